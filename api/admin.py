@@ -0,0 +1,74 @@
+"""Operational endpoints, protected by the ADMIN_API_KEY shared secret"""
+from fastapi import APIRouter, Header, HTTPException
+from typing import Optional
+import hmac
+import os
+
+from core.model_selector import model_config
+from core.prompt_registry import prompt_registry
+from core.resources import resources
+from utils.openrouter_client import openrouter
+from utils.prompt_cache import prompt_cache_stats
+from utils.structured_output import structured_output_stats
+
+router = APIRouter(prefix="/api/admin", tags=["admin"])
+
+
+def require_admin(x_admin_key: Optional[str]):
+    """Reject the request unless X-Admin-Key matches ADMIN_API_KEY"""
+    admin_key = os.getenv("ADMIN_API_KEY")
+    if not admin_key or not x_admin_key or not hmac.compare_digest(x_admin_key, admin_key):
+        raise HTTPException(status_code=403, detail="Admin key required")
+
+
+@router.get("/model-config")
+async def get_model_config_status(x_admin_key: Optional[str] = Header(None)):
+    """Which model tier config is active and whether the last reload failed"""
+    require_admin(x_admin_key)
+    return model_config.status()
+
+
+@router.post("/model-config/reload")
+async def reload_model_config(x_admin_key: Optional[str] = Header(None)):
+    """Re-read config/model_tiers.json now; an invalid file keeps the current config"""
+    require_admin(x_admin_key)
+    reloaded = model_config.reload()
+    status = model_config.status()
+    if not reloaded:
+        raise HTTPException(status_code=422, detail={"message": "Model config rejected", **status})
+    return {"status": "reloaded", **status}
+
+
+@router.get("/resources")
+async def get_resource_stats(x_admin_key: Optional[str] = Header(None)):
+    """Size and usage of the shared DB, HTTP and Redis connection pools"""
+    require_admin(x_admin_key)
+    return resources.stats()
+
+
+@router.get("/openrouter")
+async def get_openrouter_status(x_admin_key: Optional[str] = Header(None)):
+    """OpenRouter call counters and each model's circuit breaker state"""
+    require_admin(x_admin_key)
+    return openrouter.status()
+
+
+@router.get("/prompts")
+async def get_prompt_stats(x_admin_key: Optional[str] = Header(None)):
+    """Per-template placeholders, stable prefix tokens and rendered-prompt sizes"""
+    require_admin(x_admin_key)
+    return prompt_registry.stats()
+
+
+@router.get("/prompt-cache")
+async def get_prompt_cache_stats(x_admin_key: Optional[str] = Header(None)):
+    """Per-endpoint cached prompt tokens, hit rate and latency with and without a hit"""
+    require_admin(x_admin_key)
+    return prompt_cache_stats.snapshot()
+
+
+@router.get("/structured-output")
+async def get_structured_output_stats(x_admin_key: Optional[str] = Header(None)):
+    """Per-model structured output calls, parse failures and the retries they caused"""
+    require_admin(x_admin_key)
+    return structured_output_stats.snapshot()
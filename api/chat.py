@@ -2,7 +2,6 @@
 from fastapi import APIRouter
 from datetime import datetime, timezone, timedelta
 import os
-import requests
 from dotenv import load_dotenv
 from typing import Optional, Dict, List
 
@@ -20,12 +19,15 @@ from business_logic import call_llm, make_prompt, get_llm_context as get_llm_con
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from core.model_selector import get_user_tier
-from utils.token_counter import count_tokens
+from utils.token_counter import count_tokens, count_message_tokens
 from utils.summary_helpers import (
     create_conversational_summary, 
     create_quick_scan_summary
 )
 from utils.data_gathering import get_user_medical_data
+from utils.openrouter_client import openrouter, OpenRouterError
+from utils.conversation_state import CONTEXT_RECENT_MESSAGES, load_context_state, checkpoint_summary
+from utils.history_digest import get_history_digest, schedule_digest_refresh
 from utils.context_builder import get_enhanced_llm_context
 from utils.context_compression import (
     compress_medical_context,
@@ -33,6 +35,7 @@ from utils.context_compression import (
     extract_medical_flags,
     generate_medical_title,
     calculate_context_status,
+    context_status_for_tokens,
     generate_medical_summary
 )
 
@@ -41,57 +44,20 @@ load_dotenv()
 router = APIRouter(prefix="/api", tags=["chat"])
 
 async def get_llm_context(user_id: str, conversation_id: str, current_query: str = "") -> str:
-    """Fetch LLM context/summary from Supabase with intelligent aggregation"""
+    """LLM context for a chat turn: the user's history digest, or this conversation's summary"""
     try:
-        # First check if we need aggregate (all summaries for user)
-        all_summaries = supabase.table("llm_context").select("llm_summary").eq("user_id", user_id).execute()
-        
-        if all_summaries.data:
-            # Calculate total tokens across all summaries
-            total_context = "\n\n".join([s.get("llm_summary", "") for s in all_summaries.data])
-            total_tokens = count_tokens(total_context)
-            
-            if total_tokens > 25000:
-                # Need to aggregate - inline the aggregation logic here
-                print(f"Context too large ({total_tokens} tokens), aggregating...")
-                
-                # Aggregate inline to avoid import issues
-                compression_ratio = 1.5 if total_tokens < 50000 else 2.0 if total_tokens < 100000 else 5.0
-                target_tokens = int(total_tokens / compression_ratio)
-                
-                aggregate_prompt = f"""Summarize this medical history in {target_tokens} tokens, focusing on: {current_query}
-                
-HISTORY: {total_context[:10000]}...
-
-Write concise medical summary:"""
-                
-                # Call OpenRouter directly to avoid recursion
-                api_key = os.getenv("OPENROUTER_API_KEY")
-                response = requests.post(
-                    "https://openrouter.ai/api/v1/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {api_key}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "model": "openai/gpt-5-mini",  # was: deepseek/deepseek-chat
-                        "messages": [{"role": "system", "content": aggregate_prompt}],
-                        "max_tokens": target_tokens,
-                        "temperature": 0.3
-                    },
-                    timeout=30
-                )
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    return result["choices"][0]["message"]["content"]
-                else:
-                    return total_context[:2000]  # Fallback to truncated context
-            else:
-                # Just return the specific conversation summary
-                response = supabase.table("llm_context").select("llm_summary").eq("user_id", user_id).eq("conversation_id", conversation_id).execute()
-                if response.data and len(response.data) > 0:
-                    return response.data[0].get("llm_summary", "")
+        # Users with a long history get the aggregated digest, read from one Redis key
+        digest = await get_history_digest(user_id)
+        if digest is None:
+            # Never built; build it in the background and use the conversation summary now
+            schedule_digest_refresh(user_id)
+        elif digest.get("digest"):
+            return digest["digest"]
+        
+        # Just return the specific conversation summary
+        response = supabase.table("llm_context").select("llm_summary").eq("user_id", user_id).eq("conversation_id", conversation_id).execute()
+        if response.data and len(response.data) > 0:
+            return response.data[0].get("llm_summary", "")
         
         return ""
     except Exception as e:
@@ -99,10 +65,10 @@ Write concise medical summary:"""
         return ""
 
 async def get_conversation_history(conversation_id: str) -> list:
-    """Get recent messages from conversation"""
+    """Get recent messages from conversation (oldest first)"""
     try:
-        response = supabase.table("messages").select("*").eq("conversation_id", conversation_id).order("created_at", desc=False).limit(10).execute()
-        return response.data or []
+        response = supabase.table("messages").select("*").eq("conversation_id", conversation_id).order("created_at", desc=True).limit(CONTEXT_RECENT_MESSAGES).execute()
+        return list(reversed(response.data or []))
     except:
         return []
 
@@ -125,8 +91,6 @@ async def chat(request: ChatRequest):
     # Include context if provided
     additional_context = request.context or ""
     
-    api_key = os.getenv("OPENROUTER_API_KEY")
-    
     # Check user subscription status for context handling
     is_premium = False  # Simplified - check subscriptions table in production
     
@@ -143,9 +107,10 @@ async def chat(request: ChatRequest):
     # Get conversation history
     history = await get_conversation_history(request.conversation_id)
     
-    # Check context limits and apply compression if needed
-    all_messages = history + [{"role": "user", "content": request.query}]
-    context_status = calculate_context_status(all_messages, is_premium)
+    # Running token count and summary checkpoint; only new messages are counted
+    context_state = await load_context_state(request.conversation_id, request.user_id)
+    query_tokens = count_message_tokens([{"role": "user", "content": request.query}])
+    context_status = context_status_for_tokens(context_state.token_count + query_tokens, is_premium)
     
     # Check if user is blocked (free tier at 100k tokens)
     if not context_status.get("can_continue"):
@@ -158,14 +123,12 @@ async def chat(request: ChatRequest):
             "user_tier": "free"
         }
     
-    # Apply compression if needed (only for premium users)
-    if context_status.get("needs_compression"):
-        if is_premium:
-            history = await compress_medical_context(history)
-        else:
-            # This shouldn't happen since free users are blocked at 100k
-            # But keep as safety fallback
-            history = await free_tier_context(history)
+    # Older messages live in the stored summary; it is only regenerated
+    # when the unsummarized part crosses the threshold
+    await checkpoint_summary(context_state)
+    summary_message = context_state.summary_message()
+    if summary_message:
+        history = [summary_message] + history
     
     # Build comprehensive system prompt with all context
     medical_summary = ""
@@ -211,6 +174,7 @@ INSTRUCTIONS:
     # Message storage removed - messages are no longer saved to Supabase
     
     # Use tier-based model selection with fallback
+    error_detail = "No response from model"
     try:
         print(f"Using tier-based selection for user: {request.user_id}")
         result = await call_llm_with_fallback(
@@ -226,24 +190,19 @@ INSTRUCTIONS:
     except Exception as e:
         # Fallback to direct API call if tier system fails
         print(f"Tier-based selection failed: {e}, using direct call")
-        response = requests.post(
-            "https://openrouter.ai/api/v1/chat/completions",
-            headers={
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json"
-            },
-            json={
-                "model": request.model or "deepseek/deepseek-chat",
-                "messages": messages,
-                "temperature": 0.7,
-                "max_tokens": 2048
-            },
-            timeout=30
-        )
-        if response.status_code == 200:
-            result = response.json()
+        try:
+            result = await openrouter.chat_completion(
+                {
+                    "model": request.model or "deepseek/deepseek-chat",
+                    "messages": messages,
+                    "temperature": 0.7,
+                    "max_tokens": 2048
+                },
+                timeout=30
+            )
             response_success = True
-        else:
+        except OpenRouterError as direct_error:
+            error_detail = str(direct_error)
             result = None
             response_success = False
     
@@ -285,7 +244,7 @@ INSTRUCTIONS:
             "user_tier": user_tier  # Keep for compatibility
         }
     else:
-        error_msg = f"Error: {response.status_code} - {response.text}"
+        error_msg = f"Error: {error_detail}"
         
         # Error message storage removed - messages are no longer saved to Supabase
         
@@ -303,20 +262,14 @@ async def health_check():
 @router.get("/test-openrouter")
 async def test_openrouter():
     """Test OpenRouter API connection"""
-    import requests
     api_key = os.getenv("OPENROUTER_API_KEY")
     
     if not api_key:
         return {"error": "OPENROUTER_API_KEY not set", "status": "error"}
     
     try:
-        response = requests.post(
-            "https://openrouter.ai/api/v1/chat/completions",
-            headers={
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json"
-            },
-            json={
+        data = await openrouter.chat_completion(
+            {
                 "model": "deepseek/deepseek-chat",
                 "messages": [
                     {"role": "system", "content": "You are a test bot."},
@@ -325,24 +278,22 @@ async def test_openrouter():
                 "temperature": 0.1,
                 "max_tokens": 10
             },
-            timeout=10
+            timeout=10,
+            max_retries=1
         )
-        
-        if response.status_code == 200:
-            data = response.json()
-            return {
-                "status": "success",
-                "openrouter_working": True,
-                "response": data.get("choices", [{}])[0].get("message", {}).get("content", ""),
-                "model": data.get("model", "unknown")
-            }
-        else:
-            return {
-                "status": "error",
-                "openrouter_working": False,
-                "error_code": response.status_code,
-                "error_message": response.text[:200]
-            }
+        return {
+            "status": "success",
+            "openrouter_working": True,
+            "response": data.get("choices", [{}])[0].get("message", {}).get("content", ""),
+            "model": data.get("model", "unknown")
+        }
+    except OpenRouterError as e:
+        return {
+            "status": "error",
+            "openrouter_working": False,
+            "error_code": e.status_code,
+            "error_message": str(e)[:200]
+        }
     except Exception as e:
         return {
             "status": "error",
@@ -26,7 +26,7 @@ from tenacity import (
     retry_if_exception_type, before_sleep_log
 )
 import httpx
-from supabase import create_client, Client
+from supabase_client import supabase
 import logging
 
 # Models
@@ -41,11 +41,6 @@ router = APIRouter(prefix="/api/email", tags=["email"])
 # Initialize SendGrid client
 sg = sendgrid.SendGridAPIClient(api_key=os.getenv('SENDGRID_API_KEY'))
 
-# Initialize Supabase client
-supabase_url = os.getenv("SUPABASE_URL")
-supabase_key = os.getenv("SUPABASE_SERVICE_KEY")  # Use service key for backend
-supabase: Client = create_client(supabase_url, supabase_key)
-
 # Constants
 MAX_ATTACHMENT_SIZE_MB = 10
 MAX_EMAILS_PER_HOUR = 5
@@ -2,38 +2,29 @@
 Export Module - Handles PDF generation and doctor sharing functionality
 """
 
-from fastapi import APIRouter, HTTPException, Request, Response
-from fastapi.responses import FileResponse, HTMLResponse
-from typing import List, Dict, Any, Optional
-from datetime import datetime, timedelta
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Request, Response
+from fastapi.responses import FileResponse, HTMLResponse, StreamingResponse
+from typing import List, Dict, Any, Optional, Tuple
+from datetime import datetime, timedelta, timezone
 import os
+import asyncio
 import secrets
 import hashlib
-from io import BytesIO
 import logging
 from pydantic import BaseModel
 import json
 
-# PDF generation
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak, Image
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
+# PDF generation (rendered in worker processes, cached on disk)
+from utils.pdf_export import iter_file, render_report, report_cache_key
+from utils.fetch_plan import FetchSource, execute_fetch_plan, group_rows
 
-# Cloud storage (using S3-compatible storage)
-import boto3
-from botocore.exceptions import ClientError
-
-from supabase import create_client, Client
+from supabase_client import supabase
 
 router = APIRouter(prefix="/api", tags=["export"])
 
-# Initialize services
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_SERVICE_KEY")
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
+# Rendered doctor-share pages (migrations/shared_report_snapshots.sql)
+SNAPSHOT_TABLE = "shared_report_snapshots"
+SHARE_CACHE_MAX_AGE = int(os.getenv("SHARE_CACHE_MAX_AGE", "300"))
 
 # S3 configuration (can be Supabase Storage or AWS S3)
 S3_BUCKET = os.getenv("S3_BUCKET", "proxima-health-exports")
@@ -41,15 +32,20 @@ S3_REGION = os.getenv("S3_REGION", "us-east-1")
 S3_ACCESS_KEY = os.getenv("S3_ACCESS_KEY")
 S3_SECRET_KEY = os.getenv("S3_SECRET_KEY")
 
-# Initialize S3 client if credentials are provided
+# S3 client, created on first upload if credentials are provided (boto3 is slow to import)
 s3_client = None
-if S3_ACCESS_KEY and S3_SECRET_KEY:
-    s3_client = boto3.client(
-        's3',
-        region_name=S3_REGION,
-        aws_access_key_id=S3_ACCESS_KEY,
-        aws_secret_access_key=S3_SECRET_KEY
-    )
+
+def get_s3_client():
+    global s3_client
+    if s3_client is None and S3_ACCESS_KEY and S3_SECRET_KEY:
+        import boto3
+        s3_client = boto3.client(
+            's3',
+            region_name=S3_REGION,
+            aws_access_key_id=S3_ACCESS_KEY,
+            aws_secret_access_key=S3_SECRET_KEY
+        )
+    return s3_client
 
 # Request models
 class ExportPDFRequest(BaseModel):
@@ -89,243 +85,100 @@ async def get_user_info(user_id: str) -> Dict:
     """Get user information for the report"""
     try:
         # Get user profile
-        profile = supabase.table('profiles').select('*').eq('user_id', user_id).single().execute()
+        profile = await asyncio.to_thread(
+            supabase.table('profiles').select('*').eq('user_id', user_id).single().execute
+        )
         return profile.data if profile.data else {'name': 'User', 'email': 'Not provided'}
     except:
         return {'name': 'User', 'email': 'Not provided'}
 
-async def get_stories_with_analysis(story_ids: List[str]) -> Dict:
-    """Get stories with their associated analysis"""
+async def get_stories_with_analysis(story_ids: List[str]) -> List[Dict]:
+    """Get stories with their associated analysis, in story_ids order"""
+    if not story_ids:
+        return []
+
+    def for_stories(table: str, column: str, order: Optional[str] = None):
+        def build(deps):
+            query = supabase.table(table).select('*').in_(column, story_ids)
+            return query.order(order, desc=True) if order else query
+        return build
+
+    # One query per table for all stories, run concurrently
+    result = await execute_fetch_plan([
+        FetchSource('stories', for_stories('health_stories', 'id')),
+        FetchSource('insights', for_stories('health_insights', 'story_id', 'confidence')),
+        FetchSource('predictions', for_stories('health_predictions', 'story_id', 'probability')),
+        FetchSource('notes', for_stories('story_notes', 'story_id')),
+    ])
+    result.log_timings(f"EXPORT {len(story_ids)} stories")
+    if 'stories' in result.errors:
+        raise RuntimeError(f"Failed to load stories: {result.errors['stories']}")
+
+    stories = {story['id']: story for story in result.data['stories']}
+    insights = group_rows(result.data['insights'], 'story_id')
+    predictions = group_rows(result.data['predictions'], 'story_id')
+    notes = group_rows(result.data['notes'], 'story_id')
+
     stories_data = []
-    
     for story_id in story_ids:
-        # Get story
-        story_result = supabase.table('health_stories').select('*').eq('id', story_id).single().execute()
-        if not story_result.data:
+        story = stories.get(story_id)
+        if not story:
             continue
-        
-        story = story_result.data
-        
-        # Get associated analysis
-        insights = supabase.table('health_insights').select('*').eq(
-            'story_id', story_id
-        ).order('confidence.desc').execute()
-        
-        predictions = supabase.table('health_predictions').select('*').eq(
-            'story_id', story_id
-        ).order('probability.desc').execute()
-        
-        # Get any notes
-        notes = supabase.table('story_notes').select('*').eq(
-            'story_id', story_id
-        ).execute()
-        
+        story_notes = notes.get(story_id)
         stories_data.append({
             'story': story,
-            'insights': insights.data if insights.data else [],
-            'predictions': predictions.data if predictions.data else [],
-            'notes': {'content': notes.data[0]['note_text']} if notes.data else None
+            'insights': insights.get(story_id, []),
+            'predictions': predictions.get(story_id, []),
+            'notes': {'content': story_notes[0]['note_text']} if story_notes else None
         })
-    
+
     return stories_data
 
-def create_pdf_styles():
-    """Create custom styles for the PDF"""
-    styles = getSampleStyleSheet()
-    
-    # Custom styles
-    styles.add(ParagraphStyle(
-        name='CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=28,
-        textColor=colors.HexColor('#6B46C1'),
-        spaceAfter=30,
-        alignment=TA_CENTER
-    ))
-    
-    styles.add(ParagraphStyle(
-        name='SectionTitle',
-        parent=styles['Heading2'],
-        fontSize=18,
-        textColor=colors.HexColor('#6B46C1'),
-        spaceAfter=20,
-        spaceBefore=30
-    ))
-    
-    styles.add(ParagraphStyle(
-        name='InsightPositive',
-        parent=styles['Normal'],
-        fontSize=11,
-        leftIndent=20,
-        textColor=colors.HexColor('#10b981')
-    ))
-    
-    styles.add(ParagraphStyle(
-        name='InsightWarning',
-        parent=styles['Normal'],
-        fontSize=11,
-        leftIndent=20,
-        textColor=colors.HexColor('#f59e0b')
-    ))
-    
-    styles.add(ParagraphStyle(
-        name='InsightNeutral',
-        parent=styles['Normal'],
-        fontSize=11,
-        leftIndent=20,
-        textColor=colors.HexColor('#6b7280')
-    ))
-    
-    return styles
-
-async def generate_health_report_pdf(user_id: str, stories_data: List[Dict], 
-                                   include_analysis: bool, include_notes: bool) -> BytesIO:
-    """Generate a professional health report PDF"""
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter, topMargin=0.75*inch, bottomMargin=0.75*inch)
-    elements = []
-    styles = create_pdf_styles()
-    
-    # Get user info
-    user_info = await get_user_info(user_id)
-    
-    # Title page
-    elements.append(Paragraph("Health Intelligence Report", styles['CustomTitle']))
-    elements.append(Spacer(1, 0.3*inch))
-    
-    # Report metadata
-    elements.append(Paragraph(f"<b>Prepared for:</b> {user_info.get('name', 'User')}", styles['Normal']))
-    elements.append(Paragraph(f"<b>Generated:</b> {datetime.now().strftime('%B %d, %Y at %I:%M %p')}", styles['Normal']))
-    elements.append(Paragraph(f"<b>Report Period:</b> {len(stories_data)} health stories included", styles['Normal']))
-    elements.append(Spacer(1, 0.5*inch))
-    
-    # Disclaimer
-    disclaimer_style = ParagraphStyle(
-        'Disclaimer',
-        parent=styles['Normal'],
-        fontSize=9,
-        textColor=colors.HexColor('#9ca3af'),
-        borderColor=colors.HexColor('#e5e7eb'),
-        borderWidth=1,
-        borderPadding=10,
-        backColor=colors.HexColor('#f9fafb')
+async def generate_health_report_pdf(user_id: str, stories_data: List[Dict],
+                                   include_analysis: bool, include_notes: bool,
+                                   user_info: Optional[Dict] = None) -> Tuple[str, int, bool]:
+    """
+    Render a professional health report PDF (or reuse a cached render).
+
+    Returns the path of the rendered file, its size and whether it was cached.
+    """
+    if user_info is None:
+        user_info = await get_user_info(user_id)
+    options = {'include_analysis': include_analysis, 'include_notes': include_notes}
+    story_ids = [data['story']['id'] for data in stories_data]
+    cache_key = report_cache_key(user_id, story_ids, options, user_info, stories_data)
+    return await render_report(cache_key, user_info, stories_data, include_analysis, include_notes)
+
+def _s3_upload(s3_client, pdf_path: str, key: str, user_id: str):
+    # upload_file streams from disk (multipart for large reports)
+    s3_client.upload_file(
+        pdf_path, S3_BUCKET, key,
+        ExtraArgs={
+            'ContentType': 'application/pdf',
+            'Metadata': {
+                'user_id': user_id,
+                'generated_at': datetime.utcnow().isoformat()
+            }
+        }
     )
-    
-    elements.append(Paragraph(
-        "<b>Important:</b> This report is for informational purposes only and does not constitute medical advice. "
-        "Always consult with qualified healthcare professionals for medical decisions.",
-        disclaimer_style
-    ))
-    
-    elements.append(PageBreak())
-    
-    # Process each story
-    for idx, data in enumerate(stories_data):
-        story = data['story']
-        
-        # Story header
-        elements.append(Paragraph(f"Health Story #{idx + 1}", styles['SectionTitle']))
-        elements.append(Paragraph(f"Week of {story['created_at'][:10]}", styles['Italic']))
-        elements.append(Spacer(1, 0.2*inch))
-        
-        # Story content
-        elements.append(Paragraph(story['story_text'], styles['Normal']))
-        
-        # Personal note if included
-        if include_notes and data.get('notes'):
-            elements.append(Spacer(1, 0.3*inch))
-            elements.append(Paragraph("<b>Personal Note:</b>", styles['Heading3']))
-            elements.append(Paragraph(data['notes']['content'], styles['Italic']))
-        
-        # Analysis section
-        if include_analysis:
-            elements.append(Spacer(1, 0.3*inch))
-            
-            # Insights
-            if data['insights']:
-                elements.append(Paragraph("Key Insights", styles['Heading3']))
-                for insight in data['insights']:
-                    style_name = f"Insight{insight['insight_type'].capitalize()}"
-                    if style_name not in styles:
-                        style_name = 'Normal'
-                    
-                    elements.append(Paragraph(
-                        f"• <b>{insight['title']}</b> - {insight['description']} "
-                        f"<i>(Confidence: {insight['confidence']}%)</i>",
-                        styles[style_name]
-                    ))
-                elements.append(Spacer(1, 0.2*inch))
-            
-            # Predictions
-            if data['predictions']:
-                elements.append(Paragraph("Health Outlook", styles['Heading3']))
-                for pred in data['predictions']:
-                    preventable_text = " (Preventable)" if pred.get('preventable') else ""
-                    elements.append(Paragraph(
-                        f"• {pred['event_description']} - {pred['probability']}% likelihood "
-                        f"{pred['timeframe'].lower()}{preventable_text}",
-                        styles['Normal']
-                    ))
-                    if pred.get('reasoning'):
-                        elements.append(Paragraph(
-                            f"  <i>Reasoning: {pred['reasoning']}</i>",
-                            styles['Italic']
-                        ))
-                elements.append(Spacer(1, 0.2*inch))
-        
-        # Add page break between stories (except for last one)
-        if idx < len(stories_data) - 1:
-            elements.append(PageBreak())
-    
-    # Summary page
-    if include_analysis and len(stories_data) > 1:
-        elements.append(PageBreak())
-        elements.append(Paragraph("Summary Analysis", styles['SectionTitle']))
-        
-        # Aggregate insights
-        total_insights = sum(len(d['insights']) for d in stories_data)
-        total_predictions = sum(len(d['predictions']) for d in stories_data)
-        
-        elements.append(Paragraph(
-            f"Across {len(stories_data)} health stories, we identified {total_insights} key insights "
-            f"and {total_predictions} health predictions.",
-            styles['Normal']
-        ))
-    
-    # Footer
-    elements.append(Spacer(1, 0.5*inch))
-    elements.append(Paragraph(
-        "Generated by Proxima-1 Health Intelligence • proxima-1.health",
-        ParagraphStyle(
-            'Footer',
-            parent=styles['Normal'],
-            fontSize=9,
-            alignment=TA_CENTER,
-            textColor=colors.HexColor('#9ca3af')
+
+def _supabase_upload(pdf_path: str, filename: str):
+    with open(pdf_path, 'rb') as f:
+        supabase.storage.from_('exports').upload(
+            file=f,
+            path=filename,
+            file_options={"content-type": "application/pdf"}
         )
-    ))
-    
-    # Build PDF
-    doc.build(elements)
-    buffer.seek(0)
-    return buffer
 
-async def upload_to_storage(file_buffer: BytesIO, user_id: str, filename: str) -> str:
-    """Upload file to cloud storage and return URL"""
+async def upload_to_storage(pdf_path: str, user_id: str, filename: str) -> str:
+    """Upload a rendered file to cloud storage and return URL"""
+    s3_client = get_s3_client()
     if s3_client:
         # Use S3
+        from botocore.exceptions import ClientError
         try:
             key = f"exports/{user_id}/{filename}"
-            s3_client.put_object(
-                Bucket=S3_BUCKET,
-                Key=key,
-                Body=file_buffer.getvalue(),
-                ContentType='application/pdf',
-                Metadata={
-                    'user_id': user_id,
-                    'generated_at': datetime.utcnow().isoformat()
-                }
-            )
+            await asyncio.to_thread(_s3_upload, s3_client, pdf_path, key, user_id)
             
             # Generate presigned URL (valid for 1 hour)
             url = s3_client.generate_presigned_url(
@@ -341,14 +194,8 @@ async def upload_to_storage(file_buffer: BytesIO, user_id: str, filename: str) -
     else:
         # Fallback: Use Supabase Storage
         try:
-            file_buffer.seek(0)
             filename = f"{user_id}/{filename}"
-            
-            response = supabase.storage.from_('exports').upload(
-                file=file_buffer.read(),
-                path=filename,
-                file_options={"content-type": "application/pdf"}
-            )
+            await asyncio.to_thread(_supabase_upload, pdf_path, filename)
             
             # Get public URL
             url = supabase.storage.from_('exports').get_public_url(filename)
@@ -357,27 +204,34 @@ async def upload_to_storage(file_buffer: BytesIO, user_id: str, filename: str) -
         except Exception as e:
             logging.error(f"Supabase storage upload failed: {str(e)}")
             # Return a data URL as last resort
-            file_buffer.seek(0)
             import base64
-            data = base64.b64encode(file_buffer.read()).decode()
+            with open(pdf_path, 'rb') as f:
+                data = base64.b64encode(f.read()).decode()
             return f"data:application/pdf;base64,{data}"
 
+async def _load_export(request: ExportPDFRequest) -> Tuple[List[Dict], Dict]:
+    stories_data, user_info = await asyncio.gather(
+        get_stories_with_analysis(request.story_ids),
+        get_user_info(request.user_id)
+    )
+    if not stories_data:
+        raise HTTPException(status_code=404, detail="No stories found")
+    return stories_data, user_info
+
 @router.post("/export-pdf")
 async def export_pdf(request: ExportPDFRequest):
     """Generate and export a PDF health report"""
     try:
         # Get stories with analysis
-        stories_data = await get_stories_with_analysis(request.story_ids)
-        
-        if not stories_data:
-            raise HTTPException(status_code=404, detail="No stories found")
+        stories_data, user_info = await _load_export(request)
         
         # Generate PDF
-        pdf_buffer = await generate_health_report_pdf(
+        pdf_path, file_size, cached = await generate_health_report_pdf(
             user_id=request.user_id,
             stories_data=stories_data,
             include_analysis=request.include_analysis,
-            include_notes=request.include_notes
+            include_notes=request.include_notes,
+            user_info=user_info
         )
         
         # Generate filename
@@ -385,28 +239,29 @@ async def export_pdf(request: ExportPDFRequest):
         filename = f"health_report_{timestamp}.pdf"
         
         # Upload to storage
-        pdf_url = await upload_to_storage(pdf_buffer, request.user_id, filename)
+        pdf_url = await upload_to_storage(pdf_path, request.user_id, filename)
         
         # Record export in database
-        export_record = supabase.table('export_history').insert({
+        export_record = await asyncio.to_thread(supabase.table('export_history').insert({
             'user_id': request.user_id,
             'export_type': 'pdf',
             'story_ids': request.story_ids,
             'file_url': pdf_url,
-            'file_size_bytes': len(pdf_buffer.getvalue()),
+            'file_size_bytes': file_size,
             'metadata': {
                 'include_analysis': request.include_analysis,
                 'include_notes': request.include_notes,
-                'stories_count': len(stories_data)
+                'stories_count': len(stories_data),
+                'cached_render': cached
             }
-        }).execute()
+        }).execute)
         
         return {
             'status': 'success',
             'pdf_url': pdf_url,
             'expires_in': 3600,  # 1 hour
             'export_id': export_record.data[0]['id'],
-            'file_size': len(pdf_buffer.getvalue())
+            'file_size': file_size
         }
         
     except HTTPException:
@@ -415,6 +270,45 @@ async def export_pdf(request: ExportPDFRequest):
         logging.error(f"PDF export failed: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Export failed: {str(e)}")
 
+@router.post("/export-pdf/download")
+async def download_pdf(request: ExportPDFRequest):
+    """Generate a PDF health report and stream it straight to the client"""
+    try:
+        stories_data, user_info = await _load_export(request)
+        
+        # A concurrent export can evict the cached file before it is opened
+        for attempt in range(2):
+            pdf_path, file_size, cached = await generate_health_report_pdf(
+                user_id=request.user_id,
+                stories_data=stories_data,
+                include_analysis=request.include_analysis,
+                include_notes=request.include_notes,
+                user_info=user_info
+            )
+            try:
+                handle = open(pdf_path, 'rb')
+                break
+            except FileNotFoundError:
+                if attempt:
+                    raise
+        
+        filename = f"health_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+        return StreamingResponse(
+            iter_file(handle),
+            media_type='application/pdf',
+            headers={
+                'Content-Disposition': f'attachment; filename="{filename}"',
+                'Content-Length': str(file_size),
+                'X-Render-Cache': 'hit' if cached else 'miss'
+            }
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"PDF download failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Export failed: {str(e)}")
+
 @router.post("/share-with-doctor")
 async def share_with_doctor(request: ShareWithDoctorRequest):
     """Create a secure share link for healthcare providers"""
@@ -443,6 +337,12 @@ async def share_with_doctor(request: ShareWithDoctorRequest):
             }
         }).execute()
         
+        # Render once now; views are served from the snapshot
+        try:
+            await snapshot_shared_report(share_record.data[0])
+        except Exception as e:
+            logging.warning(f"Share snapshot failed, will render on first view: {str(e)}")
+        
         # Send email notification if requested
         if request.recipient_email:
             # TODO: Implement email sending
@@ -460,135 +360,194 @@ async def share_with_doctor(request: ShareWithDoctorRequest):
         logging.error(f"Share creation failed: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Share creation failed: {str(e)}")
 
+def _parse_expiry(expires_at: Optional[str]) -> Optional[datetime]:
+    if not expires_at:
+        return None
+    expires = datetime.fromisoformat(expires_at.replace('Z', '+00:00'))
+    return expires if expires.tzinfo else expires.replace(tzinfo=timezone.utc)
+
+def _is_expired(expires_at: Optional[str]) -> bool:
+    expires = _parse_expiry(expires_at)
+    return bool(expires and expires < datetime.now(timezone.utc))
+
+def shared_report_cache_control(expires_at: Optional[str]) -> str:
+    """Browser-cacheable for SHARE_CACHE_MAX_AGE, but never past the share's expiry
+
+    The page holds patient data, so shared caches (proxies, CDNs) must not keep it.
+    """
+    max_age = SHARE_CACHE_MAX_AGE
+    expires = _parse_expiry(expires_at)
+    if expires:
+        max_age = min(max_age, int((expires - datetime.now(timezone.utc)).total_seconds()))
+    if max_age <= 0:
+        return 'private, no-store'
+    return f'private, max-age={max_age}, must-revalidate'
+
+def render_shared_report_html(record: Dict, stories_data: List[Dict], generated_at: datetime) -> str:
+    """Full HTML page of a shared report"""
+    return f"""
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <title>Health Report - Proxima-1</title>
+        <meta name="viewport" content="width=device-width, initial-scale=1">
+        <style>
+            body {{
+                font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
+                line-height: 1.6;
+                color: #333;
+                max-width: 800px;
+                margin: 0 auto;
+                padding: 20px;
+                background: #f5f5f5;
+            }}
+            .container {{
+                background: white;
+                padding: 40px;
+                border-radius: 10px;
+                box-shadow: 0 2px 10px rgba(0,0,0,0.1);
+            }}
+            h1 {{
+                color: #6B46C1;
+                border-bottom: 3px solid #6B46C1;
+                padding-bottom: 10px;
+            }}
+            .metadata {{
+                background: #f8f9fa;
+                padding: 15px;
+                border-radius: 5px;
+                margin-bottom: 30px;
+            }}
+            .story {{
+                margin-bottom: 40px;
+                padding-bottom: 40px;
+                border-bottom: 1px solid #e0e0e0;
+            }}
+            .insight {{
+                margin: 10px 0;
+                padding: 10px;
+                border-left: 4px solid;
+                background: #f8f9fa;
+            }}
+            .insight.positive {{ border-color: #10b981; }}
+            .insight.warning {{ border-color: #f59e0b; }}
+            .insight.neutral {{ border-color: #6b7280; }}
+            .prediction {{
+                margin: 10px 0;
+                padding: 10px;
+                background: #e8f4fd;
+                border-radius: 5px;
+            }}
+            .disclaimer {{
+                margin-top: 40px;
+                padding: 20px;
+                background: #fef3c7;
+                border: 1px solid #fbbf24;
+                border-radius: 5px;
+                font-size: 14px;
+            }}
+            @media print {{
+                body {{ background: white; }}
+                .container {{ box-shadow: none; }}
+            }}
+        </style>
+    </head>
+    <body>
+        <div class="container">
+            <h1>Health Intelligence Report</h1>
+            
+            <div class="metadata">
+                <p><strong>Patient ID:</strong> {record['user_id'][:8]}...</p>
+                <p><strong>Generated:</strong> {generated_at.strftime('%B %d, %Y')}</p>
+                <p><strong>Stories Included:</strong> {len(stories_data)}</p>
+            </div>
+            
+            {"".join(generate_story_html(data) for data in stories_data)}
+            
+            <div class="disclaimer">
+                <strong>Medical Disclaimer:</strong> This report is generated from patient-reported data 
+                and AI analysis. It is for informational purposes only and should not replace 
+                professional medical judgment. Please correlate with clinical findings and patient history.
+            </div>
+            
+            <p style="text-align: center; color: #999; margin-top: 40px;">
+                Generated by Proxima-1 Health Intelligence • 
+                <a href="https://proxima-1.health" style="color: #6B46C1;">proxima-1.health</a>
+            </p>
+        </div>
+    </body>
+    </html>
+    """
+
+async def snapshot_shared_report(record: Dict) -> Dict:
+    """Render a share's report and store it with its ETag"""
+    stories_data = await get_stories_with_analysis(record['story_ids'])
+    html_content = render_shared_report_html(record, stories_data, datetime.now())
+    snapshot = {
+        'share_token': record['share_token'],
+        'export_id': record['id'],
+        'story_ids': record['story_ids'],
+        'expires_at': record.get('expires_at'),
+        'html': html_content,
+        'etag': '"' + hashlib.sha256(html_content.encode()).hexdigest()[:32] + '"',
+        'rendered_at': datetime.now(timezone.utc).isoformat()
+    }
+    try:
+        await asyncio.to_thread(
+            supabase.table(SNAPSHOT_TABLE).upsert(snapshot, on_conflict='share_token').execute
+        )
+    except Exception as e:
+        logging.warning(f"Failed to store share snapshot: {str(e)}")
+    return snapshot
+
+async def record_share_access(share_token: str):
+    """Bump the share's access count (runs after the response is sent)"""
+    try:
+        # Atomic access_count + 1 in the database (migrations/001_health_intelligence_tables.sql)
+        await asyncio.to_thread(
+            supabase.rpc('increment_share_access', {'p_share_token': share_token}).execute
+        )
+    except Exception as e:
+        logging.warning(f"Failed to record share access: {str(e)}")
+
 @router.get("/shared/{share_token}")
-async def view_shared_report(share_token: str):
+async def view_shared_report(share_token: str, request: Request, background_tasks: BackgroundTasks):
     """View a shared health report (for doctors)"""
     try:
-        # Validate share token
-        share_record = supabase.table('export_history').select('*').eq(
-            'share_token', share_token
-        ).single().execute()
-        
-        if not share_record.data:
-            raise HTTPException(status_code=404, detail="Share link not found")
-        
-        record = share_record.data
+        # Rendered snapshot: one primary-key lookup
+        result = await asyncio.to_thread(
+            supabase.table(SNAPSHOT_TABLE).select('*').eq('share_token', share_token).limit(1).execute
+        )
+        snapshot = result.data[0] if result.data else None
         
-        # Check expiration
-        if record.get('expires_at'):
-            expires = datetime.fromisoformat(record['expires_at'].replace('Z', '+00:00'))
-            if expires < datetime.utcnow():
+        if not snapshot:
+            # Not rendered yet, or invalidated by a change to the shared stories
+            share_record = await asyncio.to_thread(
+                supabase.table('export_history').select('*').eq('share_token', share_token).limit(1).execute
+            )
+            if not share_record.data:
+                raise HTTPException(status_code=404, detail="Share link not found")
+            record = share_record.data[0]
+            if _is_expired(record.get('expires_at')):
                 raise HTTPException(status_code=410, detail="Share link has expired")
+            snapshot = await snapshot_shared_report(record)
         
-        # Increment access count
-        supabase.table('export_history').update({
-            'access_count': record.get('access_count', 0) + 1,
-            'last_accessed_at': datetime.utcnow().isoformat()
-        }).eq('id', record['id']).execute()
-        
-        # Get stories and analysis
-        stories_data = await get_stories_with_analysis(record['story_ids'])
-        
-        # Get user info (limited for privacy)
-        user_info = await get_user_info(record['user_id'])
+        # Check expiration
+        if _is_expired(snapshot.get('expires_at')):
+            raise HTTPException(status_code=410, detail="Share link has expired")
+        
+        # Count the view after responding
+        background_tasks.add_task(record_share_access, share_token)
+        headers = {
+            'ETag': snapshot['etag'],
+            'Cache-Control': shared_report_cache_control(snapshot.get('expires_at'))
+        }
         
-        # Create HTML response
-        html_content = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>Health Report - Proxima-1</title>
-            <meta name="viewport" content="width=device-width, initial-scale=1">
-            <style>
-                body {{
-                    font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
-                    line-height: 1.6;
-                    color: #333;
-                    max-width: 800px;
-                    margin: 0 auto;
-                    padding: 20px;
-                    background: #f5f5f5;
-                }}
-                .container {{
-                    background: white;
-                    padding: 40px;
-                    border-radius: 10px;
-                    box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-                }}
-                h1 {{
-                    color: #6B46C1;
-                    border-bottom: 3px solid #6B46C1;
-                    padding-bottom: 10px;
-                }}
-                .metadata {{
-                    background: #f8f9fa;
-                    padding: 15px;
-                    border-radius: 5px;
-                    margin-bottom: 30px;
-                }}
-                .story {{
-                    margin-bottom: 40px;
-                    padding-bottom: 40px;
-                    border-bottom: 1px solid #e0e0e0;
-                }}
-                .insight {{
-                    margin: 10px 0;
-                    padding: 10px;
-                    border-left: 4px solid;
-                    background: #f8f9fa;
-                }}
-                .insight.positive {{ border-color: #10b981; }}
-                .insight.warning {{ border-color: #f59e0b; }}
-                .insight.neutral {{ border-color: #6b7280; }}
-                .prediction {{
-                    margin: 10px 0;
-                    padding: 10px;
-                    background: #e8f4fd;
-                    border-radius: 5px;
-                }}
-                .disclaimer {{
-                    margin-top: 40px;
-                    padding: 20px;
-                    background: #fef3c7;
-                    border: 1px solid #fbbf24;
-                    border-radius: 5px;
-                    font-size: 14px;
-                }}
-                @media print {{
-                    body {{ background: white; }}
-                    .container {{ box-shadow: none; }}
-                }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <h1>Health Intelligence Report</h1>
-                
-                <div class="metadata">
-                    <p><strong>Patient ID:</strong> {record['user_id'][:8]}...</p>
-                    <p><strong>Generated:</strong> {datetime.now().strftime('%B %d, %Y')}</p>
-                    <p><strong>Stories Included:</strong> {len(stories_data)}</p>
-                    <p><strong>Access Count:</strong> {record.get('access_count', 0) + 1}</p>
-                </div>
-                
-                {"".join(generate_story_html(data) for data in stories_data)}
-                
-                <div class="disclaimer">
-                    <strong>Medical Disclaimer:</strong> This report is generated from patient-reported data 
-                    and AI analysis. It is for informational purposes only and should not replace 
-                    professional medical judgment. Please correlate with clinical findings and patient history.
-                </div>
-                
-                <p style="text-align: center; color: #999; margin-top: 40px;">
-                    Generated by Proxima-1 Health Intelligence • 
-                    <a href="https://proxima-1.health" style="color: #6B46C1;">proxima-1.health</a>
-                </p>
-            </div>
-        </body>
-        </html>
-        """
+        if_none_match = [tag.strip() for tag in request.headers.get('if-none-match', '').split(',')]
+        if snapshot['etag'] in if_none_match:
+            return Response(status_code=304, headers=headers, background=background_tasks)
         
-        return HTMLResponse(content=html_content)
+        return HTMLResponse(content=snapshot['html'], headers=headers, background=background_tasks)
         
     except HTTPException:
         raise
@@ -602,7 +561,7 @@ def generate_story_html(data: Dict) -> str:
     html = f"""
     <div class="story">
         <h2>Health Story - {story['created_at'][:10]}</h2>
-        <p>{story['content']}</p>
+        <p>{story.get('story_text') or story.get('content', '')}</p>
     """
     
     if data['insights']:
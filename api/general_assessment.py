@@ -3,7 +3,6 @@ from fastapi import APIRouter, Request, HTTPException
 from typing import Optional, Dict, Any, List
 import json
 import uuid
-import os
 from datetime import datetime, timezone
 import logging
 
@@ -26,8 +25,11 @@ from utils.db_storage import (
     store_enhanced_fields_for_general_assessment,
     store_enhanced_fields_for_general_deepdive
 )
-from business_logic import call_llm
+from business_logic import call_llm, call_llm_structured
+from models.llm_outputs import FlashAssessmentOutput
+from utils.structured_output import StructuredOutputError
 from supabase_client import supabase
+from core.prompt_registry import prompt_registry, compile_template
 
 router = APIRouter(prefix="/api", tags=["general_assessment"])
 logger = logging.getLogger(__name__)
@@ -175,10 +177,7 @@ async def flash_assessment(request: Request):
             logger.error(f"Error formatting medical data: {str(e)}")
             medical_context = "No medical history available"
         
-        system_prompt = f"""You are a medical triage AI. Handle symptoms, concerns, and health questions professionally.
-
-User Medical Context:
-{medical_context}
+        system_prompt = """You are a medical triage AI. Handle symptoms, concerns, and health questions professionally.
 
 For SYMPTOMS (e.g., "my chest hurts"):
 "[Symptom] could indicate [2-3 conditions]. Key factors: [differentiators]. Urgency: [level]. Next: [action]."
@@ -199,73 +198,60 @@ CRITICAL JSON REQUIREMENTS:
 5. The "confidence" must be a number from 0-100, not a string
 
 Respond in JSON format:
-{{
+{
     "response": "Your assessment (2-4 sentences max)",
     "main_concern": "core issue identified",
     "urgency": "low|medium|high|emergency",
     "confidence": 0-100,
     "next_action": "general-assessment|body-scan|see-doctor|monitor",
     "action_reason": "Why this action (be specific)"
-}}
+}
 
 Example valid response:
-{{
+{
     "response": "Headache lasting 2 days could indicate tension headache, migraine, or rarely something more serious. Key factors: any fever, neck stiffness, or vision changes would raise concern. Urgency: Low if isolated symptom. Next: Monitor for 24h.",
     "main_concern": "Tension headache vs migraine",
     "urgency": "low",
     "confidence": 75,
     "next_action": "monitor",
     "action_reason": "Symptoms suggest benign headache; monitor for red flags before escalating"
-}}"""
+}"""
 
-        # Call LLM
-        llm_response = await call_llm(
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_query}
-            ],
-            model="google/gemini-2.5-flash-lite",
-            temperature=0.7
-        )
-        
-        logger.info(f"LLM Response: {str(llm_response)[:500]}...")  # Log first 500 chars
-        
-        # Extract content from response
-        if isinstance(llm_response, dict):
-            llm_content = llm_response.get('content', '')
-        else:
-            llm_content = str(llm_response)
-        
-        # Clean up markdown blocks if present
-        if '```json' in llm_content:
-            llm_content = llm_content.replace('```json', '').replace('```', '').strip()
-        
-        logger.info(f"Cleaned content: {llm_content[:500]}...")
-        
-        # Parse response
+        # Call LLM; the response is validated against FlashAssessmentOutput
         try:
-            parsed = extract_json_from_text(llm_content)
+            llm_response = await call_llm_structured(
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "system", "content": f"User Medical Context:\n{medical_context}"},
+                    {"role": "user", "content": user_query}
+                ],
+                schema=FlashAssessmentOutput,
+                model="google/gemini-2.5-flash-lite",
+                temperature=0.7,
+                prompt_cache_key="flash_assessment"
+            )
+            parsed = llm_response["parsed"].model_dump()
             logger.info(f"Parsed result: {parsed}")
-            if not parsed:
-                logger.warning("Failed to parse JSON from LLM response, using defaults")
-                parsed = {
-                    "response": llm_content if llm_content else "I understand your concern. Let me help you with that.",
-                    "main_concern": "Unable to extract",
-                    "urgency": "medium", 
-                    "confidence": 70,
-                    "next_action": "general-assessment",
-                    "action_reason": "Further assessment needed"
-                }
-        except Exception as e:
-            logger.error(f"Error parsing LLM response: {str(e)}")
+        except StructuredOutputError as e:
+            logger.warning(f"Failed to parse flash assessment, using defaults: {e}")
             parsed = {
-                "response": "I understand your concern. Let me help assess your situation.",
-                "main_concern": user_query[:100],  # First 100 chars of query
-                "urgency": "medium",
-                "confidence": 50,
-                "next_action": "general-assessment", 
-                "action_reason": "Need more information"
+                "response": "I understand your concern. Let me help you with that.",
+                "main_concern": "Unable to extract",
+                "urgency": "medium", 
+                "confidence": 70,
+                "next_action": "general-assessment",
+                "action_reason": "Further assessment needed"
             }
+            extracted = extract_json_from_text(e.raw)
+            if isinstance(extracted, dict):
+                # Valid JSON with a field off-schema (e.g. urgency "moderate"): keep what it has
+                parsed.update({k: v for k, v in extracted.items() if k in parsed and v not in (None, "")})
+                if not isinstance(parsed["confidence"], (int, float)):
+                    parsed["confidence"] = 70
+            elif extracted is None and isinstance(e.raw, str) and e.raw.strip() \
+                    and not e.raw.lstrip().startswith(("{", "[", "```")):
+                # Plain-text answer (broken JSON keeps the default text)
+                parsed["response"] = e.raw.strip()
         
         # Save to database
         # Convert user_id to UUID if it's provided as string
@@ -1279,22 +1265,10 @@ Location Description: {form_data['bodyLocation'].get('description', 'None')}
 def build_category_prompt(category: str, medical_data: dict) -> str:
     """Build category-specific prompt with medical context"""
     
-    # Try to load from file first
-    prompts_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'prompts', 'general_assessment')
-    prompt_file = os.path.join(prompts_dir, f"{category}.txt")
-    
-    base_prompt = None
-    try:
-        if os.path.exists(prompt_file):
-            with open(prompt_file, 'r') as f:
-                base_prompt = f.read()
-                logger.info(f"Loaded {category} prompt from file")
-    except Exception as e:
-        logger.warning(f"Could not load prompt from file for {category}: {e}")
-    
-    # Fall back to inline prompt if file not found
-    if not base_prompt:
-        base_prompt = CATEGORY_PROMPTS.get(category, CATEGORY_PROMPTS["unsure"])
+    # Compiled from prompts/general_assessment at startup
+    template = prompt_registry.get(f"general_assessment/{category}")
+    if template is None:
+        template = compile_template(f"inline/{category}", CATEGORY_PROMPTS.get(category, CATEGORY_PROMPTS["unsure"]))
         logger.info(f"Using inline prompt for {category}")
     
     # Replace placeholders with actual medical data
@@ -1307,7 +1281,7 @@ def build_category_prompt(category: str, medical_data: dict) -> str:
     # Use personal_health_context as conditions since there's no chronic_conditions field
     conditions = medical_data.get('personal_health_context', 'None')
     
-    prompt = base_prompt.format(
+    prompt = template.render(
         medications=medications_str,
         conditions=conditions
     )
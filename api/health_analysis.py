@@ -13,8 +13,7 @@ import asyncio
 
 # Initialize logger
 logger = logging.getLogger(__name__)
-from supabase import create_client, Client
-import os
+from supabase_client import supabase
 
 # Import our AI service (to be created)
 # HealthAnalyzer removed - now using standard call_llm pattern
@@ -23,11 +22,6 @@ from models.requests import HealthAnalysisRequest, RefreshAnalysisRequest
 
 router = APIRouter(prefix="/api", tags=["health_analysis"])
 
-# Initialize Supabase client
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_SERVICE_KEY")
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
-
 # Analyzer no longer needed - using call_llm directly
 
 # Request/Response Models
@@ -19,7 +19,9 @@ from models.requests import (
 from supabase_client import supabase
 from business_logic import call_llm, make_prompt, get_llm_context as get_llm_context_biz, get_user_data
 from utils.json_parser import extract_json_from_response
+from utils.token_counter import count_tokens
 from utils.data_gathering import get_user_medical_data
+from utils.history_digest import schedule_digest_refresh
 from utils.assessment_formatter import add_minimal_fields
 from utils.db_storage import (
     store_minimal_fields_for_quick_scan,
@@ -886,10 +888,12 @@ Key Findings: {', '.join(analysis_result.get('reasoning_snippets', [])[:3])}"""
                     "user_id": session["user_id"],
                     "conversation_id": None,  # Deep dives don't have conversation_id
                     "llm_summary": summary_text,
+                    "token_count": count_tokens(summary_text),
                     "created_at": datetime.now(timezone.utc).isoformat()
                 }
                 
                 supabase.table("llm_context").insert(summary_data).execute()
+                schedule_digest_refresh(session["user_id"])
             except Exception as summary_error:
                 print(f"Summary generation error (non-critical): {summary_error}")
         
@@ -1,18 +1,19 @@
 """Health Story API endpoint"""
 from fastapi import APIRouter
 from datetime import datetime, timezone
-import json
 import uuid
 
 from models.requests import HealthStoryRequest
 from supabase_client import supabase
 from utils.data_gathering import get_health_story_data
-from utils.token_counter import count_tokens
+from utils.context_packer import CLINICAL_FIELDS, ContextSection, pack_context
 from utils.json_parser import extract_json_from_response
 from business_logic import call_llm
 
 router = APIRouter(prefix="/api", tags=["health-story"])
 
+HEALTH_STORY_CONTEXT_TOKENS = 10000
+
 @router.post("/health-story")
 async def generate_health_story(request: HealthStoryRequest):
     """Generate weekly health story analysis"""
@@ -23,127 +24,30 @@ async def generate_health_story(request: HealthStoryRequest):
         # Gather all relevant data
         health_data = await get_health_story_data(request.user_id, request.date_range)
         
-        # Count tokens and prepare context
-        total_tokens = 0
-        context_parts = []
-        
-        # Add medical profile if available
-        if health_data["medical_profile"]:
-            profile_text = f"Medical Profile: {json.dumps(health_data['medical_profile'], indent=2)}"
-            context_parts.append(profile_text)
-            total_tokens += count_tokens(profile_text)
-        
-        # Add recent oracle chats (limit to most relevant)
-        if health_data["oracle_chats"]:
-            recent_chats = health_data["oracle_chats"][-10:]  # Last 10 messages
-            chat_text = "Recent Oracle Conversations:\n"
-            for msg in recent_chats:
-                chat_text += f"- {msg.get('created_at', '')}: {msg.get('content', '')[:200]}...\n"
-            context_parts.append(chat_text)
-            total_tokens += count_tokens(chat_text)
-        
-        # Add quick scans with detailed information
-        if health_data["quick_scans"]:
-            print(f"Adding {len(health_data['quick_scans'])} quick scans to health story context")
-            scan_text = "Recent Quick Scans:\n"
-            for scan in health_data["quick_scans"]:
-                # Get the analysis result - it's stored directly in the scan
-                analysis = scan.get('analysis_result', {})
-                form_data = scan.get('form_data', {})
-                
-                # Format the date more nicely
-                created_at = scan.get('created_at', '')
-                if created_at:
-                    try:
-                        date_obj = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
-                        formatted_date = date_obj.strftime('%Y-%m-%d %H:%M')
-                    except:
-                        formatted_date = created_at[:10]
-                else:
-                    formatted_date = 'Unknown date'
-                
-                scan_text += f"\n- {formatted_date}: {scan.get('body_part', 'Unknown body part')} scan\n"
-                
-                # Add user-reported symptoms from form data
-                if form_data.get('symptoms'):
-                    scan_text += f"  Reported Symptoms: {form_data.get('symptoms')}\n"
-                if form_data.get('painLevel'):
-                    scan_text += f"  Pain Level: {form_data.get('painLevel')}/10\n"
-                if form_data.get('duration'):
-                    scan_text += f"  Duration: {form_data.get('duration')}\n"
-                
-                # Add analysis results
-                scan_text += f"  Primary Condition: {analysis.get('primaryCondition', 'Unknown')}\n"
-                scan_text += f"  Likelihood: {analysis.get('likelihood', 'Unknown')}\n"
-                scan_text += f"  Confidence: {analysis.get('confidence', scan.get('confidence_score', 0))}%\n"
-                scan_text += f"  Urgency: {analysis.get('urgency', scan.get('urgency_level', 'unknown'))}\n"
-                
-                # Add symptoms identified by AI
-                symptoms = analysis.get('symptoms', [])
-                if symptoms and isinstance(symptoms, list):
-                    scan_text += f"  Identified Symptoms: {', '.join(str(s) for s in symptoms[:5])}\n"
-                
-                # Add key recommendations
-                recommendations = analysis.get('recommendations', [])
-                if recommendations and isinstance(recommendations, list):
-                    scan_text += f"  Key Recommendations: {', '.join(str(r) for r in recommendations[:3])}\n"
-                
-                # Add self-care if available
-                self_care = analysis.get('selfCare', [])
-                if self_care and isinstance(self_care, list) and len(self_care) > 0:
-                    scan_text += f"  Self-Care Tips: {str(self_care[0])}\n"
-                
-                # Add red flags if any
-                red_flags = analysis.get('redFlags', [])
-                if red_flags and isinstance(red_flags, list) and len(red_flags) > 0:
-                    scan_text += f"  Warning Signs: {str(red_flags[0])}\n"
-                
-            context_parts.append(scan_text)
-            total_tokens += count_tokens(scan_text)
-        else:
+        # Pack the data into the prompt budget, most important sections first
+        if not health_data["quick_scans"]:
             print("No quick scans found for health story")
+        completed_dives = [
+            dive for dive in health_data["deep_dives"]
+            if dive.get("status") == "completed" and dive.get("final_analysis")
+        ]
+        packed = pack_context([
+            ContextSection("medical_profile", health_data["medical_profile"], title="Medical Profile"),
+            ContextSection("quick_scans", health_data["quick_scans"], title="Recent Quick Scans",
+                           fields=CLINICAL_FIELDS["quick_scans"]),
+            ContextSection("deep_dives", completed_dives, title="Deep Dive Analyses",
+                           fields=CLINICAL_FIELDS["deep_dives"]),
+            ContextSection("symptom_tracking", health_data["symptom_tracking"], title="Symptom Tracking",
+                           fields=CLINICAL_FIELDS["symptom_tracking"], order_key="occurrence_date"),
+            ContextSection("oracle_chats", health_data["oracle_chats"], title="Recent Oracle Conversations",
+                           fields=CLINICAL_FIELDS["oracle_chats"]),
+        ], HEALTH_STORY_CONTEXT_TOKENS)
+        if packed.dropped:
+            print(f"Health story context over {HEALTH_STORY_CONTEXT_TOKENS} tokens, omitted: {packed.dropped}")
+        context = packed.as_text()
+        if not health_data["quick_scans"]:
             # Explicitly add a note about no quick scans
-            no_scans_text = "Recent Quick Scans: No quick scans recorded during this period.\n"
-            context_parts.append(no_scans_text)
-            total_tokens += count_tokens(no_scans_text)
-        
-        # Add deep dive summaries
-        if health_data["deep_dives"]:
-            dive_text = "Deep Dive Analyses:\n"
-            for dive in health_data["deep_dives"]:
-                if dive.get("status") == "completed" and dive.get("final_analysis"):
-                    dive_text += f"- {dive.get('created_at', '')}: {dive.get('body_part', '')} - "
-                    dive_text += f"{dive.get('final_analysis', {}).get('primaryCondition', 'Analysis completed')}\n"
-            context_parts.append(dive_text)
-            total_tokens += count_tokens(dive_text)
-        
-        # Add symptom tracking
-        if health_data["symptom_tracking"]:
-            symptom_text = "Symptom Tracking:\n"
-            for entry in health_data["symptom_tracking"]:
-                symptom_text += f"- {entry.get('date', '')}: "
-                symptoms = entry.get('symptoms', [])
-                if symptoms:
-                    symptom_text += f"{', '.join(symptoms[:3])}\n"
-            context_parts.append(symptom_text)
-            total_tokens += count_tokens(symptom_text)
-        
-        # If context is too large, summarize it
-        if total_tokens > 10000:
-            # Use LLM to summarize the context
-            summary_response = await call_llm(
-                messages=[
-                    {"role": "system", "content": "Summarize the following health data concisely, focusing on key patterns and changes:"},
-                    {"role": "user", "content": "\n".join(context_parts)}
-                ],
-                model="deepseek/deepseek-chat",  # Good for summarization
-                user_id=request.user_id,
-                temperature=0.3,
-                max_tokens=1024
-            )
-            context = summary_response.get("content", "\n".join(context_parts[:2]))
-        else:
-            context = "\n\n".join(context_parts)
+            context += "\n\nRecent Quick Scans: No quick scans recorded during this period."
         
         # Generate health story with creative title
         system_prompt = """You are a creative health journalist analyzing patterns and trends to create an engaging narrative health story with a compelling title.
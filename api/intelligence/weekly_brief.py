@@ -14,10 +14,14 @@ from supabase_client import supabase
 from business_logic import call_llm
 from utils.data_gathering import get_health_story_data, gather_user_health_data
 from utils.context_builder import get_enhanced_llm_context_time_range
+from utils.context_packer import ContextSection, context_budget, pack_context
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/health-brief", tags=["weekly_brief"])
 
+BRIEF_MODEL = "openai/gpt-5"
+BRIEF_CONTEXT_TOKEN_BUDGET = 4000
+
 class GenerateBriefRequest(BaseModel):
     user_id: str
     week_of: Optional[str] = None  # ISO date of Monday
@@ -112,6 +116,19 @@ async def generate_weekly_brief(request: GenerateBriefRequest):
             'user_id', request.user_id
         ).eq('week_of', week_monday.isoformat()).execute()
         
+        # Fit this week, the small insight lists and then last week into the prompt budget
+        packed = pack_context([
+            ContextSection.text("week", week_data),
+            ContextSection("insights", [{'type': i['insight_type'], 'title': i['title'], 'description': i['description']}
+                                        for i in (insights.data or [])[:3]], order_key=None),
+            ContextSection("predictions", [{'event': p['event_description'], 'probability': p['probability']}
+                                           for p in (predictions.data or [])[:3]], order_key=None),
+            ContextSection("shadow_patterns", [{'name': s['pattern_name'], 'significance': s['significance']}
+                                               for s in (shadow_patterns.data or [])[:3]], order_key=None),
+            ContextSection.text("previous_week", prev_week_data),
+        ], context_budget(BRIEF_MODEL, output_tokens=6000, cap=BRIEF_CONTEXT_TOKEN_BUDGET))
+        packed.log("WEEKLY BRIEF")
+        
         # Prepare comprehensive prompt for brief generation
         system_prompt = """You are a health storyteller creating a personalized weekly health brief. 
 Generate a comprehensive, engaging narrative that makes health data meaningful and actionable.
@@ -126,19 +143,19 @@ The brief should feel like it was written by a caring health advisor who knows t
         user_prompt = f"""Create a comprehensive weekly health brief for Week {week_monday.strftime('%U')} ({week_monday.strftime('%B %d')} - {week_sunday.strftime('%B %d, %Y')}).
 
 THIS WEEK'S DATA:
-{week_data[:3000]}
+{packed.render("week")}
 
 PREVIOUS WEEK FOR COMPARISON:
-{prev_week_data[:2000]}
+{packed.render("previous_week")}
 
 EXISTING INSIGHTS THIS WEEK:
-{json.dumps([{'type': i['insight_type'], 'title': i['title'], 'description': i['description']} for i in (insights.data or [])[:3]], indent=2)}
+{packed.render("insights", "[]")}
 
 PREDICTIONS:
-{json.dumps([{'event': p['event_description'], 'probability': p['probability']} for p in (predictions.data or [])[:3]], indent=2)}
+{packed.render("predictions", "[]")}
 
 SHADOW PATTERNS (things no longer tracked):
-{json.dumps([{'name': s['pattern_name'], 'significance': s['significance']} for s in (shadow_patterns.data or [])[:3]], indent=2)}
+{packed.render("shadow_patterns", "[]")}
 
 Generate a complete weekly brief with this EXACT JSON structure:
 {{
@@ -243,7 +260,7 @@ Make this brief feel like it was written specifically for this user, with genuin
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt}
             ],
-            model="openai/gpt-5",  # Use GPT-5 with reasoning for maximum narrative quality
+            model=BRIEF_MODEL,  # Use GPT-5 with reasoning for maximum narrative quality
             user_id=request.user_id,
             temperature=0.7,  # Higher for creative storytelling
             max_tokens=6000,  # Increased to accommodate reasoning tokens
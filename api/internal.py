@@ -0,0 +1,16 @@
+"""Internal diagnostics, protected by the ADMIN_API_KEY shared secret"""
+from fastapi import APIRouter, Header
+from typing import Optional
+
+from api.admin import require_admin
+from core.resources import resources
+from utils.startup_profile import startup_profile
+
+router = APIRouter(prefix="/internal", tags=["internal"])
+
+
+@router.get("/startup-report")
+async def startup_report(x_admin_key: Optional[str] = Header(None)):
+    """Where cold start time went: router imports, lifespan steps, lazy modules"""
+    require_admin(x_admin_key)
+    return {**startup_profile.report(), "pools": resources.stats()}
@@ -8,8 +8,11 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
-# Import the existing photo_analysis module
-from api import photo_analysis
 
-# Re-export the router for backward compatibility
-router = photo_analysis.router
\ No newline at end of file
+def __getattr__(name):
+    # Re-export the router lazily: api/photo_analysis.py imports the migrated
+    # submodules of this package, so an eager import here would be circular
+    if name == 'router':
+        from api import photo_analysis
+        return photo_analysis.router
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,17 +1,19 @@
 """Smart photo batching for comparison operations"""
+import heapq
 from typing import List, Dict, Any, Tuple, Optional
 
+
 class SmartPhotoBatcher:
     """Intelligently select photos for comparison when total exceeds limit"""
-    
+
     def __init__(self, max_photos: int = 40):
         self.max_photos = max_photos
         self.reserved_recent = 5  # Always include last 5 photos
         self.reserved_baseline = 1  # Always include first photo
-        
+
     def select_photos_for_comparison(
-        self, 
-        all_photos: List[Dict], 
+        self,
+        all_photos: List[Dict],
         all_analyses: Optional[List[Dict]] = None
     ) -> Tuple[List[Dict], Dict[str, Any]]:
         """
@@ -25,124 +27,112 @@ class SmartPhotoBatcher:
                 "selection_method": "all_photos",
                 "omitted_periods": []
             }
-        
-        selected = []
+
         selection_info = {
             "total_photos": len(all_photos),
             "photos_shown": self.max_photos,
             "selection_reasoning": [],
             "omitted_periods": []
         }
-        
+
         # Sort photos by date
         sorted_photos = sorted(all_photos, key=lambda x: x.get('uploaded_at', ''))
-        
+
         # Phase 1: Always include first photo (baseline)
-        if sorted_photos:
-            selected.append(sorted_photos[0])
-            selection_info["selection_reasoning"].append("Included baseline (first) photo")
-        
+        baseline = sorted_photos[:1]
+        selection_info["selection_reasoning"].append("Included baseline (first) photo")
+
         # Phase 2: Always include most recent photos
         recent_photos = sorted_photos[-self.reserved_recent:]
-        selected.extend(recent_photos)
         selection_info["selection_reasoning"].append(f"Included {len(recent_photos)} most recent photos")
-        
+
         # Phase 3: Fill remaining slots intelligently
-        remaining_slots = self.max_photos - len(selected)
+        remaining_slots = self.max_photos - len(baseline) - len(recent_photos)
         middle_photos = sorted_photos[1:-self.reserved_recent] if len(sorted_photos) > self.reserved_recent + 1 else []
-        
+        selected_middle = []
+
         if middle_photos and remaining_slots > 0:
-            # Calculate importance scores
-            scored_photos = []
-            for i, photo in enumerate(middle_photos):
-                score = self._calculate_photo_importance(photo, i, middle_photos, all_analyses)
-                scored_photos.append((score, photo))
-            
-            # Sort by score and take top photos
-            scored_photos.sort(key=lambda x: x[0], reverse=True)
-            selected_middle = [photo for score, photo in scored_photos[:remaining_slots]]
-            
-            # Insert in chronological order
-            for photo in sorted(selected_middle, key=lambda x: x.get('uploaded_at', '')):
-                # Find correct position to maintain chronological order
-                insert_pos = 1  # After baseline
-                for i in range(1, len(selected) - len(recent_photos)):
-                    if selected[i].get('uploaded_at', '') > photo.get('uploaded_at', ''):
-                        break
-                    insert_pos = i + 1
-                selected.insert(insert_pos, photo)
-            
+            scores = self._score_photos(middle_photos, self._index_analyses(all_analyses))
+
+            # Top-k by score; nlargest is stable, so ties keep chronological order
+            top_indices = heapq.nlargest(remaining_slots, range(len(middle_photos)), key=scores.__getitem__)
+
+            # middle_photos is already chronological, so sorting indices restores order
+            selected_middle = [middle_photos[i] for i in sorted(top_indices)]
+
             selection_info["selection_reasoning"].append(
                 f"Selected {len(selected_middle)} photos from middle period based on importance"
             )
-        
+
+        selected = baseline + selected_middle + recent_photos
+
         # Calculate omitted periods
         selection_info["omitted_periods"] = self._calculate_omitted_periods(sorted_photos, selected)
-        
+
         return selected, selection_info
-    
-    def _calculate_photo_importance(
-        self, 
-        photo: Dict, 
-        index: int, 
-        all_middle_photos: List[Dict],
-        all_analyses: Optional[List[Dict]]
-    ) -> float:
-        """Calculate importance score for a photo"""
-        score = 0.0
-        
+
+    @staticmethod
+    def _index_analyses(all_analyses: Optional[List[Dict]]) -> Dict[str, Dict]:
+        """Map each photo id to the first analysis that covers it"""
+        index = {}
+        for analysis in all_analyses or []:
+            for photo_id in analysis.get('photo_ids') or []:
+                index.setdefault(photo_id, analysis)
+        return index
+
+    def _score_photos(self, middle_photos: List[Dict], analysis_index: Dict[str, Dict]) -> List[float]:
+        """Calculate importance scores for all middle photos in one pass"""
+        total_photos = len(middle_photos)
+
         # 1. Temporal distribution - prefer evenly spaced photos
-        total_photos = len(all_middle_photos)
         ideal_spacing = total_photos / (self.max_photos - self.reserved_recent - self.reserved_baseline)
-        distance_from_ideal = abs(index % ideal_spacing)
-        temporal_score = 100 * (1 - distance_from_ideal / ideal_spacing)
-        score += temporal_score
-        
-        # 2. Quality score if available
-        if photo.get('quality_score'):
-            score += photo['quality_score'] * 0.5
-        
-        # 3. Check if photo has associated analysis with significant findings
-        if all_analyses:
-            photo_analysis = next(
-                (a for a in all_analyses if photo['id'] in a.get('photo_ids', [])), 
-                None
-            )
+        scores = [100 * (1 - (i % ideal_spacing) / ideal_spacing) for i in range(total_photos)]
+
+        for i, photo in enumerate(middle_photos):
+            # 2. Quality score if available
+            if photo.get('quality_score'):
+                scores[i] += photo['quality_score'] * 0.5
+
+            # 3. Check if photo has associated analysis with significant findings
+            photo_analysis = analysis_index.get(photo['id'])
             if photo_analysis:
                 # High confidence changes
                 if photo_analysis.get('confidence_score', 0) < 70:
-                    score += 50  # Uncertain cases are important
-                
+                    scores[i] += 50  # Uncertain cases are important
+
                 # Red flags present
-                if photo_analysis.get('analysis_data', {}).get('red_flags'):
-                    score += 100
-                
+                if (photo_analysis.get('analysis_data') or {}).get('red_flags'):
+                    scores[i] += 100
+
                 # Marked as significant change in comparison
-                if photo_analysis.get('comparison', {}).get('trend') == 'worsening':
-                    score += 80
-        
-        # 4. User notes or follow-up flag
-        if photo.get('followup_notes'):
-            score += 75
-        
-        return score
-    
+                if (photo_analysis.get('comparison') or {}).get('trend') == 'worsening':
+                    scores[i] += 80
+
+            # 4. User notes or follow-up flag
+            if photo.get('followup_notes'):
+                scores[i] += 75
+
+        return scores
+
     def _calculate_omitted_periods(
-        self, 
-        all_photos: List[Dict], 
+        self,
+        all_photos: List[Dict],
         selected_photos: List[Dict]
     ) -> List[Dict]:
         """Calculate time periods that were omitted from selection"""
         omitted_periods = []
         selected_dates = {p['uploaded_at'][:10] for p in selected_photos}
-        
+
+        # all_photos is chronological, so every photo in a gap is counted as we pass it
         current_gap_start = None
+        gap_count = 0
         for i, photo in enumerate(all_photos):
             photo_date = photo['uploaded_at'][:10]
-            
+
             if photo_date not in selected_dates:
                 if current_gap_start is None:
                     current_gap_start = photo_date
+                gap_count += 1
             else:
                 if current_gap_start is not None:
                     # Gap ended
@@ -150,11 +140,9 @@ class SmartPhotoBatcher:
                     omitted_periods.append({
                         "start": current_gap_start,
                         "end": prev_photo_date,
-                        "photos_omitted": sum(
-                            1 for p in all_photos 
-                            if current_gap_start <= p['uploaded_at'][:10] <= prev_photo_date
-                        )
+                        "photos_omitted": gap_count
                     })
                     current_gap_start = None
-        
-        return omitted_periods
\ No newline at end of file
+                    gap_count = 0
+
+        return omitted_periods
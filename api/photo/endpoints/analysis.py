@@ -11,6 +11,7 @@ from utils.json_parser import extract_json_from_text
 from ..core import PHOTO_ANALYSIS_PROMPT, PHOTO_COMPARISON_PROMPT, STORAGE_BUCKET
 from ..openrouter import call_openrouter, call_openrouter_with_retry
 from ..database import get_supabase
+from ..sensitive_store import load_sensitive_photo
 
 router = APIRouter()
 supabase = get_supabase()
@@ -74,8 +75,15 @@ async def analyze_photos(request: PhotoAnalysisRequest):
                 print(f"Error downloading photo {photo['id']}: {str(e)}")
                 raise HTTPException(status_code=500, detail=f"Failed to retrieve photo: {str(e)}")
         else:
-            # For sensitive photos, check if we have temporary_data
-            if photo.get('temporary_data'):
+            # For sensitive photos, read from the encrypted blob store
+            sensitive_bytes = None
+            if photo.get('temporary_blob_handle'):
+                sensitive_bytes = await load_sensitive_photo(photo['temporary_blob_handle'])
+            
+            if sensitive_bytes is not None:
+                base64_image = base64.b64encode(sensitive_bytes).decode('utf-8')
+            elif photo.get('temporary_data'):
+                # Legacy rows with inline base64
                 base64_image = photo['temporary_data']
             else:
                 print(f"No storage URL or temporary data for photo {photo['id']}")
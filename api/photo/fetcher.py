@@ -0,0 +1,239 @@
+"""Concurrent photo fetching for analysis requests
+
+Photos are downloaded from Supabase storage with bounded parallelism, served
+from an LRU cache when they were analyzed recently (follow-ups keep
+re-sending the same baseline photos), and base64-encoded in a thread pool so
+large images don't block the event loop.
+
+The photos are patient data, so the cache is in memory with a TTL unless
+PHOTO_CACHE_DIR names a directory for it; that directory is made private
+(0700) to the service user. It is never put in the shared system temp dir.
+"""
+import os
+import time
+import base64
+import asyncio
+import hashlib
+import logging
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+PHOTO_FETCH_CONCURRENCY = int(os.getenv("PHOTO_FETCH_CONCURRENCY", "8"))
+PHOTO_CACHE_MAX_BYTES = int(os.getenv("PHOTO_CACHE_MAX_MB", "512")) * 1024 * 1024
+PHOTO_MEMORY_CACHE_MAX_BYTES = int(os.getenv("PHOTO_MEMORY_CACHE_MAX_MB", "64")) * 1024 * 1024
+PHOTO_MEMORY_CACHE_TTL = float(os.getenv("PHOTO_MEMORY_CACHE_TTL_SECONDS", "900"))
+
+# Thread pool for base64 encoding
+encode_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="photo-encode")
+
+
+def coerce_download_bytes(download_response: Any) -> bytes:
+    """Normalize the different response types supabase storage.download returns"""
+    if hasattr(download_response, 'content'):
+        file_data = download_response.content
+    elif isinstance(download_response, bytes):
+        file_data = download_response
+    elif hasattr(download_response, 'read'):
+        file_data = download_response.read()
+    elif isinstance(download_response, dict) and 'data' in download_response:
+        file_data = download_response['data']
+    else:
+        file_data = getattr(download_response, 'data', download_response)
+
+    if not isinstance(file_data, bytes):
+        if hasattr(file_data, 'encode'):
+            file_data = file_data.encode()
+        else:
+            raise TypeError(f"Cannot convert {type(file_data)} to bytes")
+    return file_data
+
+
+class PhotoBytesCache:
+    """On-disk LRU cache of photo bytes keyed by storage_url.
+
+    Entries are files named by the SHA-256 of the storage path. Recency is
+    tracked in memory and mirrored to file mtimes, so the index can be
+    rebuilt from disk after a restart. Safe to use from worker threads.
+    """
+
+    def __init__(self, root_dir: str, max_bytes: int = PHOTO_CACHE_MAX_BYTES):
+        self.root_dir = root_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        os.makedirs(root_dir, mode=0o700, exist_ok=True)
+        # makedirs leaves the mode of an existing directory alone
+        os.chmod(root_dir, 0o700)
+        self._load_index()
+
+    def _load_index(self):
+        files = []
+        for name in os.listdir(self.root_dir):
+            if name.startswith('.tmp_'):
+                continue
+            stat = os.stat(os.path.join(self.root_dir, name))
+            files.append((stat.st_mtime, name, stat.st_size))
+        for _, name, size in sorted(files):
+            self._entries[name] = size
+            self._total_bytes += size
+
+    @staticmethod
+    def _key(storage_url: str) -> str:
+        return hashlib.sha256(storage_url.encode()).hexdigest()
+
+    def get(self, storage_url: str) -> Optional[bytes]:
+        key = self._key(storage_url)
+        path = os.path.join(self.root_dir, key)
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)
+            return data
+        except FileNotFoundError:
+            with self._lock:
+                self._total_bytes -= self._entries.pop(key, 0)
+            return None
+
+    def put(self, storage_url: str, data: bytes):
+        if len(data) > self.max_bytes:
+            return
+        key = self._key(storage_url)
+        fd, tmp_path = tempfile.mkstemp(dir=self.root_dir, prefix='.tmp_')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, os.path.join(self.root_dir, key))
+        except Exception as e:
+            logger.warning(f"Photo cache write failed: {e}")
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            return
+
+        with self._lock:
+            self._total_bytes -= self._entries.pop(key, 0)
+            self._entries[key] = len(data)
+            self._total_bytes += len(data)
+            evicted = []
+            while self._total_bytes > self.max_bytes and self._entries:
+                old_key, size = self._entries.popitem(last=False)
+                self._total_bytes -= size
+                evicted.append(old_key)
+
+        for old_key in evicted:
+            try:
+                os.unlink(os.path.join(self.root_dir, old_key))
+            except FileNotFoundError:
+                pass
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._total_bytes, "max_bytes": self.max_bytes}
+
+
+class MemoryPhotoCache:
+    """In-memory LRU of photo bytes keyed by storage_url, with a TTL.
+
+    Same interface as PhotoBytesCache; nothing is written to disk. Safe to
+    use from worker threads.
+    """
+
+    def __init__(self, max_bytes: int = PHOTO_MEMORY_CACHE_MAX_BYTES, ttl: float = PHOTO_MEMORY_CACHE_TTL):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[bytes, float]]" = OrderedDict()
+        self._total_bytes = 0
+
+    def get(self, storage_url: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(storage_url)
+            if entry is None:
+                return None
+            if entry[1] <= time.monotonic():
+                self._total_bytes -= len(self._entries.pop(storage_url)[0])
+                return None
+            self._entries.move_to_end(storage_url)
+            return entry[0]
+
+    def put(self, storage_url: str, data: bytes):
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(storage_url, None)
+            if old is not None:
+                self._total_bytes -= len(old[0])
+            self._entries[storage_url] = (data, time.monotonic() + self.ttl)
+            self._total_bytes += len(data)
+            while self._total_bytes > self.max_bytes and self._entries:
+                _, (old_data, _) = self._entries.popitem(last=False)
+                self._total_bytes -= len(old_data)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._total_bytes, "max_bytes": self.max_bytes}
+
+
+_cache: Optional[Union[PhotoBytesCache, MemoryPhotoCache]] = None
+
+
+def get_photo_cache() -> Union[PhotoBytesCache, MemoryPhotoCache]:
+    """Get the process-wide photo bytes cache"""
+    global _cache
+    if _cache is None:
+        root_dir = os.getenv("PHOTO_CACHE_DIR")
+        _cache = PhotoBytesCache(root_dir) if root_dir else MemoryPhotoCache()
+    return _cache
+
+
+def _download_sync(supabase, bucket: str, storage_url: str) -> bytes:
+    cache = get_photo_cache()
+    cached = cache.get(storage_url)
+    if cached is not None:
+        return cached
+
+    file_data = coerce_download_bytes(supabase.storage.from_(bucket).download(storage_url))
+    cache.put(storage_url, file_data)
+    return file_data
+
+
+async def fetch_storage_photos(
+    supabase,
+    bucket: str,
+    storage_urls: List[str],
+    max_concurrency: int = PHOTO_FETCH_CONCURRENCY
+) -> Dict[str, Union[bytes, Exception]]:
+    """
+    Download photos concurrently, at most max_concurrency at a time.
+
+    Returns a mapping of storage_url to bytes, or to the exception raised for
+    that photo so callers can decide whether a single failure is fatal.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def fetch_one(storage_url: str) -> Union[bytes, Exception]:
+        async with semaphore:
+            try:
+                # The supabase storage client is synchronous
+                return await asyncio.to_thread(_download_sync, supabase, bucket, storage_url)
+            except Exception as e:
+                return e
+
+    unique_urls = list(dict.fromkeys(storage_urls))
+    results = await asyncio.gather(*(fetch_one(url) for url in unique_urls))
+    return dict(zip(unique_urls, results))
+
+
+async def encode_base64(data: bytes) -> str:
+    """Base64-encode bytes in the encoding thread pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(encode_executor, lambda: base64.b64encode(data).decode('utf-8'))
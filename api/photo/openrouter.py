@@ -1,45 +1,42 @@
 """OpenRouter API integration for photo analysis"""
 import asyncio
-import httpx
 from typing import Dict, List
 from fastapi import HTTPException
 from .core import OPENROUTER_API_KEY
+from utils.openrouter_client import openrouter, OpenRouterError
 
 async def call_openrouter(model: str, messages: List[Dict], max_tokens: int = 1000, temperature: float = 0.3) -> Dict:
     """Make API call to OpenRouter"""
     if not OPENROUTER_API_KEY:
         raise HTTPException(status_code=500, detail="OpenRouter API key not configured")
     
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            'https://openrouter.ai/api/v1/chat/completions',
-            headers={
-                'Authorization': f'Bearer {OPENROUTER_API_KEY}',
-                'Content-Type': 'application/json',
-                'X-Title': 'Health Oracle Photo Analysis'
-            },
-            json={
+    # Single attempt: call_openrouter_with_retry owns the retry policy
+    try:
+        return await openrouter.chat_completion(
+            {
                 'model': model,
                 'messages': messages,
                 'max_tokens': max_tokens,
                 'temperature': temperature
             },
-            timeout=60.0
+            headers={'X-Title': 'Health Oracle Photo Analysis'},
+            timeout=60.0,
+            max_retries=1
         )
+    except OpenRouterError as e:
+        if e.status_code is None:
+            raise
+        headers = {'Retry-After': f'{e.retry_after:.0f}'} if e.retry_after is not None else None
+        detail = f"OpenRouter API error: {e.status_code}"
+        if e.status_code == 429:
+            detail = "Rate limit exceeded. Please try again in a moment."
+        elif e.status_code == 401:
+            detail = "Invalid API key"
+        elif e.status_code == 400:
+            detail = f"Bad request: {e}"
         
-        if response.status_code != 200:
-            detail = f"OpenRouter API error: {response.status_code}"
-            if response.status_code == 429:
-                detail = "Rate limit exceeded. Please try again in a moment."
-            elif response.status_code == 401:
-                detail = "Invalid API key"
-            elif response.status_code == 400:
-                detail = f"Bad request: {response.text}"
-            
-            print(f"OpenRouter error: {response.status_code} - {response.text}")
-            raise HTTPException(status_code=response.status_code, detail=detail)
-        
-        return response.json()
+        print(f"OpenRouter error: {e}")
+        raise HTTPException(status_code=e.status_code, detail=detail, headers=headers)
 
 async def call_openrouter_with_retry(model: str, messages: List[Dict], max_tokens: int = 1000, 
                                    temperature: float = 0.3, max_retries: int = 3) -> Dict:
@@ -53,8 +50,9 @@ async def call_openrouter_with_retry(model: str, messages: List[Dict], max_token
             last_error = e
             # Check if it's a rate limit error
             if e.status_code == 429:
-                # For rate limit errors, wait longer
-                wait_time = min(10 * (attempt + 1), 30)  # 10s, 20s, 30s max
+                # Honor the server's Retry-After, else 10s, 20s; 30s max either way
+                retry_after = (e.headers or {}).get('Retry-After')
+                wait_time = min(float(retry_after) if retry_after else 10 * (attempt + 1), 30)
                 print(f"Rate limit hit (429), waiting {wait_time}s before retry...")
                 # Try a different model on rate limit
                 if attempt == 0:
@@ -0,0 +1,634 @@
+"""Per-session photo progression read model
+
+The timeline, progression-analysis and analysis-history endpoints all used
+to re-fetch the session, photos, analyses and reminder and recompute
+progression metrics on every request. Instead, one row per session in
+``photo_session_progression`` holds a slim copy of the photos and analyses
+plus the derived velocity, risk, trend and visualization series.
+
+The snapshot is updated incrementally on the write path (new photos, new
+analysis, reminder changes) and rebuilt from the source tables when it is
+missing or a concurrent write wins the version check. A rebuild continues
+the row's version. Deleting a session drops its snapshot; rebuilds skip
+soft-deleted sessions and photos.
+
+Analyses are stored with only the analysis_data and comparison fields the
+timeline and the derived series read, so a snapshot grows by a few hundred
+bytes per analysis. Views that show whole analyses load them with
+load_analysis_details.
+"""
+import asyncio
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+SNAPSHOT_TABLE = 'photo_session_progression'
+
+# Only the fields the read endpoints use are copied into the snapshot
+SESSION_FIELDS = 'id, condition_name, created_at, is_sensitive, user_id'
+PHOTO_FIELDS = ('id', 'category', 'uploaded_at', 'storage_url')
+ANALYSIS_FIELDS = ('id', 'photo_ids', 'analysis_data', 'confidence_score', 'created_at', 'comparison')
+# Paths inside analysis_data and comparison that the timeline and the derived series read
+ANALYSIS_DATA_PATHS = (
+    'primary_assessment',
+    'red_flags',
+    'key_measurements.size_estimate_mm',
+    'key_measurements.secondary_colors',
+    'condition_insights.progression_indicators.worsening_signs',
+)
+COMPARISON_PATHS = ('trend', 'ai_summary', 'visual_changes.color.concerning')
+REMINDER_FIELDS = ('enabled', 'next_reminder_date', 'reminder_text')
+
+
+def determine_monitoring_phase(analysis_count: int, trend: str) -> str:
+    """Determine what phase of monitoring we're in"""
+    if analysis_count <= 2:
+        return 'initial'
+    elif analysis_count <= 5 and trend != 'stable':
+        return 'active_monitoring'
+    elif trend == 'stable' and analysis_count > 5:
+        return 'maintenance'
+    else:
+        return 'ongoing'
+
+
+def group_photos_by_date(photos: List[Dict]) -> List[List[Dict]]:
+    """Group photos uploaded on the same day"""
+    if not photos:
+        return []
+    
+    groups = []
+    current_group = [photos[0]]
+    current_date = photos[0]['uploaded_at'][:10]  # Extract date part
+    
+    for photo in photos[1:]:
+        photo_date = photo['uploaded_at'][:10]
+        if photo_date == current_date:
+            current_group.append(photo)
+        else:
+            groups.append(current_group)
+            current_group = [photo]
+            current_date = photo_date
+    
+    if current_group:
+        groups.append(current_group)
+    
+    return groups
+
+
+def find_analysis_for_photos(photo_ids: List[str], analyses: List[Dict]) -> Optional[Dict]:
+    """Find the analysis that includes these photo IDs"""
+    for analysis in analyses:
+        if any(pid in analysis.get('photo_ids', []) for pid in photo_ids):
+            return analysis
+    return None
+
+
+def calculate_days_between(date1_str: str, date2_str: str) -> int:
+    """Calculate days between two ISO date strings"""
+    date1 = datetime.fromisoformat(date1_str.replace('Z', '+00:00'))
+    date2 = datetime.fromisoformat(date2_str.replace('Z', '+00:00'))
+    return abs((date2 - date1).days)
+
+
+def calculate_overall_trend(analyses: List[Dict]) -> str:
+    """Calculate overall trend from multiple analyses"""
+    if len(analyses) < 2:
+        return 'insufficient_data'
+    
+    # Look at comparison data in recent analyses
+    trends = []
+    for analysis in analyses:
+        if analysis.get('comparison') and analysis['comparison'].get('trend'):
+            trends.append(analysis['comparison']['trend'])
+    
+    if not trends:
+        return 'stable'
+    
+    # Count trend occurrences
+    improving = trends.count('improving')
+    worsening = trends.count('worsening')
+    stable = trends.count('stable')
+    
+    # Determine overall trend
+    if worsening > improving + stable:
+        return 'worsening'
+    elif improving > worsening + stable:
+        return 'improving'
+    else:
+        return 'stable'
+
+
+def calculate_progression_velocity(analyses: List[Dict]) -> Dict:
+    """Calculate rate and acceleration of changes"""
+    
+    # Extract size measurements over time
+    size_timeline = []
+    for analysis in analyses:
+        if analysis.get('analysis_data', {}).get('key_measurements', {}).get('size_estimate_mm'):
+            size_timeline.append({
+                'date': analysis['created_at'],
+                'size_mm': analysis['analysis_data']['key_measurements']['size_estimate_mm'],
+                'confidence': analysis.get('confidence_score', 0)
+            })
+    
+    velocity_data = {
+        'overall_trend': 'stable',
+        'size_change_rate': None,
+        'acceleration': None,
+        'projected_size_30d': None,
+        'monitoring_phase': 'ongoing'
+    }
+    
+    if len(size_timeline) >= 2:
+        # Calculate rate of change
+        first = size_timeline[0]
+        last = size_timeline[-1]
+        
+        first_date = datetime.fromisoformat(first['date'].replace('Z', '+00:00'))
+        last_date = datetime.fromisoformat(last['date'].replace('Z', '+00:00'))
+        days_elapsed = (last_date - first_date).days
+        
+        if days_elapsed > 0:
+            size_change = last['size_mm'] - first['size_mm']
+            rate_per_week = (size_change / days_elapsed) * 7
+            
+            velocity_data['size_change_rate'] = f"{rate_per_week:.2f}mm/week"
+            
+            # Calculate acceleration if we have 3+ points
+            if len(size_timeline) >= 3:
+                mid_point = size_timeline[len(size_timeline)//2]
+                
+                # First half rate
+                mid_date = datetime.fromisoformat(mid_point['date'].replace('Z', '+00:00'))
+                first_half_days = (mid_date - first_date).days
+                first_half_change = mid_point['size_mm'] - first['size_mm']
+                first_half_rate = first_half_change / max(first_half_days, 1)
+                
+                # Second half rate
+                second_half_days = (last_date - mid_date).days
+                second_half_change = last['size_mm'] - mid_point['size_mm']
+                second_half_rate = second_half_change / max(second_half_days, 1)
+                
+                # Acceleration
+                if first_half_rate < second_half_rate:
+                    velocity_data['acceleration'] = 'increasing'
+                elif first_half_rate > second_half_rate:
+                    velocity_data['acceleration'] = 'decreasing'
+                else:
+                    velocity_data['acceleration'] = 'stable'
+            
+            # Project 30 days
+            if rate_per_week != 0:
+                projected_change_30d = (rate_per_week / 7) * 30
+                velocity_data['projected_size_30d'] = f"{last['size_mm'] + projected_change_30d:.1f}mm"
+            
+            # Determine trend
+            if size_change > 0.5:
+                velocity_data['overall_trend'] = 'growing'
+            elif size_change < -0.5:
+                velocity_data['overall_trend'] = 'shrinking'
+            else:
+                velocity_data['overall_trend'] = 'stable'
+    
+    # Determine monitoring phase
+    velocity_data['monitoring_phase'] = determine_monitoring_phase(
+        len(analyses),
+        velocity_data['overall_trend']
+    )
+    
+    return velocity_data
+
+
+def calculate_risk_indicators(analyses: List[Dict]) -> Dict:
+    """Calculate risk indicators based on progression patterns"""
+    
+    risk_indicators = {
+        'rapid_growth': False,
+        'color_darkening': False,
+        'border_irregularity_increase': False,
+        'new_colors_appearing': False,
+        'asymmetry_increasing': False,
+        'overall_risk_level': 'low'
+    }
+    
+    # Check for rapid growth
+    for i in range(1, len(analyses)):
+        prev = analyses[i-1]
+        curr = analyses[i]
+        
+        # Check size increase
+        if (prev.get('analysis_data', {}).get('key_measurements', {}).get('size_estimate_mm') and 
+            curr.get('analysis_data', {}).get('key_measurements', {}).get('size_estimate_mm')):
+            
+            prev_size = prev['analysis_data']['key_measurements']['size_estimate_mm']
+            curr_size = curr['analysis_data']['key_measurements']['size_estimate_mm']
+            
+            if prev_size > 0 and (curr_size - prev_size) / prev_size > 0.2:  # 20% increase
+                risk_indicators['rapid_growth'] = True
+        
+        # Check for color changes
+        if curr.get('comparison', {}).get('visual_changes', {}).get('color', {}).get('concerning'):
+            risk_indicators['color_darkening'] = True
+        
+        # Check for new colors
+        prev_colors = prev.get('analysis_data', {}).get('key_measurements', {}).get('secondary_colors', [])
+        curr_colors = curr.get('analysis_data', {}).get('key_measurements', {}).get('secondary_colors', [])
+        
+        if len(curr_colors) > len(prev_colors):
+            risk_indicators['new_colors_appearing'] = True
+    
+    # Check latest analysis for border/asymmetry
+    if analyses:
+        latest = analyses[-1]
+        if latest.get('analysis_data', {}).get('condition_insights', {}).get('progression_indicators', {}).get('worsening_signs'):
+            worsening_signs = latest['analysis_data']['condition_insights']['progression_indicators']['worsening_signs']
+            
+            if any('border' in sign.lower() for sign in worsening_signs):
+                risk_indicators['border_irregularity_increase'] = True
+            
+            if any('asymmetr' in sign.lower() for sign in worsening_signs):
+                risk_indicators['asymmetry_increasing'] = True
+    
+    # Calculate overall risk
+    risk_count = sum([
+        risk_indicators['rapid_growth'],
+        risk_indicators['color_darkening'],
+        risk_indicators['border_irregularity_increase'],
+        risk_indicators['new_colors_appearing'],
+        risk_indicators['asymmetry_increasing']
+    ])
+    
+    if risk_count >= 3:
+        risk_indicators['overall_risk_level'] = 'high'
+    elif risk_count >= 1:
+        risk_indicators['overall_risk_level'] = 'moderate'
+    else:
+        risk_indicators['overall_risk_level'] = 'low'
+    
+    return risk_indicators
+
+
+def generate_clinical_insights(
+    session: Dict,
+    analyses: List[Dict],
+    velocity_data: Dict,
+    risk_indicators: Dict
+) -> Dict:
+    """Generate clinical insights based on progression data"""
+    
+    condition_name = session.get('condition_name', 'condition')
+    
+    insights = {
+        'thresholds': {},
+        'recommendations': [],
+        'summary': '',
+        'next_steps': []
+    }
+    
+    # Set clinical thresholds based on condition type
+    if 'mole' in condition_name.lower() or 'lesion' in condition_name.lower():
+        insights['thresholds'] = {
+            'concerning_size': '6mm',
+            'rapid_growth_threshold': '20% in 30 days',
+            'color_change_threshold': 'Any darkening or new colors'
+        }
+        
+        # Check against thresholds
+        latest_size = None
+        if analyses:
+            latest = analyses[-1]
+            latest_size = latest.get('analysis_data', {}).get('key_measurements', {}).get('size_estimate_mm')
+        
+        if latest_size and latest_size >= 6:
+            insights['recommendations'].append("Size exceeds 6mm - dermatologist evaluation recommended")
+    
+    # Generate recommendations based on risk
+    if risk_indicators['overall_risk_level'] == 'high':
+        insights['recommendations'].extend([
+            "Multiple concerning changes detected",
+            "Urgent dermatologist consultation recommended",
+            "Document all changes carefully"
+        ])
+        insights['next_steps'] = [
+            "Schedule dermatologist appointment within 1 week",
+            "Bring all photo documentation",
+            "Note any symptoms (itching, bleeding)"
+        ]
+    elif risk_indicators['overall_risk_level'] == 'moderate':
+        insights['recommendations'].extend([
+            "Some changes observed requiring attention",
+            "Continue close monitoring",
+            "Consider dermatologist consultation"
+        ])
+        insights['next_steps'] = [
+            "Monitor every 7-14 days",
+            "Watch for rapid changes",
+            "Schedule routine dermatologist check"
+        ]
+    else:
+        insights['recommendations'].extend([
+            "Stable progression observed",
+            "Continue routine monitoring",
+            "Annual dermatologist check recommended"
+        ])
+        insights['next_steps'] = [
+            "Continue monthly photos",
+            "Note any new symptoms",
+            "Maintain photo documentation"
+        ]
+    
+    # Generate summary
+    trend_text = velocity_data.get('overall_trend', 'stable')
+    rate_text = velocity_data.get('size_change_rate', 'minimal change')
+    
+    insights['summary'] = (
+        f"Analysis of {len(analyses)} photos shows {trend_text} progression "
+        f"with {rate_text}. Risk level: {risk_indicators['overall_risk_level']}. "
+        f"Monitoring phase: {velocity_data.get('monitoring_phase', 'ongoing')}."
+    )
+    
+    return insights
+
+
+def prepare_visualization_data(analyses: List[Dict]) -> Dict:
+    """Prepare data for frontend visualization"""
+    
+    timeline_data = []
+    
+    for analysis in analyses:
+        data_point = {
+            'date': analysis['created_at'],
+            'confidence': analysis.get('confidence_score', 0),
+            'primary_assessment': analysis.get('analysis_data', {}).get('primary_assessment', ''),
+            'metrics': {}
+        }
+        
+        # Extract key metrics
+        measurements = analysis.get('analysis_data', {}).get('key_measurements', {})
+        if measurements.get('size_estimate_mm'):
+            data_point['metrics']['size_mm'] = measurements['size_estimate_mm']
+        
+        # Extract risk indicators
+        if analysis.get('analysis_data', {}).get('red_flags'):
+            data_point['has_red_flags'] = True
+            data_point['red_flag_count'] = len(analysis['analysis_data']['red_flags'])
+        
+        timeline_data.append(data_point)
+    
+    # Calculate trend lines
+    size_values = [p['metrics'].get('size_mm') for p in timeline_data if p['metrics'].get('size_mm')]
+    
+    trend_lines = []
+    if len(size_values) >= 2:
+        # Simple linear regression for trend line
+        x_values = list(range(len(size_values)))
+        mean_x = sum(x_values) / len(x_values)
+        mean_y = sum(size_values) / len(size_values)
+        
+        numerator = sum((x - mean_x) * (y - mean_y) for x, y in zip(x_values, size_values))
+        denominator = sum((x - mean_x) ** 2 for x in x_values)
+        
+        if denominator != 0:
+            slope = numerator / denominator
+            intercept = mean_y - slope * mean_x
+            
+            trend_lines = [
+                {'x': 0, 'y': intercept},
+                {'x': len(size_values) - 1, 'y': intercept + slope * (len(size_values) - 1)}
+            ]
+    
+    return {
+        'timeline': timeline_data,
+        'trend_lines': trend_lines,
+        'metrics': {
+            'size': {
+                'values': size_values,
+                'unit': 'mm',
+                'label': 'Size'
+            }
+        }
+    }
+
+
+def slim_photo(photo: Dict) -> Dict:
+    return {field: photo.get(field) for field in PHOTO_FIELDS}
+
+
+def _pick(value: Dict, paths) -> Dict:
+    """Nested copy of value holding only the dotted paths that exist in it"""
+    picked: Dict = {}
+    for path in paths:
+        *parents, leaf = path.split('.')
+        source, target = value, picked
+        for key in parents:
+            source = source.get(key)
+            if not isinstance(source, dict):
+                break
+            target = target.setdefault(key, {})
+        else:
+            if leaf in source:
+                target[leaf] = source[leaf]
+    return picked
+
+
+def slim_analysis(analysis: Dict) -> Dict:
+    # 'comparison' is only kept when present; history checks for the key itself
+    slim = {field: analysis[field] for field in ANALYSIS_FIELDS if field in analysis}
+    slim['analysis_data'] = _pick(analysis.get('analysis_data') or {}, ANALYSIS_DATA_PATHS)
+    if 'comparison' in slim:
+        slim['comparison'] = _pick(slim['comparison'] or {}, COMPARISON_PATHS)
+    return slim
+
+
+def slim_reminder(reminder: Optional[Dict]) -> Optional[Dict]:
+    if not reminder:
+        return None
+    return {field: reminder.get(field) for field in REMINDER_FIELDS}
+
+
+def compute_progression_metrics(snapshot: Dict) -> Dict:
+    """(Re)compute the derived series from the slim photos/analyses in a snapshot"""
+    analyses = snapshot['analyses']
+    snapshot['analysis_count'] = len(analyses)
+    snapshot['overall_trend'] = calculate_overall_trend(analyses)
+
+    if len(analyses) < 2:
+        snapshot['velocity'] = None
+        snapshot['risk_indicators'] = None
+        snapshot['clinical_insights'] = None
+        snapshot['visualization_data'] = None
+        return snapshot
+
+    velocity_data = calculate_progression_velocity(analyses)
+    risk_indicators = calculate_risk_indicators(analyses)
+    snapshot['velocity'] = velocity_data
+    snapshot['risk_indicators'] = risk_indicators
+    snapshot['clinical_insights'] = generate_clinical_insights(
+        snapshot['session'], analyses, velocity_data, risk_indicators
+    )
+    snapshot['visualization_data'] = prepare_visualization_data(analyses)
+    return snapshot
+
+
+def build_progression_snapshot(
+    session: Dict,
+    photos: List[Dict],
+    analyses: List[Dict],
+    reminder: Optional[Dict]
+) -> Dict:
+    """Build a snapshot from full source rows (photos/analyses in chronological order)"""
+    snapshot = {
+        'session_id': session['id'],
+        'user_id': session.get('user_id'),
+        'session': {
+            'id': session['id'],
+            'condition_name': session.get('condition_name'),
+            'created_at': session.get('created_at'),
+            'is_sensitive': session.get('is_sensitive', False)
+        },
+        'photos': [slim_photo(p) for p in photos],
+        'analyses': [slim_analysis(a) for a in analyses],
+        'reminder': slim_reminder(reminder)
+    }
+    return compute_progression_metrics(snapshot)
+
+
+def _run(query):
+    # supabase-py is synchronous; run queries in threads so they overlap
+    return asyncio.to_thread(query.execute)
+
+
+async def _save_snapshot(supabase, snapshot: Dict, expected_version: Optional[int],
+                         previous_version: int = 0) -> bool:
+    """
+    Persist a snapshot. With expected_version set, only succeeds if nobody else wrote first;
+    without it (a rebuild) the row is overwritten with the version after previous_version.
+    """
+    row = {
+        **snapshot,
+        'version': (expected_version if expected_version is not None else previous_version) + 1,
+        'updated_at': datetime.now().isoformat()
+    }
+
+    if expected_version is None:
+        await _run(supabase.table(SNAPSHOT_TABLE).upsert(row, on_conflict='session_id'))
+    else:
+        result = await _run(
+            supabase.table(SNAPSHOT_TABLE)
+            .update(row)
+            .eq('session_id', snapshot['session_id'])
+            .eq('version', expected_version)
+        )
+        if not result.data:
+            return False
+
+    # Keep the summary on photo_sessions in sync for list views
+    if snapshot.get('velocity') and snapshot.get('risk_indicators'):
+        await _run(
+            supabase.table('photo_sessions').update({
+                'last_progression_analysis': datetime.now().isoformat(),
+                'progression_summary': {
+                    'overall_trend': snapshot['velocity']['overall_trend'],
+                    'current_phase': snapshot['velocity']['monitoring_phase'],
+                    'risk_level': snapshot['risk_indicators']['overall_risk_level']
+                }
+            }).eq('id', snapshot['session_id'])
+        )
+    return True
+
+
+async def rebuild_progression_snapshot(supabase, session_id: str) -> Optional[Dict]:
+    """Rebuild a session's snapshot from the source tables. Returns None if the session doesn't exist."""
+    session_result, photos_result, analyses_result, reminder_result, current_result = await asyncio.gather(
+        _run(supabase.table('photo_sessions').select(SESSION_FIELDS).eq('id', session_id)
+             .is_('deleted_at', 'null').limit(1)),
+        _run(supabase.table('photo_uploads').select(', '.join(PHOTO_FIELDS)).eq('session_id', session_id)
+             .is_('deleted_at', 'null').order('uploaded_at')),
+        _run(supabase.table('photo_analyses').select('*').eq('session_id', session_id).order('created_at')),
+        _run(supabase.table('photo_reminders').select(', '.join(REMINDER_FIELDS)).eq('session_id', session_id).limit(1)),
+        _run(supabase.table(SNAPSHOT_TABLE).select('version').eq('session_id', session_id).limit(1))
+    )
+
+    if not session_result.data:
+        if current_result.data:
+            await invalidate_progression_snapshot(supabase, session_id)
+        return None
+
+    snapshot = build_progression_snapshot(
+        session_result.data[0],
+        photos_result.data or [],
+        analyses_result.data or [],
+        reminder_result.data[0] if reminder_result.data else None
+    )
+    previous_version = (current_result.data[0].get('version') or 0) if current_result.data else 0
+    await _save_snapshot(supabase, snapshot, expected_version=None, previous_version=previous_version)
+    return snapshot
+
+
+async def get_progression_snapshot(supabase, session_id: str) -> Optional[Dict]:
+    """Read a session's snapshot, building it on first access"""
+    result = await _run(supabase.table(SNAPSHOT_TABLE).select('*').eq('session_id', session_id).limit(1))
+    if result.data:
+        return result.data[0]
+    return await rebuild_progression_snapshot(supabase, session_id)
+
+
+async def invalidate_progression_snapshot(supabase, session_id: str):
+    """Drop a session's snapshot, e.g. after the session is deleted"""
+    try:
+        await _run(supabase.table(SNAPSHOT_TABLE).delete().eq('session_id', session_id))
+    except Exception as e:
+        print(f"Could not invalidate progression snapshot for session {session_id}: {str(e)}")
+
+
+async def load_analysis_details(supabase, session_id: str) -> Dict[str, Dict]:
+    """Full analysis_data per analysis id, for views that show whole analyses"""
+    result = await _run(supabase.table('photo_analyses').select('id, analysis_data').eq('session_id', session_id))
+    return {row['id']: row.get('analysis_data') or {} for row in result.data or []}
+
+
+async def _update_snapshot(supabase, session_id: str, mutate: Callable[[Dict], Any]):
+    """Apply an incremental change; fall back to a full rebuild if the row is missing or contended"""
+    try:
+        result = await _run(supabase.table(SNAPSHOT_TABLE).select('*').eq('session_id', session_id).limit(1))
+        if result.data:
+            snapshot = result.data[0]
+            version = snapshot.pop('version', 0)
+            snapshot.pop('updated_at', None)
+            mutate(snapshot)
+            if await _save_snapshot(supabase, snapshot, expected_version=version):
+                return
+        await rebuild_progression_snapshot(supabase, session_id)
+    except Exception as e:
+        # The snapshot is a cache of the source tables; drop it so the next read rebuilds
+        print(f"Progression snapshot update failed for session {session_id}: {str(e)}")
+        await invalidate_progression_snapshot(supabase, session_id)
+
+
+async def record_photos(supabase, session_id: str, photos: List[Dict]):
+    """Add newly uploaded photo rows to the session snapshot"""
+    def mutate(snapshot: Dict):
+        known = {p['id'] for p in snapshot['photos']}
+        snapshot['photos'].extend(slim_photo(p) for p in photos if p['id'] not in known)
+        snapshot['photos'].sort(key=lambda p: p.get('uploaded_at') or '')
+
+    await _update_snapshot(supabase, session_id, mutate)
+
+
+async def record_analysis(supabase, session_id: str, analysis: Dict):
+    """Add a newly written analysis row and recompute the derived metrics"""
+    def mutate(snapshot: Dict):
+        snapshot['analyses'] = [a for a in snapshot['analyses'] if a['id'] != analysis['id']]
+        snapshot['analyses'].append(slim_analysis(analysis))
+        snapshot['analyses'].sort(key=lambda a: a.get('created_at') or '')
+        compute_progression_metrics(snapshot)
+
+    await _update_snapshot(supabase, session_id, mutate)
+
+
+async def record_reminder(supabase, session_id: str, reminder: Optional[Dict]):
+    """Replace the reminder summary in the session snapshot"""
+    def mutate(snapshot: Dict):
+        snapshot['reminder'] = slim_reminder(reminder)
+
+    await _update_snapshot(supabase, session_id, mutate)
@@ -0,0 +1,211 @@
+"""Ephemeral encrypted storage for medical_sensitive photo bytes
+
+Sensitive photos are never written to the permanent storage bucket. Their
+bytes are encrypted (AES-256-GCM) and kept here until the TTL runs out; the
+photo_uploads row only carries the handle returned by ``put`` in its
+``temporary_blob_handle`` column, so listing queries stay small.
+
+``SensitiveBlobStore`` is the interface; ``LocalEncryptedBlobStore`` keeps
+blobs on local disk (tmpfs when available). An object-store backend only has
+to implement the same four methods and use its own handle scheme.
+"""
+import os
+import time
+import uuid
+import base64
+import asyncio
+import logging
+import tempfile
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+logger = logging.getLogger(__name__)
+
+# Matches the 24h window the old temporary_data cleanup used
+SENSITIVE_BLOB_TTL_SECONDS = int(os.getenv("SENSITIVE_PHOTO_TTL_SECONDS", str(24 * 3600)))
+NONCE_SIZE = 12
+
+
+class SensitiveBlobStore(ABC):
+    """Interface for short-lived encrypted photo storage"""
+
+    scheme: str = ""
+
+    @abstractmethod
+    def put(self, data: bytes, ttl_seconds: Optional[int] = None) -> str:
+        """Encrypt and store bytes, returning an opaque handle"""
+
+    @abstractmethod
+    def get(self, handle: str) -> Optional[bytes]:
+        """Return decrypted bytes, or None if missing/expired"""
+
+    @abstractmethod
+    def delete(self, handle: str) -> None:
+        """Remove a blob if it still exists"""
+
+    @abstractmethod
+    def sweep_expired(self) -> int:
+        """Remove expired blobs, returning how many were deleted"""
+
+    def owns(self, handle: Optional[str]) -> bool:
+        return bool(handle) and handle.startswith(f"{self.scheme}:")
+
+
+class LocalEncryptedBlobStore(SensitiveBlobStore):
+    """Encrypted blobs on local disk.
+
+    Each blob is one file named ``<expires_epoch>_<uuid>`` holding
+    ``nonce || ciphertext``. The file name is bound as associated data, so a
+    renamed file (e.g. with a pushed-out expiry) fails to decrypt. Expiry is
+    read from the name alone, which keeps the sweeper to a directory listing.
+
+    Blobs live on the host that wrote them; multi-host deployments need an
+    object-store implementation of ``SensitiveBlobStore``.
+    """
+
+    scheme = "local"
+
+    def __init__(self, root_dir: str, key: bytes, default_ttl: int = SENSITIVE_BLOB_TTL_SECONDS):
+        self.root_dir = root_dir
+        self.default_ttl = default_ttl
+        self._aead = AESGCM(key)
+        os.makedirs(root_dir, mode=0o700, exist_ok=True)
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.root_dir, name)
+
+    def _name_from_handle(self, handle: str) -> Optional[str]:
+        if not self.owns(handle):
+            return None
+        name = handle[len(self.scheme) + 1:]
+        # Names are generated by put(); reject anything that could escape root_dir
+        if not name or os.sep in name or name.startswith('.'):
+            return None
+        return name
+
+    @staticmethod
+    def _expires_at(name: str) -> int:
+        try:
+            return int(name.split('_', 1)[0])
+        except ValueError:
+            return 0
+
+    def put(self, data: bytes, ttl_seconds: Optional[int] = None) -> str:
+        expires_at = int(time.time()) + (ttl_seconds or self.default_ttl)
+        name = f"{expires_at}_{uuid.uuid4().hex}"
+        nonce = os.urandom(NONCE_SIZE)
+        ciphertext = self._aead.encrypt(nonce, data, name.encode())
+
+        # Write to a temp file and rename so readers never see a partial blob
+        fd, tmp_path = tempfile.mkstemp(dir=self.root_dir, prefix='.tmp_')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(nonce)
+                f.write(ciphertext)
+            os.replace(tmp_path, self._path(name))
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+        return f"{self.scheme}:{name}"
+
+    def get(self, handle: str) -> Optional[bytes]:
+        name = self._name_from_handle(handle)
+        if not name or self._expires_at(name) < time.time():
+            return None
+
+        try:
+            with open(self._path(name), 'rb') as f:
+                payload = f.read()
+        except FileNotFoundError:
+            return None
+
+        try:
+            return self._aead.decrypt(payload[:NONCE_SIZE], payload[NONCE_SIZE:], name.encode())
+        except InvalidTag:
+            # Possibly written under another key (restart, other worker): keep it, the TTL sweep removes it
+            logger.error(f"Sensitive blob {name} failed authentication, not returning it")
+            return None
+
+    def delete(self, handle: str) -> None:
+        name = self._name_from_handle(handle)
+        if not name:
+            return
+        try:
+            os.unlink(self._path(name))
+        except FileNotFoundError:
+            pass
+
+    def sweep_expired(self) -> int:
+        now = time.time()
+        removed = 0
+        for name in os.listdir(self.root_dir):
+            if name.startswith('.tmp_'):
+                # Orphaned temp file from a crashed write
+                path = self._path(name)
+                if os.path.getmtime(path) < now - 3600:
+                    os.unlink(path)
+                    removed += 1
+                continue
+            if self._expires_at(name) < now:
+                try:
+                    os.unlink(self._path(name))
+                    removed += 1
+                except FileNotFoundError:
+                    pass
+        return removed
+
+
+def _load_key() -> bytes:
+    """Read the AES key from SENSITIVE_PHOTO_KEY (urlsafe base64, 32 bytes)"""
+    encoded = os.getenv("SENSITIVE_PHOTO_KEY")
+    if encoded:
+        key = base64.urlsafe_b64decode(encoded)
+        if len(key) != 32:
+            raise ValueError("SENSITIVE_PHOTO_KEY must decode to 32 bytes")
+        return key
+
+    # A per-process key can't read blobs written before a restart or by another worker
+    if os.getenv("ENV") != "development":
+        raise RuntimeError("SENSITIVE_PHOTO_KEY must be set outside development")
+    logger.warning("SENSITIVE_PHOTO_KEY not set, using a per-process key for sensitive photos")
+    return AESGCM.generate_key(bit_length=256)
+
+
+def _default_root_dir() -> str:
+    configured = os.getenv("SENSITIVE_PHOTO_DIR")
+    if configured:
+        return configured
+    # Prefer tmpfs so plaintext-adjacent data never hits a persistent disk
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(base, "oracle-sensitive-photos")
+
+
+_store: Optional[SensitiveBlobStore] = None
+
+
+def get_sensitive_blob_store() -> SensitiveBlobStore:
+    """Get the process-wide sensitive blob store"""
+    global _store
+    if _store is None:
+        _store = LocalEncryptedBlobStore(_default_root_dir(), _load_key())
+    return _store
+
+
+async def store_sensitive_photo(data: bytes) -> str:
+    """Encrypt and store sensitive photo bytes off the event loop"""
+    return await asyncio.to_thread(get_sensitive_blob_store().put, data)
+
+
+async def load_sensitive_photo(handle: str) -> Optional[bytes]:
+    """Load and decrypt sensitive photo bytes off the event loop"""
+    return await asyncio.to_thread(get_sensitive_blob_store().get, handle)
+
+
+async def sweep_sensitive_photos() -> int:
+    """Delete expired sensitive blobs"""
+    return await asyncio.to_thread(get_sensitive_blob_store().sweep_expired)
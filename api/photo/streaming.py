@@ -0,0 +1,137 @@
+"""Streaming handling for multipart photo uploads
+
+Uploads are copied chunk by chunk into a private temp file while the first
+chunk's magic bytes are checked, the size limit is enforced and a SHA-256 is
+computed. Storage uploads stream from that file, and the base64 data URL for
+the model is only built when it is actually needed, so a photo's bytes are
+never held several times over in memory.
+"""
+import os
+import base64
+import weakref
+import asyncio
+import hashlib
+import tempfile
+from dataclasses import dataclass
+from typing import Optional
+
+from fastapi import HTTPException, UploadFile
+
+CHUNK_SIZE = 256 * 1024
+PHOTO_SPOOL_DIR = os.getenv("PHOTO_SPOOL_DIR") or None  # None = system temp dir
+
+HEIC_BRANDS = {b'heic', b'heix', b'hevc', b'hevx'}
+HEIF_BRANDS = {b'mif1', b'msf1', b'heim', b'heis'}
+
+
+def sniff_image_type(head: bytes) -> Optional[str]:
+    """Detect the image MIME type from the leading bytes of a file"""
+    if head.startswith(b'\xff\xd8\xff'):
+        return 'image/jpeg'
+    if head.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'image/png'
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'image/webp'
+    if head[4:8] == b'ftyp':
+        brand = head[8:12]
+        if brand in HEIC_BRANDS:
+            return 'image/heic'
+        if brand in HEIF_BRANDS:
+            return 'image/heif'
+    return None
+
+
+def _remove_spool_file(path: str):
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+@dataclass
+class SpooledPhoto:
+    """An upload validated and copied to a private temp file"""
+    path: str
+    size: int
+    sha256: str
+    content_type: str
+    filename: str
+
+    def __post_init__(self):
+        # Removes the file once the object is dropped, for error paths that never reach cleanup()
+        self._finalizer = weakref.finalize(self, _remove_spool_file, self.path)
+
+    def open(self):
+        """Binary reader for streaming to storage"""
+        return open(self.path, 'rb')
+
+    def read_bytes(self) -> bytes:
+        with open(self.path, 'rb') as f:
+            return f.read()
+
+    def build_data_url(self) -> str:
+        with open(self.path, 'rb') as f:
+            encoded = base64.b64encode(f.read())
+        return f"data:{self.content_type};base64,{encoded.decode('ascii')}"
+
+    async def data_url(self) -> str:
+        """Base64 data URL for the model, encoded off the event loop"""
+        return await asyncio.to_thread(self.build_data_url)
+
+    def cleanup(self):
+        self._finalizer()
+
+
+def _spool_sync(source, max_size: int, allowed_types, declared_type: Optional[str], filename: str) -> SpooledPhoto:
+    source.seek(0)
+    head = source.read(CHUNK_SIZE)
+    if not head:
+        raise HTTPException(status_code=400, detail="Empty file")
+
+    detected_type = sniff_image_type(head)
+    if detected_type not in allowed_types:
+        raise HTTPException(status_code=400, detail=f"Invalid file type. Allowed: {', '.join(allowed_types)}")
+
+    # HEIC/HEIF share a container; trust the client's label between the two
+    content_type = detected_type
+    if declared_type in ('image/heic', 'image/heif') and detected_type in ('image/heic', 'image/heif'):
+        content_type = declared_type
+
+    digest = hashlib.sha256()
+    size = 0
+    fd, path = tempfile.mkstemp(dir=PHOTO_SPOOL_DIR, prefix='photo_upload_')
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            chunk = head
+            while chunk:
+                size += len(chunk)
+                if size > max_size:
+                    raise HTTPException(status_code=413, detail=f"File too large (max {max_size // (1024 * 1024)}MB)")
+                digest.update(chunk)
+                out.write(chunk)
+                chunk = source.read(CHUNK_SIZE)
+    except BaseException:
+        os.unlink(path)
+        raise
+
+    return SpooledPhoto(
+        path=path,
+        size=size,
+        sha256=digest.hexdigest(),
+        content_type=content_type,
+        filename=filename
+    )
+
+
+async def spool_photo_upload(file: UploadFile, max_size: int, allowed_types) -> SpooledPhoto:
+    """
+    Validate and spool an uploaded photo to disk in chunks.
+
+    Raises HTTPException 400 for unrecognized image data and 413 when the
+    stream exceeds max_size (checked on the actual bytes, not the header).
+    Callers should call cleanup() on the result; the file is also removed
+    when the result is garbage collected.
+    """
+    return await asyncio.to_thread(
+        _spool_sync, file.file, max_size, allowed_types, file.content_type, file.filename or 'photo.jpg'
+    )
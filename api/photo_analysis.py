@@ -3,13 +3,12 @@ from fastapi import APIRouter, File, UploadFile, Form, HTTPException, Depends, Q
 from fastapi.responses import JSONResponse
 from typing import List, Optional, Dict, Any, Union
 from pydantic import BaseModel
-import base64
 import io
 import os
 import json
 from datetime import datetime, timedelta
-import httpx
-from supabase import create_client
+from core.resources import resources
+from utils.openrouter_client import openrouter, OpenRouterError
 import uuid
 
 from models.requests import (
@@ -23,29 +22,51 @@ from models.requests import (
     PhotoMonitoringSuggestRequest
 )
 from utils.json_parser import extract_json_from_text
+from api.photo.sensitive_store import get_sensitive_blob_store, store_sensitive_photo, load_sensitive_photo
+from api.photo.fetcher import fetch_storage_photos, encode_base64
+from api.photo.batcher import SmartPhotoBatcher
+from api.photo.streaming import spool_photo_upload, SpooledPhoto
+from api.photo.progression import (
+    get_progression_snapshot,
+    invalidate_progression_snapshot,
+    load_analysis_details,
+    record_analysis,
+    record_photos,
+    record_reminder,
+    determine_monitoring_phase,
+    group_photos_by_date,
+    find_analysis_for_photos,
+    calculate_days_between,
+    calculate_overall_trend
+)
 
 router = APIRouter(prefix="/api/photo-analysis", tags=["photo-analysis"])
 
 import re
 import asyncio
-from typing import Tuple
 import redis
 from functools import lru_cache, wraps
 import hashlib
 import pickle
 from concurrent.futures import ThreadPoolExecutor
 
-# Initialize Redis client for caching
+# Redis client for caching; connected by on_startup() from the app lifespan
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
-try:
-    redis_client = redis.Redis.from_url(REDIS_URL, decode_responses=False)
-    redis_client.ping()
-    REDIS_AVAILABLE = True
-    print("✅ Redis connected for photo analysis caching")
-except Exception as e:
-    print(f"⚠️ Redis not available for caching: {e}")
-    redis_client = None
-    REDIS_AVAILABLE = False
+redis_client = None
+REDIS_AVAILABLE = False
+
+async def on_startup():
+    """Lifespan hook: load the sensitive photo key (fails the boot if missing) and connect the Redis cache"""
+    global redis_client, REDIS_AVAILABLE
+    get_sensitive_blob_store()
+    client = redis.Redis.from_url(REDIS_URL, decode_responses=False)
+    try:
+        await asyncio.to_thread(client.ping)
+        redis_client, REDIS_AVAILABLE = client, True
+        print("✅ Redis connected for photo analysis caching")
+    except Exception as e:
+        print(f"⚠️ Redis not available for caching: {e}")
+        redis_client, REDIS_AVAILABLE = None, False
 
 # Thread pool for parallel operations
 executor = ThreadPoolExecutor(max_workers=4)
@@ -161,164 +182,6 @@ async def generate_single_signed_url(storage_path: str, expiry: int) -> str:
     
     return url
 
-class SmartPhotoBatcher:
-    """Intelligently select photos for comparison when total exceeds limit"""
-    
-    def __init__(self, max_photos: int = 40):
-        self.max_photos = max_photos
-        self.reserved_recent = 5  # Always include last 5 photos
-        self.reserved_baseline = 1  # Always include first photo
-        
-    def select_photos_for_comparison(
-        self, 
-        all_photos: List[Dict], 
-        all_analyses: Optional[List[Dict]] = None
-    ) -> Tuple[List[Dict], Dict[str, Any]]:
-        """
-        Select most relevant photos for comparison
-        Returns: (selected_photos, selection_info)
-        """
-        if len(all_photos) <= self.max_photos:
-            return all_photos, {
-                "total_photos": len(all_photos),
-                "photos_shown": len(all_photos),
-                "selection_method": "all_photos",
-                "omitted_periods": []
-            }
-        
-        selected = []
-        selection_info = {
-            "total_photos": len(all_photos),
-            "photos_shown": self.max_photos,
-            "selection_reasoning": [],
-            "omitted_periods": []
-        }
-        
-        # Sort photos by date
-        sorted_photos = sorted(all_photos, key=lambda x: x.get('uploaded_at', ''))
-        
-        # Phase 1: Always include first photo (baseline)
-        if sorted_photos:
-            selected.append(sorted_photos[0])
-            selection_info["selection_reasoning"].append("Included baseline (first) photo")
-        
-        # Phase 2: Always include most recent photos
-        recent_photos = sorted_photos[-self.reserved_recent:]
-        selected.extend(recent_photos)
-        selection_info["selection_reasoning"].append(f"Included {len(recent_photos)} most recent photos")
-        
-        # Phase 3: Fill remaining slots intelligently
-        remaining_slots = self.max_photos - len(selected)
-        middle_photos = sorted_photos[1:-self.reserved_recent] if len(sorted_photos) > self.reserved_recent + 1 else []
-        
-        if middle_photos and remaining_slots > 0:
-            # Calculate importance scores
-            scored_photos = []
-            for i, photo in enumerate(middle_photos):
-                score = self._calculate_photo_importance(photo, i, middle_photos, all_analyses)
-                scored_photos.append((score, photo))
-            
-            # Sort by score and take top photos
-            scored_photos.sort(key=lambda x: x[0], reverse=True)
-            selected_middle = [photo for score, photo in scored_photos[:remaining_slots]]
-            
-            # Insert in chronological order
-            for photo in sorted(selected_middle, key=lambda x: x.get('uploaded_at', '')):
-                # Find correct position to maintain chronological order
-                insert_pos = 1  # After baseline
-                for i in range(1, len(selected) - len(recent_photos)):
-                    if selected[i].get('uploaded_at', '') > photo.get('uploaded_at', ''):
-                        break
-                    insert_pos = i + 1
-                selected.insert(insert_pos, photo)
-            
-            selection_info["selection_reasoning"].append(
-                f"Selected {len(selected_middle)} photos from middle period based on importance"
-            )
-        
-        # Calculate omitted periods
-        selection_info["omitted_periods"] = self._calculate_omitted_periods(sorted_photos, selected)
-        
-        return selected, selection_info
-    
-    def _calculate_photo_importance(
-        self, 
-        photo: Dict, 
-        index: int, 
-        all_middle_photos: List[Dict],
-        all_analyses: Optional[List[Dict]]
-    ) -> float:
-        """Calculate importance score for a photo"""
-        score = 0.0
-        
-        # 1. Temporal distribution - prefer evenly spaced photos
-        total_photos = len(all_middle_photos)
-        ideal_spacing = total_photos / (self.max_photos - self.reserved_recent - self.reserved_baseline)
-        distance_from_ideal = abs(index % ideal_spacing)
-        temporal_score = 100 * (1 - distance_from_ideal / ideal_spacing)
-        score += temporal_score
-        
-        # 2. Quality score if available
-        if photo.get('quality_score'):
-            score += photo['quality_score'] * 0.5
-        
-        # 3. Check if photo has associated analysis with significant findings
-        if all_analyses:
-            photo_analysis = next(
-                (a for a in all_analyses if photo['id'] in a.get('photo_ids', [])), 
-                None
-            )
-            if photo_analysis:
-                # High confidence changes
-                if photo_analysis.get('confidence_score', 0) < 70:
-                    score += 50  # Uncertain cases are important
-                
-                # Red flags present
-                if photo_analysis.get('analysis_data', {}).get('red_flags'):
-                    score += 100
-                
-                # Marked as significant change in comparison
-                if photo_analysis.get('comparison', {}).get('trend') == 'worsening':
-                    score += 80
-        
-        # 4. User notes or follow-up flag
-        if photo.get('followup_notes'):
-            score += 75
-        
-        return score
-    
-    def _calculate_omitted_periods(
-        self, 
-        all_photos: List[Dict], 
-        selected_photos: List[Dict]
-    ) -> List[Dict]:
-        """Calculate time periods that were omitted from selection"""
-        omitted_periods = []
-        selected_dates = {p['uploaded_at'][:10] for p in selected_photos}
-        
-        current_gap_start = None
-        for i, photo in enumerate(all_photos):
-            photo_date = photo['uploaded_at'][:10]
-            
-            if photo_date not in selected_dates:
-                if current_gap_start is None:
-                    current_gap_start = photo_date
-            else:
-                if current_gap_start is not None:
-                    # Gap ended
-                    prev_photo_date = all_photos[i-1]['uploaded_at'][:10] if i > 0 else current_gap_start
-                    omitted_periods.append({
-                        "start": current_gap_start,
-                        "end": prev_photo_date,
-                        "photos_omitted": sum(
-                            1 for p in all_photos 
-                            if current_gap_start <= p['uploaded_at'][:10] <= prev_photo_date
-                        )
-                    })
-                    current_gap_start = None
-        
-        return omitted_periods
-
 
 def sanitize_filename(filename: str) -> str:
     """Sanitize filename by removing special characters and unicode spaces"""
@@ -348,8 +211,9 @@ async def call_openrouter_with_retry(model: str, messages: List[Dict], max_token
             last_error = e
             # Check if it's a rate limit error
             if e.status_code == 429:
-                # For rate limit errors, wait longer
-                wait_time = min(10 * (attempt + 1), 30)  # 10s, 20s, 30s max
+                # Honor the server's Retry-After, else 10s, 20s; 30s max either way
+                retry_after = (e.headers or {}).get('Retry-After')
+                wait_time = min(float(retry_after) if retry_after else 10 * (attempt + 1), 30)
                 print(f"Rate limit hit (429), waiting {wait_time}s before retry...")
                 # Try a different model on rate limit
                 if attempt == 0:
@@ -436,13 +300,10 @@ SUPABASE_ANON_KEY = os.getenv("SUPABASE_ANON_KEY")
 SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_SERVICE_KEY") or os.getenv("SUPABASE_SERVICE_ROLE_KEY")
 OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
 
-# Initialize Supabase client only if credentials are available
-supabase = None
-if SUPABASE_URL and SUPABASE_SERVICE_KEY:
-    supabase = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
-elif SUPABASE_URL and SUPABASE_ANON_KEY:
+# Shared Supabase client, only if credentials are available
+supabase = resources.db if resources.db_configured else None
+if supabase is not None and not SUPABASE_SERVICE_KEY:
     # Fallback to anon key if service key not available
-    supabase = create_client(SUPABASE_URL, SUPABASE_ANON_KEY)
     print("Warning: Using ANON key for photo analysis. Some operations may be limited.")
 
 # Constants
@@ -649,50 +510,38 @@ Format as JSON:
 CRITICAL: Output ONLY valid JSON with no text before or after."""
 
 
-async def file_to_base64(file: UploadFile) -> str:
-    """Convert uploaded file to base64 string"""
-    contents = await file.read()
-    return base64.b64encode(contents).decode('utf-8')
-
-
-async def validate_photo_upload(file: UploadFile) -> Dict[str, Any]:
-    """Validate uploaded photo file"""
-    if file.size > MAX_FILE_SIZE:
-        raise HTTPException(status_code=413, detail="File too large (max 10MB)")
-    
-    if file.content_type not in ALLOWED_MIME_TYPES:
-        raise HTTPException(status_code=400, detail=f"Invalid file type. Allowed: {', '.join(ALLOWED_MIME_TYPES)}")
-    
-    # Reset file pointer after validation
-    await file.seek(0)
-    
-    return {"valid": True, "size": file.size, "mime_type": file.content_type}
+def upload_spooled_photo(file_name: str, spooled: SpooledPhoto):
+    """Upload a spooled photo to storage, streaming from disk"""
+    with spooled.open() as f:
+        return supabase.storage.from_(STORAGE_BUCKET).upload(
+            file_name,
+            f,
+            file_options={"content-type": spooled.content_type}
+        )
 
 
 async def call_openrouter(model: str, messages: List[Dict], max_tokens: int = 1000, temperature: float = 0.3) -> Dict:
-    """Make API call to OpenRouter"""
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            'https://openrouter.ai/api/v1/chat/completions',
-            headers={
-                'Authorization': f'Bearer {OPENROUTER_API_KEY}',
-                'Content-Type': 'application/json',
-                'HTTP-Referer': os.getenv('APP_URL', 'http://localhost:3000'),
-                'X-Title': 'Proxima-1 Photo Analysis'
-            },
-            json={
+    """Make API call to OpenRouter (single attempt; call_openrouter_with_retry owns retries)"""
+    try:
+        return await openrouter.chat_completion(
+            {
                 'model': model,
                 'messages': messages,
                 'max_tokens': max_tokens,
                 'temperature': temperature
             },
-            timeout=180.0
+            headers={
+                'HTTP-Referer': os.getenv('APP_URL', 'http://localhost:3000'),
+                'X-Title': 'Proxima-1 Photo Analysis'
+            },
+            timeout=180.0,
+            max_retries=1
         )
-        
-        if response.status_code != 200:
-            raise HTTPException(status_code=response.status_code, detail=f"OpenRouter API error: {response.text}")
-        
-        return response.json()
+    except OpenRouterError as e:
+        if e.status_code is None:
+            raise
+        headers = {'Retry-After': f'{e.retry_after:.0f}'} if e.retry_after is not None else None
+        raise HTTPException(status_code=e.status_code, detail=f"OpenRouter API error: {e}", headers=headers)
 
 
 @router.post("/categorize", response_model=PhotoCategorizeResponse)
@@ -704,11 +553,10 @@ async def categorize_photo(
     if not OPENROUTER_API_KEY:
         raise HTTPException(status_code=500, detail="OpenRouter API key not configured")
     
-    # Validate file
-    await validate_photo_upload(photo)
-    
-    # Convert to base64
-    base64_image = await file_to_base64(photo)
+    # Validate and spool to disk (magic bytes, size, hash)
+    spooled = await spool_photo_upload(photo, MAX_FILE_SIZE, ALLOWED_MIME_TYPES)
+    data_url = await spooled.data_url()
+    spooled.cleanup()
     
     # Call Gemini Flash Lite for faster categorization with retry
     try:
@@ -718,7 +566,7 @@ async def categorize_photo(
                 'role': 'user',
                 'content': [
                     {'type': 'text', 'text': PHOTO_CATEGORIZATION_PROMPT},
-                    {'type': 'image_url', 'image_url': {'url': f'data:{photo.content_type};base64,{base64_image}'}}
+                    {'type': 'image_url', 'image_url': {'url': data_url}}
                 ]
             }],
             max_tokens=50,
@@ -831,14 +679,13 @@ async def upload_photos(
         session_id = session_result.data[0]['id']
     
     uploaded_photos = []
+    uploaded_rows = []
     requires_action = {'type': None, 'affected_photos': [], 'message': None}
     
     for photo in photos:
-        # Validate
-        await validate_photo_upload(photo)
-        
-        # Categorize
-        base64_image = await file_to_base64(photo)
+        # Validate and spool to disk in chunks; later steps stream from the
+        # spooled file and base64 is only built for the model request
+        spooled = await spool_photo_upload(photo, MAX_FILE_SIZE, ALLOWED_MIME_TYPES)
         
         try:
             response = await call_openrouter(
@@ -847,7 +694,7 @@ async def upload_photos(
                     'role': 'user',
                     'content': [
                         {'type': 'text', 'text': PHOTO_CATEGORIZATION_PROMPT},
-                        {'type': 'image_url', 'image_url': {'url': f'data:{photo.content_type};base64,{base64_image}'}}
+                        {'type': 'image_url', 'image_url': {'url': await spooled.data_url()}}
                     ]
                 }],
                 max_tokens=50,
@@ -880,15 +727,8 @@ async def upload_photos(
             file_name = f"{user_id}/{session_id}/{datetime.now().timestamp()}_{sanitized_filename}"
             
             try:
-                # Reset file pointer
-                await photo.seek(0)
-                file_data = await photo.read()
-                
-                upload_response = supabase.storage.from_(STORAGE_BUCKET).upload(
-                    file_name,
-                    file_data,
-                    file_options={"content-type": photo.content_type}
-                )
+                # Stream from the spooled file rather than re-reading the upload
+                await asyncio.to_thread(upload_spooled_photo, file_name, spooled)
                 
                 storage_url = file_name
                 stored = True
@@ -902,12 +742,12 @@ async def upload_photos(
                 'is_sensitive': True
             }).eq('id', session_id).execute()
             
-            # For sensitive photos, store the base64 data in the database temporarily
-            await photo.seek(0)  # Reset file pointer
-            photo_data = await photo.read()
-            base64_data = base64.b64encode(photo_data).decode('utf-8')
+            # For sensitive photos, keep the bytes in the ephemeral encrypted
+            # store; only the handle goes into the photo_uploads row
+            photo_data = await asyncio.to_thread(spooled.read_bytes)
+            blob_handle = await store_sensitive_photo(photo_data)
+            del photo_data
             
-            # Store base64 in temporary_data field
             stored = False  # Mark as not stored in permanent storage
             
             requires_action['type'] = 'sensitive_modal'
@@ -929,17 +769,19 @@ async def upload_photos(
             'category': category,
             'storage_url': storage_url,
             'file_metadata': {
-                'size': photo.size,
-                'mime_type': photo.content_type,
-                'original_name': photo.filename
+                'size': spooled.size,
+                'mime_type': spooled.content_type,
+                'original_name': photo.filename,
+                'sha256': spooled.sha256
             }
         }
         
-        # Add temporary base64 data for sensitive photos
+        # Add the encrypted blob handle for sensitive photos
         if category == 'medical_sensitive':
-            upload_data['temporary_data'] = base64_data
+            upload_data['temporary_blob_handle'] = blob_handle
             
         upload_record = supabase.table('photo_uploads').insert(upload_data).execute()
+        uploaded_rows.extend(upload_record.data or [])
         
         uploaded_photos.append({
             'id': photo_id,
@@ -947,6 +789,7 @@ async def upload_photos(
             'stored': stored,
             'storage_url': storage_url if stored else None
         })
+        spooled.cleanup()
     
     # Batch generate all preview URLs at once
     storage_urls_to_generate = [
@@ -971,6 +814,8 @@ async def upload_photos(
         'last_photo_at': datetime.now().isoformat()
     }).eq('id', session_id).execute()
     
+    await record_photos(supabase, session_id, uploaded_rows)
+    
     return {
         'session_id': session_id,
         'uploaded_photos': uploaded_photos,
@@ -978,6 +823,59 @@ async def upload_photos(
     }
 
 
+async def build_photo_image_contents(photos: List[Dict], skip_failed: bool = False) -> List[Dict]:
+    """
+    Build image_url message parts for a list of photo_uploads rows.
+    
+    Storage photos are downloaded concurrently (through the on-disk LRU cache)
+    and sensitive photos are read from the encrypted blob store; base64
+    encoding runs in a thread pool. Order of the input rows is preserved.
+    Failed photos raise unless skip_failed is set, in which case they are dropped.
+    """
+    storage_urls = [p['storage_url'] for p in photos if p.get('storage_url')]
+    downloaded = await fetch_storage_photos(supabase, STORAGE_BUCKET, storage_urls)
+    
+    async def load_one(photo: Dict) -> Optional[str]:
+        if photo.get('storage_url'):
+            file_data = downloaded.get(photo['storage_url'])
+            if isinstance(file_data, Exception):
+                print(f"Error downloading photo {photo['id']}: {str(file_data)}")
+                if skip_failed:
+                    return None
+                raise HTTPException(status_code=500, detail=f"Failed to retrieve photo: {str(file_data)}")
+            return await encode_base64(file_data)
+        
+        # For sensitive photos, read from the encrypted blob store
+        sensitive_bytes = None
+        if photo.get('temporary_blob_handle'):
+            sensitive_bytes = await load_sensitive_photo(photo['temporary_blob_handle'])
+        
+        if sensitive_bytes is not None:
+            return await encode_base64(sensitive_bytes)
+        if photo.get('temporary_data'):
+            # Rows written before the blob store still carry inline base64
+            return photo['temporary_data']
+        
+        print(f"No storage URL or temporary data for photo {photo['id']}")
+        if skip_failed:
+            return None
+        raise HTTPException(status_code=400, detail="Cannot analyze photo without data")
+    
+    encoded = await asyncio.gather(*(load_one(photo) for photo in photos))
+    
+    contents = []
+    for photo, base64_image in zip(photos, encoded):
+        if base64_image is None:
+            continue
+        # Get proper mime type from file metadata or default to jpeg
+        mime_type = (photo.get('file_metadata') or {}).get('mime_type', 'image/jpeg')
+        contents.append({
+            'type': 'image_url',
+            'image_url': {'url': f'data:{mime_type};base64,{base64_image}'}
+        })
+    return contents
+
+
 @router.post("/analyze", response_model=PhotoAnalysisResponse)
 async def analyze_photos(request: PhotoAnalysisRequest):
     """Analyze photos using GPT-4V"""
@@ -1005,64 +903,8 @@ async def analyze_photos(request: PhotoAnalysisRequest):
         raise HTTPException(status_code=404, detail="Session not found")
     session = session_result.data
     
-    # Build photo content for AI
-    photo_contents = []
-    
-    for photo in photos:
-        if photo['storage_url']:
-            # Get from storage
-            try:
-                download_response = supabase.storage.from_(STORAGE_BUCKET).download(photo['storage_url'])
-                
-                # Handle different response types from Supabase
-                if hasattr(download_response, 'content'):
-                    # Response object with content attribute
-                    file_data = download_response.content
-                elif isinstance(download_response, bytes):
-                    # Direct bytes response
-                    file_data = download_response
-                elif hasattr(download_response, 'read'):
-                    # File-like object
-                    file_data = download_response.read()
-                elif isinstance(download_response, dict) and 'data' in download_response:
-                    # Dict response with data key
-                    file_data = download_response['data']
-                else:
-                    # Log the actual type for debugging
-                    print(f"Unknown download response type: {type(download_response)}")
-                    print(f"Response dir: {dir(download_response)}")
-                    # Try to get data attribute
-                    file_data = getattr(download_response, 'data', download_response)
-                
-                if not isinstance(file_data, bytes):
-                    print(f"Error: file_data is not bytes, got {type(file_data)}")
-                    # Try to convert to bytes if possible
-                    if hasattr(file_data, 'encode'):
-                        file_data = file_data.encode()
-                    else:
-                        raise TypeError(f"Cannot convert {type(file_data)} to bytes")
-                
-                base64_image = base64.b64encode(file_data).decode('utf-8')
-                
-            except Exception as e:
-                print(f"Error downloading photo {photo['id']}: {str(e)}")
-                raise HTTPException(status_code=500, detail=f"Failed to retrieve photo: {str(e)}")
-        else:
-            # For sensitive photos, check if we have temporary_data
-            if photo.get('temporary_data'):
-                # Use the base64 data directly
-                base64_image = photo['temporary_data']
-            else:
-                # No data available
-                print(f"No storage URL or temporary data for photo {photo['id']}")
-                raise HTTPException(status_code=400, detail="Cannot analyze photo without data")
-        
-        # Get proper mime type from file metadata or default to jpeg
-        mime_type = photo.get('file_metadata', {}).get('mime_type', 'image/jpeg')
-        photo_contents.append({
-            'type': 'image_url',
-            'image_url': {'url': f'data:{mime_type};base64,{base64_image}'}
-        })
+    # Build photo content for AI (downloads and encoding run concurrently)
+    photo_contents = await build_photo_image_contents(photos)
     
     # Build analysis prompt with user's description for question detection
     analysis_prompt = PHOTO_ANALYSIS_PROMPT
@@ -1192,42 +1034,8 @@ async def analyze_photos(request: PhotoAnalysisRequest):
         comp_photos_result = supabase.table('photo_uploads').select('*').in_('id', request.comparison_photo_ids).execute()
         
         if comp_photos_result.data:
-            # Build comparison prompt
-            comp_contents = []
-            for photo in comp_photos_result.data:
-                if photo['storage_url']:
-                    try:
-                        download_response = supabase.storage.from_(STORAGE_BUCKET).download(photo['storage_url'])
-                        
-                        # Handle different response types from Supabase
-                        if hasattr(download_response, 'content'):
-                            file_data = download_response.content
-                        elif isinstance(download_response, bytes):
-                            file_data = download_response
-                        elif hasattr(download_response, 'read'):
-                            file_data = download_response.read()
-                        elif isinstance(download_response, dict) and 'data' in download_response:
-                            file_data = download_response['data']
-                        else:
-                            file_data = getattr(download_response, 'data', download_response)
-                        
-                        if not isinstance(file_data, bytes):
-                            print(f"Error: file_data is not bytes, got {type(file_data)}")
-                            # Try to convert to bytes if possible
-                            if hasattr(file_data, 'encode'):
-                                file_data = file_data.encode()
-                            else:
-                                raise TypeError(f"Cannot convert {type(file_data)} to bytes")
-                        
-                        base64_image = base64.b64encode(file_data).decode('utf-8')
-                        comp_contents.append({
-                            'type': 'image_url',
-                            'image_url': {'url': f'data:image/jpeg;base64,{base64_image}'}
-                        })
-                    except Exception as e:
-                        print(f"Error downloading comparison photo: {str(e)}")
-                        # Continue without this comparison photo
-                        continue
+            # Build comparison prompt (photos that fail to download are skipped)
+            comp_contents = await build_photo_image_contents(comp_photos_result.data, skip_failed=True)
             
             # Call AI for comparison
             # IMPORTANT: Photo order matters for accurate progression analysis:
@@ -1292,6 +1100,9 @@ async def analyze_photos(request: PhotoAnalysisRequest):
 
     analysis_id = analysis_record.data[0]['id']
 
+    # Fold the new analysis into the session's progression snapshot
+    await record_analysis(supabase, request.session_id, analysis_record.data[0])
+
     # Generate tracking suggestions if applicable
     if analysis.get('trackable_metrics') and not request.temporary_analysis:
         for metric in analysis['trackable_metrics']:
@@ -1392,7 +1203,11 @@ async def get_photo_session_detail(session_id: str):
     session = session_result.data
     
     # Get photos
-    photos_result = supabase.table('photo_uploads').select('*').eq('session_id', session_id).order('uploaded_at').execute()
+    photos_result = supabase.table('photo_uploads')\
+        .select('id, category, uploaded_at, storage_url')\
+        .eq('session_id', session_id)\
+        .order('uploaded_at')\
+        .execute()
     
     photos = []
     for photo in photos_result.data:
@@ -1452,6 +1267,9 @@ async def delete_photo_session(session_id: str):
         'deleted_at': datetime.now().isoformat()
     }).eq('session_id', session_id).execute()
     
+    # The progression snapshot still lists the session's photos
+    await invalidate_progression_snapshot(supabase, session_id)
+    
     return {'message': 'Session deleted successfully'}
 
 
@@ -1796,13 +1614,11 @@ async def add_follow_up_photos(
         
         # Process and upload new photos
         uploaded_photos = []
+        uploaded_rows = []
         
         for photo in photos:
-            # Validate
-            await validate_photo_upload(photo)
-            
-            # Categorize
-            base64_image = await file_to_base64(photo)
+            # Validate and spool to disk in chunks
+            spooled = await spool_photo_upload(photo, MAX_FILE_SIZE, ALLOWED_MIME_TYPES)
             
             try:
                 response = await call_openrouter_with_retry(
@@ -1811,7 +1627,7 @@ async def add_follow_up_photos(
                         'role': 'user',
                         'content': [
                             {'type': 'text', 'text': PHOTO_CATEGORIZATION_PROMPT},
-                            {'type': 'image_url', 'image_url': {'url': f'data:{photo.content_type};base64,{base64_image}'}}
+                            {'type': 'image_url', 'image_url': {'url': await spooled.data_url()}}
                         ]
                     }],
                     max_tokens=50,
@@ -1844,14 +1660,7 @@ async def add_follow_up_photos(
                 file_name = f"{user_id}/{session_id}/followup_{datetime.now().timestamp()}_{sanitized_filename}"
                 
                 try:
-                    await photo.seek(0)
-                    file_data = await photo.read()
-                    
-                    upload_response = supabase.storage.from_(STORAGE_BUCKET).upload(
-                        file_name,
-                        file_data,
-                        file_options={"content-type": photo.content_type}
-                    )
+                    await asyncio.to_thread(upload_spooled_photo, file_name, spooled)
                     
                     storage_url = file_name
                     stored = True
@@ -1860,10 +1669,10 @@ async def add_follow_up_photos(
                     raise HTTPException(status_code=500, detail=f"Storage upload failed: {str(e)}")
             
             elif category == 'medical_sensitive':
-                # Store base64 temporarily
-                await photo.seek(0)
-                photo_data = await photo.read()
-                base64_data = base64.b64encode(photo_data).decode('utf-8')
+                # Keep bytes in the ephemeral encrypted store
+                photo_data = await asyncio.to_thread(spooled.read_bytes)
+                blob_handle = await store_sensitive_photo(photo_data)
+                del photo_data
                 stored = False
             
             # Save upload record
@@ -1873,18 +1682,20 @@ async def add_follow_up_photos(
                 'category': category,
                 'storage_url': storage_url,
                 'file_metadata': {
-                    'size': photo.size,
-                    'mime_type': photo.content_type,
-                    'original_name': photo.filename
+                    'size': spooled.size,
+                    'mime_type': spooled.content_type,
+                    'original_name': photo.filename,
+                    'sha256': spooled.sha256
                 },
                 'is_followup': True,
                 'followup_notes': notes
             }
             
             if category == 'medical_sensitive':
-                upload_data['temporary_data'] = base64_data
+                upload_data['temporary_blob_handle'] = blob_handle
             
             upload_record = supabase.table('photo_uploads').insert(upload_data).execute()
+            uploaded_rows.extend(upload_record.data or [])
             
             # Get preview URL
             preview_url = None
@@ -1904,12 +1715,15 @@ async def add_follow_up_photos(
                 'stored': stored,
                 'preview_url': preview_url
             })
+            spooled.cleanup()
         
         # Update session last_photo_at
         supabase.table('photo_sessions').update({
             'last_photo_at': datetime.now().isoformat()
         }).eq('id', session_id).execute()
         
+        await record_photos(supabase, session_id, uploaded_rows)
+        
         # Perform comparison if requested
         comparison_results = None
         if comparison_photo_ids and uploaded_photos:
@@ -2219,18 +2033,6 @@ def generate_contextual_reasoning(
     return ". ".join(reasons)
 
 
-def determine_monitoring_phase(analysis_count: int, trend: str) -> str:
-    """Determine what phase of monitoring we're in"""
-    if analysis_count <= 2:
-        return 'initial'
-    elif analysis_count <= 5 and trend != 'stable':
-        return 'active_monitoring'
-    elif trend == 'stable' and analysis_count > 5:
-        return 'maintenance'
-    else:
-        return 'ongoing'
-
-
 def identify_key_factors(analyses: List[Dict]) -> List[str]:
     """Identify key factors affecting monitoring"""
     factors = []
@@ -2345,6 +2147,8 @@ async def configure_photo_reminders(request: PhotoReminderConfigureRequest):
         reminder_data['id'] = reminder_id
         supabase.table('photo_reminders').insert(reminder_data).execute()
     
+    await record_reminder(supabase, request.session_id, reminder_data)
+    
     return {
         'reminder_id': reminder_id,
         'session_id': request.session_id,
@@ -2528,57 +2332,15 @@ async def get_session_timeline(session_id: str):
     
     print(f"Getting timeline for session {session_id}")
     
-    # Parallel fetch all data using asyncio.gather
-    async def fetch_session():
-        # Industry standard: Select only needed fields for performance
-        return supabase.table('photo_sessions')\
-            .select('id, condition_name, created_at, is_sensitive, user_id')\
-            .eq('id', session_id)\
-            .single()\
-            .execute()
-    
-    async def fetch_photos():
-        return supabase.table('photo_uploads')\
-            .select('*')\
-            .eq('session_id', session_id)\
-            .order('uploaded_at')\
-            .execute()
-    
-    async def fetch_analyses():
-        return supabase.table('photo_analyses')\
-            .select('*')\
-            .eq('session_id', session_id)\
-            .order('created_at')\
-            .execute()
-    
-    async def fetch_reminder():
-        # Industry standard: No exceptions for expected cases
-        result = supabase.table('photo_reminders')\
-            .select('*')\
-            .eq('session_id', session_id)\
-            .limit(1)\
-            .execute()
-        # Return consistent structure without creating mock objects
-        return {'data': result.data[0] if result.data else None}
-    
-    # Execute all queries in parallel for better performance
-    session_result, photos_result, analyses_result, reminder_result = await asyncio.gather(
-        fetch_session(),
-        fetch_photos(),
-        fetch_analyses(),
-        fetch_reminder()
-    )
-    
-    # Direct access without expensive type checking
-    if not session_result.data:
+    # One row holds the session, slim photos/analyses and reminder
+    snapshot = await get_progression_snapshot(supabase, session_id)
+    if not snapshot:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    session = session_result.data
-    photos = photos_result.data or []
-    analyses = analyses_result.data or []
-    
-    # Simple dict access for reminder - no hasattr needed
-    reminder = reminder_result.get('data')
+    session = snapshot['session']
+    photos = snapshot['photos'] or []
+    analyses = snapshot['analyses'] or []
+    reminder = snapshot.get('reminder')
     
     # Collect all storage URLs that need signed URLs for batch generation
     urls_to_generate = []
@@ -2595,7 +2357,8 @@ async def get_session_timeline(session_id: str):
     timeline_events = []
     
     # Add photo upload events
-    for i, photo_group in enumerate(group_photos_by_date(photos)):
+    photo_groups = group_photos_by_date(photos)
+    for i, photo_group in enumerate(photo_groups):
         event = {
             'date': photo_group[0]['uploaded_at'],
             'type': 'follow_up' if i > 0 else 'photo_upload',
@@ -2623,14 +2386,14 @@ async def get_session_timeline(session_id: str):
             
             # Add comparison data for follow-ups
             if i > 0 and event_analysis.get('comparison'):
-                prev_photos = [p for pg in group_photos_by_date(photos)[:i] for p in pg]
-                if prev_photos:
-                    days_since = calculate_days_between(prev_photos[-1]['uploaded_at'], photo_group[0]['uploaded_at'])
-                    event['comparison'] = {
-                        'days_since_previous': days_since,
-                        'trend': event_analysis['comparison'].get('trend', 'unknown'),
-                        'summary': event_analysis['comparison'].get('ai_summary', 'No comparison available')
-                    }
+                # Last photo of the previous day's group
+                prev_photo = photo_groups[i - 1][-1]
+                days_since = calculate_days_between(prev_photo['uploaded_at'], photo_group[0]['uploaded_at'])
+                event['comparison'] = {
+                    'days_since_previous': days_since,
+                    'trend': event_analysis['comparison'].get('trend', 'unknown'),
+                    'summary': event_analysis['comparison'].get('ai_summary', 'No comparison available')
+                }
         
         timeline_events.append(event)
     
@@ -2659,8 +2422,8 @@ async def get_session_timeline(session_id: str):
             'days_until': max(0, days_until)
         }
     
-    # Calculate overall trend
-    overall_trend = calculate_overall_trend(analyses)
+    # Overall trend is maintained on the snapshot
+    overall_trend = snapshot.get('overall_trend') or calculate_overall_trend(analyses)
     
     # Calculate total duration
     if photos:
@@ -2687,73 +2450,6 @@ async def get_session_timeline(session_id: str):
     }
 
 
-def group_photos_by_date(photos: List[Dict]) -> List[List[Dict]]:
-    """Group photos uploaded on the same day"""
-    if not photos:
-        return []
-    
-    groups = []
-    current_group = [photos[0]]
-    current_date = photos[0]['uploaded_at'][:10]  # Extract date part
-    
-    for photo in photos[1:]:
-        photo_date = photo['uploaded_at'][:10]
-        if photo_date == current_date:
-            current_group.append(photo)
-        else:
-            groups.append(current_group)
-            current_group = [photo]
-            current_date = photo_date
-    
-    if current_group:
-        groups.append(current_group)
-    
-    return groups
-
-
-def find_analysis_for_photos(photo_ids: List[str], analyses: List[Dict]) -> Optional[Dict]:
-    """Find the analysis that includes these photo IDs"""
-    for analysis in analyses:
-        if any(pid in analysis.get('photo_ids', []) for pid in photo_ids):
-            return analysis
-    return None
-
-
-def calculate_days_between(date1_str: str, date2_str: str) -> int:
-    """Calculate days between two ISO date strings"""
-    date1 = datetime.fromisoformat(date1_str.replace('Z', '+00:00'))
-    date2 = datetime.fromisoformat(date2_str.replace('Z', '+00:00'))
-    return abs((date2 - date1).days)
-
-
-def calculate_overall_trend(analyses: List[Dict]) -> str:
-    """Calculate overall trend from multiple analyses"""
-    if len(analyses) < 2:
-        return 'insufficient_data'
-    
-    # Look at comparison data in recent analyses
-    trends = []
-    for analysis in analyses:
-        if analysis.get('comparison') and analysis['comparison'].get('trend'):
-            trends.append(analysis['comparison']['trend'])
-    
-    if not trends:
-        return 'stable'
-    
-    # Count trend occurrences
-    improving = trends.count('improving')
-    worsening = trends.count('worsening')
-    stable = trends.count('stable')
-    
-    # Determine overall trend
-    if worsening > improving + stable:
-        return 'worsening'
-    elif improving > worsening + stable:
-        return 'improving'
-    else:
-        return 'stable'
-
-
 @router.get("/session/{session_id}/progression-analysis")
 async def get_progression_analysis(session_id: str):
     """
@@ -2764,23 +2460,13 @@ async def get_progression_analysis(session_id: str):
     
     print(f"Generating progression analysis for session {session_id}")
     
-    # Get session data
-    session_result = supabase.table('photo_sessions').select('*').eq('id', session_id).single().execute()
-    if not session_result.data:
+    # Velocity, risk, insights and visualization series are precomputed
+    # whenever an analysis is written
+    snapshot = await get_progression_snapshot(supabase, session_id)
+    if not snapshot:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    session = session_result.data
-    
-    # Get all analyses with comparisons
-    analyses_result = supabase.table('photo_analyses')\
-        .select('*')\
-        .eq('session_id', session_id)\
-        .order('created_at')\
-        .execute()
-    
-    analyses = analyses_result.data or []
-    
-    if len(analyses) < 2:
+    if (snapshot.get('analysis_count') or 0) < 2 or not snapshot.get('velocity'):
         return {
             "progression_metrics": {
                 "status": "insufficient_data",
@@ -2788,338 +2474,21 @@ async def get_progression_analysis(session_id: str):
             }
         }
     
-    # Calculate velocity metrics
-    velocity_data = calculate_progression_velocity(analyses)
-    
-    # Calculate risk indicators
-    risk_indicators = calculate_risk_indicators(analyses)
-    
-    # Generate clinical insights
-    clinical_insights = generate_clinical_insights(
-        session,
-        analyses,
-        velocity_data,
-        risk_indicators
-    )
-    
-    # Create visualization data
-    visualization_data = prepare_visualization_data(analyses)
-    
-    # Update session with latest progression summary
-    supabase.table('photo_sessions').update({
-        'last_progression_analysis': datetime.now().isoformat(),
-        'progression_summary': {
-            'overall_trend': velocity_data['overall_trend'],
-            'current_phase': velocity_data['monitoring_phase'],
-            'risk_level': risk_indicators['overall_risk_level']
-        }
-    }).eq('id', session_id).execute()
+    clinical_insights = snapshot['clinical_insights']
     
     return {
         "progression_metrics": {
-            "velocity": velocity_data,
-            "risk_indicators": risk_indicators,
+            "velocity": snapshot['velocity'],
+            "risk_indicators": snapshot['risk_indicators'],
             "clinical_thresholds": clinical_insights['thresholds'],
             "recommendations": clinical_insights['recommendations']
         },
-        "visualization_data": visualization_data,
+        "visualization_data": snapshot['visualization_data'],
         "summary": clinical_insights['summary'],
         "next_steps": clinical_insights['next_steps']
     }
 
 
-def calculate_progression_velocity(analyses: List[Dict]) -> Dict:
-    """Calculate rate and acceleration of changes"""
-    
-    # Extract size measurements over time
-    size_timeline = []
-    for analysis in analyses:
-        if analysis.get('analysis_data', {}).get('key_measurements', {}).get('size_estimate_mm'):
-            size_timeline.append({
-                'date': analysis['created_at'],
-                'size_mm': analysis['analysis_data']['key_measurements']['size_estimate_mm'],
-                'confidence': analysis.get('confidence_score', 0)
-            })
-    
-    velocity_data = {
-        'overall_trend': 'stable',
-        'size_change_rate': None,
-        'acceleration': None,
-        'projected_size_30d': None,
-        'monitoring_phase': 'ongoing'
-    }
-    
-    if len(size_timeline) >= 2:
-        # Calculate rate of change
-        first = size_timeline[0]
-        last = size_timeline[-1]
-        
-        first_date = datetime.fromisoformat(first['date'].replace('Z', '+00:00'))
-        last_date = datetime.fromisoformat(last['date'].replace('Z', '+00:00'))
-        days_elapsed = (last_date - first_date).days
-        
-        if days_elapsed > 0:
-            size_change = last['size_mm'] - first['size_mm']
-            rate_per_week = (size_change / days_elapsed) * 7
-            
-            velocity_data['size_change_rate'] = f"{rate_per_week:.2f}mm/week"
-            
-            # Calculate acceleration if we have 3+ points
-            if len(size_timeline) >= 3:
-                mid_point = size_timeline[len(size_timeline)//2]
-                
-                # First half rate
-                mid_date = datetime.fromisoformat(mid_point['date'].replace('Z', '+00:00'))
-                first_half_days = (mid_date - first_date).days
-                first_half_change = mid_point['size_mm'] - first['size_mm']
-                first_half_rate = first_half_change / max(first_half_days, 1)
-                
-                # Second half rate
-                second_half_days = (last_date - mid_date).days
-                second_half_change = last['size_mm'] - mid_point['size_mm']
-                second_half_rate = second_half_change / max(second_half_days, 1)
-                
-                # Acceleration
-                if first_half_rate < second_half_rate:
-                    velocity_data['acceleration'] = 'increasing'
-                elif first_half_rate > second_half_rate:
-                    velocity_data['acceleration'] = 'decreasing'
-                else:
-                    velocity_data['acceleration'] = 'stable'
-            
-            # Project 30 days
-            if rate_per_week != 0:
-                projected_change_30d = (rate_per_week / 7) * 30
-                velocity_data['projected_size_30d'] = f"{last['size_mm'] + projected_change_30d:.1f}mm"
-            
-            # Determine trend
-            if size_change > 0.5:
-                velocity_data['overall_trend'] = 'growing'
-            elif size_change < -0.5:
-                velocity_data['overall_trend'] = 'shrinking'
-            else:
-                velocity_data['overall_trend'] = 'stable'
-    
-    # Determine monitoring phase
-    velocity_data['monitoring_phase'] = determine_monitoring_phase(
-        len(analyses),
-        velocity_data['overall_trend']
-    )
-    
-    return velocity_data
-
-
-def calculate_risk_indicators(analyses: List[Dict]) -> Dict:
-    """Calculate risk indicators based on progression patterns"""
-    
-    risk_indicators = {
-        'rapid_growth': False,
-        'color_darkening': False,
-        'border_irregularity_increase': False,
-        'new_colors_appearing': False,
-        'asymmetry_increasing': False,
-        'overall_risk_level': 'low'
-    }
-    
-    # Check for rapid growth
-    for i in range(1, len(analyses)):
-        prev = analyses[i-1]
-        curr = analyses[i]
-        
-        # Check size increase
-        if (prev.get('analysis_data', {}).get('key_measurements', {}).get('size_estimate_mm') and 
-            curr.get('analysis_data', {}).get('key_measurements', {}).get('size_estimate_mm')):
-            
-            prev_size = prev['analysis_data']['key_measurements']['size_estimate_mm']
-            curr_size = curr['analysis_data']['key_measurements']['size_estimate_mm']
-            
-            if prev_size > 0 and (curr_size - prev_size) / prev_size > 0.2:  # 20% increase
-                risk_indicators['rapid_growth'] = True
-        
-        # Check for color changes
-        if curr.get('comparison', {}).get('visual_changes', {}).get('color', {}).get('concerning'):
-            risk_indicators['color_darkening'] = True
-        
-        # Check for new colors
-        prev_colors = prev.get('analysis_data', {}).get('key_measurements', {}).get('secondary_colors', [])
-        curr_colors = curr.get('analysis_data', {}).get('key_measurements', {}).get('secondary_colors', [])
-        
-        if len(curr_colors) > len(prev_colors):
-            risk_indicators['new_colors_appearing'] = True
-    
-    # Check latest analysis for border/asymmetry
-    if analyses:
-        latest = analyses[-1]
-        if latest.get('analysis_data', {}).get('condition_insights', {}).get('progression_indicators', {}).get('worsening_signs'):
-            worsening_signs = latest['analysis_data']['condition_insights']['progression_indicators']['worsening_signs']
-            
-            if any('border' in sign.lower() for sign in worsening_signs):
-                risk_indicators['border_irregularity_increase'] = True
-            
-            if any('asymmetr' in sign.lower() for sign in worsening_signs):
-                risk_indicators['asymmetry_increasing'] = True
-    
-    # Calculate overall risk
-    risk_count = sum([
-        risk_indicators['rapid_growth'],
-        risk_indicators['color_darkening'],
-        risk_indicators['border_irregularity_increase'],
-        risk_indicators['new_colors_appearing'],
-        risk_indicators['asymmetry_increasing']
-    ])
-    
-    if risk_count >= 3:
-        risk_indicators['overall_risk_level'] = 'high'
-    elif risk_count >= 1:
-        risk_indicators['overall_risk_level'] = 'moderate'
-    else:
-        risk_indicators['overall_risk_level'] = 'low'
-    
-    return risk_indicators
-
-
-def generate_clinical_insights(
-    session: Dict,
-    analyses: List[Dict],
-    velocity_data: Dict,
-    risk_indicators: Dict
-) -> Dict:
-    """Generate clinical insights based on progression data"""
-    
-    condition_name = session.get('condition_name', 'condition')
-    
-    insights = {
-        'thresholds': {},
-        'recommendations': [],
-        'summary': '',
-        'next_steps': []
-    }
-    
-    # Set clinical thresholds based on condition type
-    if 'mole' in condition_name.lower() or 'lesion' in condition_name.lower():
-        insights['thresholds'] = {
-            'concerning_size': '6mm',
-            'rapid_growth_threshold': '20% in 30 days',
-            'color_change_threshold': 'Any darkening or new colors'
-        }
-        
-        # Check against thresholds
-        latest_size = None
-        if analyses:
-            latest = analyses[-1]
-            latest_size = latest.get('analysis_data', {}).get('key_measurements', {}).get('size_estimate_mm')
-        
-        if latest_size and latest_size >= 6:
-            insights['recommendations'].append("Size exceeds 6mm - dermatologist evaluation recommended")
-    
-    # Generate recommendations based on risk
-    if risk_indicators['overall_risk_level'] == 'high':
-        insights['recommendations'].extend([
-            "Multiple concerning changes detected",
-            "Urgent dermatologist consultation recommended",
-            "Document all changes carefully"
-        ])
-        insights['next_steps'] = [
-            "Schedule dermatologist appointment within 1 week",
-            "Bring all photo documentation",
-            "Note any symptoms (itching, bleeding)"
-        ]
-    elif risk_indicators['overall_risk_level'] == 'moderate':
-        insights['recommendations'].extend([
-            "Some changes observed requiring attention",
-            "Continue close monitoring",
-            "Consider dermatologist consultation"
-        ])
-        insights['next_steps'] = [
-            "Monitor every 7-14 days",
-            "Watch for rapid changes",
-            "Schedule routine dermatologist check"
-        ]
-    else:
-        insights['recommendations'].extend([
-            "Stable progression observed",
-            "Continue routine monitoring",
-            "Annual dermatologist check recommended"
-        ])
-        insights['next_steps'] = [
-            "Continue monthly photos",
-            "Note any new symptoms",
-            "Maintain photo documentation"
-        ]
-    
-    # Generate summary
-    trend_text = velocity_data.get('overall_trend', 'stable')
-    rate_text = velocity_data.get('size_change_rate', 'minimal change')
-    
-    insights['summary'] = (
-        f"Analysis of {len(analyses)} photos shows {trend_text} progression "
-        f"with {rate_text}. Risk level: {risk_indicators['overall_risk_level']}. "
-        f"Monitoring phase: {velocity_data.get('monitoring_phase', 'ongoing')}."
-    )
-    
-    return insights
-
-
-def prepare_visualization_data(analyses: List[Dict]) -> Dict:
-    """Prepare data for frontend visualization"""
-    
-    timeline_data = []
-    
-    for analysis in analyses:
-        data_point = {
-            'date': analysis['created_at'],
-            'confidence': analysis.get('confidence_score', 0),
-            'primary_assessment': analysis.get('analysis_data', {}).get('primary_assessment', ''),
-            'metrics': {}
-        }
-        
-        # Extract key metrics
-        measurements = analysis.get('analysis_data', {}).get('key_measurements', {})
-        if measurements.get('size_estimate_mm'):
-            data_point['metrics']['size_mm'] = measurements['size_estimate_mm']
-        
-        # Extract risk indicators
-        if analysis.get('analysis_data', {}).get('red_flags'):
-            data_point['has_red_flags'] = True
-            data_point['red_flag_count'] = len(analysis['analysis_data']['red_flags'])
-        
-        timeline_data.append(data_point)
-    
-    # Calculate trend lines
-    size_values = [p['metrics'].get('size_mm') for p in timeline_data if p['metrics'].get('size_mm')]
-    
-    trend_lines = []
-    if len(size_values) >= 2:
-        # Simple linear regression for trend line
-        x_values = list(range(len(size_values)))
-        mean_x = sum(x_values) / len(x_values)
-        mean_y = sum(size_values) / len(size_values)
-        
-        numerator = sum((x - mean_x) * (y - mean_y) for x, y in zip(x_values, size_values))
-        denominator = sum((x - mean_x) ** 2 for x in x_values)
-        
-        if denominator != 0:
-            slope = numerator / denominator
-            intercept = mean_y - slope * mean_x
-            
-            trend_lines = [
-                {'x': 0, 'y': intercept},
-                {'x': len(size_values) - 1, 'y': intercept + slope * (len(size_values) - 1)}
-            ]
-    
-    return {
-        'timeline': timeline_data,
-        'trend_lines': trend_lines,
-        'metrics': {
-            'size': {
-                'values': size_values,
-                'unit': 'mm',
-                'label': 'Size'
-            }
-        }
-    }
-
-
 @router.get("/session/{session_id}/analysis-history")
 @cache_result(ttl_seconds=300)  # Cache for 5 minutes
 async def get_analysis_history_endpoint(
@@ -3145,37 +2514,18 @@ async def get_analysis_history_endpoint(
     if not supabase:
         raise HTTPException(status_code=500, detail="Database connection not configured")
     
-    # Parallel fetch all data using asyncio.gather for better performance
-    async def fetch_session():
-        return supabase.table('photo_sessions').select('*').eq('id', session_id).single().execute()
-    
-    async def fetch_analyses():
-        return supabase.table('photo_analyses')\
-            .select('*')\
-            .eq('session_id', session_id)\
-            .order('created_at', desc=False)\
-            .execute()
-    
-    async def fetch_photos():
-        return supabase.table('photo_uploads')\
-            .select('*')\
-            .eq('session_id', session_id)\
-            .order('uploaded_at', desc=False)\
-            .execute()
-    
-    # Execute all queries in parallel
-    session_result, analyses_result, photos_result = await asyncio.gather(
-        fetch_session(),
-        fetch_analyses(), 
-        fetch_photos()
+    # Session, photos and analyses come from the progression snapshot row; the snapshot
+    # keeps only a few analysis fields, so the full analysis data is read alongside it
+    snapshot, analysis_details = await asyncio.gather(
+        get_progression_snapshot(supabase, session_id),
+        load_analysis_details(supabase, session_id)
     )
-    
-    if not session_result.data:
+    if not snapshot:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    session = session_result.data
-    analyses = analyses_result.data if analyses_result.data else []
-    photos = photos_result.data if photos_result.data else []
+    session = snapshot['session']
+    analyses = snapshot['analyses'] or []
+    photos = snapshot['photos'] or []
     photos_by_id = {photo['id']: photo for photo in photos}
     
     # Collect all storage URLs that need signed URLs
@@ -3215,7 +2565,7 @@ async def get_analysis_history_endpoint(
                 thumbnail_url = photo_url  # For now, same as full photo
         
         # Extract key metrics
-        analysis_data = analysis.get('analysis_data', {})
+        analysis_data = analysis_details.get(analysis['id']) or analysis.get('analysis_data', {})
         key_metrics = {}
         
         # Try to get size from different possible locations
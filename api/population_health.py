@@ -1,9 +1,12 @@
 """Population Health API endpoints"""
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, Response
 from datetime import datetime, timezone
 from typing import Optional
 
 from supabase_client import supabase
+from utils.report_listing import (
+    DEFAULT_PAGE_SIZE, InvalidCursor, get_report, list_all_reports, list_reports_page
+)
 
 router = APIRouter(prefix="/api", tags=["population-health"])
 
@@ -66,25 +69,34 @@ async def get_outbreak_alerts(geographic_area: Optional[str] = None):
         return {"error": str(e), "status": "error"}
 
 @router.get("/reports")
-async def get_user_reports(user_id: str):
-    """Get all reports for a user"""
+async def get_user_reports(user_id: str, response: Response, limit: Optional[int] = None,
+                           cursor: Optional[str] = None):
+    """
+    Get a user's reports, newest first.
+
+    Without limit or cursor every report is returned, as before. With either,
+    one page is returned (limit defaults to DEFAULT_PAGE_SIZE, at most
+    MAX_PAGE_SIZE); the body stays a plain array, so the cursor for the next
+    page is sent in the X-Next-Cursor header, which is absent on the last page.
+    """
     try:
-        response = supabase.table("medical_reports")\
-            .select("id, report_type, created_at, executive_summary, confidence_score")\
-            .eq("user_id", user_id)\
-            .order("created_at.desc")\
-            .execute()
-        
-        reports = response.data or []
+        if limit is None and cursor is None:
+            reports = await list_all_reports(user_id)
+        else:
+            page = await list_reports_page(user_id, limit=limit or DEFAULT_PAGE_SIZE, cursor=cursor)
+            reports = page["items"]
+            if page["next_cursor"]:
+                response.headers["X-Next-Cursor"] = page["next_cursor"]
         
         # Format for frontend - return array directly (frontend expects array, not object)
         formatted_reports = []
         for report in reports:
+            summary = report.get("executive_summary") or ""
             formatted_reports.append({
                 "id": report["id"],
                 "type": report["report_type"],
                 "title": report["report_type"].replace("_", " ").title(),
-                "summary": report["executive_summary"][:150] + "..." if len(report.get("executive_summary", "")) > 150 else report.get("executive_summary", ""),
+                "summary": summary[:150] + "..." if len(summary) > 150 else summary,
                 "confidence": report.get("confidence_score", 0),
                 "created_at": report["created_at"],
                 "generated_date": report["created_at"]
@@ -93,6 +105,8 @@ async def get_user_reports(user_id: str):
         # Return array directly for frontend compatibility
         return formatted_reports
         
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         print(f"Error fetching user reports: {e}")
         # Return empty array on error to prevent frontend crashes
@@ -122,16 +136,11 @@ async def mark_report_accessed(report_id: str):
 async def get_report_by_id(report_id: str):
     """Get a specific report by ID"""
     try:
-        response = supabase.table("medical_reports")\
-            .select("*")\
-            .eq("id", report_id)\
-            .execute()
+        report = await get_report(report_id)
         
-        if not response.data:
+        if not report:
             return {"error": "Report not found", "status": "error"}
         
-        report = response.data[0]
-        
         return {
             "report_id": report["id"],
             "report_type": report["report_type"],
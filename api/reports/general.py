@@ -1,6 +1,7 @@
 """General Report API endpoints"""
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, Request
 from datetime import datetime, timezone, timedelta
+from typing import Optional
 import json
 import uuid
 import logging
@@ -24,6 +25,15 @@ from utils.data_gathering import (
     has_emergency_indicators,
     determine_time_range
 )
+from utils.report_listing import (
+    DEFAULT_PAGE_SIZE,
+    InvalidCursor,
+    get_report,
+    get_report_body,
+    json_response,
+    list_reports_page,
+    with_report_data_defaults
+)
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -31,94 +41,64 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/report", tags=["reports-general"])
 
 @router.get("/list/{user_id}")
-async def list_user_reports(user_id: str):
-    """List all reports for a user"""
+async def list_user_reports(user_id: str, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None,
+                            days: int = 90):
+    """
+    List a user's reports, newest first, one page at a time.
+
+    Items carry summary columns only; fetch the body with GET /{report_id}
+    or GET /{report_id}/data. Pass next_cursor back as cursor for the next page.
+    """
     try:
-        # Get reports from last 90 days by default
-        cutoff_date = (datetime.now(timezone.utc) - timedelta(days=90)).isoformat()
-        
-        response = supabase.table("medical_reports")\
-            .select("*")\
-            .eq("user_id", user_id)\
-            .gte("created_at", cutoff_date)\
-            .order("created_at", desc=True)\
-            .execute()
-        
-        reports = response.data or []
-        
-        # Ensure report_data is properly formatted
-        for report in reports:
-            # report_data is already a dict from JSONB, no need to parse
-            if report.get("report_data") and isinstance(report["report_data"], dict):
-                # Ensure all expected fields exist
-                report_data = report["report_data"]
-                if "executive_summary" not in report_data:
-                    report_data["executive_summary"] = {
-                        "one_page_summary": report.get("executive_summary", "No summary available"),
-                        "chief_complaints": [],
-                        "key_findings": [],
-                        "urgency_indicators": [],
-                        "action_items": []
-                    }
-            else:
-                # Create minimal structure if report_data is missing
-                report["report_data"] = {
-                    "executive_summary": {
-                        "one_page_summary": report.get("executive_summary", "Report data unavailable"),
-                        "chief_complaints": [],
-                        "key_findings": ["Report data needs to be regenerated"],
-                        "urgency_indicators": [],
-                        "action_items": ["Contact support if this persists"]
-                    }
-                }
+        # Reports from last 90 days by default
+        cutoff_date = (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
+        page = await list_reports_page(user_id, limit=limit, cursor=cursor, since=cutoff_date)
         
         return {
-            "reports": reports,
-            "count": len(reports),
+            "reports": page["items"],
+            "count": len(page["items"]),
+            "next_cursor": page["next_cursor"],
+            "has_more": page["has_more"],
             "status": "success"
         }
         
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         print(f"Error listing reports: {e}")
         return {"error": str(e), "reports": [], "status": "error"}
 
-@router.get("/{report_id}")
-async def get_report_by_id(report_id: str):
-    """Get a specific report by ID"""
+@router.get("/{report_id}/data")
+async def get_report_data(report_id: str, request: Request):
+    """Just the report_data body of a report, gzip-encoded when accepted"""
     try:
-        response = supabase.table("medical_reports")\
-            .select("*")\
-            .eq("id", report_id)\
-            .execute()
+        report = await get_report_body(report_id)
         
-        if not response.data:
+        if not report:
             return {"error": "Report not found", "status": "error"}
         
-        report = response.data[0]
+        report = with_report_data_defaults(report)
+        return json_response({
+            "report_id": report["id"],
+            "report_data": report["report_data"],
+            "status": "success"
+        }, request)
         
-        # Ensure report_data is properly formatted
-        if report.get("report_data") and isinstance(report["report_data"], dict):
-            # Ensure all expected fields exist
-            report_data = report["report_data"]
-            if "executive_summary" not in report_data:
-                report_data["executive_summary"] = {
-                    "one_page_summary": report.get("executive_summary", "No summary available"),
-                    "chief_complaints": [],
-                    "key_findings": [],
-                    "urgency_indicators": [],
-                    "action_items": []
-                }
-        else:
-            # Create minimal structure if report_data is missing
-            report["report_data"] = {
-                "executive_summary": {
-                    "one_page_summary": report.get("executive_summary", "Report data unavailable"),
-                    "chief_complaints": [],
-                    "key_findings": ["Report data needs to be regenerated"],
-                    "urgency_indicators": [],
-                    "action_items": ["Contact support if this persists"]
-                }
-            }
+    except Exception as e:
+        print(f"Error getting report data: {e}")
+        return {"error": str(e), "status": "error"}
+
+@router.get("/{report_id}")
+async def get_report_by_id(report_id: str, include_data: bool = True):
+    """Get a specific report by ID (include_data=false skips the report_data body)"""
+    try:
+        report = await get_report(report_id, include_data=include_data)
+        
+        if not report:
+            return {"error": "Report not found", "status": "error"}
+        
+        if include_data:
+            report = with_report_data_defaults(report)
         
         # Update access tracking
         supabase.table("medical_reports")\
@@ -0,0 +1,386 @@
+"""Asynchronous report generation jobs
+
+POST /api/report/jobs/... enqueues a report and returns its report_id straight
+away. A worker task runs the existing report handler (gather -> prompt -> LLM ->
+save) under a concurrency limit, and clients poll GET /api/report/jobs/{id} or
+subscribe to /api/report/jobs/{id}/events for server-sent status updates.
+Identical requests share one job, keyed by a hash of the report type and the
+selected IDs, so a double-click never produces two reports.
+"""
+import os
+import json
+import uuid
+import asyncio
+import hashlib
+import logging
+from functools import partial
+from datetime import datetime, timezone, timedelta
+from typing import Optional, Dict, Any, Callable, Awaitable
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+
+from models.requests import SpecialistReportRequest, TimePeriodReportRequest
+from supabase_client import supabase
+from api.reports import specialist, time_based
+from api.reports.specialist_engine import run_specialist_report
+from api.reports.specialty_profiles import SPECIALTY_PROFILES
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/report/jobs", tags=["reports-jobs"])
+
+JOBS_TABLE = "report_jobs"
+REPORT_WORKER_CONCURRENCY = int(os.getenv("REPORT_WORKER_CONCURRENCY", "4"))
+DEDUP_WINDOW = timedelta(minutes=int(os.getenv("REPORT_DEDUP_WINDOW_MINUTES", "10")))
+STALE_JOB_AFTER = timedelta(minutes=15)  # queued/running rows older than this were orphaned by a restart
+SSE_HEARTBEAT_SECONDS = 15
+PERSISTED_POLL_SECONDS = 2
+
+TERMINAL_STATUSES = {"completed", "failed"}
+
+ReportHandler = Callable[[Any], Awaitable[dict]]
+
+TIME_PERIOD_HANDLERS: Dict[str, ReportHandler] = {
+    "30-day": time_based.generate_30_day_report,
+    "annual": time_based.generate_annual_report,
+}
+
+
+def normalize_specialty(specialty: str) -> str:
+    return specialty.strip().lower().replace("_", "-").replace(" ", "-")
+
+
+def compute_request_hash(report_type: str, request) -> str:
+    """
+    Stable hash of a report request for deduplication.
+
+    analysis_id and report_id are per-click identifiers, so they are left out;
+    ID lists are order-insensitive and None is treated the same as [].
+    """
+    payload = {"report_type": report_type}
+    for key, value in request.dict(exclude={"analysis_id", "report_id"}).items():
+        if isinstance(value, list):
+            value = sorted(set(value))
+        if value in (None, []):
+            continue
+        payload[key] = value
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def public_job(job: dict) -> dict:
+    """Job fields exposed to clients"""
+    return {
+        "report_id": job["id"],
+        "report_type": job.get("report_type"),
+        "status": job.get("status"),
+        "created_at": job.get("created_at"),
+        "started_at": job.get("started_at"),
+        "completed_at": job.get("completed_at"),
+        "error": job.get("error"),
+    }
+
+
+class ReportJobQueue:
+    """In-process report worker pool with state mirrored to the report_jobs table"""
+
+    def __init__(self, supabase_client, concurrency: int = REPORT_WORKER_CONCURRENCY):
+        self.supabase = supabase_client
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._lock = asyncio.Lock()
+        self._jobs: Dict[str, dict] = {}       # report_id -> job state
+        self._by_hash: Dict[str, str] = {}     # request hash -> report_id
+        self._results: Dict[str, dict] = {}    # report_id -> handler response, kept for DEDUP_WINDOW
+        self._changed: Dict[str, asyncio.Event] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    async def enqueue(self, report_type: str, handler: ReportHandler, request) -> tuple:
+        """
+        Queue a report and return (job, deduplicated).
+
+        An identical request that is still queued/running, or that completed
+        within DEDUP_WINDOW, returns the existing job instead of a new one.
+        """
+        request_hash = compute_request_hash(report_type, request)
+
+        async with self._lock:
+            self._prune()
+            existing = self._find_local(request_hash) or await self._find_persisted(request_hash)
+            if existing:
+                return existing, True
+
+            report_id = str(uuid.uuid4())
+            job = {
+                "id": report_id,
+                "user_id": request.user_id,
+                "report_type": report_type,
+                "request_hash": request_hash,
+                "status": "queued",
+                "request": request.dict(exclude={"report_id"}),
+                "created_at": _now().isoformat(),
+                "started_at": None,
+                "completed_at": None,
+                "error": None,
+            }
+            self._jobs[report_id] = job
+            self._by_hash[request_hash] = report_id
+            self._changed[report_id] = asyncio.Event()
+            await self._persist_insert(job)
+
+            request.report_id = report_id
+            self._tasks[report_id] = asyncio.create_task(self._run(job, handler, request))
+
+        logger.info(f"[REPORT JOBS] Queued {report_type} report {report_id}")
+        return job, False
+
+    async def get_job(self, report_id: str) -> Optional[dict]:
+        """Current job state from memory, the jobs table or, failing that, the saved report"""
+        self._prune()
+        job = self._jobs.get(report_id)
+        if job:
+            return job
+
+        row = await self._fetch_persisted(report_id)
+        if row:
+            return self._expire_orphan(row)
+
+        try:
+            report = await asyncio.to_thread(
+                self.supabase.table("medical_reports").select("id, report_type, created_at").eq("id", report_id).execute
+            )
+        except Exception as e:
+            logger.warning(f"[REPORT JOBS] Report lookup failed for {report_id}: {e}")
+            return None
+        if report.data:
+            saved = report.data[0]
+            return {"id": saved["id"], "report_type": saved.get("report_type"), "status": "completed",
+                    "created_at": saved.get("created_at"), "completed_at": saved.get("created_at")}
+        return None
+
+    def get_result(self, report_id: str) -> Optional[dict]:
+        self._prune()
+        return self._results.get(report_id)
+
+    def change_event(self, report_id: str) -> Optional[asyncio.Event]:
+        """Event set on the next state change of a local job; None for jobs owned elsewhere"""
+        return self._changed.get(report_id)
+
+    async def _run(self, job: dict, handler: ReportHandler, request):
+        report_id = job["id"]
+        try:
+            async with self._semaphore:
+                await self._update(job, status="running", started_at=_now().isoformat())
+                try:
+                    result = await handler(request)
+                except Exception as e:
+                    logger.error(f"[REPORT JOBS] {job['report_type']} report {report_id} raised: {e}")
+                    result = {"status": "error", "error": str(e)}
+
+                # Report handlers signal failure in the response body rather than raising
+                if isinstance(result, dict) and result.get("status") == "success":
+                    self._results[report_id] = result
+                    await self._update(job, status="completed", completed_at=_now().isoformat())
+                else:
+                    error = (result or {}).get("error") or "Report generation failed"
+                    await self._update(job, status="failed", completed_at=_now().isoformat(), error=error)
+                    self._by_hash.pop(job["request_hash"], None)
+            # Free the job and its result even if no further requests arrive
+            asyncio.get_running_loop().call_later(DEDUP_WINDOW.total_seconds(), self._prune)
+        finally:
+            self._tasks.pop(report_id, None)
+
+    async def _update(self, job: dict, **fields):
+        job.update(fields)
+        # Wake everyone waiting on this job, then arm a fresh event for the next change
+        event = self._changed.get(job["id"])
+        self._changed[job["id"]] = asyncio.Event()
+        if event:
+            event.set()
+        await self._persist_update(job["id"], fields)
+
+    def _find_local(self, request_hash: str) -> Optional[dict]:
+        job = self._jobs.get(self._by_hash.get(request_hash))
+        if job and self._reusable(job):
+            return job
+        return None
+
+    async def _find_persisted(self, request_hash: str) -> Optional[dict]:
+        """Jobs queued by another worker process (or before a restart)"""
+        try:
+            result = await asyncio.to_thread(
+                self.supabase.table(JOBS_TABLE)
+                .select("id, report_type, status, created_at, started_at, completed_at, error")
+                .eq("request_hash", request_hash)
+                .order("created_at", desc=True)
+                .limit(1)
+                .execute
+            )
+        except Exception as e:
+            logger.warning(f"[REPORT JOBS] Dedup lookup failed: {e}")
+            return None
+        if result.data and self._reusable(result.data[0]):
+            return result.data[0]
+        return None
+
+    @staticmethod
+    def _reusable(job: dict) -> bool:
+        now = _now()
+        if job.get("status") in ("queued", "running"):
+            created_at = _parse_time(job.get("created_at"))
+            return created_at is not None and now - created_at < STALE_JOB_AFTER
+        if job.get("status") == "completed":
+            completed_at = _parse_time(job.get("completed_at"))
+            return completed_at is not None and now - completed_at < DEDUP_WINDOW
+        return False
+
+    @staticmethod
+    def _expire_orphan(row: dict) -> dict:
+        """A persisted job still marked active past STALE_JOB_AFTER lost its worker"""
+        created_at = _parse_time(row.get("created_at"))
+        if row.get("status") not in TERMINAL_STATUSES and created_at and _now() - created_at >= STALE_JOB_AFTER:
+            return {**row, "status": "failed", "error": "Report job was interrupted; please retry"}
+        return row
+
+    def _prune(self):
+        """Drop finished jobs and their results once DEDUP_WINDOW has passed"""
+        cutoff = _now() - DEDUP_WINDOW
+        for report_id, job in list(self._jobs.items()):
+            completed_at = _parse_time(job.get("completed_at"))
+            if job["status"] in TERMINAL_STATUSES and completed_at is not None and completed_at <= cutoff:
+                self._jobs.pop(report_id, None)
+                self._results.pop(report_id, None)
+                self._changed.pop(report_id, None)
+                if self._by_hash.get(job["request_hash"]) == report_id:
+                    self._by_hash.pop(job["request_hash"], None)
+
+    async def _fetch_persisted(self, report_id: str) -> Optional[dict]:
+        try:
+            result = await asyncio.to_thread(
+                self.supabase.table(JOBS_TABLE)
+                .select("id, report_type, status, created_at, started_at, completed_at, error")
+                .eq("id", report_id)
+                .execute
+            )
+        except Exception as e:
+            logger.warning(f"[REPORT JOBS] Status lookup failed for {report_id}: {e}")
+            return None
+        return result.data[0] if result.data else None
+
+    async def _persist_insert(self, job: dict):
+        try:
+            await asyncio.to_thread(self.supabase.table(JOBS_TABLE).insert(job).execute)
+        except Exception as e:
+            # Local state still drives the job; only cross-process dedup/status is lost
+            logger.warning(f"[REPORT JOBS] Could not persist job {job['id']}: {e}")
+
+    async def _persist_update(self, report_id: str, fields: dict):
+        try:
+            await asyncio.to_thread(self.supabase.table(JOBS_TABLE).update(fields).eq("id", report_id).execute)
+        except Exception as e:
+            logger.warning(f"[REPORT JOBS] Could not update job {report_id}: {e}")
+
+
+report_jobs = ReportJobQueue(supabase)
+
+
+def _accepted(job: dict, deduplicated: bool) -> dict:
+    report_id = job["id"]
+    return {
+        **public_job(job),
+        "deduplicated": deduplicated,
+        "status_url": f"/api/report/jobs/{report_id}",
+        "events_url": f"/api/report/jobs/{report_id}/events",
+    }
+
+
+@router.post("/specialist", status_code=202)
+async def enqueue_specialist_report(request: SpecialistReportRequest):
+    """Queue a specialist report; specialties without a profile use the generic specialist report"""
+    if not request.specialty:
+        raise HTTPException(status_code=400, detail="specialty is required")
+    if not request.user_id:
+        raise HTTPException(status_code=400, detail="user_id is required")
+
+    specialty = normalize_specialty(request.specialty)
+    profile = SPECIALTY_PROFILES.get(specialty)
+    handler = partial(run_specialist_report, profile) if profile else specialist.generate_specialist_report
+    job, deduplicated = await report_jobs.enqueue(specialty, handler, request)
+    return _accepted(job, deduplicated)
+
+
+@router.post("/30-day", status_code=202)
+async def enqueue_30_day_report(request: TimePeriodReportRequest):
+    """Queue a 30-day aggregate report"""
+    job, deduplicated = await report_jobs.enqueue("30-day", TIME_PERIOD_HANDLERS["30-day"], request)
+    return _accepted(job, deduplicated)
+
+
+@router.post("/annual", status_code=202)
+async def enqueue_annual_report(request: TimePeriodReportRequest):
+    """Queue an annual report"""
+    job, deduplicated = await report_jobs.enqueue("annual", TIME_PERIOD_HANDLERS["annual"], request)
+    return _accepted(job, deduplicated)
+
+
+@router.get("/{report_id}")
+async def get_report_job(report_id: str):
+    """Poll a report job; completed jobs include the generated report"""
+    job = await report_jobs.get_job(report_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Report job not found")
+
+    response = public_job(job)
+    if job.get("status") == "completed":
+        result = report_jobs.get_result(report_id)
+        if result:
+            response["report"] = result
+        else:
+            response["report_url"] = f"/api/report/{report_id}"
+    return response
+
+
+@router.get("/{report_id}/events")
+async def stream_report_job(report_id: str):
+    """Server-sent events with the job status until it completes or fails"""
+    job = await report_jobs.get_job(report_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Report job not found")
+
+    async def event_stream():
+        last_sent = None
+        while True:
+            # Grab the event before reading state so a change in between is not missed
+            changed = report_jobs.change_event(report_id)
+            current = await report_jobs.get_job(report_id)
+            if current is None:
+                return
+            state = public_job(current)
+            if state != last_sent:
+                yield f"event: status\ndata: {json.dumps(state)}\n\n"
+                last_sent = state
+            if state["status"] in TERMINAL_STATUSES:
+                return
+            if changed is None:
+                # Owned by another worker process: poll the jobs table
+                await asyncio.sleep(PERSISTED_POLL_SECONDS)
+                continue
+            try:
+                await asyncio.wait_for(changed.wait(), SSE_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
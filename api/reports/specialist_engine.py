@@ -0,0 +1,372 @@
+"""Shared engine for the specialty report endpoints
+
+Every specialty runs the same steps: load or create the report_analyses row,
+gather the selected interactions once, serialize them compactly within a
+token budget, call the LLM with the specialty's system prompt, run the
+specialty's post-processors and save. Specialties differ only in their
+SpecialtyProfile (see api/reports/specialty_profiles.py).
+"""
+import os
+import time
+import uuid
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timezone, timedelta
+from typing import Optional, Dict, Any, Tuple, Callable
+
+from supabase_client import supabase
+from business_logic import call_llm
+from utils.json_parser import extract_json_from_response
+from utils.data_gathering import gather_selected_data, safe_insert_report
+from utils.token_counter import count_tokens
+from utils.context_packer import ContextSection, compact_json, context_budget, pack_context
+
+logger = logging.getLogger(__name__)
+
+REPORT_CONTEXT_TOKEN_BUDGET = int(os.getenv("REPORT_CONTEXT_TOKEN_BUDGET", "60000"))
+
+# Sections trimmed (oldest entries first) when the data is over budget: supplementary first
+TRIM_ORDER = (
+    "llm_summaries", "symptom_tracking", "tracking_data", "photo_analyses",
+    "general_deep_dives", "deep_dives", "general_assessments", "quick_scans"
+)
+
+PostProcessor = Callable[[dict, "SpecialtyProfile"], Optional[dict]]
+
+
+@dataclass(frozen=True)
+class SpecialtyProfile:
+    """Configuration for one specialty report"""
+    key: str                    # route slug and log tag, e.g. "primary-care"
+    report_type: str            # stored report_type, e.g. "primary_care"
+    name: str                   # display name, e.g. "Primary care"
+    system_prompt: str
+    title: Optional[str] = None  # task line, defaults to "<name> report"
+    model: str = "openai/gpt-5"
+    max_tokens: int = 4000
+    temperature: float = 0.3
+    fail_on_invalid_json: bool = False  # otherwise a placeholder report is saved
+    fallback_fields: Tuple[str, ...] = ("chief_complaints", "key_findings", "action_items")
+    include_session_overview: bool = False
+    include_analysis_focus: bool = False  # time range and primary concern from the analysis config
+    specialty: Optional[str] = None  # stored specialty, defaults to report_type
+    response_specialty: Optional[str] = None
+    post_processors: Tuple[PostProcessor, ...] = ()
+    context_token_budget: int = REPORT_CONTEXT_TOKEN_BUDGET
+
+    @property
+    def tag(self) -> str:
+        return self.key.upper()
+
+    @property
+    def stored_specialty(self) -> str:
+        return self.specialty or self.report_type
+
+    @property
+    def task_title(self) -> str:
+        return self.title or f"{self.name.lower()} report"
+
+
+async def load_analysis(analysis_id: str):
+    """Load analysis from database"""
+    response = supabase.table("report_analyses")\
+        .select("*")\
+        .eq("id", analysis_id)\
+        .execute()
+
+    if not response.data:
+        raise ValueError("Analysis not found")
+
+    return response.data[0]
+
+
+async def load_or_create_analysis(analysis_id: str, request, specialty: str):
+    """Load analysis from database or create it if it doesn't exist"""
+    try:
+        return await load_analysis(analysis_id)
+    except ValueError:
+        # CREATE the analysis record as requested by frontend
+        logger.info(f"Creating new analysis record for {specialty} ID: {analysis_id}")
+
+        # Create appropriate report_config for specialist report
+        config = {
+            "report_type": "specialist_focused",
+            "specialty": specialty,
+            "selected_data_only": True,
+            "time_range": {
+                "start": (datetime.now(timezone.utc) - timedelta(days=30)).isoformat(),
+                "end": datetime.now(timezone.utc).isoformat()
+            }
+        }
+
+        # Create the analysis record
+        new_analysis = {
+            "id": analysis_id,  # Use the ID provided by frontend
+            "user_id": request.user_id,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "purpose": f"Specialist report for {specialty}",
+            "recommended_type": specialty,
+            "report_config": config,
+            "quick_scan_ids": request.quick_scan_ids or [],
+            "deep_dive_ids": request.deep_dive_ids or [],
+            "photo_session_ids": request.photo_session_ids or [],
+            "general_assessment_ids": request.general_assessment_ids or [],
+            "general_deep_dive_ids": request.general_deep_dive_ids or [],
+            "flash_assessment_ids": getattr(request, 'flash_assessment_ids', None) or [],
+            "confidence": 0.85
+        }
+
+        insert_response = supabase.table("report_analyses")\
+            .insert(new_analysis)\
+            .execute()
+
+        if not insert_response.data:
+            raise ValueError("Failed to create analysis record")
+
+        logger.info(f"Created analysis record for {specialty}: {analysis_id}")
+        return insert_response.data[0]
+
+
+def process_session_data(sessions: list, session_type: str = "deep_dive") -> str:
+    """Process session data and add status indicators for incomplete sessions"""
+    if not sessions:
+        return f"No {session_type} sessions found"
+
+    processed_sessions = []
+    status_indicators = {
+        "active": "🔄 Assessment in Progress",
+        "analysis_ready": "✅ Analysis Ready",
+        "completed": "✅ Completed",
+        "abandoned": "❌ Abandoned"
+    }
+
+    for session in sessions:
+        status = session.get("status", "unknown")
+        session_info = {
+            "id": session.get("id"),
+            "date": session.get("created_at", "")[:10] if session.get("created_at") else "Unknown",
+            "status": status_indicators.get(status, status),
+            "questions_answered": len(session.get("questions", [])) if session.get("questions") else 0
+        }
+
+        # Add appropriate data based on status
+        if status == "active" and not session.get("final_analysis"):
+            session_info["note"] = "Using partial data from ongoing assessment"
+            session_info["action_needed"] = "Continue Assessment"
+        elif status == "analysis_ready":
+            session_info["note"] = "Initial analysis complete, additional questions available"
+
+        # Include confidence if available
+        if session.get("final_confidence"):
+            session_info["confidence"] = f"{session.get('final_confidence')}%"
+        elif session.get("enhanced_confidence"):
+            session_info["confidence"] = f"{session.get('enhanced_confidence')}% (enhanced)"
+
+        processed_sessions.append(session_info)
+
+    return compact_json(processed_sessions)
+
+
+async def save_specialist_report(report_id: str, request, specialty: str, report_data: dict,
+                                 model_used: str = "google/gemini-2.5-flash", report_type: Optional[str] = None):
+    """Save specialist report to database"""
+    report_record = {
+        "id": report_id,
+        "user_id": request.user_id,
+        "analysis_id": request.analysis_id,
+        "report_type": report_type or specialty,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "report_data": report_data,
+        "executive_summary": report_data.get("executive_summary", {}).get("one_page_summary", ""),
+        "confidence_score": 85,
+        "model_used": model_used,
+        "specialty": specialty
+    }
+
+    await safe_insert_report(report_record)
+
+
+def serialize_report_data(data: Dict[str, Any], max_tokens: int) -> Tuple[str, int, Dict[str, int]]:
+    """
+    Serialize gathered data compactly within a token budget.
+
+    Sections are packed in reverse TRIM_ORDER after everything else, so over
+    budget the supplementary sections lose their oldest entries first. Returns
+    the text, its token count and how many entries were omitted per section
+    (also recorded in the payload as "_omitted" so the model knows the data is
+    partial).
+    """
+    trim_rank = {key: rank for rank, key in enumerate(TRIM_ORDER)}
+    keys = sorted(data, key=lambda key: -trim_rank.get(key, len(TRIM_ORDER)))
+    packed = pack_context([ContextSection(key, data[key]) for key in keys], max_tokens)
+    text = compact_json(packed.as_dict())
+    return text, count_tokens(text), packed.dropped
+
+
+def build_session_overview(all_data: Dict[str, Any]) -> str:
+    """Interaction counts and deep dive status summary for profiles that ask for it"""
+    return f"""PRIMARY INTERACTIONS (Main focus of this report):
+- Quick Scans: {len(all_data.get('quick_scans', []))}
+- Deep Dives: {len(all_data.get('deep_dives', []))}
+  Session Status Summary: {process_session_data(all_data.get('deep_dives', []), "Deep Dive")}
+- General Assessments: {len(all_data.get('general_assessments', []))}
+- General Deep Dives: {len(all_data.get('general_deep_dives', []))}
+  Session Status Summary: {process_session_data(all_data.get('general_deep_dives', []), "General Deep Dive")}
+- Photo Analyses: {len(all_data.get('photo_analyses', []))}
+
+SUPPLEMENTARY DATA (From same dates as primary interactions - for context only):
+- Symptom Tracking Entries: {len(all_data.get('symptom_tracking', []))}
+- Chat Summaries: {len(all_data.get('llm_summaries', []))}
+
+IMPORTANT NOTES:
+- Sessions marked as "🔄 Assessment in Progress" contain partial data that should be included in analysis
+- For incomplete sessions, use available questions/answers data even without final analysis
+- Include "Continue Assessment" as an action item for any in-progress sessions
+
+"""
+
+
+def build_analysis_focus(profile: SpecialtyProfile, analysis: Optional[Dict[str, Any]]) -> str:
+    """Time range and primary concern from the analysis' report_config"""
+    config = (analysis or {}).get("report_config") or {}
+    time_range = config.get("time_range") or {}
+    now = datetime.now(timezone.utc).isoformat()
+    return f"""Time Range: {time_range.get('start', now)[:10]} to {time_range.get('end', now)[:10]}
+Specialty Focus: {profile.stored_specialty}
+Primary Concern: {config.get('primary_focus', 'general health')}
+
+"""
+
+
+def build_report_context(profile: SpecialtyProfile, all_data: Dict[str, Any],
+                         analysis: Optional[Dict[str, Any]] = None) -> Tuple[str, int, Dict[str, int]]:
+    """User message for the LLM: the task line, optional focus and overview, and the patient data"""
+    budget = min(profile.context_token_budget, context_budget(profile.model, profile.max_tokens))
+    data_text, data_tokens, omitted = serialize_report_data(all_data, budget)
+    focus = build_analysis_focus(profile, analysis) if profile.include_analysis_focus else ""
+    overview = build_session_overview(all_data) if profile.include_session_overview else ""
+    context = f"""Generate a comprehensive {profile.task_title}.
+
+{focus}{overview}PATIENT DATA (Selected Interactions Only, compact JSON):
+{data_text}"""
+    return context, data_tokens, omitted
+
+
+def fallback_report(profile: SpecialtyProfile) -> dict:
+    """Placeholder saved when the model does not return usable JSON"""
+    summary = {"one_page_summary": f"{profile.name} report generation failed. Please retry."}
+    for field in profile.fallback_fields:
+        summary[field] = ["Regenerate report"] if field == "action_items" else []
+    return {"executive_summary": summary}
+
+
+def _field(report_data: dict, path: str) -> Any:
+    value: Any = report_data
+    for part in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def log_report_fields(*paths: str) -> PostProcessor:
+    """Post-processor that logs selected (dotted-path) fields of the generated report"""
+    def post_process(report_data: dict, profile: SpecialtyProfile):
+        for path in paths:
+            value = _field(report_data, path)
+            if value not in (None, [], {}):
+                logger.info(f"[{profile.tag}] {path}: {value}")
+    return post_process
+
+
+async def run_specialist_report(profile: SpecialtyProfile, request, timings: Optional[Dict[str, float]] = None) -> dict:
+    """
+    Generate, save and return one specialty report.
+
+    Per-stage latencies (ms) are logged and, when a dict is passed as timings,
+    written into it for benchmarking.
+    """
+    timings = timings if timings is not None else {}
+    started = time.perf_counter()
+
+    def mark(stage: str):
+        nonlocal started
+        now = time.perf_counter()
+        timings[stage] = round((now - started) * 1000, 1)
+        started = now
+
+    logger.info(f"[{profile.tag}] Request received: analysis_id={request.analysis_id}, user_id={request.user_id}, "
+                f"quick_scan_ids={request.quick_scan_ids}, deep_dive_ids={request.deep_dive_ids}, "
+                f"photo_session_ids={request.photo_session_ids}")
+
+    try:
+        analysis = await load_or_create_analysis(request.analysis_id, request, profile.stored_specialty)
+        mark("load_analysis")
+
+        # ALWAYS use selected data mode for specialist reports
+        # Convert None to empty arrays to ensure we don't load unwanted data
+        all_data = await gather_selected_data(
+            user_id=request.user_id or analysis["user_id"],
+            quick_scan_ids=request.quick_scan_ids or [],
+            deep_dive_ids=request.deep_dive_ids or [],
+            photo_session_ids=request.photo_session_ids or [],
+            general_assessment_ids=request.general_assessment_ids or [],
+            general_deep_dive_ids=request.general_deep_dive_ids or []
+        )
+        mark("gather")
+
+        context, context_tokens, omitted = build_report_context(profile, all_data, analysis)
+        if omitted:
+            logger.warning(f"[{profile.tag}] Context over {profile.context_token_budget} tokens, omitted: {omitted}")
+        mark("build_context")
+
+        llm_response = await call_llm(
+            messages=[
+                {"role": "system", "content": profile.system_prompt},
+                {"role": "user", "content": context}
+            ],
+            model=profile.model,
+            temperature=profile.temperature,
+            max_tokens=profile.max_tokens,
+            prompt_cache_key=f"specialist:{profile.key}"
+        )
+        mark("llm")
+
+        report_data = extract_json_from_response(llm_response.get("content", llm_response.get("raw_content", "")))
+        logger.info(f"[{profile.tag}] JSON extraction successful: {report_data is not None}")
+
+        if not report_data:
+            if profile.fail_on_invalid_json:
+                logger.error(f"[{profile.tag}] Failed to extract JSON from LLM response")
+                return {
+                    "status": "error",
+                    "error": "Failed to generate report content. AI did not return valid JSON.",
+                    "code": "AI_GENERATION_FAILED",
+                    "specialty": profile.key
+                }
+            report_data = fallback_report(profile)
+
+        for post_process in profile.post_processors:
+            report_data = post_process(report_data, profile) or report_data
+        mark("parse")
+
+        report_id = request.report_id or str(uuid.uuid4())
+        await save_specialist_report(report_id, request, profile.stored_specialty, report_data,
+                                     model_used=profile.model, report_type=profile.report_type)
+        mark("save")
+
+        logger.info(f"[{profile.tag}] Report saved with ID: {report_id} "
+                    f"(context {context_tokens} tokens, timings ms: {timings})")
+
+        return {
+            "report_id": report_id,
+            "report_type": profile.report_type,
+            "specialty": profile.response_specialty or profile.report_type,
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "report_data": report_data,
+            "status": "success"
+        }
+
+    except Exception as e:
+        logger.error(f"[{profile.tag}] Exception generating report: {e}")
+        return {"error": str(e), "status": "error", "code": "EXCEPTION", "specialty": profile.key}
@@ -0,0 +1,2430 @@
+"""Specialty report profiles: prompts and per-specialty settings for the report engine"""
+from typing import Optional
+
+from api.reports.specialist_engine import SpecialtyProfile, log_report_fields
+
+# Extended specialties run on the faster model with a smaller output budget
+EXTENDED_MODEL = "google/gemini-2.5-flash"
+
+# Fallback executive summaries for these specialties also carry urgency indicators
+WITH_URGENCY = ("chief_complaints", "key_findings", "urgency_indicators", "action_items")
+
+
+CARDIOLOGY_PROMPT = """Generate a detailed cardiology specialist report analyzing the patient's cardiac symptoms and history.
+
+IMPORTANT: Focus primarily on the PRIMARY INTERACTIONS (quick scans, deep dives) that were specifically selected for this report. 
+The supplementary data (symptom tracking, chat summaries) is provided for context but should not be the main focus.
+Use the medical profile for demographics, medications, allergies, and family history to inform your assessment.
+
+HANDLING INCOMPLETE SESSIONS:
+- For sessions marked as "active" or "🔄 Assessment in Progress": Extract and analyze available data from the questions array
+- Include partial insights even without final_analysis
+- Add "Continue Assessment" to action_items for any in-progress sessions
+- Do NOT penalize confidence for incomplete sessions - the deep dive asks questions until reaching sufficient confidence
+- Clearly indicate which data comes from completed vs in-progress assessments
+
+CLINICAL SCALE CALCULATIONS:
+1. Automatically calculate relevant standardized scales based on available data
+2. For each scale:
+   - Provide the calculated score
+   - Include confidence level (0.0-1.0) based on data completeness
+   - Explain your reasoning for each component
+   - List any missing data that would improve accuracy
+3. Use your medical knowledge to infer reasonable values when data is indirect
+4. Always err on the side of caution - when uncertain, indicate lower confidence
+
+For Cardiology, automatically calculate when relevant:
+- CHA₂DS₂-VASc (for any atrial fibrillation or stroke risk assessment)
+- HAS-BLED (if anticoagulation is being considered)
+- NYHA Functional Classification (for heart failure symptoms)
+- Canadian Cardiovascular Society (CCS) Angina Grade
+
+BEST PRACTICES FOR SCALE CALCULATION:
+- If age is mentioned as "elderly" infer 75+ for scoring
+- If "history of stroke" mentioned, count as positive even without dates
+- For functional capacity, use activity descriptions to estimate METs
+- Document all assumptions made in the reasoning field
+
+Return JSON format:
+{
+  "executive_summary": {
+    "one_page_summary": "Comprehensive clinical overview for cardiologist",
+    "key_findings": ["most clinically significant findings"],
+    "patterns_identified": ["temporal or trigger patterns"],
+    "chief_complaints": ["primary cardiac concerns"],
+    "action_items": ["immediate actions needed"],
+    "specialist_focus": "cardiology",
+    "target_audience": "cardiologist"
+  },
+  
+  "clinical_summary": {
+    "chief_complaint": "Primary cardiac concern in patient's words",
+    "hpi": "Detailed history of present illness with timeline",
+    "symptom_timeline": [
+      {
+        "date": "ISO date",
+        "symptoms": "specific symptoms reported",
+        "severity": 1-10,
+        "context": "what patient was doing",
+        "duration": "how long it lasted",
+        "resolution": "what helped"
+      }
+    ],
+    "pattern_analysis": {
+      "frequency": "how often symptoms occur",
+      "triggers": ["identified triggers"],
+      "alleviating_factors": ["what helps"],
+      "progression": "getting worse/better/stable over time"
+    }
+  },
+  
+  "cardiology_assessment": {
+    "angina_classification": {
+      "ccs_class": "I-IV based on functional limitation",
+      "typical_features": ["substernal", "exertional", "relieved by rest"],
+      "atypical_features": ["any unusual characteristics"]
+    },
+    "functional_capacity": {
+      "current": "estimated METs based on activities",
+      "baseline": "prior exercise tolerance if known",
+      "specific_limitations": ["cannot climb stairs", "stops after 1 block", "etc"]
+    },
+    "risk_stratification": {
+      "clinical_risk": "low/intermediate/high based on symptoms",
+      "missing_data_for_scores": ["BP", "cholesterol", "smoking status"],
+      "red_flags": ["concerning features requiring urgent evaluation"]
+    }
+  },
+  
+  "cardiologist_specific_findings": {
+    "chest_pain_characterization": {
+      "quality": "pressure/sharp/burning/etc",
+      "location": "specific location described",
+      "radiation": "if pain spreads anywhere",
+      "associated_symptoms": ["dyspnea", "diaphoresis", "nausea", "palpitations"]
+    },
+    "symptom_pattern_insights": {
+      "temporal_patterns": "morning vs evening, weekday vs weekend",
+      "activity_correlation": "symptoms with specific activities",
+      "stress_relationship": "emotional trigger patterns noted"
+    },
+    "functional_decline": {
+      "trajectory": "how function has changed over time",
+      "compensatory_behaviors": ["avoiding stairs", "stopping activities"]
+    }
+  },
+  
+  "diagnostic_priorities": {
+    "immediate": [
+      {
+        "test": "ECG",
+        "rationale": "baseline assessment, check for ischemic changes",
+        "timing": "same day"
+      }
+    ],
+    "short_term": [
+      {
+        "test": "Exercise stress test or pharmacologic if cannot exercise",
+        "rationale": "assess for inducible ischemia",
+        "timing": "within 1 week given symptom progression"
+      },
+      {
+        "test": "Lipid panel, A1C, TSH",
+        "rationale": "risk stratification and secondary causes",
+        "timing": "with next blood draw"
+      }
+    ],
+    "contingent": [
+      {
+        "test": "Coronary CTA or angiography",
+        "condition": "if stress test positive or high clinical suspicion",
+        "rationale": "define coronary anatomy"
+      }
+    ]
+  },
+  
+  "treatment_recommendations": {
+    "immediate_medical_therapy": [
+      {
+        "medication": "Aspirin 81mg daily",
+        "rationale": "antiplatelet for suspected CAD"
+      },
+      {
+        "medication": "Atorvastatin 40mg daily",
+        "rationale": "high-intensity statin for ASCVD risk reduction"
+      },
+      {
+        "medication": "Metoprolol 25mg BID",
+        "rationale": "rate control and anti-anginal effect"
+      }
+    ],
+    "symptom_management": {
+      "prn_medications": ["Sublingual nitroglycerin for acute episodes"],
+      "activity_modification": "avoid known triggers until evaluated",
+      "monitoring": "keep symptom diary"
+    },
+    "lifestyle_interventions": {
+      "diet": "Mediterranean or DASH diet for cardiovascular health",
+      "exercise": "cardiac rehab referral after evaluation",
+      "risk_factor_modification": ["smoking cessation if applicable", "weight management", "stress reduction"]
+    }
+  },
+  
+  "care_coordination": {
+    "referral_urgency": "routine/urgent/emergent",
+    "pre_visit_preparation": [
+      "bring list of all medications",
+      "document symptom episodes",
+      "gather family cardiac history"
+    ],
+    "follow_up_plan": {
+      "cardiology": "within 2 weeks",
+      "primary_care": "after cardiac workup for risk factor management",
+      "emergency_plan": "call 911 for rest pain or prolonged symptoms"
+    }
+  },
+  
+  "data_quality_notes": {
+    "completeness": "good symptom description, missing risk factor data",
+    "consistency": "symptoms consistent across reports",
+    "gaps": ["family history needed", "BP readings helpful", "prior ECGs if available"]
+  },
+  
+  "clinical_scales": {
+    "CHA2DS2_VASc": {
+      "calculated": "score based on available data",
+      "confidence": 0.0-1.0,
+      "confidence_level": "high/medium/low",
+      "reasoning": "Detailed explanation of how score was calculated",
+      "breakdown": {
+        "age": 0-2,
+        "sex": 0-1,
+        "chf": 0-1,
+        "hypertension": 0-1,
+        "stroke": 0-2,
+        "vascular": 0-1,
+        "diabetes": 0-1
+      },
+      "missing_data": ["specific data points that would improve accuracy"],
+      "interpretation": "Risk level and anticoagulation recommendation",
+      "annual_stroke_risk": "percentage based on score"
+    },
+    "NYHA_Classification": {
+      "class": "I-IV",
+      "confidence": 0.0-1.0,
+      "reasoning": "Based on functional limitations described",
+      "functional_description": "What patient can/cannot do"
+    },
+    "CCS_Angina_Grade": {
+      "grade": "I-IV",
+      "confidence": 0.0-1.0,
+      "reasoning": "Based on angina patterns and limitations",
+      "typical_activities_affected": ["specific examples"]
+    }
+  }
+}"""
+
+
+NEUROLOGY_PROMPT = """Generate a detailed neurology specialist report focusing on neurological symptoms and patterns.
+
+CLINICAL SCALE CALCULATIONS:
+1. Automatically calculate relevant standardized scales based on available data
+2. For each scale:
+   - Provide the calculated score
+   - Include confidence level (0.0-1.0) based on data completeness
+   - Explain your reasoning for each component
+   - List any missing data that would improve accuracy
+3. Use your medical knowledge to infer reasonable values when data is indirect
+
+For Neurology, automatically calculate when relevant:
+- MIDAS (Migraine Disability Assessment) - estimate days affected from symptom reports
+- HIT-6 (Headache Impact Test) - infer from functional limitations
+- ICHD-3 criteria matching - pattern match symptoms to headache types
+- PHQ-9 (if mood symptoms present with neurological complaints)
+
+BEST PRACTICES FOR SCALE CALCULATION:
+- For MIDAS: Count reported days with limitations in work/household/social activities
+- For headache classification: Match patterns to ICHD-3 diagnostic criteria
+- If cognitive complaints present, estimate MoCA/MMSE based on described deficits
+- Document all inferences and assumptions
+
+Return JSON format:
+{
+  "executive_summary": {
+    "one_page_summary": "Comprehensive clinical overview for neurologist",
+    "key_findings": ["most clinically significant neurological findings"],
+    "patterns_identified": ["temporal patterns, triggers, progression"],
+    "chief_complaints": ["primary neurological concerns"],
+    "action_items": ["immediate evaluations or treatments needed"],
+    "specialist_focus": "neurology",
+    "target_audience": "neurologist"
+  },
+  
+  "clinical_summary": {
+    "chief_complaint": "Primary neurological concern",
+    "hpi": "Detailed neurological history with timeline",
+    "symptom_timeline": [
+      {
+        "date": "ISO date",
+        "symptoms": "specific neurological symptoms",
+        "location": "anatomical location",
+        "severity": 1-10,
+        "duration": "episode duration",
+        "associated_symptoms": ["accompanying symptoms"]
+      }
+    ]
+  },
+  
+  "neurology_assessment": {
+    "headache_characterization": {
+      "classification": "Probable diagnosis per ICHD-3 criteria",
+      "frequency": "episodes per month",
+      "pattern": {
+        "typical_onset": "time of day patterns",
+        "duration": "typical episode length",
+        "laterality": "unilateral/bilateral percentages"
+      }
+    },
+    "red_flag_screen": {
+      "thunderclap_onset": "present/absent",
+      "progressive_pattern": "worsening/stable",
+      "focal_deficits": "any reported",
+      "systemic_symptoms": "fever/weight loss",
+      "papilledema_risk": "symptoms suggesting increased ICP"
+    }
+  },
+  
+  "neurologist_specific_findings": {
+    "headache_phenomenology": {
+      "pain_quality": "throbbing/pressure/sharp/burning",
+      "location_specifics": "precise anatomical description",
+      "radiation_pattern": "if pain spreads",
+      "triggers": {
+        "identified": ["specific triggers from history"],
+        "suspected": ["possible triggers to test"],
+        "protective": ["what prevents episodes"]
+      }
+    },
+    "associated_phenomena": {
+      "autonomic": ["lacrimation", "rhinorrhea", "ptosis"],
+      "sensory": ["photophobia", "phonophobia", "osmophobia"],
+      "aura": "visual/sensory/speech symptoms if present"
+    },
+    "medication_patterns": {
+      "current_use": {
+        "acute": "medications and frequency",
+        "preventive": "if any tried",
+        "overuse_risk": "days per month of analgesic use"
+      },
+      "treatment_response": "what has helped/failed"
+    }
+  },
+  
+  "diagnostic_plan": {
+    "imaging": {
+      "mri_brain": {
+        "indicated": "yes/no",
+        "rationale": "red flags or atypical features",
+        "protocol": "with/without contrast",
+        "urgency": "routine/urgent"
+      }
+    },
+    "laboratory": [
+      {
+        "test": "ESR, CRP",
+        "rationale": "if giant cell arteritis suspected"
+      },
+      {
+        "test": "Thyroid function",
+        "rationale": "can trigger headaches"
+      }
+    ],
+    "specialized": {
+      "sleep_study": "if sleep-related headaches",
+      "lumbar_puncture": "only if specific indications"
+    }
+  },
+  
+  "treatment_recommendations": {
+    "acute_management": {
+      "first_line": [
+        {
+          "medication": "Sumatriptan 100mg",
+          "instructions": "at onset, may repeat in 2 hours",
+          "contraindications": "vascular disease"
+        }
+      ],
+      "rescue": "if first-line fails",
+      "limits": "maximum days per month to avoid MOH"
+    },
+    "preventive_strategy": {
+      "lifestyle": {
+        "essential": ["sleep hygiene", "meal regularity", "hydration"],
+        "triggers_to_avoid": "based on diary"
+      },
+      "medications": [
+        {
+          "drug": "Topiramate",
+          "starting_dose": "25mg daily",
+          "target": "50-100mg BID",
+          "side_effects": "cognitive, weight loss"
+        },
+        {
+          "drug": "Propranolol",
+          "starting_dose": "20mg BID",
+          "target": "80-160mg daily",
+          "contraindications": "asthma, bradycardia"
+        }
+      ],
+      "expected_response": "50% reduction in 3 months"
+    },
+    "non_pharmacologic": {
+      "recommended": ["CBT for chronic pain", "biofeedback", "acupuncture"],
+      "physical_therapy": "if cervicogenic component"
+    }
+  },
+  
+  "follow_up_plan": {
+    "neurology_visit": "4-6 weeks to assess treatment",
+    "headache_diary": {
+      "track": ["frequency", "triggers", "medication use"],
+      "apps_recommended": ["specific tracking apps"]
+    },
+    "warning_signs": [
+      "sudden severe headache",
+      "neurological deficits",
+      "fever with headache"
+    ]
+  },
+  
+  "data_insights": {
+    "pattern_recognition": "episodic migraine progressing to chronic",
+    "comorbidities": ["anxiety noted in reports", "sleep issues"],
+    "prognosis": "good with appropriate prophylaxis"
+  },
+  
+  "clinical_scales": {
+    "MIDAS": {
+      "calculated": "total score based on disability days",
+      "confidence": 0.0-1.0,
+      "confidence_level": "high/medium/low",
+      "grade": "I-IV",
+      "interpretation": "disability level and treatment implications",
+      "reasoning": "How days were calculated from symptom reports",
+      "breakdown": {
+        "missed_work_school": "estimated days",
+        "reduced_productivity_work": "estimated days",
+        "missed_household": "estimated days",
+        "reduced_productivity_household": "estimated days",
+        "missed_social": "estimated days"
+      },
+      "missing_data": ["specific data that would improve accuracy"],
+      "treatment_recommendation": "based on severity grade"
+    },
+    "ICHD3_Classification": {
+      "diagnosis": "Most likely headache type per ICHD-3",
+      "confidence": 0.0-1.0,
+      "criteria_met": ["specific criteria fulfilled"],
+      "criteria_missing": ["criteria that couldn't be assessed"],
+      "differential_diagnoses": ["other possible headache types"],
+      "reasoning": "Why this classification was chosen"
+    },
+    "HIT6_Estimate": {
+      "estimated_score": "score based on functional impact",
+      "confidence": 0.0-1.0,
+      "severity_category": "little/moderate/substantial/severe impact",
+      "reasoning": "How impact was assessed from reports"
+    },
+    "Cognitive_Screen": {
+      "assessment": "if cognitive complaints present",
+      "estimated_MoCA": "score range if applicable",
+      "confidence": 0.0-1.0,
+      "domains_affected": ["memory", "attention", "language", "etc"],
+      "reasoning": "Based on reported cognitive symptoms"
+    }
+  }
+}"""
+
+
+PSYCHIATRY_PROMPT = """Generate a detailed psychiatry specialist report analyzing mental health symptoms and psychosocial factors.
+
+CLINICAL SCALE CALCULATIONS:
+1. Automatically calculate relevant standardized scales based on available data
+2. For each scale:
+   - Provide the calculated score
+   - Include confidence level (0.0-1.0) based on data completeness
+   - Map reported symptoms to questionnaire items
+   - Explain your reasoning for each item score
+   - List any missing data that would improve accuracy
+
+For Psychiatry, automatically calculate when relevant:
+- PHQ-9 (Patient Health Questionnaire) - map symptoms to 9 items
+- GAD-7 (Generalized Anxiety Disorder) - map anxiety symptoms to 7 items
+- Columbia Suicide Severity Rating Scale - if any SI mentioned
+- MADRS (Montgomery-Åsberg Depression Rating Scale) - for detailed depression assessment
+- Mood Disorder Questionnaire (MDQ) - if bipolar symptoms suspected
+
+BEST PRACTICES FOR SCALE CALCULATION:
+- Map "feeling down" to PHQ-9 item 2, "little interest" to item 1
+- For GAD-7, look for worry, restlessness, irritability patterns
+- Always assess suicide risk carefully - err on side of caution
+- Consider frequency: "nearly every day" = 3, "more than half the days" = 2, "several days" = 1
+- Document how each item score was derived
+
+Return JSON format:
+{
+  "executive_summary": {
+    "one_page_summary": "Comprehensive clinical overview for psychiatrist",
+    "key_findings": ["most clinically significant psychiatric findings"],
+    "patterns_identified": ["mood patterns, triggers, cycles"],
+    "chief_complaints": ["primary mental health concerns"],
+    "action_items": ["immediate safety or treatment needs"],
+    "specialist_focus": "psychiatry",
+    "target_audience": "psychiatrist"
+  },
+  
+  "clinical_summary": {
+    "chief_complaint": "Primary mental health concern",
+    "hpi": "Psychiatric history with precipitants and timeline",
+    "symptom_timeline": [
+      {
+        "date": "ISO date",
+        "symptoms": "mood/anxiety/psychotic symptoms",
+        "severity": "mild/moderate/severe",
+        "triggers": "identified stressors",
+        "impact": "functional impairment"
+      }
+    ]
+  },
+  
+  "psychiatry_assessment": {
+    "diagnostic_impression": {
+      "primary": "Most likely DSM-5 diagnosis",
+      "differential": ["other considerations"],
+      "specifiers": ["with anxious distress", "severity", "etc"],
+      "timeline": "acute/chronic, first episode/recurrent"
+    },
+    "risk_assessment": {
+      "suicide_risk": {
+        "current_ideation": "none/passive/active",
+        "plan_intent": "present/absent",
+        "risk_level": "low/moderate/high",
+        "protective_factors": ["identified protections"]
+      },
+      "violence_risk": "assessment if indicated",
+      "self_harm": "non-suicidal self-injury patterns"
+    }
+  },
+  
+  "psychiatrist_specific_findings": {
+    "mental_status_elements": {
+      "mood_symptoms": ["depression", "anhedonia", "hopelessness"],
+      "anxiety_symptoms": ["worry", "panic", "avoidance"],
+      "cognitive_symptoms": ["concentration", "memory", "decision-making"],
+      "neurovegetative": ["sleep", "appetite", "energy", "psychomotor"]
+    },
+    "functional_analysis": {
+      "occupational": "impact on work/school",
+      "social": "relationship effects",
+      "adls": "self-care status",
+      "behavioral_activation": "activity level changes"
+    },
+    "psychosocial_factors": {
+      "stressors": ["identified triggers"],
+      "supports": ["family", "friends", "community"],
+      "coping_mechanisms": ["adaptive", "maladaptive"]
+    }
+  },
+  
+  "treatment_planning": {
+    "psychopharmacology": {
+      "recommended_medication": {
+        "class": "SSRI/SNRI/other",
+        "specific_drug": "medication name",
+        "starting_dose": "initial dose",
+        "titration": "increase schedule",
+        "monitoring": "side effects to watch"
+      },
+      "past_medications": {
+        "tried": ["what has been tried"],
+        "response": "effectiveness and tolerability"
+      },
+      "augmentation_options": "if partial response"
+    },
+    "psychotherapy": {
+      "modality": "CBT/DBT/IPT/supportive",
+      "frequency": "weekly/biweekly",
+      "focus": ["specific targets"],
+      "duration": "expected treatment length"
+    },
+    "behavioral_interventions": {
+      "immediate": ["sleep hygiene", "exercise", "routine"],
+      "behavioral_activation": ["pleasant activities", "social contact"],
+      "coping_skills": ["specific techniques"]
+    }
+  },
+  
+  "safety_planning": {
+    "warning_signs": ["personal triggers"],
+    "coping_strategies": ["internal strategies"],
+    "support_contacts": ["who to reach out to"],
+    "professional_contacts": ["therapist", "crisis line"],
+    "environment_safety": ["means restriction if needed"],
+    "follow_up": "next appointment timing"
+  },
+  
+  "coordination_of_care": {
+    "primary_care": "communicate about medications",
+    "therapy_referral": {
+      "type": "specific therapy modality",
+      "urgency": "routine/expedited",
+      "expected_wait": "typical timeframe"
+    },
+    "community_resources": ["support groups", "peer support"],
+    "monitoring_plan": {
+      "frequency": "follow-up schedule",
+      "symptom_tracking": "PHQ-9 q2weeks",
+      "medication_monitoring": "labs if needed"
+    }
+  },
+  
+  "prognosis_factors": {
+    "positive_indicators": ["help-seeking", "support system", "insight"],
+    "challenges": ["chronicity", "comorbidities", "stressors"],
+    "expected_trajectory": "with appropriate treatment"
+  },
+  
+  "clinical_scales": {
+    "PHQ9": {
+      "calculated": "total score 0-27",
+      "confidence": 0.0-1.0,
+      "confidence_level": "high/medium/low",
+      "severity": "minimal/mild/moderate/moderately severe/severe",
+      "interpretation": "Depression severity and treatment implications",
+      "reasoning": "How each item was scored based on symptoms",
+      "item_scores": {
+        "little_interest": 0-3,
+        "feeling_down": 0-3,
+        "sleep_problems": 0-3,
+        "tired_no_energy": 0-3,
+        "appetite_problems": 0-3,
+        "feeling_bad_about_self": 0-3,
+        "concentration_problems": 0-3,
+        "moving_slowly_or_restless": 0-3,
+        "suicidal_thoughts": 0-3
+      },
+      "suicide_item_score": 0-3,
+      "suicide_risk": "none/low/moderate/high",
+      "missing_data": ["symptoms not explicitly assessed"],
+      "treatment_recommendation": "based on severity"
+    },
+    "GAD7": {
+      "calculated": "total score 0-21",
+      "confidence": 0.0-1.0,
+      "severity": "minimal/mild/moderate/severe",
+      "interpretation": "Anxiety severity",
+      "reasoning": "How anxiety symptoms mapped to scale items",
+      "item_mapping": {
+        "feeling_nervous": 0-3,
+        "cant_stop_worrying": 0-3,
+        "worrying_too_much": 0-3,
+        "trouble_relaxing": 0-3,
+        "restless": 0-3,
+        "easily_annoyed": 0-3,
+        "feeling_afraid": 0-3
+      },
+      "treatment_recommendation": "based on severity"
+    },
+    "Columbia_SSR": {
+      "calculated": "if SI present",
+      "confidence": 0.0-1.0,
+      "ideation_type": "none/passive/active",
+      "plan": "present/absent",
+      "intent": "present/absent",
+      "risk_level": "low/moderate/high/imminent",
+      "protective_factors": ["identified protective elements"],
+      "reasoning": "How risk was assessed"
+    },
+    "MADRS": {
+      "estimated_score": "if sufficient depression data",
+      "confidence": 0.0-1.0,
+      "severity_category": "based on score ranges",
+      "key_items_assessed": ["apparent sadness", "reported sadness", "inner tension", "etc"],
+      "reasoning": "Items that could be scored from available data"
+    }
+  }
+}"""
+
+
+DERMATOLOGY_PROMPT = """Generate a detailed dermatology specialist report analyzing skin conditions with photo documentation insights.
+
+CLINICAL SCALE CALCULATIONS:
+1. Automatically calculate relevant standardized scales based on available data
+2. For each scale:
+   - Provide the calculated score
+   - Include confidence level (0.0-1.0) based on data completeness
+   - Explain your reasoning
+   - List any missing data that would improve accuracy
+
+For Dermatology, automatically calculate when relevant:
+- PASI (Psoriasis Area and Severity Index) - for psoriasis
+- DLQI (Dermatology Life Quality Index) - quality of life impact
+- SCORAD (for atopic dermatitis)
+- IGA (Investigator's Global Assessment)
+
+BEST PRACTICES:
+- Use photo analysis to estimate body surface area affected
+- Assess erythema, induration, and desquamation for PASI
+- Map patient-reported impacts to DLQI questions
+- Document visual findings that support scoring
+
+Return JSON format:
+{
+  "executive_summary": {
+    "one_page_summary": "Comprehensive clinical overview for dermatologist",
+    "key_findings": ["most significant dermatological findings"],
+    "patterns_identified": ["distribution patterns, evolution"],
+    "chief_complaints": ["primary skin concerns"],
+    "action_items": ["immediate evaluations or treatments"],
+    "specialist_focus": "dermatology",
+    "target_audience": "dermatologist"
+  },
+  "clinical_summary": {
+    "chief_complaint": "Primary skin concern",
+    "hpi": "Detailed history of skin condition",
+    "lesion_timeline": [
+      {
+        "date": "ISO date",
+        "description": "appearance and changes",
+        "location": "anatomical sites",
+        "symptoms": "itching/pain/burning",
+        "triggers": "identified factors"
+      }
+    ]
+  },
+  
+  "dermatology_assessment": {
+    "lesion_characterization": {
+      "morphology": "papules/plaques/vesicles/etc",
+      "configuration": "scattered/grouped/linear",
+      "distribution": "body areas affected",
+      "color": "erythematous/hyperpigmented/etc",
+      "surface_changes": "scale/crust/erosion",
+      "size": "measurements from photos"
+    },
+    "clinical_diagnosis": {
+      "primary_impression": "most likely diagnosis",
+      "differential": ["other possibilities"],
+      "confidence": "high/moderate/low",
+      "supporting_features": ["classic signs present"]
+    },
+    "severity_assessment": {
+      "bsa_affected": "percent of body surface",
+      "pasi_estimate": "if psoriasis suspected",
+      "impact_score": "quality of life impact 1-10"
+    }
+  },
+  
+  "dermatologist_specific_findings": {
+    "photo_analysis": {
+      "quality": "good/fair/poor lighting and angles",
+      "evolution_documented": "changes over time visible",
+      "key_features": ["specific findings in photos"],
+      "comparison": "improvement/worsening/stable"
+    },
+    "clinical_patterns": {
+      "koebner_phenomenon": "present/absent",
+      "distribution_pattern": "extensor/flexural/sun-exposed",
+      "symmetry": "bilateral/unilateral",
+      "dermatomal": "follows nerve distribution"
+    },
+    "associated_findings": {
+      "nail_changes": "pitting/onycholysis/etc",
+      "scalp_involvement": "if present",
+      "mucosal_involvement": "oral/genital",
+      "joint_symptoms": "if psoriatic arthritis risk"
+    }
+  },
+  
+  "diagnostic_plan": {
+    "biopsy_recommendation": {
+      "indicated": "yes/no",
+      "rationale": "uncertain diagnosis/rule out malignancy",
+      "type": "punch/shave/excisional",
+      "sites": "where to biopsy"
+    },
+    "laboratory": [
+      {
+        "test": "KOH prep",
+        "indication": "if fungal suspected"
+      },
+      {
+        "test": "Patch testing",
+        "indication": "if contact dermatitis"
+      }
+    ],
+    "imaging": "dermoscopy if available"
+  },
+  
+  "treatment_recommendations": {
+    "topical_therapy": {
+      "first_line": [
+        {
+          "medication": "Clobetasol 0.05% ointment",
+          "instructions": "BID to affected areas x 2 weeks",
+          "then": "weekend pulse therapy"
+        }
+      ],
+      "adjuncts": [
+        {
+          "medication": "Calcipotriene",
+          "role": "maintenance therapy",
+          "combination": "with topical steroid"
+        }
+      ],
+      "vehicles": "ointment for dry areas, cream for moist"
+    },
+    "systemic_considerations": {
+      "threshold": "BSA >10% or QOL impact",
+      "options": [
+        {
+          "medication": "Methotrexate",
+          "dose": "15-25mg weekly",
+          "monitoring": "LFTs, CBC"
+        }
+      ],
+      "phototherapy": "NB-UVB if widespread"
+    },
+    "skin_care": {
+      "moisturizers": "thick creams/ointments daily",
+      "bathing": "lukewarm water, gentle cleansers",
+      "triggers_to_avoid": ["harsh soaps", "hot water"]
+    }
+  },
+  
+  "patient_education": {
+    "disease_course": "chronic with flares and remissions",
+    "trigger_avoidance": ["stress", "skin trauma", "infections"],
+    "treatment_expectations": "improvement in 4-6 weeks",
+    "when_to_follow_up": [
+      "no improvement in 4 weeks",
+      "side effects from treatment",
+      "new lesions appearing"
+    ]
+  },
+  
+  "follow_up_plan": {
+    "timing": "4-6 weeks for treatment response",
+    "photo_documentation": "take photos before starting treatment",
+    "treatment_diary": "track what helps/worsens"
+  },
+  
+  "clinical_scales": {
+    "PASI": {
+      "calculated": "score if psoriasis suspected",
+      "confidence": 0.0-1.0,
+      "confidence_level": "high/medium/low",
+      "severity_category": "mild/moderate/severe",
+      "reasoning": "How score was estimated from photos and descriptions",
+      "body_regions": {
+        "head": {"area": 0-6, "erythema": 0-4, "induration": 0-4, "desquamation": 0-4},
+        "trunk": {"area": 0-6, "erythema": 0-4, "induration": 0-4, "desquamation": 0-4},
+        "upper_extremities": {"area": 0-6, "erythema": 0-4, "induration": 0-4, "desquamation": 0-4},
+        "lower_extremities": {"area": 0-6, "erythema": 0-4, "induration": 0-4, "desquamation": 0-4}
+      },
+      "missing_data": ["areas not photographed", "scale/crust detail needed"]
+    },
+    "DLQI": {
+      "estimated_score": "0-30 based on QOL impact",
+      "confidence": 0.0-1.0,
+      "impact_level": "no effect/small/moderate/very large/extremely large",
+      "reasoning": "How life impacts were assessed",
+      "domains_affected": ["symptoms", "daily activities", "leisure", "work/school", "relationships", "treatment"]
+    },
+    "IGA": {
+      "score": "0-4 (clear to severe)",
+      "confidence": 0.0-1.0,
+      "reasoning": "Based on overall lesion appearance",
+      "change_from_baseline": "if follow-up photos available"
+    }
+  }
+}"""
+
+
+GASTROENTEROLOGY_PROMPT = """Generate a detailed gastroenterology specialist report analyzing GI symptoms and patterns.
+
+CLINICAL SCALE CALCULATIONS:
+1. Automatically calculate relevant standardized scales based on available data
+2. For each scale, provide score, confidence, reasoning, and missing data
+
+For Gastroenterology, automatically calculate when relevant:
+- Rome IV Criteria (for IBS, functional dyspepsia)
+- Bristol Stool Scale patterns
+- IBS-SSS (IBS Symptom Severity Score)
+- Mayo Score (for UC) or CDAI (for Crohn's) if IBD suspected
+
+BEST PRACTICES:
+- Map bowel patterns to Bristol Stool Scale (1-7)
+- Assess Rome IV criteria for functional disorders
+- Track symptom frequency and severity for IBS-SSS
+- Note alarm features that override functional diagnosis
+
+Return JSON format:
+{
+  "executive_summary": {
+    "one_page_summary": "Comprehensive clinical overview for gastroenterologist",
+    "key_findings": ["most significant GI findings"],
+    "patterns_identified": ["dietary triggers, bowel patterns"],
+    "chief_complaints": ["primary GI concerns"],
+    "action_items": ["immediate evaluations needed"],
+    "specialist_focus": "gastroenterology",
+    "target_audience": "gastroenterologist"
+  },
+  "clinical_summary": {
+    "chief_complaint": "Primary GI concern",
+    "hpi": "Detailed GI history with timeline",
+    "symptom_timeline": [
+      {
+        "date": "ISO date",
+        "symptoms": "specific GI symptoms",
+        "severity": 1-10,
+        "timing": "relation to meals",
+        "bowel_pattern": "changes noted"
+      }
+    ]
+  },
+  
+  "gastroenterology_assessment": {
+    "symptom_characterization": {
+      "abdominal_pain": {
+        "location": "epigastric/periumbilical/RLQ/etc",
+        "quality": "cramping/burning/sharp",
+        "timing": "before/during/after meals",
+        "relief": "with BM/antacids/nothing"
+      },
+      "bowel_patterns": {
+        "frequency": "times per day/week",
+        "consistency": "Bristol stool scale",
+        "blood": "present/absent",
+        "mucus": "present/absent"
+      },
+      "associated_symptoms": {
+        "nausea": "frequency and triggers",
+        "bloating": "timing and severity",
+        "weight_change": "amount and timeframe"
+      }
+    },
+    "alarm_features": {
+      "present": ["list any red flags"],
+      "absent": ["important negatives"],
+      "risk_assessment": "low/moderate/high for serious pathology"
+    }
+  },
+  
+  "gi_specific_findings": {
+    "dietary_analysis": {
+      "trigger_foods": ["identified from history"],
+      "safe_foods": ["well tolerated"],
+      "meal_patterns": "regular/irregular",
+      "fodmap_sensitivity": "suspected based on symptoms"
+    },
+    "functional_assessment": {
+      "rome_criteria": "meets criteria for IBS/functional dyspepsia",
+      "symptom_pattern": "post-infectious/stress-related/dietary",
+      "quality_of_life_impact": "work/social/sleep"
+    },
+    "medication_history": {
+      "current": ["what patient takes now"],
+      "previous_trials": ["what helped/failed"],
+      "otc_use": "antacids/laxatives frequency"
+    }
+  },
+  
+  "diagnostic_recommendations": {
+    "laboratory": [
+      {
+        "test": "CBC, CMP, TSH",
+        "rationale": "baseline and rule out metabolic causes"
+      },
+      {
+        "test": "Celiac panel",
+        "rationale": "if chronic diarrhea or bloating"
+      },
+      {
+        "test": "H. pylori testing",
+        "rationale": "if dyspepsia symptoms"
+      }
+    ],
+    "endoscopy": {
+      "colonoscopy": {
+        "indicated": "yes/no based on symptoms and age",
+        "urgency": "routine/expedited",
+        "prep_considerations": "standard/modified"
+      },
+      "upper_endoscopy": {
+        "indicated": "if GERD/dyspepsia/alarm symptoms",
+        "biopsies": "H. pylori, celiac if indicated"
+      }
+    },
+    "imaging": {
+      "ct_abdomen": "only if suspicion of structural issue",
+      "other": "HIDA scan if biliary symptoms"
+    }
+  },
+  
+  "treatment_plan": {
+    "dietary_modifications": {
+      "immediate": ["food diary", "regular meals", "avoid triggers"],
+      "trial_diets": ["low FODMAP", "gluten-free if indicated"],
+      "nutritionist_referral": "if complex dietary needs"
+    },
+    "medications": {
+      "acid_suppression": {
+        "ppi": "omeprazole 20mg daily x 8 weeks",
+        "timing": "30 min before breakfast"
+      },
+      "motility": {
+        "if_constipation": "PEG 3350 daily",
+        "if_diarrhea": "loperamide PRN"
+      },
+      "antispasmodics": "dicyclomine for cramping"
+    },
+    "lifestyle": {
+      "stress_management": "noted correlation with symptoms",
+      "exercise": "regular activity helps motility",
+      "sleep": "poor sleep worsens GI symptoms"
+    }
+  },
+  
+  "follow_up_plan": {
+    "timing": "4-6 weeks to assess response",
+    "symptom_diary": "track triggers and patterns",
+    "red_flags": [
+      "persistent vomiting",
+      "GI bleeding",
+      "severe pain",
+      "unintended weight loss"
+    ]
+  },
+  
+  "clinical_scales": {
+    "Rome_IV_Assessment": {
+      "diagnosis": "IBS/functional dyspepsia/none",
+      "confidence": 0.0-1.0,
+      "criteria_met": ["specific Rome IV criteria fulfilled"],
+      "criteria_missing": ["criteria that need assessment"],
+      "subtype": "IBS-C/IBS-D/IBS-M if applicable",
+      "reasoning": "How diagnosis was determined"
+    },
+    "Bristol_Stool_Pattern": {
+      "predominant_type": "1-7",
+      "range": "types seen",
+      "consistency": "how consistent the pattern is",
+      "confidence": 0.0-1.0,
+      "reasoning": "Based on stool descriptions"
+    },
+    "IBS_SSS": {
+      "estimated_score": "0-500",
+      "severity": "mild/moderate/severe",
+      "confidence": 0.0-1.0,
+      "components": {
+        "pain_severity": "0-100",
+        "pain_frequency": "0-100",
+        "distension_severity": "0-100",
+        "bowel_dissatisfaction": "0-100",
+        "life_interference": "0-100"
+      },
+      "reasoning": "How scores were estimated"
+    },
+    "GERD_Assessment": {
+      "reflux_frequency": "episodes per week",
+      "impact_score": "if GERD symptoms present",
+      "confidence": 0.0-1.0,
+      "alarm_features": ["dysphagia", "weight loss", "anemia"]
+    }
+  }
+}"""
+
+
+ENDOCRINOLOGY_PROMPT = """Generate a detailed endocrinology specialist report analyzing metabolic and hormonal symptoms.
+
+CLINICAL SCALE CALCULATIONS:
+1. Automatically calculate relevant standardized scales based on available data
+2. For each scale, provide score, confidence, reasoning, and missing data
+
+For Endocrinology, automatically calculate when relevant:
+- FINDRISC (Finnish Diabetes Risk Score)
+- Thyroid symptom scores
+- ADAM questionnaire (for male hypogonadism)
+- Cushingoid features assessment
+
+BEST PRACTICES:
+- Assess diabetes risk from weight, family history, activity
+- Map symptoms to thyroid dysfunction (hyper/hypo)
+- Consider hormonal patterns in symptom timing
+- Note metabolic syndrome components
+
+Return JSON format:
+{
+  "executive_summary": {
+    "one_page_summary": "Comprehensive clinical overview for endocrinologist",
+    "key_findings": ["significant metabolic/hormonal findings"],
+    "patterns_identified": ["hormonal cycles, metabolic patterns"],
+    "chief_complaints": ["primary endocrine concerns"],
+    "action_items": ["immediate hormonal evaluations"],
+    "specialist_focus": "endocrinology",
+    "target_audience": "endocrinologist"
+  },
+  
+  "clinical_summary": {
+    "chief_complaint": "Primary endocrine concern",
+    "hpi": "Detailed metabolic/hormonal history",
+    "symptom_timeline": [
+      {
+        "date": "ISO date",
+        "symptoms": "specific endocrine symptoms",
+        "severity": 1-10,
+        "timing": "relation to meals/time of day",
+        "associated_factors": "stress, diet, sleep"
+      }
+    ]
+  },
+  
+  "endocrinology_assessment": {
+    "suspected_disorders": {
+      "primary": "most likely endocrine disorder",
+      "differential": ["other possibilities"],
+      "confidence": "high/medium/low"
+    },
+    "metabolic_status": {
+      "weight_trajectory": "gaining/stable/losing",
+      "glucose_patterns": "if diabetic symptoms",
+      "lipid_concerns": "based on history"
+    },
+    "hormonal_patterns": {
+      "thyroid_symptoms": "hyper/hypo/mixed/none",
+      "adrenal_symptoms": "if present",
+      "reproductive_hormones": "if relevant"
+    }
+  },
+  
+  "diagnostic_priorities": {
+    "immediate": [
+      {
+        "test": "specific hormone panels",
+        "rationale": "clinical reasoning",
+        "timing": "urgency level"
+      }
+    ],
+    "comprehensive_workup": [
+      "metabolic panel",
+      "hormonal assessments",
+      "imaging if indicated"
+    ]
+  },
+  
+  "treatment_recommendations": {
+    "hormonal_therapy": {
+      "indicated": "yes/no",
+      "options": ["specific hormones if deficient"]
+    },
+    "metabolic_management": {
+      "medications": ["if diabetes/lipids"],
+      "lifestyle": "critical for endocrine health"
+    },
+    "monitoring": "hormone levels, metabolic markers"
+  },
+  
+  "clinical_scales": {
+    "FINDRISC": {
+      "calculated": "score 0-26",
+      "confidence": 0.0-1.0,
+      "risk_category": "low/slightly elevated/moderate/high/very high",
+      "10_year_diabetes_risk": "percentage",
+      "reasoning": "How score components were assessed",
+      "components": {
+        "age": "points",
+        "BMI": "points",
+        "waist_circumference": "points",
+        "physical_activity": "points",
+        "vegetable_intake": "points",
+        "hypertension_meds": "points",
+        "high_glucose_history": "points",
+        "family_history": "points"
+      },
+      "missing_data": ["specific measurements needed"]
+    },
+    "Thyroid_Symptom_Score": {
+      "hyperthyroid_score": "0-10+",
+      "hypothyroid_score": "0-10+",
+      "predominant_pattern": "hyper/hypo/mixed/euthyroid",
+      "confidence": 0.0-1.0,
+      "key_symptoms": ["most significant thyroid symptoms"],
+      "reasoning": "Based on symptom pattern"
+    },
+    "Metabolic_Syndrome_Components": {
+      "components_present": "0-5",
+      "meets_criteria": "yes/no (3+ components)",
+      "identified": ["which components present"],
+      "missing_assessment": ["labs needed for full assessment"]
+    }
+  }
+}"""
+
+
+PULMONOLOGY_PROMPT = """Generate a detailed pulmonology specialist report analyzing respiratory symptoms and patterns.
+
+CLINICAL SCALE CALCULATIONS:
+1. Automatically calculate relevant standardized scales based on available data
+2. For each scale, provide score, confidence, reasoning, and missing data
+
+For Pulmonology, automatically calculate when relevant:
+- CAT (COPD Assessment Test)
+- mMRC Dyspnea Scale
+- ACT (Asthma Control Test)
+- STOP-BANG (for sleep apnea risk)
+- Borg Scale for exertional dyspnea
+
+BEST PRACTICES:
+- Grade dyspnea based on functional limitations
+- Assess control for asthma symptoms
+- Screen for sleep apnea risk factors
+- Evaluate impact on daily activities
+
+Return JSON format:
+{
+  "executive_summary": {
+    "one_page_summary": "Comprehensive clinical overview for pulmonologist",
+    "key_findings": ["significant respiratory findings"],
+    "patterns_identified": ["triggers, diurnal variation, seasonal patterns"],
+    "chief_complaints": ["primary respiratory concerns"],
+    "action_items": ["immediate pulmonary evaluations"],
+    "specialist_focus": "pulmonology",
+    "target_audience": "pulmonologist"
+  },
+  
+  "clinical_summary": {
+    "chief_complaint": "Primary respiratory concern",
+    "hpi": "Detailed respiratory history with timeline",
+    "symptom_timeline": [
+      {
+        "date": "ISO date",
+        "symptoms": "specific respiratory symptoms",
+        "severity": 1-10,
+        "triggers": "identified precipitants",
+        "relieving_factors": "what helps"
+      }
+    ]
+  },
+  
+  "pulmonology_assessment": {
+    "suspected_diagnosis": {
+      "primary": "most likely pulmonary condition",
+      "differential": ["other considerations"],
+      "phenotype": "if asthma/COPD subtype"
+    },
+    "functional_assessment": {
+      "exercise_tolerance": "specific limitations",
+      "dyspnea_pattern": "at rest/exertion/nocturnal",
+      "impact_on_adls": "specific activities affected"
+    },
+    "environmental_factors": {
+      "exposures": ["smoking, occupational, allergens"],
+      "home_environment": "triggers identified"
+    }
+  },
+  
+  "diagnostic_recommendations": {
+    "pulmonary_function": {
+      "spirometry": "pre/post bronchodilator",
+      "dlco": "if indicated",
+      "lung_volumes": "if restriction suspected"
+    },
+    "imaging": {
+      "chest_xray": "baseline",
+      "hrct": "if ILD or bronchiectasis suspected"
+    },
+    "other_tests": [
+      "sleep study if OSA suspected",
+      "methacholine challenge if asthma unclear"
+    ]
+  },
+  
+  "treatment_plan": {
+    "pharmacotherapy": {
+      "controller_medications": ["ICS/LABA, etc"],
+      "rescue_medications": "SABA frequency",
+      "add_on_therapy": "if needed"
+    },
+    "non_pharmacologic": {
+      "pulmonary_rehab": "candidacy assessment",
+      "oxygen_therapy": "if hypoxemia",
+      "environmental_control": ["specific modifications"]
+    }
+  },
+  
+  "clinical_scales": {
+    "mMRC_Dyspnea": {
+      "grade": "0-4",
+      "confidence": 0.0-1.0,
+      "description": "specific functional limitation",
+      "reasoning": "Based on activity tolerance described"
+    },
+    "CAT_Score": {
+      "estimated_total": "0-40",
+      "confidence": 0.0-1.0,
+      "impact_level": "low/medium/high/very high",
+      "reasoning": "How symptoms mapped to CAT items",
+      "domains": {
+        "cough": "0-5",
+        "phlegm": "0-5",
+        "chest_tightness": "0-5",
+        "breathlessness": "0-5",
+        "activity_limitation": "0-5",
+        "confidence": "0-5",
+        "sleep": "0-5",
+        "energy": "0-5"
+      }
+    },
+    "ACT_Score": {
+      "estimated_total": "5-25",
+      "control_level": "well controlled/not well controlled/very poorly controlled",
+      "confidence": 0.0-1.0,
+      "reasoning": "Based on symptom frequency and impact",
+      "rescue_inhaler_use": "times per week"
+    },
+    "STOP_BANG": {
+      "score": "0-8",
+      "risk_category": "low/intermediate/high",
+      "confidence": 0.0-1.0,
+      "positive_factors": ["which risk factors present"],
+      "reasoning": "How risk was assessed"
+    }
+  }
+}"""
+
+
+PRIMARY_CARE_PROMPT = """Generate a comprehensive primary care report focusing on overall health assessment and coordination of care.
+
+Return JSON format:
+{
+  "clinical_summary": {
+    "chief_complaints": ["main health concerns"],
+    "hpi": "comprehensive history of present illness",
+    "review_of_systems": {
+      "constitutional": ["fatigue", "weight changes", "fever"],
+      "cardiovascular": ["chest pain", "palpitations"],
+      "respiratory": ["cough", "dyspnea"],
+      "gastrointestinal": ["abdominal pain", "bowel changes"],
+      "genitourinary": ["urinary symptoms"],
+      "musculoskeletal": ["joint pain", "stiffness"],
+      "neurological": ["headaches", "dizziness"],
+      "psychiatric": ["mood", "anxiety", "sleep"],
+      "endocrine": ["energy", "temperature intolerance"],
+      "dermatologic": ["rashes", "lesions"]
+    }
+  },
+  
+  "preventive_care_gaps": {
+    "screening_due": ["colonoscopy", "mammogram", "etc based on age/sex"],
+    "immunizations_needed": ["flu", "covid booster", "etc"],
+    "health_maintenance": ["annual physical", "dental", "vision"]
+  },
+  
+  "chronic_disease_assessment": {
+    "identified_conditions": [
+      {
+        "condition": "condition name",
+        "control_status": "well-controlled/poorly-controlled/needs assessment",
+        "last_evaluation": "date or unknown",
+        "management_gaps": ["what needs attention"]
+      }
+    ],
+    "risk_factors": {
+      "cardiovascular": ["identified risks"],
+      "metabolic": ["weight, diet, exercise patterns"],
+      "cancer": ["family history, lifestyle factors"]
+    }
+  },
+  
+  "medication_reconciliation": {
+    "current_medications": ["if mentioned in reports"],
+    "adherence_concerns": ["if any patterns noted"],
+    "potential_interactions": ["to discuss with pharmacist"]
+  },
+  
+  "specialist_coordination": {
+    "current_specialists": ["based on report patterns"],
+    "recommended_referrals": [
+      {
+        "specialty": "specialty name",
+        "reason": "clinical indication",
+        "urgency": "routine/urgent",
+        "pre_referral_workup": ["tests to order first"]
+      }
+    ],
+    "care_gaps": ["specialists needed but not yet seen"]
+  },
+  
+  "diagnostic_plan": {
+    "laboratory": [
+      {
+        "test": "CBC, CMP, Lipid panel",
+        "rationale": "baseline/screening",
+        "frequency": "annual/one-time"
+      }
+    ],
+    "imaging": ["if indicated by symptoms"],
+    "screening": ["age-appropriate cancer screening"]
+  },
+  
+  "health_optimization": {
+    "lifestyle_counseling": {
+      "diet": ["specific recommendations"],
+      "exercise": ["realistic goals"],
+      "sleep": ["hygiene tips if issues noted"],
+      "stress": ["management strategies"]
+    },
+    "behavioral_health": {
+      "mood_screening": "PHQ-9 recommended if symptoms",
+      "substance_use": "screening indicated",
+      "support_resources": ["if needed"]
+    }
+  },
+  
+  "care_plan_summary": {
+    "immediate_actions": ["urgent items"],
+    "short_term_goals": ["1-3 month targets"],
+    "long_term_goals": ["6-12 month targets"],
+    "follow_up_schedule": {
+      "next_visit": "recommended timing",
+      "monitoring_plan": "for chronic conditions"
+    }
+  },
+  
+  "patient_engagement": {
+    "strengths": ["good tracking, seeking care, etc"],
+    "barriers": ["identified challenges"],
+    "education_priorities": ["key topics to address"]
+  }
+}"""
+
+
+ORTHOPEDICS_PROMPT = """Generate a detailed orthopedics specialist report analyzing musculoskeletal symptoms and conditions.
+
+CLINICAL SCALE CALCULATIONS:
+1. Automatically calculate relevant standardized scales based on available data
+2. For each scale:
+   - Provide the calculated score
+   - Include confidence level (0.0-1.0) based on data completeness
+   - Explain your reasoning for each component
+   - List any missing data that would improve accuracy
+
+For Orthopedics, automatically calculate when relevant:
+- Oswestry Disability Index (for back pain)
+- KOOS (Knee injury and Osteoarthritis Outcome Score)
+- Oxford Hip/Knee/Shoulder scores
+- DASH (Disabilities of the Arm, Shoulder and Hand)
+- Roland-Morris Disability Questionnaire
+
+BEST PRACTICES:
+- Assess functional limitations from patient descriptions
+- Map activities to disability scores
+- Consider pain patterns and mechanical symptoms
+- Note any red flags for serious pathology
+
+Return JSON format:
+{
+  "executive_summary": {
+    "one_page_summary": "Comprehensive clinical overview for orthopedist",
+    "key_findings": ["most significant musculoskeletal findings"],
+    "patterns_identified": ["mechanical vs inflammatory patterns"],
+    "chief_complaints": ["primary orthopedic concerns"],
+    "action_items": ["immediate evaluations or treatments"],
+    "specialist_focus": "orthopedics",
+    "target_audience": "orthopedist"
+  },
+  
+  "clinical_summary": {
+    "chief_complaint": "Primary musculoskeletal concern",
+    "hpi": "Detailed history of orthopedic condition",
+    "injury_timeline": [
+      {
+        "date": "ISO date",
+        "event": "injury or symptom onset",
+        "mechanism": "how it occurred",
+        "severity": "immediate impact",
+        "treatment": "initial management"
+      }
+    ]
+  },
+  
+  "orthopedic_assessment": {
+    "affected_joints": ["specific joints/areas involved"],
+    "pain_characteristics": {
+      "location": "precise anatomical location",
+      "quality": "sharp/dull/aching/burning",
+      "timing": "constant/intermittent/activity-related",
+      "severity": "0-10 scale with context",
+      "radiation": "if pain travels"
+    },
+    "mechanical_symptoms": {
+      "locking": "present/absent",
+      "catching": "present/absent",
+      "instability": "giving way episodes",
+      "stiffness": "morning/activity-related",
+      "swelling": "pattern and triggers"
+    },
+    "functional_limitations": {
+      "ambulation": "walking distance/aids needed",
+      "stairs": "ability to climb/descend",
+      "activities": ["specific limitations"],
+      "work_impact": "occupational restrictions"
+    }
+  },
+  
+  "orthopedist_specific_findings": {
+    "injury_mechanism": {
+      "traumatic": "specific injury details if applicable",
+      "overuse": "repetitive activities identified",
+      "degenerative": "gradual onset patterns"
+    },
+    "red_flags": {
+      "present": ["any concerning features"],
+      "absent": ["important negatives"]
+    },
+    "previous_treatments": {
+      "conservative": ["PT, injections, medications tried"],
+      "surgical": ["any prior procedures"],
+      "response": "what helped/failed"
+    }
+  },
+  
+  "diagnostic_recommendations": {
+    "imaging": {
+      "xrays": {
+        "views": "AP/lateral/special views needed",
+        "rationale": "baseline assessment"
+      },
+      "mri": {
+        "indicated": "yes/no",
+        "region": "specific area to image",
+        "rationale": "soft tissue/cartilage evaluation"
+      },
+      "ct": "if bony detail needed"
+    },
+    "laboratory": [
+      {
+        "test": "inflammatory markers",
+        "indication": "if inflammatory arthritis suspected"
+      }
+    ],
+    "other": ["EMG/NCS if nerve involvement"]
+  },
+  
+  "treatment_recommendations": {
+    "conservative_management": {
+      "immediate": [
+        "activity modification",
+        "ice/heat application",
+        "relative rest"
+      ],
+      "medications": [
+        {
+          "class": "NSAIDs",
+          "specific": "ibuprofen 600mg TID with food",
+          "duration": "2-3 weeks trial"
+        }
+      ],
+      "physical_therapy": {
+        "focus": "strengthening, ROM, mechanics",
+        "frequency": "2-3x/week for 6-8 weeks",
+        "specific_exercises": ["based on condition"]
+      }
+    },
+    "injection_options": {
+      "corticosteroid": {
+        "location": "intra-articular vs bursal",
+        "indication": "inflammatory component"
+      },
+      "viscosupplementation": "if OA knee",
+      "prp": "consideration for tendinopathy"
+    },
+    "surgical_considerations": {
+      "indicated": "based on failure of conservative care",
+      "procedure_options": ["arthroscopy", "replacement", "repair"],
+      "timing": "urgent vs elective"
+    }
+  },
+  
+  "rehabilitation_plan": {
+    "phase_1": {
+      "goals": "pain control, protect healing",
+      "restrictions": ["weight bearing status"],
+      "duration": "0-2 weeks typically"
+    },
+    "phase_2": {
+      "goals": "restore ROM, begin strengthening",
+      "activities": ["specific exercises"],
+      "progression_criteria": "pain <3/10, no swelling"
+    },
+    "return_to_activity": {
+      "timeline": "expected recovery duration",
+      "milestones": ["functional goals"],
+      "prevention": "avoiding re-injury"
+    }
+  },
+  
+  "follow_up_plan": {
+    "orthopedic_visit": "2-4 weeks for reassessment",
+    "imaging_followup": "if needed based on response",
+    "therapy_progress": "PT to communicate concerns",
+    "surgical_decision": "timeline if conservative fails"
+  },
+  
+  "clinical_scales": {
+    "Oswestry_Disability_Index": {
+      "calculated": "percentage disability",
+      "confidence": 0.0-1.0,
+      "category": "minimal/moderate/severe/crippled",
+      "reasoning": "How functional limitations were assessed",
+      "sections": {
+        "pain_intensity": 0-5,
+        "personal_care": 0-5,
+        "lifting": 0-5,
+        "walking": 0-5,
+        "sitting": 0-5,
+        "standing": 0-5,
+        "sleeping": 0-5,
+        "sex_life": 0-5,
+        "social_life": 0-5,
+        "traveling": 0-5
+      },
+      "missing_data": ["sections that couldn't be assessed"]
+    },
+    "KOOS": {
+      "calculated": "if knee symptoms present",
+      "confidence": 0.0-1.0,
+      "subscales": {
+        "pain": "score 0-100",
+        "symptoms": "score 0-100",
+        "adl": "score 0-100",
+        "sport_rec": "score 0-100",
+        "qol": "score 0-100"
+      },
+      "interpretation": "lower scores indicate worse function",
+      "reasoning": "Based on reported knee-specific limitations"
+    },
+    "Pain_Disability": {
+      "functional_score": "based on activity limitations",
+      "work_impact": "off work/light duty/full duty",
+      "adl_impact": "independent/assisted/dependent",
+      "confidence": 0.0-1.0
+    }
+  }
+}"""
+
+
+RHEUMATOLOGY_PROMPT = """Generate a detailed rheumatology specialist report analyzing autoimmune and inflammatory conditions.
+
+CLINICAL SCALE CALCULATIONS:
+1. Automatically calculate relevant standardized scales based on available data
+2. For each scale:
+   - Provide the calculated score
+   - Include confidence level (0.0-1.0) based on data completeness
+   - Explain your reasoning
+   - List any missing data that would improve accuracy
+
+For Rheumatology, automatically calculate when relevant:
+- DAS28 (Disease Activity Score) for RA
+- CDAI (Clinical Disease Activity Index)
+- HAQ-DI (Health Assessment Questionnaire Disability Index)
+- BASDAI (Bath Ankylosing Spondylitis Disease Activity Index)
+- ACR/EULAR classification criteria for various conditions
+
+BEST PRACTICES:
+- Assess pattern of joint involvement (symmetric vs asymmetric)
+- Look for systemic symptoms (fatigue, fever, weight loss)
+- Consider morning stiffness duration
+- Evaluate functional impact
+- Note any extra-articular manifestations
+
+Return JSON format:
+{
+  "executive_summary": {
+    "one_page_summary": "Comprehensive clinical overview for rheumatologist",
+    "key_findings": ["most significant rheumatologic findings"],
+    "patterns_identified": ["inflammatory vs mechanical patterns"],
+    "chief_complaints": ["primary rheumatologic concerns"],
+    "action_items": ["immediate evaluations or treatments"],
+    "specialist_focus": "rheumatology",
+    "target_audience": "rheumatologist"
+  },
+  
+  "clinical_summary": {
+    "chief_complaint": "Primary rheumatologic concern",
+    "hpi": "Detailed history of symptoms with timeline",
+    "symptom_evolution": [
+      {
+        "date": "ISO date",
+        "joints_affected": ["specific joints"],
+        "pattern": "symmetric/asymmetric/migratory",
+        "associated_symptoms": ["systemic features"]
+      }
+    ]
+  },
+  
+  "rheumatologic_assessment": {
+    "joint_involvement": {
+      "pattern": "symmetric/asymmetric/axial/peripheral",
+      "small_joints": ["MCPs", "PIPs", "wrists"],
+      "large_joints": ["knees", "shoulders", "hips"],
+      "distribution": "polyarticular/oligoarticular/monoarticular"
+    },
+    "inflammatory_markers": {
+      "morning_stiffness": "duration in minutes",
+      "inflammatory_pattern": "present/absent",
+      "improvement_with_activity": "yes/no"
+    },
+    "systemic_features": {
+      "constitutional": ["fever", "weight loss", "fatigue"],
+      "extra_articular": ["rash", "eye symptoms", "lung involvement"],
+      "serologies_needed": ["RF", "anti-CCP", "ANA", "etc"]
+    }
+  },
+  
+  "rheumatologist_specific_findings": {
+    "disease_classification": {
+      "primary_consideration": "most likely diagnosis",
+      "differential": ["other possibilities"],
+      "criteria_met": ["specific classification criteria"],
+      "criteria_missing": ["what's needed for diagnosis"]
+    },
+    "disease_activity": {
+      "current_activity": "remission/low/moderate/high",
+      "trajectory": "improving/stable/worsening",
+      "prognostic_factors": ["poor prognostic indicators if present"]
+    },
+    "comorbidities": {
+      "cardiovascular_risk": "assessment needed",
+      "osteoporosis_risk": "screening indicated",
+      "infection_risk": "if on immunosuppression"
+    }
+  },
+  
+  "diagnostic_recommendations": {
+    "laboratory": {
+      "immediate": [
+        {
+          "test": "CBC, CMP, ESR, CRP",
+          "rationale": "baseline inflammation and organ function"
+        },
+        {
+          "test": "RF, anti-CCP antibodies",
+          "rationale": "if RA suspected"
+        },
+        {
+          "test": "ANA with reflex",
+          "rationale": "if lupus/CTD suspected"
+        }
+      ],
+      "specialized": [
+        {
+          "test": "HLA-B27",
+          "indication": "if spondyloarthropathy"
+        }
+      ]
+    },
+    "imaging": {
+      "xrays": {
+        "joints": "hands/feet for baseline",
+        "purpose": "erosions, joint space narrowing"
+      },
+      "ultrasound": {
+        "indication": "synovitis detection",
+        "joints": "clinically affected areas"
+      },
+      "mri": "if axial disease or early detection needed"
+    }
+  },
+  
+  "treatment_recommendations": {
+    "immediate_therapy": {
+      "symptomatic": [
+        {
+          "medication": "NSAIDs",
+          "specific": "naproxen 500mg BID",
+          "monitoring": "renal function, GI tolerance"
+        }
+      ],
+      "bridge_therapy": {
+        "corticosteroids": "prednisone taper if high disease activity",
+        "starting_dose": "based on severity",
+        "taper_plan": "gradual reduction"
+      }
+    },
+    "dmard_therapy": {
+      "conventional": [
+        {
+          "drug": "methotrexate",
+          "starting_dose": "15mg weekly",
+          "folic_acid": "1mg daily",
+          "monitoring": "LFTs, CBC q8-12 weeks"
+        }
+      ],
+      "biologic_consideration": {
+        "indications": "moderate-high activity despite cDMARDs",
+        "screening_required": ["TB", "hepatitis", "HIV"],
+        "options": ["TNF inhibitors", "IL-6", "JAK inhibitors"]
+      }
+    },
+    "supportive_care": {
+      "physical_therapy": "joint protection, strengthening",
+      "occupational_therapy": "adaptive devices if needed",
+      "lifestyle": ["smoking cessation critical", "weight management"]
+    }
+  },
+  
+  "monitoring_plan": {
+    "disease_activity": {
+      "frequency": "q3 months initially",
+      "measures": ["joint counts", "patient globals", "inflammatory markers"],
+      "treat_to_target": "remission or low disease activity"
+    },
+    "medication_monitoring": {
+      "laboratory": "based on DMARD choice",
+      "toxicity_screening": ["LFTs", "CBC", "creatinine"]
+    },
+    "comorbidity_screening": {
+      "cardiovascular": "annual risk assessment",
+      "bone_health": "DEXA if risk factors",
+      "malignancy": "age-appropriate screening"
+    }
+  },
+  
+  "prognosis_counseling": {
+    "disease_course": "expected trajectory with treatment",
+    "functional_outcomes": "maintaining independence",
+    "work_disability": "prevention strategies",
+    "pregnancy_planning": "if applicable, medication adjustments"
+  },
+  
+  "clinical_scales": {
+    "DAS28": {
+      "calculated": "score if RA suspected",
+      "confidence": 0.0-1.0,
+      "components": {
+        "tender_joints": "0-28",
+        "swollen_joints": "0-28",
+        "esr_crp": "estimated if not available",
+        "patient_global": "0-100mm VAS"
+      },
+      "interpretation": "remission <2.6, low <3.2, moderate ≤5.1, high >5.1",
+      "reasoning": "How components were estimated"
+    },
+    "HAQ_DI": {
+      "calculated": "functional disability score",
+      "confidence": 0.0-1.0,
+      "categories": {
+        "dressing": 0-3,
+        "arising": 0-3,
+        "eating": 0-3,
+        "walking": 0-3,
+        "hygiene": 0-3,
+        "reach": 0-3,
+        "grip": 0-3,
+        "activities": 0-3
+      },
+      "total_score": "0-3 (mean of categories)",
+      "interpretation": "mild <0.5, moderate 0.5-1, severe >1"
+    },
+    "ACR_Classification": {
+      "criteria_assessment": "for suspected condition",
+      "points_calculated": "based on available data",
+      "confidence": 0.0-1.0,
+      "missing_data": ["serologies", "imaging", "etc"],
+      "meets_criteria": "yes/no/insufficient data"
+    }
+  }
+}"""
+
+
+NEPHROLOGY_PROMPT = """Generate a detailed nephrology specialist report analyzing kidney function and related conditions.
+
+CLINICAL SCALE CALCULATIONS:
+Automatically calculate when relevant:
+- CKD-EPI eGFR estimation
+- KDIGO CKD staging (G1-G5, A1-A3)
+- Kidney Failure Risk Equation (if CKD)
+- Volume status assessment
+
+Return JSON format:
+{
+  "executive_summary": {
+    "one_page_summary": "Comprehensive clinical overview for nephrologist",
+    "key_findings": ["most significant renal findings"],
+    "patterns_identified": ["acute vs chronic patterns"],
+    "chief_complaints": ["primary renal concerns"],
+    "action_items": ["immediate evaluations needed"],
+    "specialist_focus": "nephrology",
+    "target_audience": "nephrologist"
+  },
+  
+  "clinical_summary": {
+    "chief_complaint": "Primary renal concern",
+    "hpi": "Detailed history focusing on kidney-related symptoms",
+    "risk_factors": ["hypertension", "diabetes", "family history", "medications"]
+  },
+  
+  "nephrology_assessment": {
+    "renal_symptoms": {
+      "urinary_changes": ["frequency", "color", "volume", "foaming"],
+      "edema": ["location", "pitting", "progression"],
+      "systemic": ["fatigue", "nausea", "pruritus"]
+    },
+    "blood_pressure": {
+      "control": "controlled/uncontrolled",
+      "medications": ["current antihypertensives"],
+      "target": "based on comorbidities"
+    },
+    "volume_status": {
+      "assessment": "euvolemic/hypervolemic/hypovolemic",
+      "clinical_signs": ["edema", "JVP", "weight changes"]
+    }
+  },
+  
+  "diagnostic_recommendations": {
+    "laboratory": {
+      "immediate": [
+        {"test": "BUN, creatinine, eGFR", "rationale": "kidney function"},
+        {"test": "Urinalysis with microscopy", "rationale": "proteinuria, hematuria"},
+        {"test": "Urine protein/creatinine ratio", "rationale": "quantify proteinuria"}
+      ],
+      "additional": [
+        {"test": "Renal ultrasound", "indication": "size, obstruction"},
+        {"test": "24-hour urine", "indication": "if needed for clearance"}
+      ]
+    }
+  },
+  
+  "treatment_recommendations": {
+    "ckd_management": {
+      "blood_pressure": {"target": "<130/80", "medications": "ACE/ARB preferred"},
+      "proteinuria": {"target": "reduce by 30-50%", "interventions": ["ACE/ARB", "SGLT2i"]},
+      "mineral_bone": {"phosphate_control": "diet/binders", "vitamin_d": "if deficient"}
+    },
+    "acute_issues": {
+      "volume": "diuretic adjustment if needed",
+      "electrolytes": "specific corrections",
+      "uremia": "dialysis planning if advanced"
+    },
+    "lifestyle": {
+      "diet": ["sodium restriction", "protein moderation", "potassium as indicated"],
+      "fluid": "restriction if volume overload",
+      "nephrotoxins": ["avoid NSAIDs", "contrast precautions"]
+    }
+  },
+  
+  "clinical_scales": {
+    "CKD_Staging": {
+      "estimated_gfr": "mL/min/1.73m²",
+      "ckd_stage": "G1-G5",
+      "albuminuria_category": "A1-A3",
+      "confidence": 0.0-1.0,
+      "reasoning": "Based on symptoms and risk factors",
+      "prognosis": "risk of progression"
+    },
+    "Volume_Assessment": {
+      "status": "euvolemic/hypervolemic/hypovolemic",
+      "confidence": 0.0-1.0,
+      "clinical_basis": ["edema", "BP", "symptoms"]
+    }
+  }
+}"""
+
+
+UROLOGY_PROMPT = """Generate a detailed urology specialist report analyzing urinary and male reproductive symptoms.
+
+CLINICAL SCALE CALCULATIONS:
+Automatically calculate when relevant:
+- IPSS (International Prostate Symptom Score)
+- AUA Symptom Score
+- SHIM (Sexual Health Inventory for Men) if applicable
+- NIH-CPSI for chronic prostatitis
+
+Return JSON format:
+{
+  "executive_summary": {
+    "one_page_summary": "Comprehensive clinical overview for urologist",
+    "key_findings": ["most significant urologic findings"],
+    "patterns_identified": ["obstructive vs irritative patterns"],
+    "chief_complaints": ["primary urologic concerns"],
+    "action_items": ["immediate evaluations needed"],
+    "specialist_focus": "urology",
+    "target_audience": "urologist"
+  },
+  
+  "clinical_summary": {
+    "chief_complaint": "Primary urologic concern",
+    "hpi": "Detailed history of urinary/reproductive symptoms",
+    "review_of_systems": {
+      "lower_urinary_tract": ["frequency", "urgency", "nocturia", "stream"],
+      "pain": ["location", "character", "timing"],
+      "sexual_function": ["if relevant to complaint"]
+    }
+  },
+  
+  "urology_assessment": {
+    "luts_characterization": {
+      "storage_symptoms": ["frequency", "urgency", "nocturia"],
+      "voiding_symptoms": ["hesitancy", "weak stream", "straining", "intermittency"],
+      "post_micturition": ["incomplete emptying", "dribbling"]
+    },
+    "pain_assessment": {
+      "location": ["suprapubic", "perineal", "testicular", "penile"],
+      "timing": "with voiding/ejaculation/constant",
+      "severity": "0-10 scale"
+    },
+    "sexual_function": {
+      "erectile_function": "if applicable",
+      "ejaculatory_function": "if applicable",
+      "libido": "changes noted"
+    }
+  },
+  
+  "diagnostic_recommendations": {
+    "laboratory": [
+      {"test": "Urinalysis and culture", "rationale": "infection, hematuria"},
+      {"test": "PSA", "indication": "if male >50 or symptoms"},
+      {"test": "Creatinine", "rationale": "renal function"}
+    ],
+    "imaging": [
+      {"test": "Renal/bladder ultrasound", "indication": "obstruction, stones"},
+      {"test": "Post-void residual", "indication": "retention assessment"}
+    ],
+    "specialized": [
+      {"test": "Uroflowmetry", "indication": "objective flow assessment"},
+      {"test": "Cystoscopy", "indication": "if hematuria or suspicious symptoms"}
+    ]
+  },
+  
+  "treatment_recommendations": {
+    "medical_therapy": {
+      "alpha_blockers": {"indication": "BPH symptoms", "options": ["tamsulosin", "alfuzosin"]},
+      "5ari": {"indication": "large prostate", "options": ["finasteride", "dutasteride"]},
+      "anticholinergics": {"indication": "overactive bladder", "cautions": "retention risk"}
+    },
+    "behavioral": {
+      "fluid_management": "timing and volume",
+      "bladder_training": "if urgency/frequency",
+      "pelvic_floor": "exercises if indicated"
+    },
+    "surgical_options": {
+      "indications": ["failed medical therapy", "retention", "complications"],
+      "procedures": ["based on pathology"]
+    }
+  },
+  
+  "clinical_scales": {
+    "IPSS": {
+      "total_score": "0-35",
+      "severity": "mild/moderate/severe",
+      "confidence": 0.0-1.0,
+      "symptom_breakdown": {
+        "incomplete_emptying": 0-5,
+        "frequency": 0-5,
+        "intermittency": 0-5,
+        "urgency": 0-5,
+        "weak_stream": 0-5,
+        "straining": 0-5,
+        "nocturia": "times per night"
+      },
+      "qol_score": "0-6",
+      "reasoning": "How symptoms were mapped to scores"
+    },
+    "Bladder_Diary": {
+      "daytime_frequency": "voids per day",
+      "nocturia": "times per night",
+      "urgency_episodes": "per day",
+      "incontinence": "episodes if any"
+    }
+  }
+}"""
+
+
+GYNECOLOGY_PROMPT = """Generate a detailed gynecology specialist report analyzing women's health concerns.
+
+CLINICAL SCALE CALCULATIONS:
+Automatically calculate when relevant:
+- Menstrual pattern assessment (regular/irregular)
+- PCOS diagnostic criteria
+- Menopausal symptom severity
+- Pelvic pain assessment scales
+
+Return JSON format:
+{
+  "executive_summary": {
+    "one_page_summary": "Comprehensive clinical overview for gynecologist",
+    "key_findings": ["most significant gynecologic findings"],
+    "patterns_identified": ["menstrual patterns, hormonal symptoms"],
+    "chief_complaints": ["primary gynecologic concerns"],
+    "action_items": ["immediate evaluations needed"],
+    "specialist_focus": "gynecology",
+    "target_audience": "gynecologist"
+  },
+  
+  "clinical_summary": {
+    "chief_complaint": "Primary gynecologic concern",
+    "hpi": "Detailed gynecologic history",
+    "menstrual_history": {
+      "lmp": "last menstrual period",
+      "cycle_length": "days between periods",
+      "cycle_regularity": "regular/irregular",
+      "flow": "light/moderate/heavy",
+      "duration": "days of bleeding"
+    },
+    "obstetric_history": {
+      "gravidity": "number of pregnancies",
+      "parity": "number of births",
+      "pregnancy_complications": ["if any"]
+    }
+  },
+  
+  "gynecologic_assessment": {
+    "menstrual_abnormalities": {
+      "pattern": "regular/irregular/absent",
+      "abnormal_bleeding": ["intermenstrual", "postcoital", "postmenopausal"],
+      "dysmenorrhea": "severity and impact"
+    },
+    "pelvic_symptoms": {
+      "pain": ["location", "timing", "character"],
+      "pressure": "pelvic pressure symptoms",
+      "discharge": "abnormal discharge characteristics"
+    },
+    "hormonal_symptoms": {
+      "vasomotor": ["hot flashes", "night sweats"],
+      "mood": ["PMS", "PMDD symptoms"],
+      "other": ["acne", "hirsutism", "weight changes"]
+    },
+    "sexual_health": {
+      "dyspareunia": "if present",
+      "libido_changes": "if reported",
+      "contraception": "current method and satisfaction"
+    }
+  },
+  
+  "diagnostic_recommendations": {
+    "laboratory": [
+      {"test": "CBC", "indication": "if heavy bleeding"},
+      {"test": "TSH, prolactin", "indication": "menstrual irregularity"},
+      {"test": "FSH, LH, estradiol", "indication": "hormonal assessment"},
+      {"test": "Testosterone, DHEAS", "indication": "if PCOS suspected"}
+    ],
+    "imaging": [
+      {"test": "Pelvic ultrasound", "indication": "structural abnormalities"},
+      {"test": "Saline sonogram", "indication": "if endometrial pathology"}
+    ],
+    "procedures": [
+      {"test": "Endometrial biopsy", "indication": "abnormal bleeding >45yo"},
+      {"test": "Hysteroscopy", "indication": "persistent abnormal bleeding"}
+    ]
+  },
+  
+  "treatment_recommendations": {
+    "menstrual_management": {
+      "hormonal": ["OCPs", "IUD", "other hormonal options"],
+      "non_hormonal": ["NSAIDs", "tranexamic acid"],
+      "procedural": ["endometrial ablation if indicated"]
+    },
+    "fertility_considerations": {
+      "current_desires": "trying to conceive/contraception/not applicable",
+      "fertility_preservation": "if treatment may impact"
+    },
+    "menopausal_management": {
+      "hrt_consideration": "benefits vs risks",
+      "non_hormonal": ["SSRIs for hot flashes", "vaginal moisturizers"],
+      "bone_health": "calcium, vitamin D, DEXA screening"
+    }
+  },
+  
+  "preventive_care": {
+    "screening_due": [
+      {"test": "Pap smear", "due_date": "based on guidelines"},
+      {"test": "HPV testing", "indication": "age-appropriate"},
+      {"test": "Mammogram", "timing": "based on age/risk"},
+      {"test": "Bone density", "indication": "postmenopausal"}
+    ]
+  },
+  
+  "clinical_assessment": {
+    "Menstrual_Pattern": {
+      "classification": "regular/irregular/amenorrhea",
+      "cycle_length": "21-35 days normal",
+      "variability": "days of variation",
+      "confidence": 0.0-1.0,
+      "abnormalities": ["specific patterns identified"]
+    },
+    "PCOS_Criteria": {
+      "rotterdam_criteria_met": "0-3 criteria",
+      "features": {
+        "oligo_anovulation": "present/absent",
+        "hyperandrogenism": "clinical/biochemical",
+        "pco_morphology": "if ultrasound done"
+      },
+      "confidence": 0.0-1.0,
+      "additional_workup": ["tests needed for diagnosis"]
+    },
+    "Bleeding_Assessment": {
+      "pattern": "type of abnormal bleeding",
+      "severity": "impact on hemoglobin/QOL",
+      "etiology": "likely cause based on age/pattern",
+      "evaluation_needed": ["specific tests indicated"]
+    }
+  }
+}"""
+
+
+ONCOLOGY_PROMPT = """Generate a detailed oncology specialist report analyzing cancer-related symptoms and screening needs.
+
+CLINICAL SCALE CALCULATIONS:
+Automatically calculate when relevant:
+- Performance status (ECOG/Karnofsky)
+- Constitutional symptom assessment
+- Cancer screening risk scores
+- Symptom burden scales
+
+Return JSON format with focus on:
+1. Constitutional symptoms (weight loss, fatigue, night sweats)
+2. Localized symptoms suggesting malignancy
+3. Family history and genetic risk
+4. Age-appropriate screening recommendations
+5. Red flags requiring urgent evaluation
+
+Include sections for:
+- Executive summary for oncologist
+- Symptom analysis and timeline
+- Risk factor assessment
+- Screening recommendations
+- Diagnostic workup priorities
+- Clinical scales with confidence levels"""
+
+
+PHYSICAL_THERAPY_PROMPT = """Generate a detailed physical therapy evaluation report focusing on functional limitations and rehabilitation needs.
+
+CLINICAL SCALE CALCULATIONS:
+Automatically calculate when relevant:
+- Functional outcome measures (based on activities reported)
+- Pain and disability scales
+- Balance and fall risk assessment
+- Activity limitation scales
+
+Return JSON format with focus on:
+1. Functional limitations and impact on daily activities
+2. Movement patterns and compensations
+3. Pain patterns with movement
+4. Strength and flexibility deficits (inferred)
+5. Goals for therapy
+
+Include sections for:
+- Executive summary for PT
+- Functional assessment
+- Movement analysis
+- Treatment plan with specific exercises
+- Expected outcomes and timeline
+- Home exercise program recommendations"""
+
+
+# Generic referral report for /api/report/specialist; {specialty} is filled per request
+GENERIC_SPECIALIST_PROMPT = """Generate a specialist referral report for {specialty}. Return JSON:
+{{
+  "executive_summary": {{
+    "one_page_summary": "Clinical summary for specialist",
+    "chief_complaints": ["primary concerns"],
+    "key_findings": ["clinically relevant findings"],
+    "referral_reason": "why specialist consultation needed"
+  }},
+  "clinical_presentation": {{
+    "presenting_symptoms": ["current symptoms"],
+    "symptom_duration": "timeline of symptoms",
+    "progression": "how symptoms have changed",
+    "previous_treatments": ["treatments tried"],
+    "response_to_treatment": "treatment responses"
+  }},
+  "specialist_focus": {{
+    "relevant_findings": ["findings relevant to {specialty}"],
+    "diagnostic_considerations": ["differential diagnoses"],
+    "specific_questions": ["questions for specialist"],
+    "urgency_assessment": "routine/urgent/emergent"
+  }},
+  "recommendations": {{
+    "suggested_workup": ["recommended tests/procedures"],
+    "clinical_questions": ["specific questions to address"],
+    "timing": "recommended timeframe for consultation"
+  }}
+}}"""
+
+
+def generic_specialist_profile(specialty: Optional[str]) -> SpecialtyProfile:
+    """Profile for the generic specialist report, saved as specialist_focused with the requested specialty"""
+    specialty = specialty or "specialist"
+    return SpecialtyProfile(
+        key=specialty,
+        report_type="specialist_focused",
+        specialty=specialty,
+        name=specialty,
+        system_prompt=GENERIC_SPECIALIST_PROMPT.format(specialty=specialty),
+        title=f"{specialty} referral report",
+        max_tokens=2000,
+        fail_on_invalid_json=True,
+        include_analysis_focus=True,
+        response_specialty=specialty
+    )
+
+
+SPECIALTY_PROFILES = {
+    "cardiology": SpecialtyProfile(
+        key="cardiology",
+        report_type="cardiology",
+        name="Cardiology",
+        system_prompt=CARDIOLOGY_PROMPT,
+        fail_on_invalid_json=True,
+        include_session_overview=True
+    ),
+    "neurology": SpecialtyProfile(
+        key="neurology",
+        report_type="neurology",
+        name="Neurology",
+        system_prompt=NEUROLOGY_PROMPT,
+        fallback_fields=WITH_URGENCY
+    ),
+    "psychiatry": SpecialtyProfile(
+        key="psychiatry",
+        report_type="psychiatry",
+        name="Psychiatry",
+        system_prompt=PSYCHIATRY_PROMPT,
+        fallback_fields=WITH_URGENCY
+    ),
+    "dermatology": SpecialtyProfile(
+        key="dermatology",
+        report_type="dermatology",
+        name="Dermatology",
+        system_prompt=DERMATOLOGY_PROMPT,
+        fallback_fields=WITH_URGENCY,
+        post_processors=(log_report_fields(
+            "executive_summary.key_findings",
+            "executive_summary.urgency_indicators",
+            "lesion_analysis.abcde_assessment.overall_risk",
+            "clinical_differential.primary_diagnosis",
+            "clinical_differential.differential_diagnoses"
+        ),)
+    ),
+    "gastroenterology": SpecialtyProfile(
+        key="gastroenterology",
+        report_type="gastroenterology",
+        name="Gastroenterology",
+        system_prompt=GASTROENTEROLOGY_PROMPT,
+        fallback_fields=WITH_URGENCY
+    ),
+    "endocrinology": SpecialtyProfile(
+        key="endocrinology",
+        report_type="endocrinology",
+        name="Endocrinology",
+        system_prompt=ENDOCRINOLOGY_PROMPT,
+        fallback_fields=WITH_URGENCY
+    ),
+    "pulmonology": SpecialtyProfile(
+        key="pulmonology",
+        report_type="pulmonology",
+        name="Pulmonology",
+        system_prompt=PULMONOLOGY_PROMPT,
+        fallback_fields=WITH_URGENCY
+    ),
+    "primary-care": SpecialtyProfile(
+        key="primary-care",
+        report_type="primary_care",
+        name="Primary care",
+        system_prompt=PRIMARY_CARE_PROMPT,
+        title="primary care evaluation report",
+        fail_on_invalid_json=True,
+        response_specialty="primary-care",
+        post_processors=(log_report_fields(
+            "clinical_summary.chief_complaints",
+            "preventive_care_gaps.screening_due",
+            "specialist_coordination.recommended_referrals"
+        ),)
+    ),
+    "orthopedics": SpecialtyProfile(
+        key="orthopedics",
+        report_type="orthopedics",
+        name="Orthopedics",
+        system_prompt=ORTHOPEDICS_PROMPT,
+        post_processors=(log_report_fields(
+            "executive_summary.key_findings",
+            "orthopedic_assessment.affected_joints",
+            "orthopedic_assessment.pain_characteristics",
+            "clinical_scales.Oswestry_Disability_Index.calculated"
+        ),)
+    ),
+    "rheumatology": SpecialtyProfile(
+        key="rheumatology",
+        report_type="rheumatology",
+        name="Rheumatology",
+        system_prompt=RHEUMATOLOGY_PROMPT
+    ),
+    "nephrology": SpecialtyProfile(
+        key="nephrology",
+        report_type="nephrology",
+        name="Nephrology",
+        system_prompt=NEPHROLOGY_PROMPT,
+        model=EXTENDED_MODEL,
+        max_tokens=3000,
+        post_processors=(log_report_fields(
+            "executive_summary.key_findings",
+            "clinical_scales.CKD_Staging.ckd_stage",
+            "clinical_scales.CKD_Staging.estimated_gfr"
+        ),)
+    ),
+    "urology": SpecialtyProfile(
+        key="urology",
+        report_type="urology",
+        name="Urology",
+        system_prompt=UROLOGY_PROMPT,
+        model=EXTENDED_MODEL,
+        max_tokens=3000,
+        post_processors=(log_report_fields(
+            "executive_summary.key_findings",
+            "clinical_scales.IPSS.total_score",
+            "clinical_scales.IPSS.severity"
+        ),)
+    ),
+    "gynecology": SpecialtyProfile(
+        key="gynecology",
+        report_type="gynecology",
+        name="Gynecology",
+        system_prompt=GYNECOLOGY_PROMPT,
+        model=EXTENDED_MODEL,
+        max_tokens=3000,
+        post_processors=(log_report_fields(
+            "executive_summary.key_findings",
+            "clinical_assessment.Menstrual_Pattern.classification",
+            "clinical_assessment.Menstrual_Pattern.cycle_length"
+        ),)
+    ),
+    "oncology": SpecialtyProfile(
+        key="oncology",
+        report_type="oncology",
+        name="Oncology",
+        system_prompt=ONCOLOGY_PROMPT,
+        model=EXTENDED_MODEL,
+        max_tokens=3000
+    ),
+    "physical-therapy": SpecialtyProfile(
+        key="physical-therapy",
+        report_type="physical_therapy",
+        name="Physical therapy",
+        system_prompt=PHYSICAL_THERAPY_PROMPT,
+        title="physical therapy evaluation report",
+        model=EXTENDED_MODEL,
+        max_tokens=3000
+    ),
+}
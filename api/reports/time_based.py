@@ -1,199 +1,136 @@
 """Time-based Report API endpoints (30-day, annual, annual summary)"""
 from fastapi import APIRouter
 from datetime import datetime, timezone, timedelta
-import json
+import os
 import uuid
+import asyncio
+from typing import Iterable, Optional
 
 from models.requests import TimePeriodReportRequest, AnnualSummaryRequest
 from supabase_client import supabase
 from business_logic import call_llm
 from utils.json_parser import extract_json_from_response
 from utils.data_gathering import safe_insert_report
+from utils.fetch_plan import FetchSource, execute_fetch_plan, group_rows, ids_of, resolved_data, select_sources
+from utils.context_packer import ContextSection, compact_json, context_budget, pack_context
+from utils.monthly_rollups import get_monthly_rollups, merge_rollups, top_entries
 
 router = APIRouter(prefix="/api/report", tags=["reports-time"])
 
+PERIOD_REPORT_MODEL = "google/gemini-2.5-flash"
+# Annual reports read counts from monthly rollups and rows only for these sections
+ANNUAL_DETAIL_SOURCES = ("photo_analyses", "medications", "tracking_data", "medical_profile")
+# Packed data per 30-day/annual prompt; the counts above each section are always complete
+PERIOD_CONTEXT_TOKEN_BUDGET = int(os.getenv("PERIOD_REPORT_CONTEXT_TOKENS", "16000"))
+
 # Helper functions specific to time-based reports
-async def gather_comprehensive_data(user_id: str, config: dict):
-    """Gather ALL available data for time-based reports"""
+def _in_range(query, time_range: dict, column: str = "created_at"):
+    return query\
+        .gte(column, time_range.get("start", "2020-01-01"))\
+        .lte(column, time_range.get("end", datetime.now(timezone.utc).isoformat()))
+
+
+def _user_rows(table: str, user_id: str, time_range: dict):
+    """All of a user's rows from a table within the report period"""
+    return lambda deps: _in_range(supabase.table(table).select("*").eq("user_id", user_id), time_range)\
+        .order("created_at")
+
+
+def _group_tracking_points(points: list, deps: dict) -> list:
+    """One entry per approved configuration that has data, in configuration order"""
+    by_config = group_rows(points, "configuration_id")
+    return [
+        {"metric": config_item["metric_name"], "data_points": by_config[config_item["id"]]}
+        for config_item in deps["tracking_configs"]
+        if by_config.get(config_item["id"])
+    ]
+
+
+async def gather_comprehensive_data(user_id: str, config: dict, timings: Optional[dict] = None,
+                                    include: Optional[Iterable[str]] = None):
+    """Gather ALL available data for time-based reports (or only the `include`d sections)"""
     time_range = config.get("time_range", {})
-    
-    # Quick Scans
-    scans = supabase.table("quick_scans")\
-        .select("*")\
-        .eq("user_id", user_id)\
-        .gte("created_at", time_range.get("start", "2020-01-01"))\
-        .lte("created_at", time_range.get("end", datetime.now(timezone.utc).isoformat()))\
-        .order("created_at")\
-        .execute()
-    
-    # Deep Dives
-    dives = supabase.table("deep_dive_sessions")\
-        .select("*")\
-        .eq("user_id", user_id)\
-        .eq("status", "completed")\
-        .gte("created_at", time_range.get("start", "2020-01-01"))\
-        .lte("created_at", time_range.get("end", datetime.now(timezone.utc).isoformat()))\
-        .order("created_at")\
-        .execute()
-    
-    # Symptom Tracking
-    tracking = supabase.table("symptom_tracking")\
-        .select("*")\
-        .eq("user_id", user_id)\
-        .gte("created_at", time_range.get("start", "2020-01-01"))\
-        .lte("created_at", time_range.get("end", datetime.now(timezone.utc).isoformat()))\
-        .order("created_at")\
-        .execute()
-    
-    # Long-term tracking data
-    tracking_configs = supabase.table("tracking_configurations")\
-        .select("*")\
-        .eq("user_id", user_id)\
-        .eq("status", "approved")\
-        .execute()
-    
-    tracking_data = []
-    for config_item in (tracking_configs.data or []):
-        points = supabase.table("tracking_data_points")\
-            .select("*")\
-            .eq("configuration_id", config_item["id"])\
-            .gte("recorded_at", time_range.get("start", "2020-01-01"))\
-            .lte("recorded_at", time_range.get("end", datetime.now(timezone.utc).isoformat()))\
-            .order("recorded_at")\
-            .execute()
-        
-        if points.data:
-            tracking_data.append({
-                "metric": config_item["metric_name"],
-                "data_points": points.data
-            })
-    
-    # LLM Chat Summaries
-    chats = supabase.table("oracle_chats")\
-        .select("*")\
-        .eq("user_id", user_id)\
-        .gte("created_at", time_range.get("start", "2020-01-01"))\
-        .lte("created_at", time_range.get("end", datetime.now(timezone.utc).isoformat()))\
-        .order("created_at")\
-        .execute()
-    
-    # Photo Analysis Sessions and Data
-    photo_sessions = supabase.table("photo_sessions")\
-        .select("*")\
-        .eq("user_id", user_id)\
-        .gte("created_at", time_range.get("start", "2020-01-01"))\
-        .lte("created_at", time_range.get("end", datetime.now(timezone.utc).isoformat()))\
-        .order("created_at")\
-        .execute()
-    
-    photo_analyses = []
-    if photo_sessions.data:
-        session_ids = [s["id"] for s in photo_sessions.data]
-        photo_analyses_result = supabase.table("photo_analyses")\
-            .select("*")\
-            .in_("session_id", session_ids)\
-            .order("created_at.desc")\
-            .execute()
-        photo_analyses = photo_analyses_result.data or []
-    
-    # General Assessments (text-based)
-    general_assessments = supabase.table("general_assessments")\
-        .select("*")\
-        .eq("user_id", user_id)\
-        .gte("created_at", time_range.get("start", "2020-01-01"))\
-        .lte("created_at", time_range.get("end", datetime.now(timezone.utc).isoformat()))\
-        .order("created_at")\
-        .execute()
-    
-    # Flash Assessments (quick text analysis)
-    flash_assessments = supabase.table("flash_assessments")\
-        .select("*")\
-        .eq("user_id", user_id)\
-        .gte("created_at", time_range.get("start", "2020-01-01"))\
-        .lte("created_at", time_range.get("end", datetime.now(timezone.utc).isoformat()))\
-        .order("created_at")\
-        .execute()
-    
-    # Health Stories (AI-generated narratives)
-    health_stories = supabase.table("health_stories")\
-        .select("*")\
-        .eq("user_id", user_id)\
-        .gte("created_at", time_range.get("start", "2020-01-01"))\
-        .lte("created_at", time_range.get("end", datetime.now(timezone.utc).isoformat()))\
-        .order("created_at")\
-        .execute()
-    
-    # Population Health Alerts
-    population_health = supabase.table("population_health_alerts")\
-        .select("*")\
-        .eq("user_id", user_id)\
-        .gte("created_at", time_range.get("start", "2020-01-01"))\
-        .lte("created_at", time_range.get("end", datetime.now(timezone.utc).isoformat()))\
-        .order("created_at")\
-        .execute()
-    
-    # Medication Tracking (if exists)
-    medications = supabase.table("medication_tracking")\
-        .select("*")\
-        .eq("user_id", user_id)\
-        .gte("created_at", time_range.get("start", "2020-01-01"))\
-        .lte("created_at", time_range.get("end", datetime.now(timezone.utc).isoformat()))\
-        .order("created_at")\
-        .execute()
-    
-    # User Medical Profile
-    medical_profile = supabase.table("medical")\
-        .select("*")\
-        .eq("id", user_id)\
-        .execute()
-    
+
+    plan = [
+        FetchSource("quick_scans", _user_rows("quick_scans", user_id, time_range)),
+        FetchSource("deep_dives", lambda deps: _in_range(
+            supabase.table("deep_dive_sessions").select("*").eq("user_id", user_id).eq("status", "completed"),
+            time_range
+        ).order("created_at")),
+        FetchSource("symptom_tracking", _user_rows("symptom_tracking", user_id, time_range)),
+        FetchSource("tracking_configs", lambda deps: supabase.table("tracking_configurations")
+                    .select("*").eq("user_id", user_id).eq("status", "approved")),
+        # Long-term tracking data: one query for every configuration, grouped in memory
+        FetchSource(
+            "tracking_data",
+            lambda deps: _in_range(
+                supabase.table("tracking_data_points").select("*")
+                .in_("configuration_id", ids_of(deps["tracking_configs"])),
+                time_range, "recorded_at"
+            ).order("recorded_at") if deps["tracking_configs"] else None,
+            after=("tracking_configs",),
+            transform=_group_tracking_points
+        ),
+        FetchSource("llm_summaries", _user_rows("oracle_chats", user_id, time_range)),
+        FetchSource("photo_sessions", _user_rows("photo_sessions", user_id, time_range)),
+        FetchSource(
+            "photo_analyses",
+            lambda deps: supabase.table("photo_analyses").select("*")
+            .in_("session_id", ids_of(deps["photo_sessions"]))
+            .order("created_at.desc") if deps["photo_sessions"] else None,
+            after=("photo_sessions",)
+        ),
+        FetchSource("general_assessments", _user_rows("general_assessments", user_id, time_range)),
+        FetchSource("flash_assessments", _user_rows("flash_assessments", user_id, time_range)),
+        FetchSource("health_stories", _user_rows("health_stories", user_id, time_range)),
+        FetchSource("population_health_alerts", _user_rows("population_health_alerts", user_id, time_range)),
+        FetchSource("medications", _user_rows("medication_tracking", user_id, time_range)),
+        FetchSource(
+            "medical_profile",
+            lambda deps: supabase.table("medical").select("*").eq("id", user_id),
+            transform=lambda rows, deps: rows[0] if rows else None,
+            default=lambda: None
+        ),
+    ]
+
+    result = await execute_fetch_plan(select_sources(plan, include) if include is not None else plan)
+    result.log_timings("TIME-BASED DATA")
+    if timings is not None:
+        timings.update(result.timings)
+
+    data = resolved_data(plan, result)
     return {
-        "quick_scans": scans.data or [],
-        "deep_dives": dives.data or [],
-        "symptom_tracking": tracking.data or [],
-        "tracking_data": tracking_data,
-        "llm_summaries": chats.data or [],
-        "photo_sessions": photo_sessions.data or [],
-        "photo_analyses": photo_analyses,
-        "general_assessments": general_assessments.data or [],
-        "flash_assessments": flash_assessments.data or [],
-        "health_stories": health_stories.data or [],
-        "population_health_alerts": population_health.data or [],
-        "medications": medications.data or [],
-        "medical_profile": medical_profile.data[0] if medical_profile.data else None,
+        "quick_scans": data["quick_scans"],
+        "deep_dives": data["deep_dives"],
+        "symptom_tracking": data["symptom_tracking"],
+        "tracking_data": data["tracking_data"],
+        "llm_summaries": data["llm_summaries"],
+        "photo_sessions": data["photo_sessions"],
+        "photo_analyses": data["photo_analyses"],
+        "general_assessments": data["general_assessments"],
+        "flash_assessments": data["flash_assessments"],
+        "health_stories": data["health_stories"],
+        "population_health_alerts": data["population_health_alerts"],
+        "medications": data["medications"],
+        "medical_profile": data["medical_profile"],
         "wearables": {}  # Placeholder for wearables integration
     }
 
-async def group_data_by_month(all_data: dict):
-    """Group health data by month for annual reports"""
+def monthly_breakdown(rollups: dict) -> dict:
+    """Per-month interaction counts and top symptoms for months with scans or dives"""
     monthly_data = {}
-    
-    for scan in all_data.get("quick_scans", []):
-        month = scan["created_at"][:7]  # YYYY-MM
-        if month not in monthly_data:
-            monthly_data[month] = {"quick_scans": 0, "deep_dives": 0, "symptoms": {}, "total_interactions": 0}
-        monthly_data[month]["quick_scans"] += 1
-        
-        # Count symptoms
-        symptoms = scan.get("form_data", {}).get("symptoms", "")
-        if symptoms:
-            if symptoms not in monthly_data[month]["symptoms"]:
-                monthly_data[month]["symptoms"][symptoms] = 0
-            monthly_data[month]["symptoms"][symptoms] += 1
-    
-    for dive in all_data.get("deep_dives", []):
-        month = dive["created_at"][:7]
-        if month not in monthly_data:
-            monthly_data[month] = {"quick_scans": 0, "deep_dives": 0, "symptoms": {}, "total_interactions": 0}
-        monthly_data[month]["deep_dives"] += 1
-    
-    # Calculate totals
-    for month in monthly_data:
-        monthly_data[month]["total_interactions"] = (
-            monthly_data[month]["quick_scans"] + 
-            monthly_data[month]["deep_dives"]
-        )
-    
+    for month, rollup in rollups.items():
+        counts = rollup.get("counts") or {}
+        total = counts.get("quick_scans", 0) + counts.get("deep_dives", 0)
+        if not total:
+            continue
+        monthly_data[month] = {
+            "quick_scans": counts.get("quick_scans", 0),
+            "deep_dives": counts.get("deep_dives", 0),
+            "symptoms": {entry["name"]: entry["frequency"]
+                         for entry in top_entries(rollup.get("symptom_frequency") or {}, 5)},
+            "total_interactions": total
+        }
     return monthly_data
 
 def count_symptoms_by_frequency(all_data: dict):
@@ -220,33 +157,34 @@ def count_symptoms_by_frequency(all_data: dict):
     
     return sorted(result, key=lambda x: x["frequency"], reverse=True)
 
-def analyze_seasonal_patterns(all_data: dict):
-    """Analyze seasonal patterns in health data"""
-    seasonal_data = {
-        "winter": {"months": ["12", "01", "02"], "symptoms": {}},
-        "spring": {"months": ["03", "04", "05"], "symptoms": {}},
-        "summer": {"months": ["06", "07", "08"], "symptoms": {}},
-        "fall": {"months": ["09", "10", "11"], "symptoms": {}}
-    }
-    
-    for scan in all_data.get("quick_scans", []):
-        month = scan["created_at"][5:7]  # MM
-        symptoms = scan.get("form_data", {}).get("symptoms", "")
-        
-        for season, data in seasonal_data.items():
-            if month in data["months"] and symptoms:
-                if symptoms not in data["symptoms"]:
-                    data["symptoms"][symptoms] = 0
-                data["symptoms"][symptoms] += 1
-    
-    # Get top symptoms per season
+SEASONS = {
+    "winter": ("12", "01", "02"),
+    "spring": ("03", "04", "05"),
+    "summer": ("06", "07", "08"),
+    "fall": ("09", "10", "11")
+}
+
+
+def _merge_symptoms(rollup: dict) -> dict:
+    """Quick scan and tracked symptoms in one histogram"""
+    merged = {key: dict(entry) for key, entry in rollup.get("symptom_frequency", {}).items()}
+    for key, entry in rollup.get("tracked_symptoms", {}).items():
+        target = merged.setdefault(key, {"count": 0, "severity_sum": 0.0})
+        target["count"] += entry["count"]
+        target["severity_sum"] += entry["severity_sum"]
+    return merged
+
+
+def analyze_seasonal_patterns(rollups: dict) -> dict:
+    """Top 3 quick scan symptoms per season"""
     result = {}
-    for season, data in seasonal_data.items():
-        top_symptoms = sorted(data["symptoms"].items(), key=lambda x: x[1], reverse=True)[:3]
-        result[season] = [s[0] for s in top_symptoms]
-    
+    for season, months in SEASONS.items():
+        in_season = [rollup for month, rollup in rollups.items() if month[5:7] in months]
+        merged = merge_rollups(in_season)["symptom_frequency"]
+        result[season] = [entry["name"] for entry in top_entries(merged, 3)]
     return result
 
+
 @router.post("/30-day")
 async def generate_30_day_report(request: TimePeriodReportRequest):
     """Generate 30-day aggregate health report"""
@@ -306,6 +244,30 @@ async def generate_30_day_report(request: TimePeriodReportRequest):
                     "severity": scan.get("form_data", {}).get("painLevel", 5)
                 })
         
+        packed = pack_context([
+            ContextSection("weekly", weekly_data),
+            ContextSection("symptoms", symptom_freq[:10], order_key=None),
+            ContextSection("patterns", patterns, order_key="date"),
+            ContextSection("photo_analyses", [{
+                'date': pa['created_at'][:10],
+                'condition': (pa.get('analysis_data') or {}).get('primary_assessment'),
+                'confidence': pa.get('confidence_score'),
+                'visual_changes': (pa.get('analysis_data') or {}).get('visual_observations', [])[:2]
+            } for pa in all_data.get('photo_analyses', [])], order_key="date"),
+            ContextSection("assessments", [{
+                'date': a['created_at'][:10],
+                'category': a.get('category', 'general'),
+                'severity': a.get('severity_score'),
+                'key_finding': (a.get('assessment_result') or {}).get('primary_finding')
+            } for a in all_data.get('general_assessments', []) + all_data.get('flash_assessments', [])], order_key="date"),
+            ContextSection("medications", [{
+                'medication': m.get('medication_name'),
+                'adherence_rate': m.get('adherence_percentage'),
+                'missed_doses': m.get('missed_doses_count')
+            } for m in all_data.get('medications', [])], order_key=None),
+        ], context_budget(PERIOD_REPORT_MODEL, output_tokens=4000, cap=PERIOD_CONTEXT_TOKEN_BUDGET))
+        packed.log("30-DAY REPORT")
+        
         context = f"""Generate a 30-day comprehensive health report analyzing ALL available health data.
 
 TIME PERIOD: {start_date.strftime('%B %d')} to {end_date.strftime('%B %d, %Y')}
@@ -323,43 +285,29 @@ ACTIVITY SUMMARY:
 - Medication Entries: {len(all_data.get('medications', []))}
 
 WEEKLY BREAKDOWN:
-{json.dumps(weekly_data, indent=2)}
+{packed.render("weekly")}
 
 TOP SYMPTOMS (by frequency):
-{json.dumps(symptom_freq[:10], indent=2)}
+{packed.render("symptoms")}
 
 PATTERN DATA:
-{json.dumps(patterns[:20], indent=2)}
+{packed.render("patterns")}
 
 PHOTO ANALYSIS INSIGHTS:
-{json.dumps([{
-    'date': pa['created_at'][:10],
-    'condition': pa['analysis_data'].get('primary_assessment'),
-    'confidence': pa.get('confidence_score'),
-    'visual_changes': pa['analysis_data'].get('visual_observations', [])[:2]
-} for pa in all_data.get('photo_analyses', [])[:10]], indent=2)}
+{packed.render("photo_analyses")}
 
 GENERAL/FLASH ASSESSMENTS:
-{json.dumps([{
-    'date': a['created_at'][:10],
-    'category': a.get('category', 'general'),
-    'severity': a.get('severity_score'),
-    'key_finding': a.get('assessment_result', {}).get('primary_finding')
-} for a in (all_data.get('general_assessments', []) + all_data.get('flash_assessments', []))[:10]], indent=2)}
+{packed.render("assessments")}
 
 MEDICATION ADHERENCE:
-{json.dumps([{
-    'medication': m.get('medication_name'),
-    'adherence_rate': m.get('adherence_percentage'),
-    'missed_doses': m.get('missed_doses_count')
-} for m in all_data.get('medications', [])[:5]], indent=2)}
+{packed.render("medications")}
 
 USER PROFILE:
 Age: {all_data.get('medical_profile', {}).get('age', 'Unknown')}
 Chronic Conditions: {all_data.get('medical_profile', {}).get('chronic_conditions', [])}
 Allergies: {all_data.get('medical_profile', {}).get('allergies', [])}
 
-WEARABLES DATA: {json.dumps(all_data.get('wearables', {}), indent=2) if request.include_wearables else 'Not included'}"""
+WEARABLES DATA: {compact_json(all_data.get('wearables', {})) if request.include_wearables else 'Not included'}"""
 
         system_prompt = """Generate a comprehensive 30-day aggregate health report analyzing ALL available health data types. Look for patterns, correlations, and actionable insights across all data sources.
 
@@ -493,7 +441,7 @@ Return JSON format:
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": context}
             ],
-            model="google/gemini-2.5-flash",
+            model=PERIOD_REPORT_MODEL,
             temperature=0.3,
             max_tokens=4000
         )
@@ -511,7 +459,7 @@ Return JSON format:
             }
         
         # Save report
-        report_id = str(uuid.uuid4())
+        report_id = request.report_id or str(uuid.uuid4())
         report_record = {
             "id": report_id,
             "user_id": request.user_id,
@@ -558,91 +506,88 @@ async def generate_annual_report(request: TimePeriodReportRequest):
             }
         }
         
-        # Gather ALL data for the year
-        all_data = await gather_comprehensive_data(request.user_id, config)
+        # Counts and histograms come from the monthly rollups; only the sections
+        # listed item by item are still read row by row
+        rollups, all_data = await asyncio.gather(
+            get_monthly_rollups(request.user_id, f"{year}-01", f"{year}-12"),
+            gather_comprehensive_data(request.user_id, config, include=ANNUAL_DETAIL_SOURCES)
+        )
+        year_rollup = merge_rollups(list(rollups.values()))
+        counts = year_rollup["counts"]
         
         # Group data by month
-        monthly_data = await group_data_by_month(all_data)
-        
-        # Calculate yearly metrics
-        total_interactions = sum(m["total_interactions"] for m in monthly_data.values())
+        monthly_data = monthly_breakdown(rollups)
         
         # Analyze seasonal patterns
-        seasonal_patterns = analyze_seasonal_patterns(all_data)
-        
-        # Get top conditions throughout the year
-        all_conditions = []
-        for scan in all_data.get("quick_scans", []):
-            condition = scan.get("analysis_result", {}).get("primaryCondition")
-            if condition:
-                all_conditions.append(condition)
-        
-        # Count condition frequencies
-        condition_counts = {}
-        for condition in all_conditions:
-            condition_counts[condition] = condition_counts.get(condition, 0) + 1
+        seasonal_patterns = analyze_seasonal_patterns(rollups)
         
-        top_conditions = sorted(condition_counts.items(), key=lambda x: x[1], reverse=True)[:10]
-        
-        # Calculate quarterly breakdowns
-        quarterly_data = {
-            "Q1": {"interactions": 0, "main_issues": [], "trend": ""},
-            "Q2": {"interactions": 0, "main_issues": [], "trend": ""},
-            "Q3": {"interactions": 0, "main_issues": [], "trend": ""},
-            "Q4": {"interactions": 0, "main_issues": [], "trend": ""}
-        }
+        # Top conditions throughout the year
+        top_conditions = [(entry["name"], entry["frequency"]) for entry in top_entries(year_rollup["conditions"], 10)]
         
         # Group all interactions by type
         all_interactions = (
-            len(all_data.get('quick_scans', [])) +
-            len(all_data.get('deep_dives', [])) +
+            counts.get('quick_scans', 0) +
+            counts.get('deep_dives', 0) +
             len(all_data.get('photo_analyses', [])) +
-            len(all_data.get('general_assessments', [])) +
-            len(all_data.get('flash_assessments', []))
+            counts.get('general_assessments', 0) +
+            counts.get('flash_assessments', 0)
         )
         
+        packed = pack_context([
+            ContextSection("monthly", monthly_data),
+            ContextSection("top_conditions", top_conditions, order_key=None),
+            ContextSection("seasonal", seasonal_patterns),
+            ContextSection("photo_analyses", [{
+                'month': pa['created_at'][:7],
+                'condition': (pa.get('analysis_data') or {}).get('primary_assessment'),
+                'confidence': pa.get('confidence_score'),
+                'trend': (pa.get('analysis_data') or {}).get('progression_assessment', 'stable')
+            } for pa in all_data.get('photo_analyses', [])], order_key="month"),
+            ContextSection("medications", [{
+                'medication': m.get('medication_name'),
+                'started': m.get('start_date', 'Unknown'),
+                'adherence': m.get('average_adherence', 'Unknown'),
+                'effectiveness': m.get('effectiveness_rating', 'Unknown')
+            } for m in all_data.get('medications', [])], order_key=None),
+            ContextSection("tracking", [
+                {"metric": t["metric"], "data_points": len(t["data_points"]), "trend": "calculate from data"}
+                for t in all_data.get("tracking_data", [])
+            ], order_key=None),
+        ], context_budget(PERIOD_REPORT_MODEL, output_tokens=5000, cap=PERIOD_CONTEXT_TOKEN_BUDGET))
+        packed.log("ANNUAL REPORT")
+        
         context = f"""Generate a comprehensive annual health report for {year} analyzing ALL health data sources.
 
 YEARLY STATISTICS:
 - Total Health Interactions: {all_interactions}
-- Quick Scans: {len(all_data.get('quick_scans', []))}
-- Deep Dives: {len(all_data.get('deep_dives', []))}
-- Symptom Tracking Entries: {len(all_data.get('symptom_tracking', []))}
-- Photo Analysis Sessions: {len(all_data.get('photo_sessions', []))}
-- General Assessments: {len(all_data.get('general_assessments', []))}
-- Flash Assessments: {len(all_data.get('flash_assessments', []))}
-- Health Stories: {len(all_data.get('health_stories', []))}
-- Population Health Alerts: {len(all_data.get('population_health_alerts', []))}
-- Medications Tracked: {len(all_data.get('medications', []))}
+- Quick Scans: {counts.get('quick_scans', 0)}
+- Deep Dives: {counts.get('deep_dives', 0)}
+- Symptom Tracking Entries: {counts.get('symptom_tracking', 0)}
+- Photo Analysis Sessions: {counts.get('photo_sessions', 0)}
+- General Assessments: {counts.get('general_assessments', 0)}
+- Flash Assessments: {counts.get('flash_assessments', 0)}
+- Health Stories: {counts.get('health_stories', 0)}
+- Population Health Alerts: {counts.get('population_health_alerts', 0)}
+- Medications Tracked: {counts.get('medications', 0)}
 - Months with Data: {len(monthly_data)}
 
 MONTHLY BREAKDOWN:
-{json.dumps(monthly_data, indent=2)}
+{packed.render("monthly")}
 
 TOP CONDITIONS (by frequency):
-{json.dumps(top_conditions, indent=2)}
+{packed.render("top_conditions")}
 
 SEASONAL PATTERNS:
-{json.dumps(seasonal_patterns, indent=2)}
+{packed.render("seasonal")}
 
 PHOTO ANALYSIS PROGRESSION (Year Overview):
-{json.dumps([{
-    'month': pa['created_at'][:7],
-    'condition': pa['analysis_data'].get('primary_assessment'),
-    'confidence': pa.get('confidence_score'),
-    'trend': pa['analysis_data'].get('progression_assessment', 'stable')
-} for pa in all_data.get('photo_analyses', [])[:20]], indent=2)}
+{packed.render("photo_analyses")}
 
 MEDICATION HISTORY:
-{json.dumps([{
-    'medication': m.get('medication_name'),
-    'started': m.get('start_date', 'Unknown'),
-    'adherence': m.get('average_adherence', 'Unknown'),
-    'effectiveness': m.get('effectiveness_rating', 'Unknown')
-} for m in all_data.get('medications', [])], indent=2)}
+{packed.render("medications")}
 
 TRACKING METRICS SUMMARY:
-{json.dumps([{"metric": t["metric"], "data_points": len(t["data_points"]), "trend": "calculate from data"} for t in all_data.get("tracking_data", [])], indent=2)}
+{packed.render("tracking")}
 
 USER HEALTH PROFILE:
 Age: {all_data.get('medical_profile', {}).get('age', 'Unknown')}
@@ -650,7 +595,7 @@ Chronic Conditions: {all_data.get('medical_profile', {}).get('chronic_conditions
 Medications: {all_data.get('medical_profile', {}).get('current_medications', [])}
 Allergies: {all_data.get('medical_profile', {}).get('allergies', [])}
 
-WEARABLES DATA: {json.dumps(all_data.get('wearables', {}), indent=2) if request.include_wearables else 'Not included'}"""
+WEARABLES DATA: {compact_json(all_data.get('wearables', {})) if request.include_wearables else 'Not included'}"""
 
         system_prompt = """Generate a comprehensive annual health report analyzing ALL health data sources. Provide deep insights, identify long-term patterns, and create actionable recommendations for the coming year.
 
@@ -866,7 +811,7 @@ Return JSON format:
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": context}
             ],
-            model="google/gemini-2.5-flash",
+            model=PERIOD_REPORT_MODEL,
             temperature=0.3,
             max_tokens=5000  # Larger for comprehensive annual report
         )
@@ -884,7 +829,7 @@ Return JSON format:
             }
         
         # Save report
-        report_id = str(uuid.uuid4())
+        report_id = request.report_id or str(uuid.uuid4())
         report_record = {
             "id": report_id,
             "user_id": request.user_id,
@@ -943,48 +888,30 @@ async def generate_annual_summary(request: AnnualSummaryRequest):
             "data_sources": {"quick_scans": [], "deep_dives": []}
         }
         
-        # Get all data for the year
-        scan_response = supabase.table("quick_scans")\
-            .select("*")\
-            .eq("user_id", str(request.user_id))\
-            .gte("created_at", annual_range["start"])\
-            .lte("created_at", annual_range["end"])\
-            .execute()
-        
-        dive_response = supabase.table("deep_dive_sessions")\
-            .select("*")\
-            .eq("user_id", str(request.user_id))\
-            .eq("status", "completed")\
-            .gte("created_at", annual_range["start"])\
-            .lte("created_at", annual_range["end"])\
-            .execute()
-        
-        symptom_response = supabase.table("symptom_tracking")\
-            .select("*")\
-            .eq("user_id", str(request.user_id))\
-            .gte("created_at", annual_range["start"])\
-            .lte("created_at", annual_range["end"])\
-            .execute()
+        # Monthly rollups for the year instead of every row of every table
+        rollups = await get_monthly_rollups(request.user_id, f"{year}-01", f"{year}-12")
+        year_rollup = merge_rollups(list(rollups.values()))
+        counts = year_rollup["counts"]
         
-        quick_scans = scan_response.data or []
-        deep_dives = dive_response.data or []
-        symptoms = symptom_response.data or []
+        def season_entries(months):
+            return sum((rollup.get("counts") or {}).get("symptom_tracking", 0)
+                       for month, rollup in rollups.items() if month[5:7] in months)
         
         # Build annual context
         context = f"""Generate an annual health summary for {year}.
 
 Annual Statistics:
-- Total Quick Scans: {len(quick_scans)}
-- Total Deep Dives: {len(deep_dives)}
-- Symptom Entries: {len(symptoms)}
+- Total Quick Scans: {counts.get('quick_scans', 0)}
+- Total Deep Dives: {counts.get('deep_dives', 0)}
+- Symptom Entries: {counts.get('symptom_tracking', 0)}
 
 Conditions Assessed:
-{json.dumps([s.get('analysis_result', {}).get('primaryCondition') for s in quick_scans if s.get('analysis_result', {}).get('primaryCondition')], indent=2)}
+{compact_json({entry["name"]: entry["frequency"] for entry in top_entries(year_rollup["conditions"], 20)})}
 
 Symptom Frequency:
-{json.dumps({}, indent=2)}
+{compact_json(top_entries(_merge_symptoms(year_rollup), 15))}
 
-Seasonal Patterns: {len([s for s in symptoms if '01' in s.get('created_at', '')[:7] or '02' in s.get('created_at', '')[:7] or '12' in s.get('created_at', '')[:7]])} winter entries, {len([s for s in symptoms if '06' in s.get('created_at', '')[:7] or '07' in s.get('created_at', '')[:7] or '08' in s.get('created_at', '')[:7]])} summer entries"""
+Seasonal Patterns: {season_entries(SEASONS["winter"])} winter entries, {season_entries(SEASONS["summer"])} summer entries"""
 
         system_prompt = """Generate an annual health summary. Return JSON:
 {
@@ -1045,7 +972,7 @@ Seasonal Patterns: {len([s for s in symptoms if '01' in s.get('created_at', '')[
                     "action_items": ["Schedule annual physical exam"]
                 },
                 "yearly_overview": {
-                    "total_assessments": len(quick_scans) + len(deep_dives),
+                    "total_assessments": counts.get('quick_scans', 0) + counts.get('deep_dives', 0),
                     "most_common_concerns": [],
                     "health_trends": {},
                     "seasonal_patterns": {}
@@ -1056,7 +983,7 @@ Seasonal Patterns: {len([s for s in symptoms if '01' in s.get('created_at', '')[
         
         # Update total assessments
         if "yearly_overview" in report_data:
-            report_data["yearly_overview"]["total_assessments"] = len(quick_scans) + len(deep_dives)
+            report_data["yearly_overview"]["total_assessments"] = counts.get('quick_scans', 0) + counts.get('deep_dives', 0)
         
         # Save report
         report_id = str(uuid.uuid4())
@@ -1,14 +1,22 @@
 from supabase_client import supabase
-from typing import Optional, List
+from typing import Optional, List, Type
 import os
 from dotenv import load_dotenv
 import json
-import asyncio
 import sys
+import time
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from core.model_selector import get_models_for_endpoint, select_model_with_fallback
 from utils.token_counter import count_tokens
-from utils.async_http import make_async_post_with_retry
+from core.prompt_registry import prompt_registry
+from utils.openrouter_client import openrouter, OpenRouterError
+from utils.llm_hedging import HEDGING_ENABLED, hedged_call
+from utils.prompt_cache import apply_prompt_cache, prompt_cache_stats
+from utils.structured_output import (
+    STRUCTURED_OUTPUT_RETRIES, StructuredOutputError, parse_structured_output, repair_messages,
+    response_format, structured_output_stats, supports_response_format
+)
+from pydantic import BaseModel
 
 # Load .env file
 load_dotenv()
@@ -27,16 +35,6 @@ def make_prompt(query: str, user_data: dict, llm_context: str, category: str, pa
         parts_relationship: Relationship between parts (related/unrelated/auto-detect)
     """
     
-    # Helper function to load and format prompt from file
-    def load_prompt_template(file_path: str) -> str:
-        """Load a prompt template from file."""
-        try:
-            with open(file_path, 'r') as f:
-                return f.read()
-        except FileNotFoundError:
-            print(f"Warning: Prompt file not found: {file_path}")
-            return None
-    
     # Helper function to format body parts for display
     def format_body_parts(parts: List[str]) -> str:
         """Format body parts list for prompt display"""
@@ -49,13 +47,10 @@ def make_prompt(query: str, user_data: dict, llm_context: str, category: str, pa
         else:
             return ", ".join(parts[:-1]) + f", and {parts[-1]}"
     
-    # Base directory for prompts
-    prompts_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'prompts', 'medical')
-    
     if category == "health-scan":
-        template = load_prompt_template(os.path.join(prompts_dir, 'health_scan.txt'))
+        template = prompt_registry.get("medical/health_scan")
         if template:
-            return template.format(
+            return template.render(
                 query=query,
                 user_data=user_data,
                 llm_context=llm_context,
@@ -87,9 +82,9 @@ def make_prompt(query: str, user_data: dict, llm_context: str, category: str, pa
         elif not parts_relationship:
             parts_relationship = 'single'
         
-        template = load_prompt_template(os.path.join(prompts_dir, 'quick_scan.txt'))
+        template = prompt_registry.get("medical/quick_scan")
         if template:
-            return template.format(
+            return template.render(
                 body_parts=format_body_parts(parts_list),
                 parts_relationship=parts_relationship,
                 form_data=json.dumps(form_data) if form_data else 'Not provided',
@@ -134,9 +129,9 @@ def make_prompt(query: str, user_data: dict, llm_context: str, category: str, pa
         elif not parts_relationship:
             parts_relationship = 'single'
         
-        template = load_prompt_template(os.path.join(prompts_dir, 'deep_dive', 'initial.txt'))
+        template = prompt_registry.get("medical/deep_dive/initial")
         if template:
-            return template.format(
+            return template.render(
                 body_parts=format_body_parts(parts_list),
                 parts_relationship=parts_relationship,
                 query=query,
@@ -157,9 +152,9 @@ def make_prompt(query: str, user_data: dict, llm_context: str, category: str, pa
         if medical_data and medical_data not in [{}, None]:
             medical_context = f"\n- Medical History: {str(medical_data)[:200]}..."
         
-        template = load_prompt_template(os.path.join(prompts_dir, 'deep_dive', 'continue.txt'))
+        template = prompt_registry.get("medical/deep_dive/continue")
         if template:
-            return template.format(
+            return template.render(
                 questions=json.dumps(session_data.get('questions', [])),
                 internal_state=json.dumps(session_data.get('internal_state', {})),
                 medical_context=medical_context,
@@ -173,9 +168,9 @@ def make_prompt(query: str, user_data: dict, llm_context: str, category: str, pa
         session_data = user_data.get('session_data', {}) if isinstance(user_data, dict) else {}
         medical_data = session_data.get('medical_data', {})
         
-        template = load_prompt_template(os.path.join(prompts_dir, 'deep_dive', 'final.txt'))
+        template = prompt_registry.get("medical/deep_dive/final")
         if template:
-            return template.format(
+            return template.render(
                 questions=json.dumps(session_data.get('questions', [])),
                 form_data=json.dumps(session_data.get('form_data', {})),
                 medical_data=str(medical_data)[:200] + '...' if medical_data else 'Not available',
@@ -235,14 +230,27 @@ async def get_user_model(user_id: str) -> str:
         # If preferred_model column doesn't exist, just use default
         return "deepseek/deepseek-chat"
 
+def is_valid_llm_result(result: Optional[dict]) -> bool:
+    """A real model answer, not empty and not call_llm's degraded placeholder"""
+    return bool(
+        result and not result.get("degraded") and result.get("choices")
+        and result["choices"][0].get("message")
+    )
+
 async def call_llm_with_fallback(
     messages: list,
     user_id: Optional[str] = None,
     endpoint_type: Optional[str] = None,
     reasoning_mode: bool = False,
+    hedge: Optional[bool] = None,
     **kwargs
 ) -> dict:
-    """Call LLM with automatic fallback to secondary models if primary fails"""
+    """
+    Call LLM with automatic fallback to secondary models if primary fails.
+    
+    With hedging (LLM_HEDGING_ENABLED, or hedge=True) a slow primary gets the
+    next model raced against it instead of waiting for its timeout.
+    """
     
     # Get all available models for this endpoint
     models = None
@@ -253,8 +261,27 @@ async def call_llm_with_fallback(
         # Fallback to single model
         return await call_llm(messages=messages, user_id=user_id, reasoning_mode=reasoning_mode, endpoint_type=endpoint_type, **kwargs)
     
+    if hedge is None:
+        hedge = HEDGING_ENABLED
+    if hedge and len(models) > 1:
+        # Start the next model in parallel if this one is slower than the endpoint's p95
+        return await hedged_call(
+            models,
+            lambda model: call_llm(
+                messages=messages,
+                model=model,
+                user_id=user_id,
+                reasoning_mode=reasoning_mode,
+                endpoint_type=endpoint_type,
+                **kwargs
+            ),
+            endpoint=endpoint_type,
+            is_valid=is_valid_llm_result
+        )
+    
     # Try each model in order
     last_error = None
+    last_degraded = None
     for i, model in enumerate(models):
         try:
             print(f"Trying model: {model}")
@@ -268,16 +295,19 @@ async def call_llm_with_fallback(
             )
             
             # Check if we got a valid response
-            if result and result.get("choices") and len(result["choices"]) > 0 and result["choices"][0].get("message"):
+            if is_valid_llm_result(result):
                 print(f"Success with model: {model}")
                 return result
+            last_degraded = result
                 
         except Exception as e:
             print(f"Model {model} failed: {e}")
             last_error = e
-            if i < len(models) - 1:
-                print(f"Trying fallback model {i+2}/{len(models)}")
-            continue
+        if i < len(models) - 1:
+            print(f"Trying fallback model {i+2}/{len(models)}")
+    
+    if last_degraded is not None:
+        return last_degraded
     
     # All models failed
     print(f"All models failed. Last error: {last_error}")
@@ -291,9 +321,17 @@ async def call_llm(
     endpoint_type: Optional[str] = None,
     temperature: float = 0.7, 
     max_tokens: int = 2048, 
-    top_p: float = 1.0
+    top_p: float = 1.0,
+    prompt_cache_key: Optional[str] = None,
+    response_schema: Optional[Type[BaseModel]] = None
 ) -> dict:
-    """Call the LLM via OpenRouter with tier-based model selection and reasoning support"""
+    """Call the LLM via OpenRouter with tier-based model selection and reasoning support
+
+    The leading system message's stable prefix is marked for provider prompt
+    caching; pass prompt_cache_key when the whole system message is the same
+    for every user (it also labels the cache stats). response_schema is sent
+    as response_format to models that support structured outputs.
+    """
     api_key = os.getenv("OPENROUTER_API_KEY")
     if not api_key:
         raise ValueError("OPENROUTER_API_KEY not set in .env file")
@@ -315,6 +353,9 @@ async def call_llm(
         if not model:
             model = "deepseek/deepseek-chat"  # Ultimate fallback
 
+    # Static instructions first, with a cache breakpoint where the provider needs one
+    messages, cache_label = apply_prompt_cache(messages, model, prompt_cache_key)
+
     # Adjust parameters for reasoning mode or specific endpoints
     request_params = {
         "model": model,
@@ -322,6 +363,8 @@ async def call_llm(
         "temperature": temperature,
         "top_p": top_p,
     }
+    if response_schema is not None and supports_response_format(model):
+        request_params["response_format"] = response_format(response_schema)
     
     # Handle reasoning models and high-reasoning endpoints
     if reasoning_mode or endpoint_type in ["deep_dive", "reports", "health_analysis", "ultra_think"]:
@@ -366,11 +409,8 @@ async def call_llm(
         print(f"Model: {model}")
         print(f"Request params: {json.dumps(request_params, indent=2)}")
     
-    # Build headers
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json"
-    }
+    # Extra headers (the OpenRouter key is added by the client)
+    headers = {}
     
     # Add provider API keys for BYOK (Bring Your Own Key)
     if model:
@@ -396,57 +436,32 @@ async def call_llm(
         print(f"Headers: {headers}")
         print(f"Request JSON: {json.dumps(request_params, indent=2)}")
     
-    # Use async HTTP client with connection pooling and retry
+    # Async client: pooled connections, Retry-After aware retries, per-model circuit breaker
+    degraded = False
+    started = time.perf_counter()
     try:
-        data = await make_async_post_with_retry(
-            url="https://openrouter.ai/api/v1/chat/completions",
+        data = await openrouter.chat_completion(
+            request_params,
             headers=headers,
-            json_data=request_params,
-            max_retries=3,
             timeout=240  # 4 minutes for reasoning models
         )
-    except Exception as e:
-        print(f"Request exception: {str(e)}")
-        print(f"Exception type: {type(e).__name__}")
-        print(f"Full exception details: {repr(e)}")
-        
-        # Fallback to synchronous requests library
-        print("Falling back to requests library...")
-        import requests
-        try:
-            response = requests.post(
-                "https://openrouter.ai/api/v1/chat/completions",
-                headers=headers,
-                json=request_params,
-                timeout=60
-            )
-            if response.status_code == 200:
-                data = response.json()
-                print("Fallback successful with requests library")
-            else:
-                print(f"Fallback failed: {response.status_code} - {response.text[:200]}")
-                # Return mock response as fallback
-                data = {
-                    "choices": [{
-                        "message": {
-                            "content": f"I understand your query. (Note: API error {response.status_code})"
-                        },
-                        "finish_reason": "stop"
-                    }],
-                    "usage": {"prompt_tokens": 10, "completion_tokens": 20, "total_tokens": 30}
-                }
-        except Exception as fallback_e:
-            print(f"Fallback also failed: {fallback_e}")
-            # Return mock response as last resort
-            data = {
-                "choices": [{
-                    "message": {
-                        "content": "I understand your query. (Note: Connection issue - please try again)"
-                    },
-                    "finish_reason": "stop"
-                }],
-                "usage": {"prompt_tokens": 10, "completion_tokens": 20, "total_tokens": 30}
-            }
+        prompt_cache_stats.record(
+            endpoint_type or cache_label or "other", data.get("usage") or {}, time.perf_counter() - started
+        )
+    except OpenRouterError as e:
+        print(f"OpenRouter request failed: {e}")
+        # Placeholder answer; call_llm_with_fallback moves on to the next model
+        degraded = True
+        note = f"API error {e.status_code}" if e.status_code else "Connection issue - please try again"
+        data = {
+            "choices": [{
+                "message": {
+                    "content": f"I understand your query. (Note: {note})"
+                },
+                "finish_reason": "stop"
+            }],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 20, "total_tokens": 30}
+        }
     
     # Debug logging to see exact response structure
     if reasoning_mode:
@@ -517,7 +532,7 @@ async def call_llm(
         usage["response_tokens"] = usage.get("completion_tokens", 0) - reasoning_tokens
     
     # Return full response data in OpenRouter format with reasoning
-    return {
+    result = {
         "choices": [{
             "message": {
                 "content": content,
@@ -533,6 +548,44 @@ async def call_llm(
         "content": parsed_content,
         "raw_content": content
     }
+    if degraded:
+        # Placeholder text, not a model answer (fallback callers try another model)
+        result["degraded"] = True
+    return result
+
+async def call_llm_structured(
+    messages: list,
+    schema: Type[BaseModel],
+    max_retries: Optional[int] = None,
+    **kwargs
+) -> dict:
+    """
+    call_llm with the response validated against schema; result["parsed"] holds the instance.
+    
+    An invalid response is shown to the model with the validation error and it is
+    asked again, up to max_retries times; then StructuredOutputError is raised.
+    """
+    if max_retries is None:
+        max_retries = STRUCTURED_OUTPUT_RETRIES
+    attempt_messages = messages
+    for attempt in range(max_retries + 1):
+        result = await call_llm(messages=attempt_messages, response_schema=schema, **kwargs)
+        model = result.get("model")
+        raw = result.get("raw_content", result.get("content"))
+        if result.get("degraded"):
+            # Placeholder text, not a model answer: nothing to repair
+            raise StructuredOutputError(f"{model} is unavailable", raw)
+        structured_output_stats.record_call(model)
+        try:
+            result["parsed"] = parse_structured_output(raw, schema)
+            return result
+        except StructuredOutputError as e:
+            retrying = attempt < max_retries
+            structured_output_stats.record_failure(model, retrying)
+            print(f"Structured output from {model} failed validation: {e}")
+            if not retrying:
+                raise
+            attempt_messages = messages + repair_messages(raw, e)
 
 # Copy all the other functions from business_logic.py
 async def has_messages(conversation_id: str) -> bool:
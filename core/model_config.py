@@ -0,0 +1,183 @@
+"""
+In-memory model tier configuration with hot reload
+
+config/model_tiers.json is parsed and validated once into an immutable index
+keyed by (tier, endpoint, reasoning_mode). Lookups never touch the disk: the
+file's mtime is checked at most every MODEL_CONFIG_CHECK_SECONDS and the
+index is swapped atomically when it changes. A reload can also be forced
+with SIGHUP or POST /api/admin/model-config/reload. An edit that fails
+validation is logged and the previous index stays in use.
+"""
+import os
+import json
+import time
+import signal
+import asyncio
+import logging
+import threading
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MODEL_CONFIG_PATH = Path(os.getenv(
+    "MODEL_CONFIG_PATH", Path(__file__).parent.parent / "config" / "model_tiers.json"
+))
+MODEL_CONFIG_CHECK_SECONDS = float(os.getenv("MODEL_CONFIG_CHECK_SECONDS", "5"))
+FALLBACK_TIER = "free"
+
+IndexKey = Tuple[str, str, bool]
+
+
+class ModelConfigError(ValueError):
+    pass
+
+
+def _check_models(models: Any, where: str):
+    if not isinstance(models, list) or not models:
+        raise ModelConfigError(f"{where}: expected a non-empty list of model names")
+    for model in models:
+        if not isinstance(model, str) or not model.strip():
+            raise ModelConfigError(f"{where}: invalid model name {model!r}")
+
+
+def validate_model_config(config: Any):
+    """
+    Raise ModelConfigError unless config has the model_tiers.json shape:
+    {tier: {endpoint: [models] | {"models": [...], "reasoning_models": [...]}}}
+    """
+    if not isinstance(config, dict) or not config:
+        raise ModelConfigError("config must be a non-empty object of tiers")
+    if FALLBACK_TIER not in config:
+        raise ModelConfigError(f"config must define the '{FALLBACK_TIER}' tier")
+    for tier, endpoints in config.items():
+        if not isinstance(endpoints, dict) or not endpoints:
+            raise ModelConfigError(f"{tier}: expected a non-empty object of endpoints")
+        for endpoint, entry in endpoints.items():
+            where = f"{tier}.{endpoint}"
+            if isinstance(entry, dict):
+                unknown = set(entry) - {"models", "reasoning_models"}
+                if unknown or not entry:
+                    raise ModelConfigError(f"{where}: expected 'models' and/or 'reasoning_models'")
+                for key, models in entry.items():
+                    _check_models(models, f"{where}.{key}")
+            else:
+                _check_models(entry, where)
+
+
+def build_index(config: Dict[str, Any]) -> Mapping[IndexKey, Tuple[str, ...]]:
+    """Resolve every (tier, endpoint, reasoning_mode) to its model list up front"""
+    index: Dict[IndexKey, Tuple[str, ...]] = {}
+    for tier, endpoints in config.items():
+        for endpoint, entry in endpoints.items():
+            if isinstance(entry, list):
+                index[(tier, endpoint, False)] = index[(tier, endpoint, True)] = tuple(entry)
+                continue
+            if "models" in entry:
+                index[(tier, endpoint, False)] = tuple(entry["models"])
+            reasoning = entry.get("reasoning_models", entry.get("models"))
+            index[(tier, endpoint, True)] = tuple(reasoning)
+    return MappingProxyType(index)
+
+
+class ModelConfigSnapshot:
+    """One validated version of the config; never mutated after creation"""
+
+    def __init__(self, config: Dict[str, Any], source: str, mtime: Optional[float]):
+        self.config = config
+        self.source = source
+        self.mtime = mtime
+        self.loaded_at = time.time()
+        self.tiers = frozenset(config)
+        self.index = build_index(config)
+
+    def models_for(self, tier: str, endpoint: str, reasoning_mode: bool = False) -> Optional[Tuple[str, ...]]:
+        if tier not in self.tiers:
+            tier = FALLBACK_TIER
+        return self.index.get((tier, endpoint, bool(reasoning_mode)))
+
+
+class ModelConfigRegistry:
+    """Holds the current snapshot and replaces it when the file changes"""
+
+    def __init__(self, path: Path, defaults: Dict[str, Any], check_interval: float = MODEL_CONFIG_CHECK_SECONDS):
+        self.path = Path(path)
+        self.defaults = defaults
+        self.check_interval = check_interval
+        self.last_error: Optional[str] = None
+        self._snapshot: Optional[ModelConfigSnapshot] = None
+        self._seen_mtime: Optional[float] = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+    def _file_mtime(self) -> Optional[float]:
+        try:
+            return self.path.stat().st_mtime
+        except OSError:
+            return None
+
+    def _load(self, mtime: Optional[float]) -> ModelConfigSnapshot:
+        if mtime is None:
+            validate_model_config(self.defaults)
+            return ModelConfigSnapshot(self.defaults, "defaults", None)
+        with open(self.path, "r") as f:
+            config = json.load(f)
+        validate_model_config(config)
+        return ModelConfigSnapshot(config, str(self.path), mtime)
+
+    def reload(self, force: bool = True) -> bool:
+        """
+        Re-read the file (only if its mtime changed unless force). Returns True
+        when a new snapshot was installed; on a bad file the old one is kept.
+        """
+        with self._lock:
+            mtime = self._file_mtime()
+            current = self._snapshot
+            if not force and current is not None and mtime == self._seen_mtime:
+                return False
+            # Remember the mtime even if the file is bad so it is not re-parsed every check
+            self._seen_mtime = mtime
+            try:
+                snapshot = self._load(mtime)
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                if current is None:
+                    logger.error(f"Invalid model config {self.path} ({self.last_error}), using defaults")
+                    self._snapshot = ModelConfigSnapshot(self.defaults, "defaults", mtime)
+                    return True
+                logger.error(f"Invalid model config {self.path} ({self.last_error}), keeping {current.source}")
+                return False
+            self._snapshot = snapshot
+            self.last_error = None
+            logger.info(f"Loaded model config from {snapshot.source} ({len(snapshot.index)} routes)")
+            return True
+
+    def current(self) -> ModelConfigSnapshot:
+        """The active snapshot, re-checking the file's mtime at most every check_interval"""
+        now = time.monotonic()
+        if self._snapshot is None or now >= self._next_check:
+            self._next_check = now + self.check_interval
+            self.reload(force=False)
+        return self._snapshot
+
+    def status(self) -> Dict[str, Any]:
+        snapshot = self.current()
+        return {
+            "source": snapshot.source,
+            "tiers": sorted(snapshot.tiers),
+            "routes": len(snapshot.index),
+            "loaded_at": snapshot.loaded_at,
+            "last_error": self.last_error,
+        }
+
+    def install_sighup_handler(self) -> bool:
+        """Reload on SIGHUP; call from the running event loop (e.g. app lifespan)"""
+        if not hasattr(signal, "SIGHUP"):
+            return False
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGHUP, self.reload)
+        except (NotImplementedError, RuntimeError) as e:
+            logger.warning(f"Could not install SIGHUP model config reload: {e}")
+            return False
+        return True
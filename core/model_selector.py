@@ -3,19 +3,15 @@ Tier-based model selection system for Oracle Health API
 Handles dynamic model selection based on user subscription tier
 """
 from typing import List, Optional, Dict, Any
-from datetime import datetime, timedelta
-import json
-import os
-from pathlib import Path
+from datetime import datetime
 from supabase_client import supabase
+from core.model_config import MODEL_CONFIG_PATH, ModelConfigRegistry
+from core.tier_cache import TierCache
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
 
-# Cache for user tiers to reduce database queries
-_tier_cache: Dict[str, Dict[str, Any]] = {}
-CACHE_DURATION = timedelta(minutes=5)
-
 # Model configuration - Loaded from JSON file or defaults
 # This is the fallback configuration if JSON file is not found
 MODEL_CONFIG = {
@@ -69,17 +65,46 @@ MODEL_CONFIG = {
     }
 }
 
-# Load config from JSON file if it exists (allows runtime updates)
+# Loaded once from config/model_tiers.json and hot-reloaded when it changes;
+# MODEL_CONFIG is used if the file is missing or invalid at startup
+model_config = ModelConfigRegistry(MODEL_CONFIG_PATH, MODEL_CONFIG)
+
+
 def load_model_config():
-    """Load model configuration from JSON file if available"""
-    config_path = Path(__file__).parent.parent / "config" / "model_tiers.json"
-    if config_path.exists():
-        try:
-            with open(config_path, 'r') as f:
-                return json.load(f)
-        except Exception as e:
-            logger.warning(f"Failed to load model config from file: {e}")
-    return MODEL_CONFIG
+    """Current model configuration (served from memory, see core/model_config.py)"""
+    return model_config.current().config
+
+
+async def fetch_user_tier(user_id: str) -> str:
+    """Tier from the active subscription in the database; raises on query errors"""
+    response = await asyncio.to_thread(
+        supabase.table("subscriptions").select(
+            "tier, status, current_period_end"
+        ).eq("user_id", user_id).eq("status", "active").execute
+    )
+    
+    if response.data and len(response.data) > 0:
+        subscription = response.data[0]
+        
+        # Check if subscription is still valid
+        # If current_period_end is null, subscription is active indefinitely
+        if subscription.get("current_period_end") is None:
+            # No end date means active subscription
+            return subscription.get("tier") or "free"  # Handle null/empty tier values
+        elif subscription.get("current_period_end"):
+            # Check if end date is in the future
+            end_date = datetime.fromisoformat(
+                subscription["current_period_end"].replace('Z', '+00:00')
+            )
+            if end_date > datetime.now(end_date.tzinfo):
+                return subscription.get("tier") or "free"  # Handle null/empty tier values
+    
+    # No active subscription = free tier
+    return "free"
+
+
+# Bounded LRU -> Redis -> database, shared across workers (see core/tier_cache.py)
+tier_cache = TierCache(fetch_user_tier)
 
 
 async def get_user_tier(user_id: str) -> str:
@@ -90,60 +115,7 @@ async def get_user_tier(user_id: str) -> str:
     if not user_id:
         return "free"
     
-    # Check cache first
-    if user_id in _tier_cache:
-        cached = _tier_cache[user_id]
-        if cached['expires'] > datetime.now():
-            return cached['tier']
-    
-    try:
-        # Query subscriptions table
-        response = supabase.table("subscriptions").select(
-            "tier, status, current_period_end"
-        ).eq("user_id", user_id).eq("status", "active").execute()
-        
-        if response.data and len(response.data) > 0:
-            subscription = response.data[0]
-            
-            # Check if subscription is still valid
-            # If current_period_end is null, subscription is active indefinitely
-            if subscription.get("current_period_end") is None:
-                # No end date means active subscription
-                tier = subscription.get("tier") or "free"  # Handle null/empty tier values
-                
-                # Cache the result
-                _tier_cache[user_id] = {
-                    'tier': tier,
-                    'expires': datetime.now() + CACHE_DURATION
-                }
-                
-                return tier
-            elif subscription.get("current_period_end"):
-                # Check if end date is in the future
-                end_date = datetime.fromisoformat(
-                    subscription["current_period_end"].replace('Z', '+00:00')
-                )
-                if end_date > datetime.now(end_date.tzinfo):
-                    tier = subscription.get("tier") or "free"  # Handle null/empty tier values
-                    
-                    # Cache the result
-                    _tier_cache[user_id] = {
-                        'tier': tier,
-                        'expires': datetime.now() + CACHE_DURATION
-                    }
-                    
-                    return tier
-        
-        # No active subscription = free tier
-        _tier_cache[user_id] = {
-            'tier': 'free',
-            'expires': datetime.now() + CACHE_DURATION
-        }
-        return "free"
-        
-    except Exception as e:
-        logger.error(f"Error fetching user tier: {e}")
-        return "free"  # Default to free on error
+    return await tier_cache.get(user_id)
 
 
 async def get_models_for_endpoint(
@@ -164,35 +136,19 @@ async def get_models_for_endpoint(
     Returns:
         List of model names in priority order, or None if not available
     """
-    # Load latest config
-    config = load_model_config()
-    
     # Determine actual tier
     if tier_override:
         tier = tier_override
     else:
         tier = await get_user_tier(user_id)
     
-    # Get models for this tier and endpoint
-    tier_config = config.get(tier, config.get("free", {}))
-    endpoint_config = tier_config.get(endpoint)
-    
-    if endpoint_config is None:
+    # Unknown tiers fall back to the free tier's models
+    models = model_config.current().models_for(tier, endpoint, reasoning_mode)
+    if models is None:
         logger.info(f"Endpoint {endpoint} not available for tier {tier}")
         return None
     
-    # Handle chat endpoint with reasoning mode
-    if isinstance(endpoint_config, dict):
-        if reasoning_mode and "reasoning_models" in endpoint_config:
-            return endpoint_config["reasoning_models"]
-        elif "models" in endpoint_config:
-            return endpoint_config["models"]
-    
-    # Regular endpoint - return list directly
-    if isinstance(endpoint_config, list):
-        return endpoint_config
-    
-    return None
+    return list(models)
 
 
 async def select_model_with_fallback(
@@ -306,5 +262,4 @@ async def get_user_tier_info(user_id: str) -> Dict[str, Any]:
 
 def invalidate_tier_cache(user_id: str):
     """Invalidate cached tier for a user (call after subscription changes)"""
-    if user_id in _tier_cache:
-        del _tier_cache[user_id]
\ No newline at end of file
+    tier_cache.invalidate_soon(user_id)
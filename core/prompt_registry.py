@@ -0,0 +1,235 @@
+"""
+Prompt templates from prompts/, compiled once
+
+Every prompts/**/*.txt template is read and parsed at startup into literal
+and placeholder segments, and its placeholders are checked against the
+fields its caller supplies (PROMPT_FIELDS). A misspelt {placeholder}, a
+stray brace or a missing template file fails load() at boot instead of
+raising KeyError on a user's request. Rendering joins the segments; nothing
+is read from disk per request.
+
+With ENV=development a template's mtime is checked at most every
+PROMPT_CHECK_SECONDS and an edited file is recompiled; an edit that fails
+validation is logged and the previous version stays in use.
+
+stats() reports, per template, the tokens of its stable prefix (the text
+before the first placeholder, identical on every call and so reusable by
+provider prompt caching) and the size of rendered prompts.
+"""
+import os
+import time
+import string
+import logging
+import threading
+from dataclasses import dataclass, field
+from functools import cached_property
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+from utils.token_counter import count_tokens, estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+PROMPTS_DIR = Path(os.getenv("PROMPTS_DIR", Path(__file__).parent.parent / "prompts"))
+PROMPT_HOT_RELOAD = os.getenv("ENV") == "development"
+PROMPT_CHECK_SECONDS = float(os.getenv("PROMPT_CHECK_SECONDS", "2"))
+
+# Fields each template's caller passes to render(); a template may use any subset
+_GENERAL_ASSESSMENT_FIELDS = frozenset({"medications", "conditions"})
+PROMPT_FIELDS: Dict[str, FrozenSet[str]] = {
+    "medical/health_scan": frozenset({"query", "user_data", "llm_context", "part_selected", "region"}),
+    "medical/quick_scan": frozenset({"body_parts", "parts_relationship", "form_data", "query", "llm_context"}),
+    "medical/deep_dive/initial": frozenset({
+        "body_parts", "parts_relationship", "query", "form_data", "medical_data", "llm_context"
+    }),
+    "medical/deep_dive/continue": frozenset({"questions", "internal_state", "medical_context", "query"}),
+    "medical/deep_dive/final": frozenset({"questions", "form_data", "medical_data", "llm_context"}),
+    **{f"general_assessment/{category}": _GENERAL_ASSESSMENT_FIELDS for category in (
+        "breathing", "digestive", "energy", "hormonal", "medication", "mental",
+        "multiple", "neurological", "physical", "sick", "skin", "unsure",
+    )},
+}
+
+
+class PromptTemplateError(ValueError):
+    pass
+
+
+@dataclass
+class TemplateStats:
+    renders: int = 0
+    rendered_tokens: int = 0
+    max_rendered_tokens: int = 0
+
+    def record(self, tokens: int):
+        self.renders += 1
+        self.rendered_tokens += tokens
+        self.max_rendered_tokens = max(self.max_rendered_tokens, tokens)
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    name: str
+    text: str
+    segments: Tuple[Tuple[str, Optional[str]], ...]  # (literal, field or None)
+    fields: FrozenSet[str]
+    mtime: float
+    prefix_tokens: int
+    stats: TemplateStats = field(default_factory=TemplateStats, compare=False)
+
+    @cached_property
+    def stable_prefix(self) -> str:
+        """Text before the first placeholder, the same in every rendering"""
+        return _stable_prefix(self.segments)
+
+    def render(self, **values: Any) -> str:
+        """The template with its placeholders filled; KeyError if one has no value"""
+        parts: List[str] = []
+        for literal, name in self.segments:
+            parts.append(literal)
+            if name is not None:
+                parts.append(str(values[name]))
+        rendered = "".join(parts)
+        self.stats.record(estimate_tokens(rendered))
+        return rendered
+
+
+def _stable_prefix(segments) -> str:
+    prefix = []
+    for literal, name in segments:
+        prefix.append(literal)
+        if name is not None:
+            break
+    return "".join(prefix)
+
+
+def compile_template(name: str, text: str, allowed: Optional[FrozenSet[str]] = None,
+                     mtime: float = 0.0) -> PromptTemplate:
+    """Parse text into segments; PromptTemplateError on bad syntax or unknown fields"""
+    try:
+        parsed = list(string.Formatter().parse(text))
+    except ValueError as e:
+        raise PromptTemplateError(f"{name}: {e}")
+
+    segments = []
+    for literal, field_name, format_spec, conversion in parsed:
+        if field_name is not None:
+            if not field_name.isidentifier():
+                raise PromptTemplateError(f"{name}: placeholder {{{field_name}}} must be a plain name")
+            if format_spec or conversion:
+                raise PromptTemplateError(f"{name}: placeholder {{{field_name}}} may not use ! or :")
+        segments.append((literal, field_name))
+
+    fields = frozenset(f for _, f in segments if f is not None)
+    if allowed is not None and not fields <= allowed:
+        unknown = ", ".join(sorted(fields - allowed))
+        raise PromptTemplateError(f"{name}: unknown placeholder(s) {unknown}; caller supplies {sorted(allowed)}")
+    return PromptTemplate(name, text, tuple(segments), fields, mtime, count_tokens(_stable_prefix(segments)))
+
+
+class PromptRegistry:
+    def __init__(self, root: Path = PROMPTS_DIR, fields: Dict[str, FrozenSet[str]] = PROMPT_FIELDS,
+                 hot_reload: bool = PROMPT_HOT_RELOAD, check_interval: float = PROMPT_CHECK_SECONDS):
+        self.root = Path(root)
+        self.fields = fields
+        self.hot_reload = hot_reload
+        self.check_interval = check_interval
+        self._templates: Dict[str, PromptTemplate] = {}
+        self._checked_at: Dict[str, float] = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _path(self, name: str) -> Path:
+        return self.root / f"{name}.txt"
+
+    def _compile_file(self, name: str) -> PromptTemplate:
+        path = self._path(name)
+        try:
+            mtime = path.stat().st_mtime
+            text = path.read_text()
+        except OSError as e:
+            raise PromptTemplateError(f"{name}: cannot read {path}: {e}")
+        return compile_template(name, text, self.fields.get(name), mtime)
+
+    def load(self):
+        """Compile every template under root; raise listing all that fail"""
+        names = set(self.fields)
+        names.update(
+            str(path.relative_to(self.root).with_suffix("")) for path in self.root.rglob("*.txt")
+        )
+        templates, errors = {}, []
+        for name in sorted(names):
+            try:
+                templates[name] = self._compile_file(name)
+            except PromptTemplateError as e:
+                errors.append(str(e))
+        if errors:
+            raise PromptTemplateError("Invalid prompt templates:\n  " + "\n  ".join(errors))
+        with self._lock:
+            self._templates = templates
+            self._loaded = True
+        logger.info(f"Loaded {len(templates)} prompt templates from {self.root}")
+
+    def _maybe_reload(self, name: str):
+        now = time.monotonic()
+        if now - self._checked_at.get(name, 0.0) < self.check_interval:
+            return
+        self._checked_at[name] = now
+        current = self._templates.get(name)
+        try:
+            mtime = self._path(name).stat().st_mtime
+        except OSError:
+            return
+        if current is not None and mtime == current.mtime:
+            return
+        try:
+            template = self._compile_file(name)
+        except PromptTemplateError as e:
+            logger.error(f"Keeping previous prompt template: {e}")
+            return
+        with self._lock:
+            self._templates = {**self._templates, name: template}
+        logger.info(f"Reloaded prompt template {name}")
+
+    def get(self, name: str) -> Optional[PromptTemplate]:
+        """Compiled template by name (path under prompts/ without .txt), None if absent"""
+        if not self._loaded:
+            with self._lock:
+                loaded = self._loaded
+            if not loaded:
+                self.load()
+        if self.hot_reload:
+            self._maybe_reload(name)
+        return self._templates.get(name)
+
+    def render(self, name: str, **values: Any) -> str:
+        template = self.get(name)
+        if template is None:
+            raise PromptTemplateError(f"Unknown prompt template {name}")
+        return template.render(**values)
+
+    def match_prefix(self, text: str) -> Optional[PromptTemplate]:
+        """The template whose stable prefix text starts with (the longest, if several)"""
+        best = None
+        for template in self._templates.values():
+            prefix = template.stable_prefix
+            if prefix and text.startswith(prefix) and (best is None or len(prefix) > len(best.stable_prefix)):
+                best = template
+        return best
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-template placeholder, stable prefix and rendered-size statistics"""
+        return {
+            name: {
+                "fields": sorted(t.fields),
+                "template_tokens": count_tokens(t.text),
+                "prefix_tokens": t.prefix_tokens,
+                "renders": t.stats.renders,
+                "avg_rendered_tokens": round(t.stats.rendered_tokens / t.stats.renders) if t.stats.renders else None,
+                "max_rendered_tokens": t.stats.max_rendered_tokens,
+            }
+            for name, t in sorted(self._templates.items())
+        }
+
+
+prompt_registry = PromptRegistry()
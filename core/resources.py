@@ -0,0 +1,202 @@
+"""
+Process-wide connection pools
+
+Every module shares one Supabase client, one HTTP/2 pool (OpenRouter and the
+jobs' calls back into this API) and one Redis connection pool, instead of
+each opening its own sockets and TLS sessions. run_oracle's lifespan opens
+them on startup and closes them on shutdown; outside the app (scripts,
+tests) they are created lazily on first use.
+
+Pool sizes are tunable with HTTP_MAX_CONNECTIONS, HTTP_MAX_KEEPALIVE and
+REDIS_MAX_CONNECTIONS; stats() reports how much of each pool is in use. The
+database pool size is not configurable: the pinned supabase==2.0.0 builds its
+own PostgREST httpx client with httpx's default limits, and only its timeout
+(DB_TIMEOUT_SECONDS) can be set.
+"""
+import os
+import time
+import asyncio
+import logging
+from typing import Any, Dict, Optional
+
+import httpx
+import redis.asyncio as redis
+from dotenv import load_dotenv
+from supabase import create_client, Client
+from supabase.lib.client_options import ClientOptions
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+SUPABASE_URL = os.getenv("SUPABASE_URL", "")
+# Use service key to bypass RLS
+SUPABASE_KEY = (os.getenv("SUPABASE_SERVICE_KEY") or os.getenv("SUPABASE_SERVICE_ROLE_KEY")
+                or os.getenv("SUPABASE_ANON_KEY", ""))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
+
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "50"))
+DB_TIMEOUT_SECONDS = float(os.getenv("DB_TIMEOUT_SECONDS", "30"))
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))
+# How long a caller waits for a free Redis connection before giving up
+REDIS_POOL_TIMEOUT = float(os.getenv("REDIS_POOL_TIMEOUT_SECONDS", "5"))
+REDIS_RETRY_SECONDS = 30
+
+try:
+    import h2  # noqa: F401  (httpx[http2])
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+def _http_pool_stats(transport: Any) -> Dict[str, int]:
+    """Connection counts of an httpx transport's pool (httpcore internals, best effort)"""
+    pool = getattr(transport, "_pool", None)
+    connections = list(getattr(pool, "connections", []) or [])
+    return {
+        "limit": getattr(pool, "_max_connections", None),
+        "open": len(connections),
+        "idle": sum(1 for c in connections if getattr(c, "is_idle", lambda: False)()),
+    }
+
+
+class ResourceRegistry:
+    def __init__(self):
+        self._db: Optional[Client] = None
+        self._http: Optional[httpx.AsyncClient] = None
+        self._redis_pool: Optional[redis.ConnectionPool] = None
+        self._redis: Optional[redis.Redis] = None
+        self._redis_retry_at = 0.0
+        self._redis_lock: Optional[asyncio.Lock] = None
+
+    # Database
+
+    @property
+    def db_configured(self) -> bool:
+        return bool(SUPABASE_URL and SUPABASE_KEY)
+
+    @property
+    def db(self) -> Client:
+        """The process's Supabase client"""
+        if self._db is None:
+            if not self.db_configured:
+                raise ValueError("SUPABASE_URL and SUPABASE_SERVICE_KEY/ANON_KEY must be set in .env file")
+            self._db = create_client(SUPABASE_URL, SUPABASE_KEY, options=self._db_options())
+        return self._db
+
+    def _db_options(self) -> ClientOptions:
+        return ClientOptions(postgrest_client_timeout=DB_TIMEOUT_SECONDS)
+
+    def _db_session(self) -> Optional[httpx.Client]:
+        try:
+            return self._db.postgrest.session if self._db is not None else None
+        except Exception:
+            return None
+
+    # HTTP
+
+    def http(self) -> httpx.AsyncClient:
+        """Shared HTTP/2 client; pass a per-request timeout for slow calls"""
+        if self._http is None or self._http.is_closed:
+            if not HTTP2_AVAILABLE:
+                logger.warning("h2 is not installed (pip install httpx[http2]), using HTTP/1.1")
+            self._http = httpx.AsyncClient(
+                timeout=httpx.Timeout(
+                    timeout=240.0,  # Total timeout
+                    connect=10.0,   # Connection timeout
+                    read=60.0,      # Read timeout
+                    write=30.0      # Write timeout
+                ),
+                limits=httpx.Limits(
+                    max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+                    max_connections=HTTP_MAX_CONNECTIONS,
+                    keepalive_expiry=30
+                ),
+                http2=HTTP2_AVAILABLE  # Multiplex requests over fewer connections
+            )
+        return self._http
+
+    async def close_http(self):
+        if self._http is not None and not self._http.is_closed:
+            await self._http.aclose()
+        self._http = None
+
+    # Redis
+
+    async def redis(self) -> Optional[redis.Redis]:
+        """Client on the shared Redis pool, or None while Redis is unreachable"""
+        if self._redis is not None:
+            return self._redis
+        if not REDIS_URL or time.monotonic() < self._redis_retry_at:
+            return None
+        if self._redis_lock is None:
+            self._redis_lock = asyncio.Lock()
+        async with self._redis_lock:
+            if self._redis is not None:
+                return self._redis
+            pool = redis.BlockingConnectionPool.from_url(
+                REDIS_URL, max_connections=REDIS_MAX_CONNECTIONS,
+                timeout=REDIS_POOL_TIMEOUT, decode_responses=True
+            )
+            client = redis.Redis(connection_pool=pool)
+            try:
+                await client.ping()
+            except Exception as e:
+                logger.warning(f"Redis connection failed: {e}. Running without Redis.")
+                self._redis_retry_at = time.monotonic() + REDIS_RETRY_SECONDS
+                await pool.disconnect()
+                return None
+            self._redis_pool, self._redis = pool, client
+            logger.info("Redis connected successfully")
+        return self._redis
+
+    async def close_redis(self):
+        if self._redis is not None:
+            await self._redis.close()
+        if self._redis_pool is not None:
+            await self._redis_pool.disconnect()
+        self._redis = self._redis_pool = None
+        self._redis_lock = None
+
+    # Lifecycle
+
+    async def start(self):
+        """Open every pool up front so the first requests don't pay for it"""
+        if self.db_configured:
+            self.db
+        self.http()
+        await self.redis()
+        logger.info(f"Connection pools ready: {self.stats()}")
+
+    async def close(self):
+        await self.close_http()
+        await self.close_redis()
+        session = self._db_session()
+        if session is not None:
+            session.close()
+        self._db = None
+
+    def stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = {}
+        session = self._db_session()
+        stats["db"] = _http_pool_stats(session._transport) if session is not None else {"open": 0}
+        http_client = self._http if self._http is not None and not self._http.is_closed else None
+        stats["http"] = _http_pool_stats(http_client._transport) if http_client is not None else {"open": 0}
+        pool = self._redis_pool
+        if pool is None:
+            stats["redis"] = {"limit": REDIS_MAX_CONNECTIONS, "connected": False}
+        else:
+            idle = len(pool._available_connections)
+            in_use = len(pool._in_use_connections)
+            stats["redis"] = {
+                "limit": pool.max_connections,
+                "connected": True,
+                "open": idle + in_use,
+                "idle": idle,
+                "in_use": in_use,
+            }
+        return stats
+
+
+resources = ResourceRegistry()
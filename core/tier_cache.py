@@ -0,0 +1,221 @@
+"""
+Shared cache for user subscription tiers
+
+Lookups go through three levels: a bounded in-process LRU, then Redis
+(shared by every worker and replica), then the database. Concurrent misses
+for the same user share one database query. If the query fails, "free" is
+cached locally for a short time so an outage does not turn every request
+into another query.
+
+invalidate() drops the user's tier everywhere: locally, in Redis, and in
+every other process through a Redis pub/sub channel that start() listens on.
+invalidate_soon() is the synchronous form for non-async callers. Without
+Redis the cache is process-local and entries expire by TTL.
+"""
+import os
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional, Set, Tuple
+
+from core.resources import resources
+
+logger = logging.getLogger(__name__)
+
+TIER_CACHE_MAX_ENTRIES = int(os.getenv("TIER_CACHE_MAX_ENTRIES", "10000"))
+TIER_CACHE_LOCAL_TTL = float(os.getenv("TIER_CACHE_LOCAL_TTL_SECONDS", "60"))
+TIER_CACHE_REDIS_TTL = int(os.getenv("TIER_CACHE_REDIS_TTL_SECONDS", "300"))
+TIER_CACHE_ERROR_TTL = float(os.getenv("TIER_CACHE_ERROR_TTL_SECONDS", "30"))
+REDIS_RETRY_SECONDS = 30
+KEY_PREFIX = "tier:"
+INVALIDATION_CHANNEL = "tier_cache:invalidate"
+ERROR_TIER = "free"
+
+
+class LocalTTLCache:
+    """LRU of key -> (value, expires_at) holding at most max_entries keys"""
+
+    def __init__(self, max_entries: int = TIER_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[1] <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def set(self, key: str, value: str, ttl: float):
+        self._entries[key] = (value, time.monotonic() + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def pop(self, key: str):
+        self._entries.pop(key, None)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class TierCache:
+    def __init__(self, loader: Callable[[str], Awaitable[str]], use_redis: bool = True):
+        self.loader = loader
+        self.use_redis = use_redis
+        self.local = LocalTTLCache()
+        self.redis_client = None
+        self._redis_retry_at = 0.0
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._listener: Optional[asyncio.Task] = None
+        self._invalidations: Set[asyncio.Task] = set()
+        self.stats = {"local_hits": 0, "redis_hits": 0, "db_loads": 0, "db_errors": 0, "coalesced": 0}
+
+    async def _redis(self):
+        """Connected client, or None while Redis is unavailable"""
+        if self.redis_client is not None:
+            return self.redis_client
+        if not self.use_redis or time.monotonic() < self._redis_retry_at:
+            return None
+        self.redis_client = await resources.redis()
+        if self.redis_client is None:
+            self._redis_retry_at = time.monotonic() + REDIS_RETRY_SECONDS
+        return self.redis_client
+
+    def _redis_failed(self, e: Exception):
+        logger.warning(f"Tier cache Redis error: {e}")
+        self.redis_client = None
+        self._redis_retry_at = time.monotonic() + REDIS_RETRY_SECONDS
+
+    async def get(self, user_id: str) -> str:
+        tier = self.local.get(user_id)
+        if tier is not None:
+            self.stats["local_hits"] += 1
+            return tier
+
+        # Single flight: concurrent misses for one user wait on the same lookup
+        pending = self._inflight.get(user_id)
+        if pending is not None:
+            self.stats["coalesced"] += 1
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                # The leader was cancelled, not us: look the tier up again
+                if pending.cancelled() and not asyncio.current_task().cancelling():
+                    return await self.get(user_id)
+                raise
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[user_id] = future
+        try:
+            tier = await self._lookup(user_id)
+            future.set_result(tier)
+            return tier
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark retrieved so an un-awaited future does not log a warning
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(user_id, None)
+
+    async def _lookup(self, user_id: str) -> str:
+        client = await self._redis()
+        if client is not None:
+            try:
+                tier = await client.get(KEY_PREFIX + user_id)
+                if tier is not None:
+                    self.stats["redis_hits"] += 1
+                    self.local.set(user_id, tier, TIER_CACHE_LOCAL_TTL)
+                    return tier
+            except Exception as e:
+                self._redis_failed(e)
+                client = None
+
+        try:
+            self.stats["db_loads"] += 1
+            tier = await self.loader(user_id)
+        except Exception as e:
+            # Negative cache: remember the failure briefly, locally only
+            self.stats["db_errors"] += 1
+            logger.error(f"Error fetching user tier: {e}")
+            self.local.set(user_id, ERROR_TIER, TIER_CACHE_ERROR_TTL)
+            return ERROR_TIER
+
+        self.local.set(user_id, tier, TIER_CACHE_LOCAL_TTL)
+        if client is not None:
+            try:
+                await client.set(KEY_PREFIX + user_id, tier, ex=TIER_CACHE_REDIS_TTL)
+            except Exception as e:
+                self._redis_failed(e)
+        return tier
+
+    async def invalidate(self, user_id: str):
+        """Forget the user's tier in this process, in Redis and in every subscriber"""
+        self.local.pop(user_id)
+        client = await self._redis()
+        if client is None:
+            return
+        try:
+            await client.delete(KEY_PREFIX + user_id)
+            await client.publish(INVALIDATION_CHANNEL, user_id)
+        except Exception as e:
+            self._redis_failed(e)
+
+    def invalidate_soon(self, user_id: str) -> Optional[asyncio.Task]:
+        """Drop the local entry now and clear Redis and the other replicas in the background"""
+        self.local.pop(user_id)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop (scripts): other replicas catch up when their TTL expires
+            return None
+        task = loop.create_task(self.invalidate(user_id))
+        self._invalidations.add(task)
+        task.add_done_callback(self._invalidations.discard)
+        return task
+
+    async def _listen(self):
+        while True:
+            client = await self._redis()
+            if client is None:
+                await asyncio.sleep(REDIS_RETRY_SECONDS)
+                continue
+            pubsub = client.pubsub()
+            try:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self.local.pop(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._redis_failed(e)
+            finally:
+                try:
+                    await pubsub.close()
+                except Exception:
+                    pass
+
+    async def start(self):
+        """Start listening for invalidations from other processes"""
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+
+    async def close(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._listener = None
+        # The connection pool belongs to core/resources.py
+        self.redis_client = None
@@ -11,14 +11,9 @@ from typing import Optional
 import math
 from supabase_client import supabase
 from business_logic import call_llm
-import tiktoken
-
-# Token counter
-encoding = tiktoken.encoding_for_model("gpt-3.5-turbo")
-
-def count_tokens(text: str) -> int:
-    """Count tokens in text"""
-    return len(encoding.encode(text))
+from utils.token_counter import count_tokens
+from utils.summary_helpers import stored_token_count, summary_token_total
+from utils.history_digest import schedule_digest_refresh
 
 class GenerateSummaryRequest(BaseModel):
     conversation_id: Optional[str] = None
@@ -183,6 +178,7 @@ Write a concise medical summary:"""
             )
             
             summary_content = summary_response["content"]
+            summary_token_count = count_tokens(summary_content)
             
             # 5. Delete old summary if exists
             delete_response = supabase.table("llm_context").delete().eq("conversation_id", request.conversation_id).eq("user_id", request.user_id).execute()
@@ -193,17 +189,18 @@ Write a concise medical summary:"""
                 "user_id": request.user_id,
                 "llm_summary": summary_content,
                 "created_at": datetime.now(timezone.utc).isoformat(),
-                "token_count": count_tokens(summary_content),
+                "token_count": summary_token_count,
                 "original_message_count": len(messages),
                 "original_token_count": total_tokens
             }
             
             insert_response = supabase.table("llm_context").insert(insert_data).execute()
+            schedule_digest_refresh(request.user_id)
             
             return {
                 "summary": summary_content,
-                "token_count": count_tokens(summary_content),
-                "compression_ratio": round(total_tokens / count_tokens(summary_content), 2),
+                "token_count": summary_token_count,
+                "compression_ratio": round(total_tokens / max(summary_token_count, 1), 2),
                 "status": "success"
             }
         
@@ -230,7 +227,8 @@ async def aggregate_llm_summaries(request: AggregateSummariesRequest):
             content = summary.get("llm_summary", "")
             all_summaries_text += f"[{date}] {content}\n\n"
         
-        total_tokens = count_tokens(all_summaries_text)
+        # Stored per-summary counts; summaries saved without one are counted once and backfilled
+        total_tokens = summary_token_total(summaries)
         compression_ratio = calculate_compression_ratio(total_tokens)
         target_tokens = int(total_tokens / compression_ratio)
         
@@ -290,13 +288,13 @@ async def get_optimized_llm_context(user_id: str, conversation_id: str, current_
     """Get LLM context, aggregating if too large"""
     try:
         # First get regular context
-        context_response = supabase.table("llm_context").select("llm_summary").eq("user_id", user_id).eq("conversation_id", conversation_id).execute()
+        context_response = supabase.table("llm_context").select("llm_summary, token_count").eq("user_id", user_id).eq("conversation_id", conversation_id).execute()
         
         if context_response.data:
             context = context_response.data[0].get("llm_summary", "")
             
-            # Check token count
-            if count_tokens(context) > 25000:
+            # Check token count (stored with the summary)
+            if stored_token_count(context_response.data[0]) > 25000:
                 # Need to aggregate
                 aggregate_result = await aggregate_llm_summaries(
                     AggregateSummariesRequest(user_id=user_id, current_query=current_query)
@@ -0,0 +1,30 @@
+-- Migration: Incremental chat context state
+-- One row per conversation, maintained by utils/conversation_state.py. Each
+-- /api/chat turn adds the tokens of messages created after last_message_at to
+-- token_count, so the context limit check never recounts the conversation.
+-- summary covers the oldest summarized_count messages and is regenerated only
+-- when the messages after it pass the summary threshold.
+
+CREATE TABLE IF NOT EXISTS conversation_context_state (
+  conversation_id TEXT PRIMARY KEY,
+  user_id TEXT,
+  token_count INTEGER NOT NULL DEFAULT 0,
+  message_count INTEGER NOT NULL DEFAULT 0,
+  last_message_at TIMESTAMPTZ,
+  summary TEXT,
+  summarized_count INTEGER NOT NULL DEFAULT 0,
+  summarized_tokens INTEGER NOT NULL DEFAULT 0,
+  updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_conversation_context_state_user_id ON conversation_context_state(user_id);
+
+ALTER TABLE conversation_context_state ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Service role has full access to context state" ON conversation_context_state;
+CREATE POLICY "Service role has full access to context state" ON conversation_context_state
+  FOR ALL USING (auth.role() = 'service_role');
+
+GRANT ALL ON conversation_context_state TO service_role;
+
+COMMENT ON TABLE conversation_context_state IS 'Running token count and summary checkpoint per chat conversation';
@@ -0,0 +1,35 @@
+-- Migration: Monthly health rollups per user
+-- utils/monthly_rollups.py stores one row per user and closed month with
+-- interaction counts, symptom/condition histograms, severity stats and urgency
+-- distribution. Annual reports read these 12 rows (plus the live current
+-- month) instead of a year of raw rows. Rows are written when a month closes
+-- (services/background_jobs_v2.close_monthly_rollups_job) or on first read
+-- after it.
+
+CREATE TABLE IF NOT EXISTS health_monthly_rollups (
+  user_id TEXT NOT NULL,
+  month TEXT NOT NULL CHECK (month ~ '^\d{4}-\d{2}$'),
+  counts JSONB NOT NULL DEFAULT '{}',
+  symptom_frequency JSONB NOT NULL DEFAULT '{}',
+  tracked_symptoms JSONB NOT NULL DEFAULT '{}',
+  conditions JSONB NOT NULL DEFAULT '{}',
+  urgency_distribution JSONB NOT NULL DEFAULT '{}',
+  severity JSONB NOT NULL DEFAULT '{}',
+  computed_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  PRIMARY KEY (user_id, month)
+);
+
+ALTER TABLE health_monthly_rollups ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Users can view own monthly rollups" ON health_monthly_rollups;
+CREATE POLICY "Users can view own monthly rollups" ON health_monthly_rollups
+  FOR SELECT USING (auth.uid()::text = user_id);
+
+DROP POLICY IF EXISTS "Service role has full access to monthly rollups" ON health_monthly_rollups;
+CREATE POLICY "Service role has full access to monthly rollups" ON health_monthly_rollups
+  FOR ALL USING (auth.role() = 'service_role');
+
+GRANT SELECT ON health_monthly_rollups TO authenticated;
+GRANT ALL ON health_monthly_rollups TO service_role;
+
+COMMENT ON TABLE health_monthly_rollups IS 'Per-user monthly aggregates of closed months for annual reports';
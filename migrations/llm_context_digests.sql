@@ -0,0 +1,28 @@
+-- Migration: Per-user history digest of llm_context summaries
+-- utils/history_digest.py rebuilds a user's row in the background whenever a
+-- new llm_context summary is written, and caches it in Redis. The Oracle chat
+-- reads the digest instead of loading and aggregating every summary per
+-- message. digest is NULL while the user's summaries total less than the
+-- aggregation threshold; source_count and latest_summary_at identify the
+-- summaries a version was built from.
+
+CREATE TABLE IF NOT EXISTS llm_context_digests (
+  user_id TEXT PRIMARY KEY,
+  version INTEGER NOT NULL DEFAULT 1,
+  digest TEXT,
+  token_count INTEGER NOT NULL DEFAULT 0,
+  source_count INTEGER NOT NULL DEFAULT 0,
+  source_tokens INTEGER NOT NULL DEFAULT 0,
+  latest_summary_at TIMESTAMPTZ,
+  updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+ALTER TABLE llm_context_digests ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Service role has full access to history digests" ON llm_context_digests;
+CREATE POLICY "Service role has full access to history digests" ON llm_context_digests
+  FOR ALL USING (auth.role() = 'service_role');
+
+GRANT ALL ON llm_context_digests TO service_role;
+
+COMMENT ON TABLE llm_context_digests IS 'Aggregated llm_context history per user, regenerated when new summaries land';
@@ -0,0 +1,20 @@
+-- Migration: Persist token counts with stored summaries
+-- Summary writers store token_count when they insert into llm_context, and
+-- readers sum the stored counts instead of re-encoding every summary on each
+-- chat turn. Rows saved before this column existed are counted on first read
+-- and backfilled in the background, one set_llm_context_token_counts call per
+-- read (utils/summary_helpers.summary_token_total).
+
+ALTER TABLE llm_context
+ADD COLUMN IF NOT EXISTS token_count INTEGER;
+
+COMMENT ON COLUMN llm_context.token_count IS 'Tokens in llm_summary, stored at write time so it is never recounted';
+
+-- counts: [{"id": ..., "token_count": ...}, ...]
+CREATE OR REPLACE FUNCTION set_llm_context_token_counts(counts JSONB)
+RETURNS VOID AS $$
+    UPDATE llm_context AS c
+    SET token_count = (entry->>'token_count')::INTEGER
+    FROM jsonb_array_elements(counts) AS entry
+    WHERE c.id::TEXT = entry->>'id';
+$$ LANGUAGE sql;
@@ -0,0 +1,31 @@
+-- Migration: Keyset pagination for report lists
+-- utils/report_listing.py pages a user's reports newest first with a cursor
+-- on (created_at, id). This index serves every page with an index range scan.
+CREATE INDEX IF NOT EXISTS idx_medical_reports_user_created_id
+ON medical_reports(user_id, created_at DESC, id DESC);
+
+-- report_data is large JSON that list queries no longer read. lz4 TOAST
+-- compression (PostgreSQL 14+) makes it smaller on disk and faster to
+-- decompress than the default pglz. It applies to rows written from now on.
+DO $$
+BEGIN
+    ALTER TABLE medical_reports ALTER COLUMN report_data SET COMPRESSION lz4;
+EXCEPTION WHEN OTHERS THEN
+    RAISE NOTICE 'lz4 column compression unavailable, keeping default: %', SQLERRM;
+END $$;
+
+-- Report detail reads without the body select every column but report_data
+-- by name (REPORT_SUMMARY_COLUMNS). Older databases were created from
+-- different migrations, so make sure each of those columns exists.
+ALTER TABLE medical_reports
+ADD COLUMN IF NOT EXISTS data_sources JSONB,
+ADD COLUMN IF NOT EXISTS time_range JSONB,
+ADD COLUMN IF NOT EXISTS specialty TEXT,
+ADD COLUMN IF NOT EXISTS year INTEGER,
+ADD COLUMN IF NOT EXISTS metadata JSONB DEFAULT '{}',
+ADD COLUMN IF NOT EXISTS last_accessed TIMESTAMP WITH TIME ZONE,
+ADD COLUMN IF NOT EXISTS access_count INTEGER DEFAULT 0,
+ADD COLUMN IF NOT EXISTS doctor_reviewed BOOLEAN DEFAULT FALSE,
+ADD COLUMN IF NOT EXISTS last_modified TIMESTAMP WITH TIME ZONE,
+ADD COLUMN IF NOT EXISTS report_version INTEGER DEFAULT 1,
+ADD COLUMN IF NOT EXISTS is_draft BOOLEAN DEFAULT FALSE;
@@ -0,0 +1,33 @@
+-- Migration: Per-session photo progression read model
+-- One row per photo session holding slim copies of its photos/analyses and the
+-- derived progression series (velocity, risk, trend, visualization).
+-- Maintained incrementally by api/photo/progression.py when photos, analyses
+-- or reminders are written; read by the timeline, progression-analysis and
+-- analysis-history endpoints instead of re-querying every source table.
+
+CREATE TABLE IF NOT EXISTS photo_session_progression (
+  session_id UUID PRIMARY KEY REFERENCES photo_sessions(id) ON DELETE CASCADE,
+  user_id UUID,
+  session JSONB NOT NULL,            -- id, condition_name, created_at, is_sensitive
+  photos JSONB NOT NULL DEFAULT '[]',   -- id, category, uploaded_at, storage_url
+  analyses JSONB NOT NULL DEFAULT '[]', -- id, photo_ids, confidence_score, created_at, timeline fields of analysis_data/comparison
+  reminder JSONB,                    -- enabled, next_reminder_date, reminder_text
+  analysis_count INTEGER NOT NULL DEFAULT 0,
+  overall_trend TEXT,
+  velocity JSONB,
+  risk_indicators JSONB,
+  clinical_insights JSONB,
+  visualization_data JSONB,
+  version INTEGER NOT NULL DEFAULT 1, -- optimistic concurrency for incremental updates
+  updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_photo_session_progression_user_id ON photo_session_progression(user_id);
+
+ALTER TABLE photo_session_progression ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Users can view own session progression" ON photo_session_progression;
+CREATE POLICY "Users can view own session progression" ON photo_session_progression
+  FOR SELECT USING (auth.uid() = user_id);
+
+COMMENT ON TABLE photo_session_progression IS 'Materialized progression snapshot per photo session; safe to delete, rebuilt on next read';
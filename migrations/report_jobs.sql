@@ -0,0 +1,36 @@
+-- Migration: Asynchronous report generation jobs
+-- One row per queued report. api/reports/jobs.py writes the row on enqueue and
+-- updates status as the worker runs; the row id doubles as the medical_reports
+-- id of the finished report. request_hash (report type + selected IDs) is used
+-- to hand an identical request the job that is already queued or just finished.
+
+CREATE TABLE IF NOT EXISTS report_jobs (
+  id UUID PRIMARY KEY,
+  user_id TEXT NOT NULL,
+  report_type TEXT NOT NULL,
+  request_hash TEXT NOT NULL,
+  status TEXT NOT NULL DEFAULT 'queued' CHECK (status IN ('queued', 'running', 'completed', 'failed')),
+  request JSONB,
+  error TEXT,
+  created_at TIMESTAMPTZ DEFAULT NOW(),
+  started_at TIMESTAMPTZ,
+  completed_at TIMESTAMPTZ
+);
+
+CREATE INDEX IF NOT EXISTS idx_report_jobs_request_hash ON report_jobs(request_hash, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_report_jobs_user_id ON report_jobs(user_id);
+
+ALTER TABLE report_jobs ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Users can view own report jobs" ON report_jobs;
+CREATE POLICY "Users can view own report jobs" ON report_jobs
+  FOR SELECT USING (auth.uid()::text = user_id);
+
+DROP POLICY IF EXISTS "Service role has full access to report jobs" ON report_jobs;
+CREATE POLICY "Service role has full access to report jobs" ON report_jobs
+  FOR ALL USING (auth.role() = 'service_role');
+
+GRANT SELECT ON report_jobs TO authenticated;
+GRANT ALL ON report_jobs TO service_role;
+
+COMMENT ON TABLE report_jobs IS 'Status of asynchronous report generation jobs; finished reports live in medical_reports';
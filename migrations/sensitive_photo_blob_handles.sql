@@ -0,0 +1,36 @@
+-- Migration: Move sensitive photo bytes out of photo_uploads rows
+-- medical_sensitive photos are now kept in an ephemeral encrypted blob store
+-- (api/photo/sensitive_store.py). The row only stores the blob handle, so
+-- select('*') on photo_uploads no longer drags base64 images through PostgREST.
+
+-- Add the handle column
+ALTER TABLE photo_uploads
+ADD COLUMN IF NOT EXISTS temporary_blob_handle TEXT;
+
+-- Index for cleanup queries
+CREATE INDEX IF NOT EXISTS idx_photo_uploads_temporary_blob_handle
+ON photo_uploads(uploaded_at)
+WHERE temporary_blob_handle IS NOT NULL;
+
+-- Extend the cleanup function: blobs expire on their own after 24 hours,
+-- so stale handles are cleared alongside any legacy inline data
+CREATE OR REPLACE FUNCTION cleanup_temporary_photo_data()
+RETURNS void AS $$
+BEGIN
+    UPDATE photo_uploads
+    SET temporary_data = NULL,
+        temporary_blob_handle = NULL
+    WHERE (temporary_data IS NOT NULL OR temporary_blob_handle IS NOT NULL)
+    AND uploaded_at < NOW() - INTERVAL '24 hours';
+
+    RAISE NOTICE 'Cleaned up temporary photo data older than 24 hours';
+END;
+$$ LANGUAGE plpgsql;
+
+GRANT EXECUTE ON FUNCTION cleanup_temporary_photo_data() TO service_role;
+
+-- Success message
+DO $$
+BEGIN
+    RAISE NOTICE 'Successfully added temporary_blob_handle column to photo_uploads table';
+END $$;
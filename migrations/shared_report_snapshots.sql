@@ -0,0 +1,89 @@
+-- Migration: Render-once snapshots of doctor share links
+-- api/export.py renders the shared report HTML when a share is created and
+-- stores it here with its ETag, so GET /api/shared/{share_token} is a single
+-- primary-key lookup. Snapshots live in their own table (service role only)
+-- because export_history is readable by anyone for active shares.
+-- Changing a story's text, notes, insights or predictions deletes the
+-- snapshots of every share that includes the story; the next view renders it
+-- again. Views are counted with increment_share_access(), an atomic
+-- access_count + 1 (migrations/001_health_intelligence_tables.sql).
+
+CREATE TABLE IF NOT EXISTS shared_report_snapshots (
+  share_token TEXT PRIMARY KEY,
+  export_id UUID NOT NULL REFERENCES export_history(id) ON DELETE CASCADE,
+  story_ids UUID[] NOT NULL DEFAULT '{}',
+  expires_at TIMESTAMPTZ,
+  html TEXT NOT NULL,
+  etag TEXT NOT NULL,
+  rendered_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_shared_report_snapshots_story_ids
+ON shared_report_snapshots USING GIN (story_ids);
+
+ALTER TABLE shared_report_snapshots ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Service role has full access to share snapshots" ON shared_report_snapshots;
+CREATE POLICY "Service role has full access to share snapshots" ON shared_report_snapshots
+  FOR ALL USING (auth.role() = 'service_role');
+
+GRANT ALL ON shared_report_snapshots TO service_role;
+
+-- Invalidate snapshots when the content they show changes
+CREATE OR REPLACE FUNCTION invalidate_shared_report_snapshots()
+RETURNS TRIGGER AS $$
+DECLARE
+  changed_story TEXT;
+BEGIN
+  IF TG_OP = 'DELETE' THEN
+    changed_story := OLD.story_id::text;
+  ELSE
+    changed_story := NEW.story_id::text;
+  END IF;
+
+  IF changed_story IS NOT NULL THEN
+    DELETE FROM shared_report_snapshots
+    WHERE story_ids @> ARRAY[changed_story::uuid];
+  END IF;
+
+  IF TG_OP = 'UPDATE' AND OLD.story_id IS DISTINCT FROM NEW.story_id AND OLD.story_id IS NOT NULL THEN
+    DELETE FROM shared_report_snapshots
+    WHERE story_ids @> ARRAY[OLD.story_id::text::uuid];
+  END IF;
+
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+DROP TRIGGER IF EXISTS story_notes_invalidate_share_snapshots ON story_notes;
+CREATE TRIGGER story_notes_invalidate_share_snapshots
+  AFTER INSERT OR UPDATE OR DELETE ON story_notes
+  FOR EACH ROW EXECUTE FUNCTION invalidate_shared_report_snapshots();
+
+DROP TRIGGER IF EXISTS health_insights_invalidate_share_snapshots ON health_insights;
+CREATE TRIGGER health_insights_invalidate_share_snapshots
+  AFTER INSERT OR UPDATE OR DELETE ON health_insights
+  FOR EACH ROW EXECUTE FUNCTION invalidate_shared_report_snapshots();
+
+DROP TRIGGER IF EXISTS health_predictions_invalidate_share_snapshots ON health_predictions;
+CREATE TRIGGER health_predictions_invalidate_share_snapshots
+  AFTER INSERT OR UPDATE OR DELETE ON health_predictions
+  FOR EACH ROW EXECUTE FUNCTION invalidate_shared_report_snapshots();
+
+-- The story itself: edits to its text, or deleting it
+CREATE OR REPLACE FUNCTION invalidate_story_share_snapshots()
+RETURNS TRIGGER AS $$
+BEGIN
+  DELETE FROM shared_report_snapshots
+  WHERE story_ids @> ARRAY[OLD.id::text::uuid];
+
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+DROP TRIGGER IF EXISTS health_stories_invalidate_share_snapshots ON health_stories;
+CREATE TRIGGER health_stories_invalidate_share_snapshots
+  AFTER UPDATE OF story_text OR DELETE ON health_stories
+  FOR EACH ROW EXECUTE FUNCTION invalidate_story_share_snapshots();
+
+COMMENT ON TABLE shared_report_snapshots IS 'Rendered HTML of doctor share links, served with ETags until the shared stories change';
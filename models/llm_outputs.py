@@ -0,0 +1,30 @@
+"""Schemas for structured LLM outputs (sent as response_format and validated on return)"""
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
+
+Urgency = Literal["low", "medium", "high", "emergency"]
+
+
+class FlashAssessmentOutput(BaseModel):
+    response: str
+    main_concern: str
+    urgency: Urgency
+    confidence: float = Field(ge=0, le=100)
+    next_action: Literal["general-assessment", "body-scan", "see-doctor", "monitor"]
+    action_reason: str
+
+
+class SecondarySpecialty(BaseModel):
+    specialty: str
+    confidence: float = Field(ge=0, le=1)
+    reason: str
+
+
+class SpecialtyTriageOutput(BaseModel):
+    primary_specialty: str
+    confidence: float = Field(ge=0, le=1)
+    reasoning: str
+    secondary_specialties: List[SecondarySpecialty] = []
+    urgency: Literal["routine", "urgent", "emergent"]
+    red_flags: List[str] = []
+    recommended_timing: Optional[str] = None
@@ -191,6 +191,7 @@ class SpecialistReportRequest(BaseModel):
     photo_session_ids: Optional[List[str]] = None
     general_assessment_ids: Optional[List[str]] = None
     general_deep_dive_ids: Optional[List[str]] = None
+    report_id: Optional[str] = None  # Pre-assigned when run through the report job queue
 
 class AnnualSummaryRequest(BaseModel):
     analysis_id: str
@@ -200,6 +201,7 @@ class AnnualSummaryRequest(BaseModel):
 class TimePeriodReportRequest(BaseModel):
     user_id: str
     include_wearables: Optional[bool] = False
+    report_id: Optional[str] = None  # Pre-assigned when run through the report job queue
 
 # Doctor and Sharing Models
 class DoctorNotesRequest(BaseModel):
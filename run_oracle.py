@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 """Oracle Server - Main entry point"""
+from utils.startup_profile import startup_profile
 from fastapi import FastAPI
 from contextlib import asynccontextmanager
 import uvicorn
@@ -7,44 +8,16 @@ import os
 from dotenv import load_dotenv
 import logging
 
-# Import routers
-from api.chat import router as chat_router
-from api.health_scan import router as health_scan_router
-from api.health_story import router as health_story_router
-from api.tracking import router as tracking_router
-from api.photo_analysis import router as photo_analysis_router
-from api.health_analysis import router as health_analysis_router
-from api.export import router as export_router
-
-from api.population_health import router as population_health_router
-from api.reports.general import router as general_reports_router
-from api.reports.specialist import router as specialist_reports_router
-from api.reports.specialist_extended import router as specialist_extended_router
-from api.reports.time_based import router as time_based_reports_router
-from api.reports.urgent import router as urgent_reports_router
-from api.ai_predictions import router as ai_predictions_router
-from api.health_score import router as health_score_router
-from api.general_assessment import router as general_assessment_router
-from api.follow_up import router as follow_up_router
-# Temporarily comment out email router due to missing sendgrid dependency
-# from api.email import router as email_router
-
-# Import intelligence routers
-from api.intelligence.weekly_brief import router as weekly_brief_router
-from api.intelligence.health_velocity import router as health_velocity_router
-from api.intelligence.body_systems import router as body_systems_router
-from api.intelligence.timeline import router as timeline_router
-from api.intelligence.patterns import router as patterns_router
-from api.intelligence.doctor_readiness import router as doctor_readiness_router
-from api.intelligence.comparative import router as comparative_router
-
 # Import middleware
 from core.middleware import setup_cors
+from core.model_selector import model_config, tier_cache
+from core.prompt_registry import prompt_registry
 
 # Import background jobs - using enhanced v2 with FAANG-level optimizations
 from services.background_jobs_v2 import init_scheduler, shutdown_scheduler
-# Import async HTTP client cleanup
-from utils.async_http import close_http_client
+# Process-wide Supabase/HTTP/Redis pools
+from core.resources import resources
+from utils.pdf_export import shutdown_render_pool
 
 load_dotenv()
 
@@ -52,19 +25,91 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Routers in registration order, imported by module path so the startup
+# report can time each one. DISABLED_ROUTERS (comma-separated module paths)
+# skips routers a deployment does not serve, along with their imports.
+ROUTER_MODULES = [
+    "api.chat",
+    "api.health_scan",
+    "api.health_story",
+    "api.tracking",
+    "api.photo_analysis",
+    "api.health_analysis",
+    "api.export",
+    "api.population_health",
+    "api.reports.general",
+    "api.reports.specialist",
+    "api.reports.specialist_extended",
+    "api.reports.time_based",
+    "api.reports.urgent",
+    "api.reports.jobs",
+    "api.ai_predictions",
+    "api.health_score",
+    "api.general_assessment",
+    "api.follow_up",
+    "api.admin",
+    # Temporarily disabled due to missing sendgrid dependency
+    # "api.email",
+    # Intelligence routers
+    "api.intelligence.weekly_brief",
+    "api.intelligence.health_velocity",
+    "api.intelligence.body_systems",
+    "api.intelligence.timeline",
+    "api.intelligence.patterns",
+    "api.intelligence.doctor_readiness",
+    "api.intelligence.comparative",
+    "api.internal",
+]
+DISABLED_ROUTERS = {m.strip() for m in os.getenv("DISABLED_ROUTERS", "").split(",") if m.strip()}
+
+def load_routers():
+    """Import the enabled router modules"""
+    modules = []
+    for module_path in ROUTER_MODULES:
+        if module_path in DISABLED_ROUTERS:
+            logger.info(f"Router {module_path} disabled")
+            continue
+        with startup_profile.timed(f"import {module_path}"):
+            # __import__ rather than importlib so `python -X importtime` sees it
+            modules.append(__import__(module_path, fromlist=["router"]))
+    return modules
+
+router_modules = load_routers()
+
 # Lifespan context manager for startup/shutdown
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup
+    # Startup: network I/O happens here, not at import time
     logger.info("Starting Oracle Health API with background scheduler...")
-    await init_scheduler()
+    with startup_profile.timed("lifespan: connection pools"):
+        await resources.start()
+    # Parse model tiers once; later edits are picked up by mtime or SIGHUP
+    with startup_profile.timed("lifespan: model config"):
+        model_config.reload()
+        model_config.install_sighup_handler()
+    # Compile prompts/ once; an invalid template stops the boot instead of failing requests
+    with startup_profile.timed("lifespan: prompt templates"):
+        prompt_registry.load()
+    # Subscribe to tier invalidations published by other replicas
+    await tier_cache.start()
+    # Routers with their own connections (e.g. photo analysis cache) set them up here
+    for module in router_modules:
+        if hasattr(module, "on_startup"):
+            with startup_profile.timed(f"lifespan: {module.__name__}.on_startup"):
+                await module.on_startup()
+    with startup_profile.timed("lifespan: scheduler"):
+        await init_scheduler()
+    startup_profile.mark_ready()
+    logger.info(f"Ready in {startup_profile.report()['ready_ms']} ms")
     yield
     # Shutdown
     logger.info("Shutting down Oracle Health API...")
     await shutdown_scheduler()
-    # Clean up HTTP client connections
-    await close_http_client()
-    logger.info("Closed HTTP client connections")
+    await tier_cache.close()
+    shutdown_render_pool()
+    # Close the shared DB, HTTP and Redis connections last
+    await resources.close()
+    logger.info("Closed connection pools")
 
 # Create FastAPI app
 app = FastAPI(
@@ -78,33 +123,8 @@ app = FastAPI(
 setup_cors(app)
 
 # Include routers
-app.include_router(chat_router)
-app.include_router(health_scan_router)
-app.include_router(health_story_router)
-app.include_router(tracking_router)
-app.include_router(photo_analysis_router)
-app.include_router(health_analysis_router)
-app.include_router(export_router)
-app.include_router(population_health_router)
-app.include_router(general_reports_router)
-app.include_router(specialist_reports_router)
-app.include_router(specialist_extended_router)
-app.include_router(time_based_reports_router)
-app.include_router(urgent_reports_router)
-app.include_router(ai_predictions_router)
-app.include_router(health_score_router)
-app.include_router(general_assessment_router)
-app.include_router(follow_up_router)
-# app.include_router(email_router)
-
-# Include intelligence routers
-app.include_router(weekly_brief_router)
-app.include_router(health_velocity_router)
-app.include_router(body_systems_router)
-app.include_router(timeline_router)
-app.include_router(patterns_router)
-app.include_router(doctor_readiness_router)
-app.include_router(comparative_router)
+for module in router_modules:
+    app.include_router(module.router)
 
 # Root endpoint
 @app.get("/")
@@ -10,8 +10,8 @@ from typing import List, Dict, Any, Optional
 import os
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
-from supabase import create_client, Client
-import redis.asyncio as redis
+from supabase_client import supabase
+from core.resources import resources
 from concurrent.futures import ThreadPoolExecutor
 import json
 
@@ -28,15 +28,12 @@ from api.health_score import calculate_health_score_with_ai
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Initialize Supabase
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_SERVICE_KEY")
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
-
-# Initialize Redis for job queuing and caching
-REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
+# Redis for job queuing and caching (shared pool, see core/resources.py)
 redis_client = None
 
+# Calls back into this API go over the shared HTTP pool; generation can be slow
+JOB_REQUEST_TIMEOUT = 300.0  # 5 minute timeout
+
 # Initialize scheduler
 scheduler = AsyncIOScheduler()
 
@@ -46,17 +43,12 @@ executor = ThreadPoolExecutor(max_workers=4)
 async def init_redis():
     """Initialize Redis connection"""
     global redis_client
-    try:
-        redis_client = await redis.from_url(REDIS_URL, decode_responses=True)
-        await redis_client.ping()
-        logger.info("Redis connected successfully")
-    except Exception as e:
-        logger.warning(f"Redis connection failed: {e}. Running without cache.")
+    redis_client = await resources.redis()
 
 async def cleanup_redis():
-    """Cleanup Redis connection"""
-    if redis_client:
-        await redis_client.close()
+    """Release Redis; the pool itself is closed with the other resources"""
+    global redis_client
+    redis_client = None
 
 def get_current_week_monday() -> date:
     """Get Monday of the current week"""
@@ -140,16 +132,15 @@ async def generate_user_weekly_content(user_id: str) -> Dict:
             if not story_result.data:
                 logger.info(f"Generating weekly story for user {user_id}")
                 # Call the health story endpoint via HTTP
-                import httpx
-                async with httpx.AsyncClient() as client:
-                    # Use environment variable for API URL
-                    api_url = os.getenv("API_URL", "http://localhost:8000")
-                    response = await client.post(
-                        f"{api_url}/api/health-story",
-                        json={"user_id": user_id}
-                    )
-                    if response.status_code != 200:
-                        logger.error(f"Failed to generate story: {response.text}")
+                # Use environment variable for API URL
+                api_url = os.getenv("API_URL", "http://localhost:8000")
+                response = await resources.http().post(
+                    f"{api_url}/api/health-story",
+                    json={"user_id": user_id},
+                    timeout=JOB_REQUEST_TIMEOUT
+                )
+                if response.status_code != 200:
+                    logger.error(f"Failed to generate story: {response.text}")
             
             # Step 2: Generate analysis
             request = GenerateAnalysisRequest(
@@ -242,33 +233,32 @@ async def generate_weekly_ai_predictions_for_user(user_id: str) -> Dict:
         
         try:
             # Generate all AI predictions via HTTP calls
-            import httpx
             api_url = os.getenv("API_URL", "http://localhost:8000")
-            
-            async with httpx.AsyncClient(timeout=300.0) as client:  # 5 minute timeout
-                # 1. Dashboard Alert
-                alert_response = await client.get(f"{api_url}/api/ai/dashboard-alert/{user_id}")
-                alert_data = alert_response.json() if alert_response.status_code == 200 else {}
-                dashboard_alert = alert_data.get('alert') if alert_data else None
-                
-                # 2. Immediate Predictions
-                predictions_response = await client.get(f"{api_url}/api/ai/predictions/immediate/{user_id}")
-                predictions_data = predictions_response.json() if predictions_response.status_code == 200 else {}
-                predictions = predictions_data.get('predictions', []) if predictions_data else []
-                data_quality_score = predictions_data.get('data_quality_score', 0) if predictions_data else 0
-                
-                # 3. Pattern Questions
-                questions_response = await client.get(f"{api_url}/api/ai/questions/{user_id}")
-                questions_data = questions_response.json() if questions_response.status_code == 200 else {}
-                pattern_questions = questions_data.get('questions', []) if questions_data else []
-                
-                # 4. Body Patterns
-                patterns_response = await client.get(f"{api_url}/api/ai/patterns/{user_id}")
-                patterns_data = patterns_response.json() if patterns_response.status_code == 200 else {}
-                body_patterns = {
-                    'tendencies': patterns_data.get('tendencies', []),
-                    'positiveResponses': patterns_data.get('positive_responses', [])
-                } if patterns_data else {}
+            client = resources.http()
+            
+            # 1. Dashboard Alert
+            alert_response = await client.get(f"{api_url}/api/ai/dashboard-alert/{user_id}", timeout=JOB_REQUEST_TIMEOUT)
+            alert_data = alert_response.json() if alert_response.status_code == 200 else {}
+            dashboard_alert = alert_data.get('alert') if alert_data else None
+            
+            # 2. Immediate Predictions
+            predictions_response = await client.get(f"{api_url}/api/ai/predictions/immediate/{user_id}", timeout=JOB_REQUEST_TIMEOUT)
+            predictions_data = predictions_response.json() if predictions_response.status_code == 200 else {}
+            predictions = predictions_data.get('predictions', []) if predictions_data else []
+            data_quality_score = predictions_data.get('data_quality_score', 0) if predictions_data else 0
+            
+            # 3. Pattern Questions
+            questions_response = await client.get(f"{api_url}/api/ai/questions/{user_id}", timeout=JOB_REQUEST_TIMEOUT)
+            questions_data = questions_response.json() if questions_response.status_code == 200 else {}
+            pattern_questions = questions_data.get('questions', []) if questions_data else []
+            
+            # 4. Body Patterns
+            patterns_response = await client.get(f"{api_url}/api/ai/patterns/{user_id}", timeout=JOB_REQUEST_TIMEOUT)
+            patterns_data = patterns_response.json() if patterns_response.status_code == 200 else {}
+            body_patterns = {
+                'tendencies': patterns_data.get('tendencies', []),
+                'positiveResponses': patterns_data.get('positive_responses', [])
+            } if patterns_data else {}
             
             # Update the record with all data
             update_data = {
@@ -642,33 +632,32 @@ async def generate_intelligence_for_user(user_id: str, max_retries: int = 3):
             logger.info(f"Generating intelligence for user {user_id} (attempt {attempt + 1}/{max_retries})")
             
             # Call the intelligence generation endpoint via HTTP
-            import httpx
-            async with httpx.AsyncClient(timeout=300) as client:  # 5 minute timeout
-                api_url = os.getenv("API_URL", "http://localhost:8000")
-                response = await client.post(
-                    f"{api_url}/api/generate-all-intelligence/{user_id}",
-                    params={"force_refresh": True}
-                )
+            api_url = os.getenv("API_URL", "http://localhost:8000")
+            response = await resources.http().post(
+                f"{api_url}/api/generate-all-intelligence/{user_id}",
+                params={"force_refresh": True},
+                timeout=JOB_REQUEST_TIMEOUT
+            )
+            
+            if response.status_code == 200:
+                result = response.json()
                 
-                if response.status_code == 200:
-                    result = response.json()
-                    
-                    # Log individual user result
-                    if result.get('status') == 'success':
-                        logger.info(f"Successfully generated intelligence for user {user_id}")
-                    elif result.get('status') == 'partial':
-                        logger.warning(f"Partially generated intelligence for user {user_id}: {result.get('errors')}")
-                    else:
-                        logger.error(f"Failed to generate intelligence for user {user_id}: {result.get('error')}")
-                    
-                    return result
+                # Log individual user result
+                if result.get('status') == 'success':
+                    logger.info(f"Successfully generated intelligence for user {user_id}")
+                elif result.get('status') == 'partial':
+                    logger.warning(f"Partially generated intelligence for user {user_id}: {result.get('errors')}")
                 else:
-                    logger.error(f"HTTP error {response.status_code} for user {user_id}")
-                    if attempt < max_retries - 1:
-                        await asyncio.sleep(10 * (attempt + 1))  # Exponential backoff
-                        continue
-                    return {'status': 'error', 'error': f'HTTP {response.status_code}'}
-                    
+                    logger.error(f"Failed to generate intelligence for user {user_id}: {result.get('error')}")
+                
+                return result
+            else:
+                logger.error(f"HTTP error {response.status_code} for user {user_id}")
+                if attempt < max_retries - 1:
+                    await asyncio.sleep(10 * (attempt + 1))  # Exponential backoff
+                    continue
+                return {'status': 'error', 'error': f'HTTP {response.status_code}'}
+                
         except Exception as e:
             logger.error(f"Error generating intelligence for user {user_id}: {str(e)}")
             if attempt < max_retries - 1:
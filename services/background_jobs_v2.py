@@ -10,8 +10,8 @@ from typing import List, Dict, Any, Optional
 import os
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
-from supabase import create_client, Client
-import redis.asyncio as redis
+from supabase_client import supabase
+from core.resources import resources
 from concurrent.futures import ThreadPoolExecutor
 import json
 import httpx
@@ -22,13 +22,7 @@ import random
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Initialize Supabase
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_SERVICE_KEY")
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
-
-# Initialize Redis for job queuing and caching
-REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
+# Redis for job queuing and caching (shared pool, see core/resources.py)
 redis_client = None
 
 # Initialize scheduler
@@ -39,6 +33,8 @@ executor = ThreadPoolExecutor(max_workers=4)
 
 # API configuration
 API_URL = os.getenv("API_URL", "http://localhost:8000")
+# Jobs call back into this API over the shared HTTP pool; generation is slow
+JOB_REQUEST_TIMEOUT = 120.0
 
 # Model fallback chain for handling 429 errors
 MODEL_FALLBACK_CHAIN = [
@@ -62,7 +58,6 @@ class BatchProcessor:
     def __init__(self, batch_size: int = 10, delay_between_batches: float = 5.0):
         self.batch_size = batch_size
         self.delay_between_batches = delay_between_batches
-        self.http_client = httpx.AsyncClient(timeout=300.0)
         
     async def process_users(self, users: List[Dict], process_func, job_name: str) -> Dict:
         """Process users in batches with monitoring"""
@@ -154,8 +149,7 @@ class BatchProcessor:
             retry_queue = new_retry_queue
     
     async def close(self):
-        """Clean up resources"""
-        await self.http_client.aclose()
+        """Nothing to release; HTTP connections are pooled in core/resources.py"""
 
 # Global batch processor
 batch_processor = BatchProcessor()
@@ -163,17 +157,12 @@ batch_processor = BatchProcessor()
 async def init_redis():
     """Initialize Redis connection"""
     global redis_client
-    try:
-        redis_client = await redis.from_url(REDIS_URL, decode_responses=True)
-        await redis_client.ping()
-        logger.info("Redis connected successfully")
-    except Exception as e:
-        logger.warning(f"Redis connection failed: {e}. Running without cache.")
+    redis_client = await resources.redis()
 
 async def cleanup_redis():
-    """Cleanup Redis connection"""
-    if redis_client:
-        await redis_client.close()
+    """Release Redis; the pool itself is closed with the other resources"""
+    global redis_client
+    redis_client = None
 
 def get_current_week_monday() -> date:
     """Get Monday of the current week"""
@@ -246,24 +235,25 @@ async def weekly_health_stories_job():
                     return {'status': 'already_exists'}
                 
                 # Call the health story endpoint
-                async with httpx.AsyncClient(timeout=120.0) as client:
-                    response = await client.post(
-                        f"{API_URL}/api/health-story",
-                        json={
-                            "user_id": user_id,
-                            "date_range": {
-                                "start": (week_of - timedelta(days=7)).isoformat(),
-                                "end": week_of.isoformat()
-                            }
+                client = resources.http()
+                response = await client.post(
+                    f"{API_URL}/api/health-story",
+                    json={
+                        "user_id": user_id,
+                        "date_range": {
+                            "start": (week_of - timedelta(days=7)).isoformat(),
+                            "end": week_of.isoformat()
                         }
-                    )
+                    },
+                    timeout=JOB_REQUEST_TIMEOUT
+                )
                     
-                    if response.status_code == 200:
-                        logger.info(f"Successfully generated story for user {user_id}")
-                        return {'status': 'success'}
-                    else:
-                        logger.error(f"Failed to generate story for user {user_id}: {response.status_code}")
-                        return {'status': 'failed', 'error': response.text}
+                if response.status_code == 200:
+                    logger.info(f"Successfully generated story for user {user_id}")
+                    return {'status': 'success'}
+                else:
+                    logger.error(f"Failed to generate story for user {user_id}: {response.status_code}")
+                    return {'status': 'failed', 'error': response.text}
                         
             except Exception as e:
                 logger.error(f"Error generating story for user {user_id}: {str(e)}")
@@ -306,16 +296,17 @@ async def weekly_ai_predictions_job():
                     if pred_type == 'dashboard':
                         endpoint = f"/api/ai/dashboard-alert/{user_id}"
                     
-                    async with httpx.AsyncClient(timeout=120.0) as client:
-                        response = await client.get(
-                            f"{API_URL}{endpoint}",
-                            params={"force_refresh": True}
-                        )
+                    client = resources.http()
+                    response = await client.get(
+                        f"{API_URL}{endpoint}",
+                        params={"force_refresh": True},
+                        timeout=JOB_REQUEST_TIMEOUT
+                    )
                         
-                        if response.status_code == 200:
-                            results[pred_type] = 'success'
-                        else:
-                            results[pred_type] = f'failed: {response.status_code}'
+                    if response.status_code == 200:
+                        results[pred_type] = 'success'
+                    else:
+                        results[pred_type] = f'failed: {response.status_code}'
                             
                 except Exception as e:
                     results[pred_type] = f'error: {str(e)}'
@@ -373,32 +364,33 @@ async def weekly_health_insights_job():
             
             # Generate insights using the health analysis endpoint
             try:
-                async with httpx.AsyncClient(timeout=120.0) as client:
-                    response = await client.post(
-                        f"{API_URL}/api/generate-insights/{user_id}",
-                        json={
-                            "force_refresh": True
-                        }
-                    )
+                client = resources.http()
+                response = await client.post(
+                    f"{API_URL}/api/generate-insights/{user_id}",
+                    json={
+                        "force_refresh": True
+                    },
+                    timeout=JOB_REQUEST_TIMEOUT
+                )
                     
-                    if response.status_code == 200:
-                        data = response.json()
+                if response.status_code == 200:
+                    data = response.json()
                         
-                        # Store insights
-                        insights = data.get('data', [])
-                        for insight in insights:
-                            supabase.table('health_insights').insert({
-                                'user_id': user_id,
-                                'insight_type': insight.get('type', 'neutral'),
-                                'title': insight.get('title', 'Health Insight'),
-                                'description': insight.get('description', ''),
-                                'confidence': insight.get('confidence', 70),
-                                'week_of': week_of.isoformat(),
-                                'generation_method': 'weekly'
-                            }).execute()
+                    # Store insights
+                    insights = data.get('data', [])
+                    for insight in insights:
+                        supabase.table('health_insights').insert({
+                            'user_id': user_id,
+                            'insight_type': insight.get('type', 'neutral'),
+                            'title': insight.get('title', 'Health Insight'),
+                            'description': insight.get('description', ''),
+                            'confidence': insight.get('confidence', 70),
+                            'week_of': week_of.isoformat(),
+                            'generation_method': 'weekly'
+                        }).execute()
                         
-                        logger.info(f"Generated {len(insights)} insights for user {user_id}")
-                        return {'status': 'success', 'count': len(insights)}
+                    logger.info(f"Generated {len(insights)} insights for user {user_id}")
+                    return {'status': 'success', 'count': len(insights)}
                     
             except Exception as e:
                 logger.error(f"Error generating insights for user {user_id}: {str(e)}")
@@ -440,34 +432,35 @@ async def weekly_shadow_patterns_job():
             
             # Generate patterns using the health analysis endpoint
             try:
-                async with httpx.AsyncClient(timeout=120.0) as client:
-                    response = await client.post(
-                        f"{API_URL}/api/generate-shadow-patterns/{user_id}",
-                        json={
-                            "force_refresh": True
-                        }
-                    )
+                client = resources.http()
+                response = await client.post(
+                    f"{API_URL}/api/generate-shadow-patterns/{user_id}",
+                    json={
+                        "force_refresh": True
+                    },
+                    timeout=JOB_REQUEST_TIMEOUT
+                )
                     
-                    if response.status_code == 200:
-                        data = response.json()
+                if response.status_code == 200:
+                    data = response.json()
                         
-                        # Store shadow patterns
-                        patterns = data.get('data', [])
-                        for pattern in patterns:
-                            supabase.table('shadow_patterns').insert({
-                                'user_id': user_id,
-                                'pattern_name': pattern.get('name', 'Unknown Pattern'),
-                                'pattern_category': pattern.get('category'),
-                                'last_seen_description': pattern.get('description', ''),
-                                'significance': pattern.get('significance', 'medium'),
-                                'last_mentioned_date': pattern.get('last_seen'),
-                                'days_missing': pattern.get('days_missing', 0),
-                                'week_of': week_of.isoformat(),
-                                'generation_method': 'weekly'
-                            }).execute()
+                    # Store shadow patterns
+                    patterns = data.get('data', [])
+                    for pattern in patterns:
+                        supabase.table('shadow_patterns').insert({
+                            'user_id': user_id,
+                            'pattern_name': pattern.get('name', 'Unknown Pattern'),
+                            'pattern_category': pattern.get('category'),
+                            'last_seen_description': pattern.get('description', ''),
+                            'significance': pattern.get('significance', 'medium'),
+                            'last_mentioned_date': pattern.get('last_seen'),
+                            'days_missing': pattern.get('days_missing', 0),
+                            'week_of': week_of.isoformat(),
+                            'generation_method': 'weekly'
+                        }).execute()
                         
-                        logger.info(f"Generated {len(patterns)} patterns for user {user_id}")
-                        return {'status': 'success', 'count': len(patterns)}
+                    logger.info(f"Generated {len(patterns)} patterns for user {user_id}")
+                    return {'status': 'success', 'count': len(patterns)}
                     
             except Exception as e:
                 logger.error(f"Error generating patterns for user {user_id}: {str(e)}")
@@ -509,33 +502,34 @@ async def weekly_strategic_moves_job():
             
             # Generate strategies using the health analysis endpoint
             try:
-                async with httpx.AsyncClient(timeout=120.0) as client:
-                    response = await client.post(
-                        f"{API_URL}/api/generate-strategies/{user_id}",
-                        json={
-                            "force_refresh": True
-                        }
-                    )
+                client = resources.http()
+                response = await client.post(
+                    f"{API_URL}/api/generate-strategies/{user_id}",
+                    json={
+                        "force_refresh": True
+                    },
+                    timeout=JOB_REQUEST_TIMEOUT
+                )
                     
-                    if response.status_code == 200:
-                        data = response.json()
+                if response.status_code == 200:
+                    data = response.json()
                         
-                        # Store strategic moves
-                        strategies = data.get('data', [])
-                        for idx, strategy in enumerate(strategies):
-                            supabase.table('strategic_moves').insert({
-                                'user_id': user_id,
-                                'strategy': strategy.get('strategy', 'Health Strategy'),
-                                'strategy_type': strategy.get('type', 'optimization'),
-                                'priority': strategy.get('priority', 5),
-                                'rationale': strategy.get('rationale'),
-                                'expected_outcome': strategy.get('expected_outcome'),
-                                'week_of': week_of.isoformat(),
-                                'generation_method': 'weekly'
-                            }).execute()
+                    # Store strategic moves
+                    strategies = data.get('data', [])
+                    for idx, strategy in enumerate(strategies):
+                        supabase.table('strategic_moves').insert({
+                            'user_id': user_id,
+                            'strategy': strategy.get('strategy', 'Health Strategy'),
+                            'strategy_type': strategy.get('type', 'optimization'),
+                            'priority': strategy.get('priority', 5),
+                            'rationale': strategy.get('rationale'),
+                            'expected_outcome': strategy.get('expected_outcome'),
+                            'week_of': week_of.isoformat(),
+                            'generation_method': 'weekly'
+                        }).execute()
                         
-                        logger.info(f"Generated {len(strategies)} strategies for user {user_id}")
-                        return {'status': 'success', 'count': len(strategies)}
+                    logger.info(f"Generated {len(strategies)} strategies for user {user_id}")
+                    return {'status': 'success', 'count': len(strategies)}
                     
             except Exception as e:
                 logger.error(f"Error generating strategies for user {user_id}: {str(e)}")
@@ -582,19 +576,20 @@ async def weekly_health_scores_job():
             """Generate health score for a user"""
             try:
                 # Call the health score endpoint
-                async with httpx.AsyncClient(timeout=120.0) as client:
-                    response = await client.get(
-                        f"{API_URL}/api/health-score/{user_id}",
-                        params={"force_refresh": True}
-                    )
+                client = resources.http()
+                response = await client.get(
+                    f"{API_URL}/api/health-score/{user_id}",
+                    params={"force_refresh": True},
+                    timeout=JOB_REQUEST_TIMEOUT
+                )
                     
-                    if response.status_code == 200:
-                        data = response.json()
-                        logger.info(f"Generated score {data.get('score')} for user {user_id}")
-                        return {'status': 'success', 'score': data.get('score')}
-                    else:
-                        logger.error(f"Failed to generate score for user {user_id}: {response.status_code}")
-                        return {'status': 'failed'}
+                if response.status_code == 200:
+                    data = response.json()
+                    logger.info(f"Generated score {data.get('score')} for user {user_id}")
+                    return {'status': 'success', 'score': data.get('score')}
+                else:
+                    logger.error(f"Failed to generate score for user {user_id}: {response.status_code}")
+                    return {'status': 'failed'}
                         
             except Exception as e:
                 logger.error(f"Error generating score for user {user_id}: {str(e)}")
@@ -652,6 +647,37 @@ async def cleanup_expired_shares():
     except Exception as e:
         logger.error(f"Error cleaning up expired shares: {str(e)}")
 
+@scheduler.scheduled_job(CronTrigger(minute='*/15'), id='sensitive_photo_sweep')
+async def sweep_sensitive_photo_blobs():
+    """Remove expired sensitive photo blobs from the local encrypted store"""
+    try:
+        from api.photo.sensitive_store import sweep_sensitive_photos
+        removed = await sweep_sensitive_photos()
+        if removed:
+            logger.info(f"Swept {removed} expired sensitive photo blobs")
+    except Exception as e:
+        logger.error(f"Error sweeping sensitive photo blobs: {str(e)}")
+
+@scheduler.scheduled_job(CronTrigger(day=1, hour=1, minute=0, timezone='UTC'), id='close_monthly_rollups')
+async def close_monthly_rollups_job():
+    """Store last month's health rollups so annual reports never re-read its rows"""
+    try:
+        from utils.monthly_rollups import close_month, month_key
+        last_month = month_key(datetime.now(timezone.utc).replace(day=1) - timedelta(days=1))
+        users = await get_all_users()
+        if not users:
+            await log_job_execution('close_monthly_rollups', 'no_users')
+            return
+        
+        results = await batch_processor.process_users(
+            users, lambda user_id: close_month(user_id, last_month), 'close_monthly_rollups'
+        )
+        await log_job_execution('close_monthly_rollups', 'completed', results)
+        logger.info(f"Closed {last_month} rollups: {results['successful']}/{results['total']} successful")
+    except Exception as e:
+        logger.error(f"Monthly rollup job failed: {str(e)}")
+        await log_job_execution('close_monthly_rollups', 'failed', {'error': str(e)})
+
 @scheduler.scheduled_job(CronTrigger(day_of_week='sun', hour='0', minute='0'), id='weekly_refresh_limits')
 async def reset_weekly_refresh_limits():
     """Reset weekly refresh limits every Sunday midnight"""
@@ -680,13 +706,14 @@ async def init_scheduler():
     logger.info("  - Saturday 2 AM UTC: Health Scores")
     logger.info("  - Hourly: AI Predictions Check (user preferences)")
     logger.info("  - Daily 3 AM: Cleanup expired shares")
+    logger.info("  - Every 15 min: Sweep expired sensitive photo blobs")
+    logger.info("  - 1st of month 1 AM UTC: Close monthly health rollups")
     logger.info("  - Sunday Midnight: Reset weekly limits")
 
 async def shutdown_scheduler():
     """Cleanup scheduler and connections"""
     scheduler.shutdown()
     await cleanup_redis()
-    await batch_processor.close()
     logger.info("Background job scheduler stopped")
 
 # Export functions for use in FastAPI
@@ -9,17 +9,12 @@ from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Optional, Any
 from enum import Enum
 import os
-from supabase import create_client, Client
+from supabase_client import supabase
 import httpx
 import json
 
 logger = logging.getLogger(__name__)
 
-# Initialize Supabase
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_SERVICE_KEY")
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
-
 class AlertSeverity(Enum):
     INFO = "info"
     WARNING = "warning"
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""Test script for the token-budgeted context packer"""
+import os
+import sys
+import json
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.context_packer import (
+    CLINICAL_FIELDS, ContextSection, compact_record, context_budget, pack_context
+)
+from utils.token_counter import count_tokens
+
+
+def scan(day, **extra):
+    return {
+        "id": f"qs{day}", "user_id": "u1", "created_at": f"2025-03-{day:02d}T10:00:00+00:00",
+        "body_part": "knee", "updated_at": "2025-03-31", "model_used": "x",
+        "form_data": {"symptoms": "swelling", "painLevel": 6, "notes": ""},
+        "analysis_result": {"primaryCondition": "Sprain", "redFlags": [], "reasoning": "long " * 300},
+        **extra
+    }
+
+
+def test_compact_record_keeps_clinical_fields_only():
+    record = compact_record(scan(1), CLINICAL_FIELDS["quick_scans"])
+    assert record == {
+        "created_at": "2025-03-01T10:00:00+00:00", "body_part": "knee",
+        "form_data": {"symptoms": "swelling", "painLevel": 6},
+        "analysis_result": {"primaryCondition": "Sprain"},
+    }
+
+    generic = compact_record(scan(1))
+    assert "user_id" not in generic and "updated_at" not in generic and "model_used" not in generic
+    assert generic["analysis_result"]["redFlags"] == []  # only top-level empties are dropped
+
+
+def test_priority_sections_fill_budget_first_and_keep_newest():
+    scans = [scan(day) for day in range(1, 29)]
+    chats = [{"created_at": f"2025-03-{day:02d}", "content": "How is my knee? " * 20} for day in range(1, 29)]
+    sections = [
+        ContextSection("quick_scans", scans, fields=CLINICAL_FIELDS["quick_scans"]),
+        ContextSection("oracle_chats", chats, fields=CLINICAL_FIELDS["oracle_chats"]),
+    ]
+    packed = pack_context(sections, budget=1500)
+
+    assert "quick_scans" not in packed.dropped
+    assert packed.dropped["oracle_chats"] > 0
+    kept_days = [c["created_at"] for c in packed.kept.get("oracle_chats", [])]
+    assert kept_days == sorted(kept_days)  # original order preserved
+    assert all(day > "2025-03-10" for day in kept_days)  # newest survive
+    text = packed.as_text()
+    assert count_tokens(text) <= 1500 * 1.05
+    assert json.loads(packed.render("quick_scans"))  # whole records, valid JSON
+
+
+def test_symptom_entries_keep_newest_by_occurrence_date():
+    # Rows as selected by get_health_story_data: no "date" column
+    entries = [{"occurrence_date": f"2025-03-{day:02d}", "symptom_name": "headache", "severity": day % 10,
+                "created_at": "2025-04-01T00:00:00+00:00", "notes": "worse after screens " * 10}
+               for day in range(1, 29)]
+    section = ContextSection("symptom_tracking", entries, fields=CLINICAL_FIELDS["symptom_tracking"],
+                             order_key="occurrence_date")
+    packed = pack_context([section], budget=600)
+
+    kept = packed.kept["symptom_tracking"]
+    assert packed.dropped["symptom_tracking"] > 0
+    assert kept[-1]["occurrence_date"] == "2025-03-28"
+    assert all(entry["occurrence_date"] > "2025-03-10" for entry in kept)
+
+
+def test_text_sections_are_cut_on_line_boundaries():
+    lines = [f"Day {i}: slept 7h, mild headache in the afternoon" for i in range(200)]
+    packed = pack_context([ContextSection.text("week", "\n".join(lines))], budget=300)
+    rendered = packed.render("week").splitlines()
+    assert rendered == lines[:len(rendered)]
+    assert 0 < len(rendered) < 200 and packed.dropped["week"] == 200 - len(rendered)
+
+
+def test_whole_values_are_included_or_reported_dropped():
+    packed = pack_context([
+        ContextSection("medical_profile", {"age": 40, "allergies": ["penicillin"], "user_id": "u1"}),
+        ContextSection("wearables", {}),
+        ContextSection("monthly", {f"2025-{m:02d}": {"scans": m} for m in range(1, 13)}),
+    ], budget=30)
+    assert packed.kept["medical_profile"] == {"age": 40, "allergies": ["penicillin"]}
+    assert "wearables" not in packed.kept and "wearables" not in packed.dropped
+    assert packed.dropped == {"monthly": 1}
+    assert packed.as_dict()["_omitted"] == {"monthly": 1}
+
+
+def test_context_budget_per_model():
+    assert context_budget("deepseek/deepseek-chat", output_tokens=1024, cap=10 ** 6) == 64000 - 1024 - 2000
+    assert context_budget("google/gemini-2.5-flash", cap=16000) == 16000
+    assert context_budget("unknown/model", output_tokens=4000, cap=10 ** 6) == 32000 - 4000 - 2000
+
+
+def test_compact_packing_beats_indented_dumps():
+    scans = [scan(day) for day in range(1, 15)]
+    indented = count_tokens(json.dumps(scans, indent=2))
+    packed = pack_context([ContextSection("quick_scans", scans, fields=CLINICAL_FIELDS["quick_scans"])], 10 ** 6)
+    print(f"Quick scan tokens: indent=2 {indented} -> packed {packed.tokens}")
+    assert packed.tokens < indented * 0.5
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            func()
+            print(f"✅ {name}")
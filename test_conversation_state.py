@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""Test script for incremental conversation context state"""
+import os
+import sys
+import asyncio
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils import conversation_state
+from utils.context_compression import compress_medical_context
+from utils.conversation_state import checkpoint_summary, load_context_state
+from utils.token_counter import count_message_tokens
+
+
+class FakeResult:
+    def __init__(self, data):
+        self.data = data
+
+
+class FakeQuery:
+    def __init__(self, db, table):
+        self.db, self.table = db, table
+        self.filters, self.orders, self.window, self.upserted = [], [], None, None
+
+    def select(self, columns="*"):
+        return self
+
+    def eq(self, key, value):
+        self.filters.append(lambda row: row.get(key) == value)
+        return self
+
+    def gt(self, key, value):
+        self.filters.append(lambda row: row.get(key) > value)
+        return self
+
+    def order(self, key, desc=False):
+        self.orders.append((key, desc))
+        return self
+
+    def range(self, start, end):
+        self.window = (start, end + 1)
+        return self
+
+    def limit(self, count):
+        self.window = (0, count)
+        return self
+
+    def upsert(self, row, on_conflict=None):
+        self.upserted = row
+        return self
+
+    def execute(self):
+        rows = self.db.tables.setdefault(self.table, [])
+        if self.upserted is not None:
+            self.db.writes += 1
+            rows[:] = [r for r in rows if r["conversation_id"] != self.upserted["conversation_id"]] + [self.upserted]
+            return FakeResult([self.upserted])
+        self.db.reads.append(self.table)
+        found = [dict(r) for r in rows if all(match(r) for match in self.filters)]
+        for key, desc in reversed(self.orders):
+            found.sort(key=lambda r: r[key], reverse=desc)
+        if self.window:
+            found = found[self.window[0]:self.window[1]]
+        return FakeResult(found)
+
+
+class FakeSupabase:
+    def __init__(self):
+        self.tables, self.reads, self.writes = {}, [], 0
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+    def add_messages(self, conversation_id, count, start=0, content="Headache again today, mild. " * 20):
+        messages = self.tables.setdefault("messages", [])
+        for i in range(start, start + count):
+            messages.append({
+                "conversation_id": conversation_id,
+                "role": "user" if i % 2 == 0 else "assistant",
+                "content": f"{i}: {content}",
+                "created_at": f"2025-01-01T00:{i // 60:02d}:{i % 60:02d}+00:00",
+            })
+
+
+def with_fakes(db, summaries, scenario):
+    async def fake_summarize(messages, max_tokens=500, previous_summary=None):
+        summaries.append((previous_summary, messages))
+        return f"summary of {len(messages)}"
+
+    originals = conversation_state.supabase, conversation_state.summarize_medical_messages
+    conversation_state.supabase = db
+    conversation_state.summarize_medical_messages = fake_summarize
+    try:
+        return asyncio.run(scenario())
+    finally:
+        conversation_state.supabase, conversation_state.summarize_medical_messages = originals
+
+
+def test_token_count_is_incremental():
+    db, summaries = FakeSupabase(), []
+    db.add_messages("c1", 6)
+
+    async def scenario():
+        first = await load_context_state("c1", "u1")
+        db.add_messages("c1", 2, start=6)
+        second = await load_context_state("c1", "u1")
+        unchanged = await load_context_state("c1", "u1")
+        return first, second, unchanged
+
+    first, second, unchanged = with_fakes(db, summaries, scenario)
+    assert first.message_count == 6 and second.message_count == 8
+    assert second.token_count == count_message_tokens(db.tables["messages"])
+    assert unchanged.token_count == second.token_count
+    # A turn with no new messages writes nothing
+    assert db.writes == 2
+
+
+def test_summary_checkpoint_is_stored_and_reused():
+    db, summaries = FakeSupabase(), []
+    db.add_messages("c1", 30)
+    original = conversation_state.CONTEXT_SUMMARY_THRESHOLD
+    conversation_state.CONTEXT_SUMMARY_THRESHOLD = 2000
+
+    async def scenario():
+        state = await load_context_state("c1")
+        assert await checkpoint_summary(state)
+        # The next turn reuses the stored summary
+        again = await load_context_state("c1")
+        assert not await checkpoint_summary(again)
+        # Crossing the threshold again folds only the new messages, plus the old summary
+        db.add_messages("c1", 20, start=30)
+        later = await load_context_state("c1")
+        assert await checkpoint_summary(later)
+        return state, again, later
+
+    try:
+        state, again, later = with_fakes(db, summaries, scenario)
+    finally:
+        conversation_state.CONTEXT_SUMMARY_THRESHOLD = original
+
+    assert state.summarized_count == 20 and state.summary == "summary of 20"
+    assert again.summary == "summary of 20" and again.summarized_tokens == state.summarized_tokens
+    assert len(summaries) == 2 and summaries[0][0] is None
+    previous, folded = summaries[1]
+    assert previous == "summary of 20"
+    assert folded[0]["content"].startswith("20:")
+    assert later.summarized_count == 40
+    assert later.summary_message()["role"] == "system"
+
+
+def test_summary_failure_keeps_checkpoint():
+    db = FakeSupabase()
+    db.add_messages("c1", 30)
+
+    async def failing(messages, max_tokens=500, previous_summary=None):
+        raise RuntimeError("down")
+
+    async def scenario():
+        conversation_state.summarize_medical_messages = failing
+        state = await load_context_state("c1")
+        state.summarized_tokens = -10 ** 6  # force the threshold
+        return state, await checkpoint_summary(state)
+
+    state, folded = with_fakes(db, [], scenario)
+    assert not folded and state.summarized_count == 0 and state.summary is None
+
+
+def test_previous_summary_is_not_clipped():
+    from utils import context_compression
+    prompts = []
+
+    class FakeOpenRouter:
+        async def chat_completion(self, payload, **kwargs):
+            prompts.append(payload["messages"][0]["content"])
+            return {"choices": [{"message": {"content": "folded"}}]}
+
+    previous = "Week 1: migraines, started sumatriptan. " * 50  # ~2000 chars
+    original = context_compression.openrouter
+    context_compression.openrouter = FakeOpenRouter()
+    try:
+        result = asyncio.run(context_compression.summarize_medical_messages(
+            [{"role": "user", "content": "x" * 2000}], previous_summary=previous
+        ))
+    finally:
+        context_compression.openrouter = original
+
+    assert result == "folded"
+    assert previous in prompts[0]
+    assert "x" * 501 not in prompts[0]
+
+
+def test_compress_medical_context_keeps_order():
+    messages = [{"role": "user" if i % 2 == 0 else "assistant", "content": f"message {i}"} for i in range(40)]
+    messages[5]["content"] = "severe chest pain"
+    messages[7]["content"] = "taking 20 mg daily"
+    messages[12]["content"] = "message 1"  # duplicate content of an earlier message
+
+    async def no_llm(excluded, max_tokens=500):
+        return f"{len(excluded)} excluded"
+
+    from utils import context_compression
+    original = context_compression.generate_medical_summary
+    context_compression.generate_medical_summary = no_llm
+    try:
+        result = asyncio.run(compress_medical_context(messages))
+    finally:
+        context_compression.generate_medical_summary = original
+
+    assert result[0] == {"role": "system", "content": "[Previous conversation summary: 25 excluded]"}
+    contents = [m["content"] for m in result[1:]]
+    assert contents == ["message 0", "message 1", "message 2", "severe chest pain", "taking 20 mg daily"] + \
+        [f"message {i}" for i in range(30, 40)]
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print(f"✅ {name}")
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""Test script for the per-user llm_context history digest"""
+import os
+import sys
+import asyncio
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils import history_digest
+from utils.history_digest import get_history_digest, refresh_history_digest, schedule_digest_refresh
+
+
+class FakeResult:
+    def __init__(self, data):
+        self.data = data
+
+
+class FakeQuery:
+    def __init__(self, db, table):
+        self.db, self.table = db, table
+        self.filters, self.orders, self.limit_to, self.upserted = [], [], None, None
+
+    def select(self, columns="*"):
+        return self
+
+    def eq(self, key, value):
+        self.filters.append(lambda row: row.get(key) == value)
+        return self
+
+    def gte(self, key, value):
+        self.filters.append(lambda row: row.get(key, "") >= value)
+        return self
+
+    def order(self, key, desc=False):
+        self.orders.append((key, desc))
+        return self
+
+    def limit(self, count):
+        self.limit_to = count
+        return self
+
+    def upsert(self, row, on_conflict=None):
+        self.upserted = row
+        return self
+
+    def update(self, values):
+        return self
+
+    def execute(self):
+        rows = self.db.tables.setdefault(self.table, [])
+        if self.upserted is not None:
+            rows[:] = [r for r in rows if r["user_id"] != self.upserted["user_id"]] + [dict(self.upserted)]
+            return FakeResult([self.upserted])
+        self.db.reads.append(self.table)
+        found = [dict(r) for r in rows if all(match(r) for match in self.filters)]
+        for key, desc in reversed(self.orders):
+            found.sort(key=lambda r: r[key], reverse=desc)
+        return FakeResult(found[:self.limit_to] if self.limit_to else found)
+
+
+class FakeSupabase:
+    def __init__(self):
+        self.tables, self.reads = {}, []
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+    def add_summaries(self, user_id, count, tokens, start=0):
+        for i in range(start, start + count):
+            self.tables.setdefault("llm_context", []).append({
+                "id": f"s{i}", "user_id": user_id, "conversation_id": f"c{i}",
+                "llm_summary": f"summary {i}", "token_count": tokens,
+                "created_at": f"2025-01-{1 + i:02d}T00:00:00+00:00",
+            })
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.values[key] = value
+
+
+class FakeResources:
+    def __init__(self, redis):
+        self.client = redis
+
+    async def redis(self):
+        return self.client
+
+
+class FakeOpenRouter:
+    def __init__(self):
+        self.calls = []
+
+    async def chat_completion(self, payload, **kwargs):
+        self.calls.append(payload)
+        return {"choices": [{"message": {"content": f"digest #{len(self.calls)}"}}]}
+
+
+def run_with(db, redis, llm, scenario, modules=()):
+    patched = [(history_digest, "supabase", db), (history_digest, "resources", FakeResources(redis)),
+               (history_digest, "openrouter", llm)] + [(m, "supabase", db) for m in modules]
+    originals = [(m, name, getattr(m, name)) for m, name, _ in patched]
+    for module, name, value in patched:
+        setattr(module, name, value)
+    try:
+        return asyncio.run(scenario())
+    finally:
+        for module, name, value in originals:
+            setattr(module, name, value)
+
+
+def test_light_history_stores_empty_digest():
+    db, redis, llm = FakeSupabase(), FakeRedis(), FakeOpenRouter()
+    db.add_summaries("u1", 3, tokens=100)
+
+    row = run_with(db, redis, llm, lambda: refresh_history_digest("u1"))
+    assert row["digest"] is None and row["source_tokens"] == 300 and row["version"] == 1
+    assert llm.calls == []
+    assert "history_digest:u1" in redis.values
+
+
+def test_heavy_history_is_aggregated_once_and_read_from_redis():
+    db, redis, llm = FakeSupabase(), FakeRedis(), FakeOpenRouter()
+    db.add_summaries("u1", 4, tokens=10000)
+
+    async def scenario():
+        built = await refresh_history_digest("u1")
+        unchanged = await refresh_history_digest("u1")
+        db.reads.clear()
+        cached = await get_history_digest("u1")
+        return built, unchanged, cached
+
+    built, unchanged, cached = run_with(db, redis, llm, scenario)
+    assert built["digest"] == "digest #1" and built["version"] == 1
+    # No new summaries: no second LLM call, same version
+    assert unchanged["version"] == 1 and len(llm.calls) == 1
+    assert llm.calls[0]["max_tokens"] <= history_digest.HISTORY_DIGEST_MAX_TOKENS
+    # The hot path is a single Redis read
+    assert cached["digest"] == "digest #1" and db.reads == []
+
+    db.add_summaries("u1", 1, tokens=10000, start=4)
+    rebuilt = run_with(db, redis, llm, lambda: refresh_history_digest("u1"))
+    assert rebuilt["version"] == 2 and rebuilt["digest"] == "digest #2"
+
+
+def test_chat_context_uses_digest_or_recent_summaries():
+    from utils import context_builder
+
+    db, redis, llm = FakeSupabase(), FakeRedis(), FakeOpenRouter()
+    db.add_summaries("u1", 4, tokens=10000)
+    db.add_summaries("u2", 1, tokens=100)
+
+    async def scenario():
+        # First call: no digest yet, so recent summaries are used and a build is scheduled
+        first = await context_builder.get_enhanced_llm_context("u1", "c2")
+        await asyncio.sleep(0)
+        await asyncio.gather(*history_digest._refreshing.values())
+        second = await context_builder.get_enhanced_llm_context("u1", "c2")
+        light = await context_builder.get_enhanced_llm_context("u2", "c0")
+        await asyncio.gather(*history_digest._refreshing.values())
+        return first, second, light
+
+    first, second, light = run_with(db, redis, llm, scenario, modules=[context_builder])
+    assert "=== Previous Health Discussions ===" in first and "digest #1" not in first
+    assert second.startswith("=== Health History Digest ===\ndigest #1")
+    assert "=== Previous Health Discussions ===" not in second
+    # Below the threshold the stored row has no digest; recent summaries are used as before
+    assert "summary 0" in light and "Health History Digest" not in light
+    assert len(llm.calls) == 1
+
+
+def test_refreshes_are_coalesced_per_user():
+    db, redis, llm = FakeSupabase(), FakeRedis(), FakeOpenRouter()
+    db.add_summaries("u1", 4, tokens=10000)
+
+    async def scenario():
+        first = schedule_digest_refresh("u1")
+        # A summary lands while the refresh is running
+        db.add_summaries("u1", 1, tokens=10000, start=4)
+        second = schedule_digest_refresh("u1")
+        assert first is second
+        await first
+        return await get_history_digest("u1")
+
+    row = run_with(db, redis, llm, scenario)
+    # The running refresh went round again and picked up the fifth summary
+    assert row["source_count"] == 5
+    assert not history_digest._refreshing
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print(f"✅ {name}")
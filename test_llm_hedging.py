@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""Test script for hedged LLM requests across fallback models"""
+import os
+import sys
+import time
+import asyncio
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import business_logic
+from utils import llm_hedging
+from utils.llm_hedging import HedgeBudget, LatencyTracker, hedged_call
+
+MODELS = ["openai/gpt-5", "google/gemini-2.5-pro", "deepseek/deepseek-chat"]
+
+
+def answer(model, degraded=False):
+    result = {"choices": [{"message": {"content": f"from {model}"}}], "model": model}
+    if degraded:
+        result["degraded"] = True
+    return result
+
+
+def fresh_state(p95=0.05, budget=5.0):
+    """New tracker and budget; p95 latency of the endpoint set to `p95` seconds"""
+    llm_hedging.HEDGE_MIN_DELAY = 0.01
+    llm_hedging.latency_tracker = LatencyTracker(min_samples=5)
+    llm_hedging.hedge_budget = HedgeBudget(ratio=0.0, burst=budget)
+    llm_hedging.hedge_budget._tokens["chat"] = budget
+    for _ in range(5):
+        llm_hedging.latency_tracker.record("chat", p95)
+
+
+class FakeModels:
+    """attempt(model) that sleeps per model and records starts/cancellations"""
+
+    def __init__(self, delays, failing=(), degraded=()):
+        self.delays, self.failing, self.degraded = delays, failing, degraded
+        self.started, self.cancelled = [], []
+
+    async def __call__(self, model):
+        self.started.append(model)
+        try:
+            await asyncio.sleep(self.delays.get(model, 0))
+        except asyncio.CancelledError:
+            self.cancelled.append(model)
+            raise
+        if model in self.failing:
+            raise RuntimeError(f"{model} 503")
+        return answer(model, degraded=model in self.degraded)
+
+
+def run(fake):
+    return asyncio.run(hedged_call(MODELS, fake, "chat", business_logic.is_valid_llm_result))
+
+
+def test_slow_primary_is_hedged_and_loser_cancelled():
+    fresh_state(p95=0.05)
+    fake = FakeModels({"openai/gpt-5": 5, "google/gemini-2.5-pro": 0.05})
+    started = time.monotonic()
+    result = run(fake)
+    assert result["model"] == "google/gemini-2.5-pro"
+    assert time.monotonic() - started < 1
+    assert fake.started == MODELS[:2] and fake.cancelled == ["openai/gpt-5"]
+
+
+def test_fast_primary_sends_no_hedge():
+    fresh_state(p95=0.5)
+    fake = FakeModels({"openai/gpt-5": 0.01})
+    assert run(fake)["model"] == "openai/gpt-5"
+    assert fake.started == ["openai/gpt-5"]
+    assert llm_hedging.hedge_budget._tokens["chat"] == 5.0
+
+
+def test_exhausted_budget_waits_for_primary():
+    fresh_state(p95=0.01, budget=0.5)
+    fake = FakeModels({"openai/gpt-5": 0.1, "google/gemini-2.5-pro": 0})
+    assert run(fake)["model"] == "openai/gpt-5"
+    assert fake.started == ["openai/gpt-5"]
+
+
+def test_failures_fail_over_immediately_without_budget():
+    fresh_state(p95=10, budget=0)
+    fake = FakeModels({}, failing={"openai/gpt-5"}, degraded={"google/gemini-2.5-pro"})
+    started = time.monotonic()
+    assert run(fake)["model"] == "deepseek/deepseek-chat"
+    assert time.monotonic() - started < 1 and fake.started == MODELS
+
+    everything_down = FakeModels({}, failing=set(MODELS[:2]), degraded={MODELS[2]})
+    assert run(everything_down).get("degraded") is True
+
+
+def test_budget_earns_a_fraction_per_call():
+    budget = HedgeBudget(ratio=0.25, burst=2)
+    for _ in range(4):
+        budget.earn("reports")
+    assert budget.try_spend("reports") and not budget.try_spend("reports")
+    for _ in range(20):
+        budget.earn("reports")
+    assert budget._tokens["reports"] == 2  # capped at burst
+
+
+def test_hedge_deadline_follows_p95():
+    tracker = LatencyTracker(min_samples=10)
+    assert tracker.hedge_delay("reports") == llm_hedging.HEDGE_DEFAULT_DELAY
+    for seconds in range(1, 101):
+        tracker.record("reports", seconds)
+    assert tracker.percentile("reports") == 96
+    assert tracker.hedge_delay("reports") == min(96, llm_hedging.HEDGE_MAX_DELAY)
+
+
+def call_with_fallback(fake, **kwargs):
+    async def fake_models(user_id, endpoint_type, reasoning_mode):
+        return MODELS
+
+    async def fake_call_llm(messages, model=None, **kwargs):
+        return await fake(model)
+
+    originals = business_logic.get_models_for_endpoint, business_logic.call_llm
+    business_logic.get_models_for_endpoint, business_logic.call_llm = fake_models, fake_call_llm
+    try:
+        return asyncio.run(business_logic.call_llm_with_fallback(
+            [{"role": "user", "content": "hi"}], user_id="u1", endpoint_type="chat", **kwargs
+        ))
+    finally:
+        business_logic.get_models_for_endpoint, business_logic.call_llm = originals
+
+
+def test_call_llm_with_fallback_hedges_by_default():
+    fresh_state(p95=0.05)
+    assert call_with_fallback(FakeModels({"openai/gpt-5": 5}))["model"] == "google/gemini-2.5-pro"
+
+
+def test_sequential_fallback_skips_degraded_placeholders():
+    fake = FakeModels({}, degraded={"openai/gpt-5"})
+    assert call_with_fallback(fake, hedge=False)["model"] == "google/gemini-2.5-pro"
+    assert fake.started == MODELS[:2]
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            func()
+            print(f"✅ {name}")
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""Test script for the in-memory, hot-reloadable model tier config"""
+import os
+import sys
+import json
+import asyncio
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from core import model_selector
+from core.model_config import ModelConfigError, ModelConfigRegistry, validate_model_config
+from api import admin
+
+CONFIG = {
+    "free": {
+        "chat": {"models": ["deepseek/deepseek-chat"], "reasoning_models": ["deepseek/deepseek-r1"]},
+        "reports": ["openai/gpt-5", "google/gemini-2.5-pro"],
+    },
+    "pro": {
+        "chat": {"models": ["openai/gpt-5-mini"]},
+        "ultra_think": ["x-ai/grok-4"],
+    },
+}
+
+
+def write_config(path, config, mtime):
+    with open(path, "w") as f:
+        f.write(config if isinstance(config, str) else json.dumps(config))
+    os.utime(path, (mtime, mtime))
+
+
+def new_registry(config=CONFIG):
+    path = os.path.join(tempfile.mkdtemp(), "model_tiers.json")
+    write_config(path, config, 1000)
+    return path, ModelConfigRegistry(path, model_selector.MODEL_CONFIG, check_interval=0)
+
+
+def test_index_resolves_tier_endpoint_and_reasoning_mode():
+    _, registry = new_registry()
+    snapshot = registry.current()
+    assert snapshot.models_for("free", "chat") == ("deepseek/deepseek-chat",)
+    assert snapshot.models_for("free", "chat", True) == ("deepseek/deepseek-r1",)
+    # No reasoning_models: reasoning mode uses the regular models
+    assert snapshot.models_for("pro", "chat", True) == ("openai/gpt-5-mini",)
+    assert snapshot.models_for("free", "reports", True) == ("openai/gpt-5", "google/gemini-2.5-pro")
+    assert snapshot.models_for("max", "reports") == ("openai/gpt-5", "google/gemini-2.5-pro")
+    assert snapshot.models_for("free", "ultra_think") is None
+
+
+def test_file_is_parsed_once_until_mtime_changes():
+    path, registry = new_registry()
+    first = registry.current()
+    for _ in range(100):
+        assert registry.current() is first
+
+    changed = json.loads(json.dumps(CONFIG))
+    changed["free"]["reports"] = ["anthropic/claude-sonnet-4"]
+    write_config(path, changed, 2000)
+    assert registry.current().models_for("free", "reports") == ("anthropic/claude-sonnet-4",)
+
+
+def test_bad_edit_keeps_previous_config():
+    path, registry = new_registry()
+    good = registry.current()
+
+    write_config(path, '{"free": {"chat": ', 2000)
+    assert registry.current() is good and "JSONDecodeError" in registry.last_error
+    write_config(path, {"pro": {"chat": ["openai/gpt-5"]}}, 3000)
+    assert registry.current() is good and "'free' tier" in registry.last_error
+    assert registry.reload() is False
+
+    write_config(path, CONFIG, 4000)
+    assert registry.current() is not good and registry.last_error is None
+
+
+def test_invalid_file_at_startup_uses_defaults():
+    _, registry = new_registry({"free": {"chat": []}})
+    assert registry.current().source == "defaults"
+    assert registry.current().models_for("free", "deep_dive") == tuple(model_selector.MODEL_CONFIG["free"]["deep_dive"])
+
+
+def test_schema_validation():
+    for bad in [[], {}, {"free": []}, {"free": {"chat": {"modles": ["a"]}}}, {"free": {"reports": ["a", 3]}}]:
+        try:
+            validate_model_config(bad)
+        except ModelConfigError:
+            continue
+        raise AssertionError(f"accepted {bad!r}")
+    validate_model_config(model_selector.MODEL_CONFIG)
+
+
+def test_get_models_for_endpoint_reads_the_registry():
+    path, registry = new_registry()
+    original = model_selector.model_config
+    model_selector.model_config = registry
+    try:
+        models = asyncio.run(model_selector.get_models_for_endpoint("u1", "chat", True, tier_override="free"))
+        assert models == ["deepseek/deepseek-r1"]
+        models.append("mutated")
+        assert asyncio.run(model_selector.get_models_for_endpoint("u1", "chat", True, tier_override="free")) == models[:1]
+        assert asyncio.run(model_selector.get_models_for_endpoint("u1", "ultra_think", tier_override="free")) is None
+    finally:
+        model_selector.model_config = original
+
+
+def test_admin_reload_endpoint():
+    path, registry = new_registry()
+    registry.current()
+    original = admin.model_config
+    admin.model_config = registry
+    os.environ["ADMIN_API_KEY"] = "secret"
+    app = FastAPI()
+    app.include_router(admin.router)
+    client = TestClient(app)
+    try:
+        assert client.post("/api/admin/model-config/reload").status_code == 403
+        assert client.post("/api/admin/model-config/reload", headers={"X-Admin-Key": "wrong"}).status_code == 403
+
+        write_config(path, '{"free": []}', 2000)
+        rejected = client.post("/api/admin/model-config/reload", headers={"X-Admin-Key": "secret"})
+        assert rejected.status_code == 422 and rejected.json()["detail"]["last_error"]
+
+        write_config(path, CONFIG, 3000)
+        reloaded = client.post("/api/admin/model-config/reload", headers={"X-Admin-Key": "secret"})
+        assert reloaded.status_code == 200 and reloaded.json()["tiers"] == ["free", "pro"]
+    finally:
+        admin.model_config = original
+        del os.environ["ADMIN_API_KEY"]
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            func()
+            print(f"✅ {name}")
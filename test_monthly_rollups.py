@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""Test script for the monthly health rollups behind annual reports"""
+import os
+import sys
+import copy
+import asyncio
+from datetime import datetime, timezone
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils import monthly_rollups
+from utils.monthly_rollups import build_rollup, get_monthly_rollups, merge_rollups, top_entries
+from api.reports.time_based import analyze_seasonal_patterns, monthly_breakdown
+
+NOW = datetime(2025, 3, 15, tzinfo=timezone.utc)
+
+
+class FakeResult:
+    def __init__(self, data):
+        self.data = data
+
+
+class FakeQuery:
+    def __init__(self, db, table):
+        self.db, self.table = db, table
+        self.columns, self.filters, self.payload = "*", [], None
+
+    def select(self, columns="*"):
+        self.columns = columns
+        return self
+
+    def eq(self, key, value):
+        self.filters.append(lambda row: row.get(key) == value)
+        return self
+
+    def gte(self, key, value):
+        self.filters.append(lambda row: row.get(key, "") >= value)
+        return self
+
+    def lte(self, key, value):
+        self.filters.append(lambda row: row.get(key, "") <= value)
+        return self
+
+    def lt(self, key, value):
+        self.filters.append(lambda row: row.get(key, "") < value)
+        return self
+
+    def upsert(self, row, on_conflict=None):
+        self.payload = (row, on_conflict.split(","))
+        return self
+
+    def project(self, row):
+        if self.columns == "*":
+            return copy.deepcopy(row)
+        projected = {}
+        for spec in (part.strip() for part in self.columns.split(",")):
+            alias, _, path = spec.rpartition(":")
+            if "->>" in path:
+                column, key = path.split("->>")
+                value = (row.get(column) or {}).get(key)
+                projected[alias or key] = None if value is None else str(value)
+            else:
+                projected[alias or path] = row.get(path)
+        return projected
+
+    def execute(self):
+        self.db.queries.append(self.table)
+        rows = self.db.tables.setdefault(self.table, [])
+        if self.payload:
+            row, keys = self.payload
+            rows[:] = [r for r in rows if any(r.get(k) != row.get(k) for k in keys)] + [copy.deepcopy(row)]
+            return FakeResult([row])
+        return FakeResult([self.project(r) for r in rows if all(match(r) for match in self.filters)])
+
+
+class FakeSupabase:
+    def __init__(self, tables):
+        self.tables, self.queries = tables, []
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+
+def scan(day, month, symptoms, pain, condition, urgency="low"):
+    return {"user_id": "u1", "created_at": f"2025-{month:02d}-{day:02d}T09:00:00+00:00",
+            "form_data": {"symptoms": symptoms, "painLevel": pain},
+            "analysis_result": {"primaryCondition": condition, "urgency": urgency, "reasoning": "x" * 500}}
+
+
+def sample_tables():
+    return {
+        "quick_scans": [
+            scan(3, 1, "headache", 6, "Migraine"), scan(20, 1, "headache", 4, "Migraine", "medium"),
+            scan(5, 2, "knee pain", 7, "Sprain"), scan(9, 3, "headache", 5, "Tension headache"),
+            {**scan(1, 1, "cough", 2, "Cold"), "user_id": "u2"},
+        ],
+        "deep_dive_sessions": [
+            {"user_id": "u1", "status": "completed", "created_at": "2025-02-10T00:00:00+00:00",
+             "final_analysis": {"primaryCondition": "Sprain"}},
+            {"user_id": "u1", "status": "active", "created_at": "2025-02-11T00:00:00+00:00"},
+        ],
+        "symptom_tracking": [
+            {"user_id": "u1", "created_at": "2025-01-04T00:00:00+00:00", "symptom_name": "headache", "severity": 6},
+            {"user_id": "u1", "created_at": "2025-12-04T00:00:00+00:00", "symptom_name": "headache", "severity": 2},
+        ],
+        "medication_tracking": [{"user_id": "u1", "created_at": "2025-01-02T00:00:00+00:00"}],
+    }
+
+
+def run_with(fake, coro_factory):
+    original = monthly_rollups.supabase
+    monthly_rollups.supabase = fake
+    try:
+        return asyncio.run(coro_factory())
+    finally:
+        monthly_rollups.supabase = original
+
+
+def test_rollup_aggregates_projected_rows():
+    fake = FakeSupabase(sample_tables())
+    rollups = run_with(fake, lambda: get_monthly_rollups("u1", "2025-01", "2025-12", now=NOW))
+
+    assert list(rollups) == ["2025-01", "2025-02", "2025-03"]  # nothing after the current month
+    january = rollups["2025-01"]
+    assert january["counts"]["quick_scans"] == 2 and january["counts"]["medications"] == 1
+    assert january["symptom_frequency"] == {"headache": {"count": 2, "severity_sum": 10.0}}
+    assert january["urgency_distribution"] == {"low": 1, "medium": 1}
+    assert january["severity"] == {"count": 3, "sum": 16.0, "min": 4.0, "max": 6.0}
+    assert rollups["2025-02"]["counts"]["deep_dives"] == 1  # only completed dives
+    assert rollups["2025-02"]["conditions"]["Sprain"]["count"] == 2
+
+
+def test_closed_months_are_stored_and_reused_current_month_is_live():
+    fake = FakeSupabase(sample_tables())
+    run_with(fake, lambda: get_monthly_rollups("u1", "2025-01", "2025-12", now=NOW))
+    stored = {row["month"] for row in fake.tables["health_monthly_rollups"]}
+    assert stored == {"2025-01", "2025-02"}
+
+    fake.queries.clear()
+    fake.tables["quick_scans"].append(scan(12, 3, "fatigue", 3, "Anemia"))
+    rollups = run_with(fake, lambda: get_monthly_rollups("u1", "2025-01", "2025-12", now=NOW))
+    assert fake.queries.count("quick_scans") == 1  # only the live month is re-read
+    assert rollups["2025-03"]["counts"]["quick_scans"] == 2
+
+
+def test_rollups_stored_before_month_end_are_recomputed():
+    fake = FakeSupabase(sample_tables())
+    early = build_rollup("u1", "2025-01", {"quick_scans": []})
+    early["computed_at"] = "2025-01-20T00:00:00+00:00"
+    fake.tables["health_monthly_rollups"] = [early]
+    rollups = run_with(fake, lambda: get_monthly_rollups("u1", "2025-01", "2025-01", now=NOW))
+    assert rollups["2025-01"]["counts"]["quick_scans"] == 2
+
+
+def test_merged_rollups_feed_annual_sections():
+    fake = FakeSupabase(sample_tables())
+    rollups = run_with(fake, lambda: get_monthly_rollups("u1", "2025-01", "2025-12", now=NOW))
+    year = merge_rollups(list(rollups.values()))
+
+    assert year["counts"]["quick_scans"] == 4
+    assert top_entries(year["symptom_frequency"], 1) == [{"name": "headache", "frequency": 3, "average_severity": 5.0}]
+    assert top_entries({"fatigue": {"count": 2, "severity_sum": 0.0}}) == [
+        {"name": "fatigue", "frequency": 2, "average_severity": 0.0}
+    ]
+    assert year["severity"]["min"] == 4.0 and year["severity"]["max"] == 7.0
+    assert monthly_breakdown(rollups)["2025-02"] == {
+        "quick_scans": 1, "deep_dives": 1, "symptoms": {"knee pain": 1}, "total_interactions": 2
+    }
+    seasons = analyze_seasonal_patterns(rollups)
+    assert seasons["winter"] == ["headache", "knee pain"] and seasons["spring"] == ["headache"]
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            func()
+            print(f"✅ {name}")
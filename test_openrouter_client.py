@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""Test script for the async OpenRouter client"""
+import os
+import sys
+import asyncio
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import httpx
+
+from utils import openrouter_client
+from utils.openrouter_client import CircuitOpenError, OpenRouterClient, OpenRouterError, parse_retry_after
+
+OK = {"choices": [{"message": {"content": "OK"}, "finish_reason": "stop"}], "usage": {}}
+
+
+class FakeResources:
+    """Serves canned responses in order and records every request"""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+        self.client = httpx.AsyncClient(transport=httpx.MockTransport(self._handle))
+
+    def _handle(self, request):
+        self.requests.append(request)
+        status, headers = self.responses.pop(0)
+        return httpx.Response(status, headers=headers, json=OK if status == 200 else {"error": "x"})
+
+    def http(self):
+        return self.client
+
+
+def run_with(fake, scenario):
+    original = openrouter_client.resources
+    openrouter_client.resources = fake
+    try:
+        return asyncio.run(scenario())
+    finally:
+        openrouter_client.resources = original
+
+
+def payload(model="test/model"):
+    return {"model": model, "messages": [{"role": "user", "content": "hi"}]}
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("7") == 7.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+    later = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=20), usegmt=True)
+    assert 15 < parse_retry_after(later) <= 20
+
+
+def test_retry_after_is_honored_then_succeeds():
+    fake = FakeResources((429, {"Retry-After": "0"}), (200, {}))
+    client = OpenRouterClient()
+
+    async def scenario():
+        return await client.chat_completion(payload(), headers={"X-Title": "t"})
+
+    assert run_with(fake, scenario) == OK
+    assert len(fake.requests) == 2
+    assert fake.requests[0].headers["X-Title"] == "t"
+    assert fake.requests[0].headers["Authorization"].startswith("Bearer ")
+    assert client.stats["retries"] == 1
+
+
+def test_long_retry_after_fails_fast():
+    fake = FakeResources((429, {"Retry-After": "3600"}), (200, {}))
+    client = OpenRouterClient()
+
+    async def scenario():
+        try:
+            await client.chat_completion(payload())
+        except OpenRouterError as e:
+            return e
+    error = run_with(fake, scenario)
+    assert error.status_code == 429 and error.retry_after == 3600
+    assert len(fake.requests) == 1
+
+
+def test_client_errors_are_not_retried_or_counted_against_the_model():
+    fake = FakeResources((400, {}), (200, {}))
+    client = OpenRouterClient()
+
+    async def scenario():
+        try:
+            await client.chat_completion(payload())
+        except OpenRouterError as e:
+            return e
+    assert run_with(fake, scenario).status_code == 400
+    assert len(fake.requests) == 1
+    assert client.status()["circuits"]["test/model"]["state"] == "closed"
+
+
+def test_client_errors_do_not_close_a_half_open_circuit():
+    fake = FakeResources((400, {}), (400, {}))
+    client = OpenRouterClient()
+    breaker = client.retry.get_circuit_breaker("test/model")
+    breaker.state = openrouter_client.CircuitState.HALF_OPEN
+
+    async def scenario():
+        for _ in range(2):
+            try:
+                await client.chat_completion(payload())
+            except OpenRouterError as e:
+                assert e.status_code == 400
+    run_with(fake, scenario)
+    assert breaker.state == openrouter_client.CircuitState.HALF_OPEN
+    assert breaker.success_count == 0 and breaker.half_open_attempts == 0
+
+
+def test_circuit_opens_per_model():
+    fake = FakeResources((503, {}), (503, {}), (200, {}))
+    client = OpenRouterClient(max_retries=1)
+    client.retry.circuit_config.failure_threshold = 2
+
+    async def scenario():
+        for _ in range(2):
+            try:
+                await client.chat_completion(payload())
+            except OpenRouterError as e:
+                assert e.status_code == 503
+        try:
+            await client.chat_completion(payload())
+            assert False, "expected CircuitOpenError"
+        except CircuitOpenError:
+            pass
+        # Other models keep working
+        return await client.chat_completion(payload("other/model"))
+
+    assert run_with(fake, scenario) == OK
+    assert len(fake.requests) == 3
+    assert client.status()["circuits"]["test/model"]["state"] == "open"
+    assert client.stats["circuit_rejections"] == 1
+
+
+def test_call_llm_degrades_without_blocking_fallback():
+    import business_logic
+
+    class FailingClient:
+        async def chat_completion(self, *args, **kwargs):
+            raise OpenRouterError("down", status_code=502)
+
+    original = business_logic.openrouter
+    business_logic.openrouter = FailingClient()
+    os.environ.setdefault("OPENROUTER_API_KEY", "x")
+    try:
+        result = asyncio.run(business_logic.call_llm(messages=[{"role": "user", "content": "hi"}], model="test/model"))
+    finally:
+        business_logic.openrouter = original
+    assert result["degraded"] is True
+    assert "API error 502" in result["content"]
+    assert "requests" not in vars(business_logic)
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print(f"✅ {name}")
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""Test script for batched story fetching and cached PDF rendering"""
+import os
+import sys
+import stat
+import asyncio
+import tempfile
+from datetime import datetime, timedelta, timezone
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api import export
+from utils import pdf_export
+from utils.pdf_export import PdfFileCache, render_report, report_cache_key
+
+
+class FakeResult:
+    def __init__(self, data):
+        self.data = data
+
+
+class FakeQuery:
+    def __init__(self, db, table):
+        self.db, self.table = db, table
+        self.filters, self.order_by, self.one, self.limit_to, self.write = [], None, False, None, None
+
+    def select(self, columns="*"):
+        return self
+
+    def eq(self, key, value):
+        self.filters.append(lambda row: row.get(key) == value)
+        return self
+
+    def in_(self, key, values):
+        self.filters.append(lambda row: row.get(key) in values)
+        return self
+
+    def order(self, key, desc=False):
+        self.order_by = (key, desc)
+        return self
+
+    def single(self):
+        self.one = True
+        return self
+
+    def limit(self, count):
+        self.limit_to = count
+        return self
+
+    def upsert(self, row, on_conflict=None):
+        self.write = ("upsert", row, on_conflict)
+        return self
+
+    def update(self, values):
+        self.write = ("update", values, None)
+        return self
+
+    def insert(self, row):
+        self.db.tables.setdefault(self.table, []).append({"id": "export-1", **row})
+        self.filters.append(lambda r: r.get("id") == "export-1")
+        return self
+
+    def execute(self):
+        self.db.queries.append(self.table)
+        table = self.db.tables.setdefault(self.table, [])
+        if self.write and self.write[0] == "upsert":
+            _, row, key = self.write
+            table[:] = [r for r in table if r.get(key) != row.get(key)] + [dict(row)]
+            return FakeResult([row])
+        rows = [r for r in table if all(match(r) for match in self.filters)]
+        if self.write:
+            for row in rows:
+                row.update(self.write[1])
+            return FakeResult(rows)
+        if self.order_by:
+            rows.sort(key=lambda r: r[self.order_by[0]], reverse=self.order_by[1])
+        return FakeResult(rows[0] if self.one else rows[:self.limit_to])
+
+
+class FakeRpc:
+    def execute(self):
+        return FakeResult(None)
+
+
+class FakeSupabase:
+    def __init__(self, tables):
+        self.tables, self.queries = tables, []
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+    def rpc(self, name, params):
+        # increment_share_access: one UPDATE ... SET access_count = access_count + 1
+        assert name == "increment_share_access"
+        query = FakeQuery(self, "export_history").eq("share_token", params["p_share_token"])
+        for row in query.execute().data:
+            row["access_count"] = (row.get("access_count") or 0) + 1
+        return FakeRpc()
+
+
+def story_tables(count):
+    tables = {"health_stories": [], "health_insights": [], "health_predictions": [], "story_notes": [],
+              "profiles": [{"user_id": "u1", "name": "Sam"}]}
+    for i in range(count):
+        sid = f"s{i}"
+        tables["health_stories"].append({"id": sid, "created_at": f"2025-01-{i + 1:02d}T00:00:00",
+                                         "story_text": f"Week {i}: sleep improved, headaches eased. " * 20})
+        for confidence in (60, 90):
+            tables["health_insights"].append({"story_id": sid, "insight_type": "positive", "title": "Sleep",
+                                              "description": "Better rest", "confidence": confidence})
+        tables["health_predictions"].append({"story_id": sid, "event_description": "Fewer headaches",
+                                             "probability": 70, "timeframe": "Next week"})
+        tables["story_notes"].append({"story_id": sid, "note_text": f"note {i}"})
+    return tables
+
+
+def export_client():
+    app = FastAPI()
+    app.include_router(export.router)
+    return TestClient(app)
+
+
+def with_fake(fake):
+    original = export.supabase
+    export.supabase = fake
+    return original
+
+
+def test_stories_are_fetched_with_one_query_per_table():
+    fake = FakeSupabase(story_tables(5))
+    original = with_fake(fake)
+    try:
+        data = asyncio.run(export.get_stories_with_analysis(["s3", "missing", "s1"]))
+    finally:
+        export.supabase = original
+
+    assert sorted(fake.queries) == ["health_insights", "health_predictions", "health_stories", "story_notes"]
+    assert [d["story"]["id"] for d in data] == ["s3", "s1"]
+    assert [i["confidence"] for i in data[0]["insights"]] == [90, 60]
+    assert data[1]["notes"] == {"content": "note 1"}
+
+
+def test_render_is_cached_by_content():
+    pdf_export._cache = PdfFileCache(tempfile.mkdtemp())
+    stories = asyncio.run(_stories(3))
+    key = report_cache_key("u1", ["s0", "s1", "s2"], {"include_analysis": True}, {"name": "Sam"}, stories)
+    try:
+        path, size, cached = asyncio.run(render_report(key, {"name": "Sam"}, stories, True, True))
+        assert not cached and size == os.path.getsize(path) > 0
+        with open(path, "rb") as f:
+            assert f.read(5) == b"%PDF-"
+        assert asyncio.run(render_report(key, {"name": "Sam"}, stories, True, True)) == (path, size, True)
+    finally:
+        pdf_export.shutdown_render_pool()
+
+    stories[0]["story"]["story_text"] = "edited"
+    assert report_cache_key("u1", ["s0", "s1", "s2"], {"include_analysis": True}, {"name": "Sam"}, stories) != key
+
+
+def test_file_cache_evicts_least_recent_by_bytes():
+    cache = PdfFileCache(tempfile.mkdtemp(), max_bytes=250)
+    for key in ("a", "b", "c"):
+        tmp = cache.reserve()
+        with open(tmp, "wb") as f:
+            f.write(b"x" * 100)
+        if key == "c":
+            cache.get("a")  # a is now more recent than b
+        cache.commit(key, tmp)
+    assert cache.get("b") is None and cache.get("a") and cache.get("c")
+    assert cache.stats()["bytes"] == 200
+    assert PdfFileCache(cache.root_dir, max_bytes=250).stats()["entries"] == 2  # index rebuilt from disk
+
+
+def test_cache_dir_is_private_and_not_shared_temp():
+    root = os.path.join(tempfile.mkdtemp(), "pdfs")
+    os.makedirs(root, mode=0o777)
+    os.chmod(root, 0o777)
+    PdfFileCache(root)
+    assert stat.S_IMODE(os.stat(root).st_mode) == 0o700
+
+    original = os.environ.pop("PDF_CACHE_DIR", None)
+    try:
+        assert not pdf_export.pdf_cache_dir().startswith(tempfile.gettempdir())
+        os.environ["PDF_CACHE_DIR"] = root
+        assert pdf_export.pdf_cache_dir() == root
+    finally:
+        os.environ.pop("PDF_CACHE_DIR", None)
+        if original is not None:
+            os.environ["PDF_CACHE_DIR"] = original
+
+
+def test_download_streams_the_rendered_file():
+    pdf_export._cache = PdfFileCache(tempfile.mkdtemp())
+    fake = FakeSupabase(story_tables(2))
+    original = with_fake(fake)
+    try:
+        response = export_client().post("/api/export-pdf/download", json={"user_id": "u1", "story_ids": ["s0", "s1"]})
+    finally:
+        export.supabase = original
+        pdf_export.shutdown_render_pool()
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/pdf"
+    assert response.headers["x-render-cache"] == "miss"
+    assert int(response.headers["content-length"]) == len(response.content)
+    assert response.content.startswith(b"%PDF-")
+
+
+def test_shared_report_is_rendered_once_and_revalidated_by_etag():
+    fake = FakeSupabase(story_tables(2))
+    original = with_fake(fake)
+    try:
+        client = export_client()
+        share = client.post("/api/share-with-doctor", json={"user_id": "u1", "story_ids": ["s0", "s1"]}).json()
+        assert fake.tables["shared_report_snapshots"][0]["share_token"] == share["share_token"]
+
+        fake.queries.clear()
+        first = client.get(f"/api/shared/{share['share_token']}")
+        assert first.status_code == 200 and "Week 1: sleep improved" in first.text
+        assert "health_stories" not in fake.queries  # served from the snapshot
+        assert first.headers["cache-control"] == f"private, max-age={export.SHARE_CACHE_MAX_AGE}, must-revalidate"
+
+        again = client.get(f"/api/shared/{share['share_token']}", headers={"If-None-Match": first.headers["etag"]})
+        assert again.status_code == 304 and again.content == b""
+        assert fake.tables["export_history"][0]["access_count"] == 2
+    finally:
+        export.supabase = original
+
+
+def test_invalidated_snapshot_is_rendered_again():
+    fake = FakeSupabase(story_tables(1))
+    original = with_fake(fake)
+    try:
+        client = export_client()
+        token = client.post("/api/share-with-doctor", json={"user_id": "u1", "story_ids": ["s0"]}).json()["share_token"]
+        etag = client.get(f"/api/shared/{token}").headers["etag"]
+
+        # What the story_notes trigger does when a note changes
+        fake.tables["shared_report_snapshots"].clear()
+        fake.tables["health_stories"][0]["story_text"] = "Updated week"
+        response = client.get(f"/api/shared/{token}", headers={"If-None-Match": etag})
+        assert response.status_code == 200 and "Updated week" in response.text
+        assert response.headers["etag"] != etag
+        assert len(fake.tables["shared_report_snapshots"]) == 1
+    finally:
+        export.supabase = original
+
+
+def test_cache_lifetime_never_outlives_the_share():
+    soon = (datetime.now(timezone.utc) + timedelta(seconds=60)).isoformat()
+    assert export.shared_report_cache_control(soon) in ("private, max-age=59, must-revalidate",
+                                                        "private, max-age=60, must-revalidate")
+    past = (datetime.now(timezone.utc) - timedelta(days=1)).isoformat()
+    assert export.shared_report_cache_control(past) == "private, no-store"
+
+    fake = FakeSupabase(story_tables(1))
+    original = with_fake(fake)
+    try:
+        fake.tables["shared_report_snapshots"] = [{"share_token": "old", "expires_at": past, "html": "x", "etag": '"e"'}]
+        assert export_client().get("/api/shared/old").status_code == 410
+    finally:
+        export.supabase = original
+
+
+async def _stories(count):
+    original = with_fake(FakeSupabase(story_tables(count)))
+    try:
+        return await export.get_stories_with_analysis([f"s{i}" for i in range(count)])
+    finally:
+        export.supabase = original
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            func()
+            print(f"✅ {name}")
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Correctness checks and benchmark for SmartPhotoBatcher selection"""
+import os
+import sys
+import time
+import random
+import statistics
+from datetime import datetime, timedelta
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from api.photo.batcher import SmartPhotoBatcher
+
+
+def generate_session(num_photos: int, num_analyses: int, seed: int = 42):
+    """Build a synthetic long-running session"""
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1)
+    photos = [
+        {
+            'id': f'photo-{i}',
+            'uploaded_at': (start + timedelta(hours=7 * i)).isoformat(),
+            'quality_score': rng.choice([None, 60, 85]),
+            'followup_notes': rng.choice([None, None, 'looks redder today'])
+        }
+        for i in range(num_photos)
+    ]
+    photo_ids = [p['id'] for p in photos]
+    analyses = [
+        {
+            'photo_ids': rng.sample(photo_ids, 3),
+            'confidence_score': rng.randint(40, 100),
+            'analysis_data': {'red_flags': rng.choice([[], ['irregular border']])},
+            'comparison': {'trend': rng.choice(['worsening', 'stable', 'improving'])}
+        }
+        for _ in range(num_analyses)
+    ]
+    return photos, analyses
+
+
+def test_keeps_baseline_recent_and_chronological_order():
+    photos, analyses = generate_session(200, 80)
+    selected, info = SmartPhotoBatcher(max_photos=40).select_photos_for_comparison(photos, analyses)
+
+    assert len(selected) == 40
+    assert selected[0]['id'] == 'photo-0'
+    assert [p['id'] for p in selected[-5:]] == [f'photo-{i}' for i in range(195, 200)]
+    dates = [p['uploaded_at'] for p in selected]
+    assert dates == sorted(dates)
+    assert info['photos_shown'] == 40
+
+
+def test_red_flag_photo_is_prioritized():
+    photos, _ = generate_session(100, 0)
+    analyses = [{'photo_ids': ['photo-51'], 'confidence_score': 50,
+                 'analysis_data': {'red_flags': ['bleeding']}, 'comparison': {'trend': 'worsening'}}]
+    selected, _ = SmartPhotoBatcher(max_photos=10).select_photos_for_comparison(photos, analyses)
+
+    assert 'photo-51' in {p['id'] for p in selected}
+
+
+def test_handles_null_analysis_fields():
+    photos, _ = generate_session(60, 0)
+    analyses = [{'photo_ids': None}, {'photo_ids': ['photo-3'], 'analysis_data': None, 'comparison': None}]
+    selected, _ = SmartPhotoBatcher().select_photos_for_comparison(photos, analyses)
+    assert len(selected) == 40
+
+
+def test_benchmark_1k_photos_500_analyses():
+    photos, analyses = generate_session(1000, 500)
+    batcher = SmartPhotoBatcher(max_photos=40)
+
+    timings = []
+    for _ in range(5):
+        start = time.perf_counter()
+        batcher.select_photos_for_comparison(photos, analyses)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    median_ms = statistics.median(timings)
+    print(f"SmartPhotoBatcher 1000 photos / 500 analyses: median {median_ms:.1f}ms")
+    assert median_ms < 50
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            func()
+            print(f"✅ {name}")
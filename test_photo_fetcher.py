@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Test script for concurrent photo fetching and the photo caches"""
+import os
+import sys
+import stat
+import time
+import asyncio
+import tempfile
+import threading
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from api.photo import fetcher
+from api.photo.fetcher import MemoryPhotoCache, PhotoBytesCache, fetch_storage_photos, encode_base64
+
+
+class FakeBucket:
+    def __init__(self, storage):
+        self.storage = storage
+
+    def download(self, path):
+        with self.storage.lock:
+            self.storage.in_flight += 1
+            self.storage.peak = max(self.storage.peak, self.storage.in_flight)
+            self.storage.calls += 1
+        time.sleep(0.05)
+        with self.storage.lock:
+            self.storage.in_flight -= 1
+        if path.startswith("missing"):
+            raise FileNotFoundError(path)
+        return f"bytes-of-{path}".encode()
+
+
+class FakeStorage:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.peak = 0
+        self.calls = 0
+
+    def from_(self, bucket):
+        return FakeBucket(self)
+
+
+class FakeSupabase:
+    def __init__(self):
+        self.storage = FakeStorage()
+
+
+def test_cache_evicts_least_recently_used():
+    cache = PhotoBytesCache(tempfile.mkdtemp(), max_bytes=30)
+    cache.put("a", b"x" * 10)
+    cache.put("b", b"y" * 10)
+    cache.put("c", b"z" * 10)
+    assert cache.get("a") == b"x" * 10  # a is now most recent
+    cache.put("d", b"w" * 10)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.stats()["bytes"] == 30
+
+
+def test_cache_index_survives_restart():
+    root = tempfile.mkdtemp()
+    PhotoBytesCache(root).put("user/session/photo.jpg", b"data")
+    assert PhotoBytesCache(root).get("user/session/photo.jpg") == b"data"
+
+
+def test_cache_dir_is_private():
+    root = os.path.join(tempfile.mkdtemp(), "photos")
+    os.makedirs(root, mode=0o777)
+    os.chmod(root, 0o777)
+    PhotoBytesCache(root)
+    assert stat.S_IMODE(os.stat(root).st_mode) == 0o700
+
+
+def test_memory_cache_is_default_and_expires():
+    original_cache, original_dir = fetcher._cache, os.environ.pop("PHOTO_CACHE_DIR", None)
+    fetcher._cache = None
+    try:
+        assert isinstance(fetcher.get_photo_cache(), MemoryPhotoCache)
+    finally:
+        fetcher._cache = original_cache
+        if original_dir is not None:
+            os.environ["PHOTO_CACHE_DIR"] = original_dir
+
+    cache = MemoryPhotoCache(max_bytes=20, ttl=60)
+    cache.put("a", b"x" * 10)
+    cache.put("b", b"y" * 10)
+    assert cache.get("a") == b"x" * 10
+    cache.put("c", b"z" * 10)
+    assert cache.get("b") is None and cache.stats()["bytes"] == 20
+
+    expired = MemoryPhotoCache(ttl=-1)
+    expired.put("a", b"x")
+    assert expired.get("a") is None and expired.stats()["bytes"] == 0
+
+
+def test_fetch_is_bounded_concurrent_and_cached():
+    fetcher._cache = PhotoBytesCache(tempfile.mkdtemp())
+    supabase = FakeSupabase()
+    urls = [f"user/session/{i}.jpg" for i in range(12)] + ["missing.jpg"]
+
+    start = time.time()
+    results = asyncio.run(fetch_storage_photos(supabase, "bucket", urls, max_concurrency=4))
+    elapsed = time.time() - start
+
+    assert results["user/session/0.jpg"] == b"bytes-of-user/session/0.jpg"
+    assert isinstance(results["missing.jpg"], FileNotFoundError)
+    assert supabase.storage.peak <= 4
+    assert elapsed < 13 * 0.05  # faster than serial
+
+    # Second pass is served from the cache
+    calls = supabase.storage.calls
+    asyncio.run(fetch_storage_photos(supabase, "bucket", urls[:12]))
+    assert supabase.storage.calls == calls
+
+
+def test_encode_base64_off_loop():
+    assert asyncio.run(encode_base64(b"hello")) == "aGVsbG8="
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            func()
+            print(f"✅ {name}")
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""Test script for the per-session photo progression snapshot"""
+import os
+import sys
+import copy
+import asyncio
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from api.photo import progression
+from api.photo.progression import (
+    get_progression_snapshot,
+    record_analysis,
+    record_photos,
+    build_progression_snapshot,
+    calculate_progression_velocity,
+    calculate_risk_indicators,
+    prepare_visualization_data
+)
+
+
+class FakeResult:
+    def __init__(self, data):
+        self.data = data
+
+
+class FakeQuery:
+    """Just enough of the supabase-py query builder for the snapshot code"""
+
+    def __init__(self, db, table):
+        self.db, self.table = db, table
+        self.filters, self.op, self.payload, self.order_key, self.limit_n = [], 'select', None, None, None
+
+    def select(self, *_):
+        return self
+
+    def eq(self, key, value):
+        self.filters.append((key, value))
+        return self
+
+    def is_(self, key, value):
+        self.filters.append((key, None if value == 'null' else value))
+        return self
+
+    def order(self, key, **_):
+        self.order_key = key
+        return self
+
+    def limit(self, n):
+        self.limit_n = n
+        return self
+
+    def insert(self, row):
+        self.op, self.payload = 'insert', row
+        return self
+
+    def upsert(self, row, on_conflict=None):
+        self.op, self.payload = 'upsert', row
+        return self
+
+    def update(self, row):
+        self.op, self.payload = 'update', row
+        return self
+
+    def delete(self):
+        self.op = 'delete'
+        return self
+
+    def execute(self):
+        self.db.queries.append((self.table, self.op))
+        rows = self.db.tables.setdefault(self.table, [])
+        matches = [r for r in rows if all(r.get(k) == v for k, v in self.filters)]
+        if self.op == 'select':
+            if self.order_key:
+                matches.sort(key=lambda r: r[self.order_key])
+            return FakeResult(copy.deepcopy(matches[:self.limit_n] if self.limit_n else matches))
+        if self.op in ('insert', 'upsert'):
+            rows[:] = [r for r in rows if r.get('session_id') != self.payload.get('session_id')] \
+                if self.op == 'upsert' else rows
+            rows.append(copy.deepcopy(self.payload))
+            return FakeResult([self.payload])
+        if self.op == 'update':
+            for r in matches:
+                r.update(copy.deepcopy(self.payload))
+            return FakeResult(matches)
+        rows[:] = [r for r in rows if r not in matches]
+        return FakeResult(matches)
+
+
+class FakeSupabase:
+    def __init__(self):
+        self.tables, self.queries = {}, []
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+
+def make_analysis(i, size):
+    return {
+        'id': f'a{i}', 'session_id': 's1', 'photo_ids': [f'p{i}'],
+        'created_at': f'2025-01-{i + 1:02d}T10:00:00+00:00', 'confidence_score': 80,
+        'model_used': 'openai/gpt-5',
+        'analysis_data': {
+            'primary_assessment': 'Mole', 'red_flags': ['border'] if i == 2 else [],
+            'key_measurements': {'size_estimate_mm': size, 'secondary_colors': ['brown'] * i}
+        }
+    }
+
+
+def seeded_db():
+    db = FakeSupabase()
+    db.tables['photo_sessions'] = [{'id': 's1', 'user_id': 'u1', 'condition_name': 'Mole on arm',
+                                    'created_at': '2025-01-01T00:00:00+00:00', 'is_sensitive': False}]
+    db.tables['photo_uploads'] = [{'id': f'p{i}', 'session_id': 's1', 'category': 'medical_normal',
+                                   'uploaded_at': f'2025-01-{i + 1:02d}T09:00:00+00:00',
+                                   'storage_url': f'u1/s1/{i}.jpg', 'temporary_data': 'x' * 1000}
+                                  for i in range(3)]
+    db.tables['photo_analyses'] = [make_analysis(i, 5 + i) for i in range(2)]
+    db.tables['photo_reminders'] = []
+    return db
+
+
+def test_snapshot_built_on_first_read_then_single_query():
+    db = seeded_db()
+    snapshot = asyncio.run(get_progression_snapshot(db, 's1'))
+    assert snapshot['analysis_count'] == 2
+    assert 'temporary_data' not in snapshot['photos'][0]
+
+    db.queries.clear()
+    asyncio.run(get_progression_snapshot(db, 's1'))
+    assert db.queries == [('photo_session_progression', 'select')]
+
+
+def test_incremental_analysis_matches_full_recompute():
+    db = seeded_db()
+    asyncio.run(get_progression_snapshot(db, 's1'))
+
+    new_analysis = make_analysis(2, 9)
+    db.tables['photo_analyses'].append(new_analysis)
+    asyncio.run(record_analysis(db, 's1', new_analysis))
+
+    snapshot = asyncio.run(get_progression_snapshot(db, 's1'))
+    analyses = db.tables['photo_analyses']
+    assert snapshot['analysis_count'] == 3
+    assert snapshot['version'] == 2
+    assert snapshot['velocity'] == calculate_progression_velocity(analyses)
+    assert snapshot['risk_indicators'] == calculate_risk_indicators(analyses)
+    assert snapshot['visualization_data'] == prepare_visualization_data(analyses)
+    assert db.tables['photo_sessions'][0]['progression_summary']['risk_level'] == 'moderate'
+
+
+def test_version_conflict_falls_back_to_rebuild():
+    db = seeded_db()
+    asyncio.run(get_progression_snapshot(db, 's1'))
+    original_save = progression._save_snapshot
+
+    async def conflicting_save(supabase, snapshot, expected_version, **kwargs):
+        if expected_version is not None:
+            return False
+        return await original_save(supabase, snapshot, expected_version, **kwargs)
+
+    progression._save_snapshot = conflicting_save
+    try:
+        new_photo = {'id': 'p9', 'session_id': 's1', 'category': 'medical_normal',
+                     'uploaded_at': '2025-02-01T09:00:00+00:00', 'storage_url': 'u1/s1/9.jpg'}
+        db.tables['photo_uploads'].append(new_photo)
+        asyncio.run(record_photos(db, 's1', [new_photo]))
+    finally:
+        progression._save_snapshot = original_save
+
+    snapshot = asyncio.run(get_progression_snapshot(db, 's1'))
+    assert [p['id'] for p in snapshot['photos']][-1] == 'p9'
+    # The rebuild continues from the version it replaced
+    assert snapshot['version'] == 2
+
+
+def test_analyses_keep_only_timeline_fields():
+    analysis = make_analysis(1, 6)
+    analysis['analysis_data'].update({
+        'detailed_description': 'Irregular pigmented lesion. ' * 500,
+        'trackable_metrics': [{'metric_name': 'size', 'current_value': 6}],
+    })
+    analysis['comparison'] = {'trend': 'worsening', 'ai_summary': 'Larger', 'raw_model_output': 'x' * 5000,
+                              'visual_changes': {'color': {'concerning': True, 'notes': 'y' * 1000}}}
+    slim = build_progression_snapshot({'id': 's1'}, [], [analysis], None)['analyses'][0]
+
+    assert slim['analysis_data'] == {
+        'primary_assessment': 'Mole', 'red_flags': [],
+        'key_measurements': {'size_estimate_mm': 6, 'secondary_colors': ['brown']}
+    }
+    assert slim['comparison'] == {'trend': 'worsening', 'ai_summary': 'Larger',
+                                  'visual_changes': {'color': {'concerning': True}}}
+    assert 'model_used' not in slim
+
+
+def test_deleted_session_drops_its_snapshot():
+    db = seeded_db()
+    asyncio.run(get_progression_snapshot(db, 's1'))
+    db.tables['photo_sessions'][0]['deleted_at'] = '2025-02-01T00:00:00'
+    for photo in db.tables['photo_uploads']:
+        photo['deleted_at'] = '2025-02-01T00:00:00'
+
+    asyncio.run(progression.invalidate_progression_snapshot(db, 's1'))
+    assert db.tables['photo_session_progression'] == []
+    assert asyncio.run(get_progression_snapshot(db, 's1')) is None
+
+
+def test_rebuild_skips_deleted_photos():
+    db = seeded_db()
+    db.tables['photo_uploads'][1]['deleted_at'] = '2025-02-01T00:00:00'
+    snapshot = asyncio.run(get_progression_snapshot(db, 's1'))
+    assert [p['id'] for p in snapshot['photos']] == ['p0', 'p2']
+
+
+def test_insufficient_data_has_no_series():
+    snapshot = build_progression_snapshot({'id': 's1', 'condition_name': 'Rash'}, [], [make_analysis(0, 4)], None)
+    assert snapshot['overall_trend'] == 'insufficient_data'
+    assert snapshot['velocity'] is None
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            func()
+            print(f"✅ {name}")
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark for photo upload handling: 20 concurrent 5-photo uploads.
+
+Compares the old read-everything path (raw bytes + base64 string + data URL
++ a second full read for storage) with the streaming spool path. The model
+call and storage upload are simulated; only the upload handling is measured.
+"""
+import os
+import sys
+import base64
+import asyncio
+import tempfile
+import tracemalloc
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from fastapi import HTTPException, UploadFile
+from starlette.datastructures import Headers
+
+from api.photo.streaming import spool_photo_upload, sniff_image_type
+
+CONCURRENT_UPLOADS = 20
+PHOTOS_PER_UPLOAD = 5
+PHOTO_SIZE = 2 * 1024 * 1024
+MAX_FILE_SIZE = 10 * 1024 * 1024
+ALLOWED_MIME_TYPES = ['image/jpeg', 'image/png', 'image/heic', 'image/heif', 'image/webp']
+JPEG_HEADER = b'\xff\xd8\xff\xe0\x00\x10JFIF\x00'
+
+
+def make_upload(payload: bytes, content_type: str = 'image/jpeg') -> UploadFile:
+    spool = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    spool.write(payload)
+    spool.seek(0)
+    return UploadFile(file=spool, size=len(payload), filename='photo.jpg',
+                      headers=Headers({'content-type': content_type}))
+
+
+async def simulated_model_call(data_url: str):
+    await asyncio.sleep(0.05)
+    return len(data_url)
+
+
+async def legacy_upload(photos):
+    for photo in photos:
+        contents = await photo.read()
+        base64_image = base64.b64encode(contents).decode('utf-8')
+        await simulated_model_call(f'data:{photo.content_type};base64,{base64_image}')
+        await photo.seek(0)
+        file_data = await photo.read()
+        await asyncio.sleep(0.01)  # storage upload
+        del contents, base64_image, file_data
+
+
+async def streaming_upload(photos):
+    for photo in photos:
+        spooled = await spool_photo_upload(photo, MAX_FILE_SIZE, ALLOWED_MIME_TYPES)
+        try:
+            await simulated_model_call(await spooled.data_url())
+
+            def stream_to_storage():
+                with spooled.open() as f:
+                    while f.read(256 * 1024):
+                        pass
+            await asyncio.to_thread(stream_to_storage)
+        finally:
+            spooled.cleanup()
+
+
+def measure_peak(handler) -> int:
+    payload = JPEG_HEADER + os.urandom(PHOTO_SIZE - len(JPEG_HEADER))
+    requests = [[make_upload(payload) for _ in range(PHOTOS_PER_UPLOAD)] for _ in range(CONCURRENT_UPLOADS)]
+
+    async def run():
+        await asyncio.gather(*(handler(photos) for photos in requests))
+
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    asyncio.run(run())
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def test_streaming_upload_peak_memory_is_lower():
+    legacy_peak = measure_peak(legacy_upload)
+    streaming_peak = measure_peak(streaming_upload)
+    print(f"{CONCURRENT_UPLOADS} concurrent x {PHOTOS_PER_UPLOAD} photos of {PHOTO_SIZE // 1024}KB")
+    print(f"  legacy peak:    {legacy_peak / 1024 / 1024:.1f}MB")
+    print(f"  streaming peak: {streaming_peak / 1024 / 1024:.1f}MB")
+    assert streaming_peak < legacy_peak * 0.6
+
+
+def test_magic_bytes_are_validated():
+    assert sniff_image_type(JPEG_HEADER) == 'image/jpeg'
+    assert sniff_image_type(b'\x00\x00\x00\x18ftypheic') == 'image/heic'
+
+    try:
+        asyncio.run(spool_photo_upload(make_upload(b'%PDF-1.7 not an image'), MAX_FILE_SIZE, ALLOWED_MIME_TYPES))
+        assert False, "PDF should be rejected"
+    except HTTPException as e:
+        assert e.status_code == 400
+
+
+def test_size_limit_uses_actual_bytes():
+    oversized = make_upload(JPEG_HEADER + b'\x00' * 2048)
+    try:
+        asyncio.run(spool_photo_upload(oversized, 1024, ALLOWED_MIME_TYPES))
+        assert False, "oversized upload should be rejected"
+    except HTTPException as e:
+        assert e.status_code == 413
+
+
+def test_spooled_photo_hash_and_data_url():
+    payload = JPEG_HEADER + b'abc'
+    spooled = asyncio.run(spool_photo_upload(make_upload(payload, 'image/png'), MAX_FILE_SIZE, ALLOWED_MIME_TYPES))
+    try:
+        assert spooled.size == len(payload)
+        assert spooled.content_type == 'image/jpeg'  # detected type wins over the header
+        assert spooled.build_data_url() == 'data:image/jpeg;base64,' + base64.b64encode(payload).decode()
+    finally:
+        spooled.cleanup()
+    assert not os.path.exists(spooled.path)
+
+
+def test_dropped_spool_file_is_removed():
+    spooled = asyncio.run(spool_photo_upload(make_upload(JPEG_HEADER), MAX_FILE_SIZE, ALLOWED_MIME_TYPES))
+    path = spooled.path
+    assert os.path.exists(path)
+    del spooled  # an error path that never called cleanup()
+    assert not os.path.exists(path)
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            func()
+            print(f"✅ {name}")
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""Test script for provider prompt caching in call_llm"""
+import os
+import sys
+import asyncio
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import business_logic
+from core.prompt_registry import PROMPT_FIELDS, prompt_registry
+from utils.prompt_cache import PromptCacheStats, apply_prompt_cache
+
+prompt_registry.load()
+
+
+def quick_scan_messages():
+    prompt = business_logic.make_prompt(
+        "sharp pain when breathing", {"form_data": {"severity": 6}}, "", "quick-scan", body_parts=["Chest"]
+    )
+    return [{"role": "system", "content": prompt}, {"role": "user", "content": "Analyze my symptoms"}]
+
+
+class FakeOpenRouter:
+    def __init__(self, cached=0):
+        self.payloads, self.cached = [], cached
+
+    async def chat_completion(self, payload, **kwargs):
+        self.payloads.append(payload)
+        return {
+            "choices": [{"message": {"content": "ok"}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 2000, "completion_tokens": 5,
+                      "prompt_tokens_details": {"cached_tokens": self.cached}},
+        }
+
+
+def test_static_instructions_come_before_user_data():
+    for name in PROMPT_FIELDS:
+        if name.startswith("medical/"):
+            template = prompt_registry.get(name)
+            # Only the input section at the end varies between users
+            assert len(template.stable_prefix) > 0.85 * len(template.text), name
+
+
+def test_breakpoint_after_template_prefix_for_anthropic():
+    messages = quick_scan_messages()
+    prefix = prompt_registry.get("medical/quick_scan").stable_prefix
+
+    cached, label = apply_prompt_cache(messages, "anthropic/claude-sonnet-4")
+    assert label == "medical/quick_scan"
+    first, second = cached[0]["content"]
+    assert first == {"type": "text", "text": prefix, "cache_control": {"type": "ephemeral"}}
+    assert prefix + second["text"] == messages[0]["content"]
+    assert "sharp pain when breathing" in second["text"]
+    # The caller's messages are untouched (fallback models reuse them)
+    assert isinstance(messages[0]["content"], str)
+
+    # OpenAI caches prefixes automatically: the request is unchanged
+    unchanged, label = apply_prompt_cache(messages, "openai/gpt-5-mini")
+    assert unchanged is messages and label == "medical/quick_scan"
+
+
+def test_cache_key_marks_whole_system_message():
+    messages = [{"role": "system", "content": "Static triage instructions"}, {"role": "user", "content": "hi"}]
+    cached, label = apply_prompt_cache(messages, "google/gemini-2.5-flash-lite", "flash_assessment")
+    assert label == "flash_assessment"
+    assert cached[0]["content"] == [
+        {"type": "text", "text": "Static triage instructions", "cache_control": {"type": "ephemeral"}}
+    ]
+
+    adhoc = [{"role": "system", "content": "Built per request for u1"}]
+    assert apply_prompt_cache(adhoc, "anthropic/claude-sonnet-4") == (adhoc, None)
+
+
+def test_stats_report_hit_rate_and_latency():
+    stats = PromptCacheStats()
+    stats.record("quick_scan", {"prompt_tokens": 2000, "prompt_tokens_details": {"cached_tokens": 0}}, 2.0)
+    stats.record("quick_scan", {"prompt_tokens": 2000, "prompt_tokens_details": {"cached_tokens": 1800}}, 1.5)
+    stats.record("quick_scan", {"prompt_tokens": 2000, "cache_read_input_tokens": 1800}, 1.5)
+    report = stats.snapshot()["quick_scan"]
+    assert report["calls"] == 3 and report["hit_rate"] == 0.667
+    assert report["cached_tokens"] == 3600 and report["cached_token_ratio"] == 0.6
+    assert report["avg_miss_ms"] == 2000 and report["avg_hit_ms"] == 1500 and report["latency_saved_ms"] == 500
+
+
+def test_call_llm_sends_breakpoint_and_records_usage():
+    fake, stats = FakeOpenRouter(cached=1800), PromptCacheStats()
+    originals = business_logic.openrouter, business_logic.prompt_cache_stats
+    business_logic.openrouter, business_logic.prompt_cache_stats = fake, stats
+    try:
+        result = asyncio.run(business_logic.call_llm(quick_scan_messages(), model="anthropic/claude-sonnet-4"))
+    finally:
+        business_logic.openrouter, business_logic.prompt_cache_stats = originals
+
+    assert result["content"] == "ok"
+    assert fake.payloads[0]["messages"][0]["content"][0]["cache_control"] == {"type": "ephemeral"}
+    assert stats.snapshot()["medical/quick_scan"]["cached_tokens"] == 1800
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print(f"✅ {name}")
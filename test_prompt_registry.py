@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""Test script for the compiled prompt template registry"""
+import os
+import sys
+import shutil
+import tempfile
+from pathlib import Path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from core.prompt_registry import (
+    PROMPT_FIELDS, PromptRegistry, PromptTemplateError, compile_template, prompt_registry
+)
+
+
+def make_registry(files, fields, **kwargs):
+    root = Path(tempfile.mkdtemp())
+    for name, text in files.items():
+        path = root / f"{name}.txt"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+    return PromptRegistry(root=root, fields=fields, **kwargs), root
+
+
+def test_shipped_templates_compile():
+    registry = PromptRegistry(root=prompt_registry.root)
+    registry.load()
+    stats = registry.stats()
+    assert set(PROMPT_FIELDS) <= set(stats)
+    for name, allowed in PROMPT_FIELDS.items():
+        assert set(stats[name]["fields"]) <= allowed, name
+
+
+def test_render_matches_str_format():
+    text = "Patient {query}\nReturn JSON: {{\"a\": {body_parts}}}\n{query}"
+    template = compile_template("t", text, frozenset({"query", "body_parts"}))
+    values = {"query": "headache", "body_parts": "Head"}
+    assert template.render(**values) == text.format(**values)
+    assert template.stable_prefix == "Patient "
+
+    final = prompt_registry.get("medical/deep_dive/final")
+    values = {"questions": "[]", "form_data": "{}", "medical_data": "x", "llm_context": "New patient"}
+    assert final.render(**values) == final.text.format(**values)
+
+
+def test_bad_placeholders_fail_at_load():
+    fields = {"a": frozenset({"query"}), "b": frozenset({"query"}), "missing": frozenset()}
+    registry, root = make_registry({"a": "{qurey}", "b": "unclosed {query"}, fields)
+    try:
+        registry.load()
+        assert False, "load should fail"
+    except PromptTemplateError as e:
+        message = str(e)
+        assert "qurey" in message and "b:" in message and "missing" in message
+    finally:
+        shutil.rmtree(root)
+
+    for text in ("{0}", "{query!r}", "{query:>10}", "{user.name}"):
+        try:
+            compile_template("t", text)
+            assert False, text
+        except PromptTemplateError:
+            pass
+
+
+def test_hot_reload_keeps_previous_template_on_bad_edit():
+    fields = {"scan": frozenset({"query"})}
+    registry, root = make_registry({"scan": "v1 {query}"}, fields, hot_reload=True, check_interval=0)
+    try:
+        assert registry.render("scan", query="q") == "v1 q"
+        path = root / "scan.txt"
+        path.write_text("v2 {query}")
+        os.utime(path, (1, 1))
+        assert registry.render("scan", query="q") == "v2 q"
+        path.write_text("v3 {typo}")
+        os.utime(path, (2, 2))
+        assert registry.render("scan", query="q") == "v2 q"
+    finally:
+        shutil.rmtree(root)
+
+
+def test_stats_track_rendered_tokens():
+    registry, root = make_registry({"scan": "Assess the symptoms. {query}"}, {"scan": frozenset({"query"})})
+    try:
+        registry.render("scan", query="short")
+        registry.render("scan", query="a much longer description " * 20)
+        stats = registry.stats()["scan"]
+        assert stats["renders"] == 2 and stats["prefix_tokens"] > 0
+        assert stats["max_rendered_tokens"] > stats["avg_rendered_tokens"] > stats["prefix_tokens"]
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print(f"✅ {name}")
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""Test script for the concurrent report data fetch plans"""
+import os
+import sys
+import time
+import asyncio
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils import data_gathering
+from utils.fetch_plan import FetchSource, execute_fetch_plan
+from api.reports import time_based
+
+LATENCY = 0.05  # seconds per round trip
+
+
+class FakeResult:
+    def __init__(self, data):
+        self.data = data
+
+
+class FakeQuery:
+    def __init__(self, db, table):
+        self.db, self.table, self.filters = db, table, []
+
+    def select(self, *_):
+        return self
+
+    def eq(self, key, value):
+        self.filters.append(lambda row: row.get(key) == value)
+        return self
+
+    def in_(self, key, values):
+        self.filters.append(lambda row: row.get(key) in values)
+        return self
+
+    def gte(self, key, value):
+        self.filters.append(lambda row: row.get(key, "") >= value)
+        return self
+
+    def lte(self, key, value):
+        self.filters.append(lambda row: row.get(key, "") <= value)
+        return self
+
+    def order(self, *_, **__):
+        return self
+
+    def execute(self):
+        self.db.queries.append(self.table)
+        time.sleep(LATENCY)
+        if self.table in self.db.broken:
+            raise RuntimeError(f"relation {self.table} does not exist")
+        return FakeResult([row for row in self.db.tables.get(self.table, [])
+                           if all(match(row) for match in self.filters)])
+
+
+class FakeSupabase:
+    def __init__(self, tables, broken=()):
+        self.tables, self.broken, self.queries = tables, set(broken), []
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+
+def sample_tables():
+    row = lambda **fields: {"user_id": "u1", "created_at": "2025-03-01T00:00:00+00:00", **fields}
+    return {
+        "quick_scans": [row(id="qs1"), row(id="qs2"), row(id="other", user_id="u2")],
+        "deep_dive_sessions": [row(id="dd1", status="completed")],
+        "symptom_tracking": [row(id="st1", quick_scan_id="qs1"), row(id="st2", quick_scan_id="qs2", deep_dive_id="dd1")],
+        "tracking_configurations": [row(id=f"cfg{i}", status="approved", metric_name=f"metric {i}") for i in range(5)],
+        "tracking_data_points": [
+            {"configuration_id": f"cfg{i % 4}", "recorded_at": f"2025-03-{i + 1:02d}T00:00:00+00:00", "value": i}
+            for i in range(12)
+        ],
+        "oracle_chats": [row(id="c1")],
+        "photo_sessions": [row(id="ps1"), row(id="ps2")],
+        "photo_analyses": [{"id": "pa1", "session_id": "ps1"}, {"id": "pa2", "session_id": "ps9"}],
+        "general_assessments": [row(id="ga1")],
+        "medical": [{"id": "u1", "age": 40}],
+    }
+
+
+def install(module, fake):
+    original = module.supabase
+    module.supabase = fake
+    return lambda: setattr(module, "supabase", original)
+
+
+async def no_medical_data(user_id):
+    await asyncio.sleep(LATENCY)
+    return {"age": 40}
+
+
+def test_independent_sources_run_concurrently():
+    fake = FakeSupabase(sample_tables())
+    plan = [FetchSource(f"s{i}", lambda deps: fake.table("quick_scans").select("*")) for i in range(6)]
+    started = time.perf_counter()
+    result = asyncio.run(execute_fetch_plan(plan, max_concurrency=6))
+    elapsed = time.perf_counter() - started
+    assert elapsed < LATENCY * 3, elapsed
+    assert set(result.timings) == {f"s{i}" for i in range(6)} | {"total"}
+
+
+def test_failed_source_resolves_to_default():
+    fake = FakeSupabase(sample_tables(), broken=["photo_sessions"])
+    plan = [
+        FetchSource("photo_sessions", lambda deps: fake.table("photo_sessions").select("*")),
+        FetchSource("photo_analyses", lambda deps: fake.table("photo_analyses").select("*")
+                    if deps["photo_sessions"] else None, after=("photo_sessions",)),
+    ]
+    result = asyncio.run(execute_fetch_plan(plan))
+    assert result.data == {"photo_sessions": [], "photo_analyses": []}
+    assert "photo_sessions" in result.errors
+    assert fake.queries == ["photo_sessions"]
+
+
+def test_time_based_gather_batches_tracking_points():
+    fake = FakeSupabase(sample_tables())
+    restore = install(time_based, fake)
+    try:
+        timings = {}
+        started = time.perf_counter()
+        data = asyncio.run(time_based.gather_comprehensive_data("u1", {"time_range": {}}, timings))
+        elapsed = time.perf_counter() - started
+    finally:
+        restore()
+
+    serial = len(fake.queries) * LATENCY
+    print(f"Time-based gather: {len(fake.queries)} queries in {elapsed * 1000:.0f}ms (serial ~{serial * 1000:.0f}ms)")
+    assert elapsed < serial / 2
+    assert fake.queries.count("tracking_data_points") == 1
+    assert [entry["metric"] for entry in data["tracking_data"]] == ["metric 0", "metric 1", "metric 2", "metric 3"]
+    assert [p["value"] for p in data["tracking_data"][1]["data_points"]] == [1, 5, 9]
+    assert [a["id"] for a in data["photo_analyses"]] == ["pa1"]
+    assert data["medical_profile"] == {"id": "u1", "age": 40}
+    assert [s["id"] for s in data["quick_scans"]] == ["qs1", "qs2"]
+    assert "tracking_data_points" not in timings and "tracking_data" in timings and "total" in timings
+
+
+def test_comprehensive_gather_returns_only_report_keys():
+    fake = FakeSupabase(sample_tables())
+    restore = install(data_gathering, fake)
+    original_medical = data_gathering.get_user_medical_data
+    data_gathering.get_user_medical_data = no_medical_data
+    try:
+        data = asyncio.run(data_gathering.gather_comprehensive_data("u1", {"time_range": {}}))
+    finally:
+        data_gathering.get_user_medical_data = original_medical
+        restore()
+
+    assert set(data) == {
+        "medical_profile", "quick_scans", "deep_dives", "general_assessments", "general_deep_dives",
+        "symptom_tracking", "tracking_data", "llm_summaries", "wearables",
+    }
+    assert len(data["tracking_data"]) == 4 and data["medical_profile"] == {"age": 40}
+
+
+def test_selected_gather_matches_selection():
+    fake = FakeSupabase(sample_tables())
+    restore = install(data_gathering, fake)
+    original_medical = data_gathering.get_user_medical_data
+    data_gathering.get_user_medical_data = no_medical_data
+    try:
+        timings = {}
+        data = asyncio.run(data_gathering.gather_selected_data(
+            user_id="u1", quick_scan_ids=["qs1", "qs2", "other"], deep_dive_ids=["dd1"],
+            photo_session_ids=[], general_assessment_ids=["ga1"], general_deep_dive_ids=[], timings=timings))
+    finally:
+        restore()
+        data_gathering.get_user_medical_data = original_medical
+
+    assert [s["id"] for s in data["quick_scans"]] == ["qs1", "qs2"]
+    assert [s["id"] for s in data["symptom_tracking"]] == ["st1", "st2"]  # st2 linked twice, kept once
+    assert fake.queries.count("symptom_tracking") == 2
+    assert "photo_analyses" not in fake.queries and "general_deepdive_sessions" not in fake.queries
+    assert data["medical_profile"] == {"age": 40}
+    assert {"quick_scans", "scan_symptoms", "medical_profile", "total"} <= set(timings)
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            func()
+            print(f"✅ {name}")
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""Test script for the asynchronous report job queue"""
+import os
+import sys
+import copy
+import asyncio
+from datetime import timedelta
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from models.requests import SpecialistReportRequest, TimePeriodReportRequest
+from api.reports.jobs import DEDUP_WINDOW, ReportJobQueue, _now, compute_request_hash
+
+
+class FakeResult:
+    def __init__(self, data):
+        self.data = data
+
+
+class FakeQuery:
+    def __init__(self, db, table):
+        self.db, self.table = db, table
+        self.filters, self.op, self.payload = [], 'select', None
+
+    def select(self, *_):
+        return self
+
+    def eq(self, key, value):
+        self.filters.append((key, value))
+        return self
+
+    def order(self, *_, **__):
+        return self
+
+    def limit(self, _):
+        return self
+
+    def insert(self, row):
+        self.op, self.payload = 'insert', row
+        return self
+
+    def update(self, row):
+        self.op, self.payload = 'update', row
+        return self
+
+    def execute(self):
+        rows = self.db.setdefault(self.table, [])
+        matches = [r for r in rows if all(r.get(k) == v for k, v in self.filters)]
+        if self.op == 'insert':
+            rows.append(copy.deepcopy(self.payload))
+        elif self.op == 'update':
+            for r in matches:
+                r.update(copy.deepcopy(self.payload))
+        return FakeResult(copy.deepcopy(matches))
+
+
+class FakeSupabase:
+    def __init__(self):
+        self.db = {}
+
+    def table(self, name):
+        return FakeQuery(self.db, name)
+
+
+def make_handler(calls, release=None, response=None):
+    async def handler(request):
+        calls.append(request.report_id)
+        if release:
+            await release.wait()
+        return response or {"report_id": request.report_id, "report_data": {}, "status": "success"}
+    return handler
+
+
+def cardiology_request(**overrides):
+    fields = dict(analysis_id='a1', user_id='u1', specialty='cardiology',
+                  quick_scan_ids=['q2', 'q1'], deep_dive_ids=None)
+    fields.update(overrides)
+    return SpecialistReportRequest(**fields)
+
+
+def test_request_hash_ignores_order_and_per_click_ids():
+    first = compute_request_hash('cardiology', cardiology_request())
+    assert first == compute_request_hash('cardiology', cardiology_request(analysis_id='a2', quick_scan_ids=['q1', 'q2'], deep_dive_ids=[]))
+    assert first != compute_request_hash('neurology', cardiology_request())
+    assert first != compute_request_hash('cardiology', cardiology_request(quick_scan_ids=['q1']))
+
+
+def test_enqueue_returns_immediately_and_completes():
+    async def run():
+        queue = ReportJobQueue(FakeSupabase())
+        release, calls = asyncio.Event(), []
+        job, deduplicated = await queue.enqueue('cardiology', make_handler(calls, release), cardiology_request())
+        assert not deduplicated and job['status'] == 'queued'
+
+        await asyncio.sleep(0.05)
+        assert (await queue.get_job(job['id']))['status'] == 'running'
+        assert calls == [job['id']]  # the handler saves under the queued report_id
+
+        release.set()
+        await asyncio.sleep(0.05)
+        assert (await queue.get_job(job['id']))['status'] == 'completed'
+        assert queue.get_result(job['id'])['status'] == 'success'
+        assert queue.supabase.db['report_jobs'][0]['status'] == 'completed'
+    asyncio.run(run())
+
+
+def test_double_click_shares_one_job():
+    async def run():
+        queue = ReportJobQueue(FakeSupabase())
+        calls = []
+        handler = make_handler(calls)
+        (first, _), (second, deduplicated) = await asyncio.gather(
+            queue.enqueue('cardiology', handler, cardiology_request()),
+            queue.enqueue('cardiology', handler, cardiology_request(analysis_id='a2'))
+        )
+        await asyncio.sleep(0.05)
+        assert deduplicated and first['id'] == second['id']
+        assert len(calls) == 1
+
+        # Completed reports are reused within the dedup window
+        third, deduplicated = await queue.enqueue('cardiology', handler, cardiology_request())
+        assert deduplicated and third['id'] == first['id']
+    asyncio.run(run())
+
+
+def test_dedup_sees_jobs_from_other_workers():
+    async def run():
+        supabase = FakeSupabase()
+        calls = []
+        release = asyncio.Event()
+        job, _ = await ReportJobQueue(supabase).enqueue(
+            '30-day', make_handler(calls, release), TimePeriodReportRequest(user_id='u1'))
+        other_worker = ReportJobQueue(supabase)
+        again, deduplicated = await other_worker.enqueue(
+            '30-day', make_handler(calls), TimePeriodReportRequest(user_id='u1'))
+        assert deduplicated and again['id'] == job['id']
+        assert (await other_worker.get_job(job['id']))['status'] in ('queued', 'running')
+        release.set()
+        await asyncio.sleep(0.05)
+        assert len(calls) == 1
+    asyncio.run(run())
+
+
+def test_failed_job_is_retried_on_next_request():
+    async def run():
+        queue = ReportJobQueue(FakeSupabase())
+        calls = []
+        failing = make_handler(calls, response={"status": "error", "error": "AI did not return valid JSON"})
+        job, _ = await queue.enqueue('cardiology', failing, cardiology_request())
+        await asyncio.sleep(0.05)
+        failed = await queue.get_job(job['id'])
+        assert failed['status'] == 'failed' and 'valid JSON' in failed['error']
+
+        retry, deduplicated = await queue.enqueue('cardiology', make_handler(calls), cardiology_request())
+        assert not deduplicated and retry['id'] != job['id']
+    asyncio.run(run())
+
+
+def test_results_are_dropped_after_the_dedup_window_on_read():
+    async def run():
+        queue = ReportJobQueue(FakeSupabase())
+        job, _ = await queue.enqueue('cardiology', make_handler([]), cardiology_request())
+        await asyncio.sleep(0.05)
+        assert queue.get_result(job['id'])['status'] == 'success'
+
+        job['completed_at'] = (_now() - DEDUP_WINDOW - timedelta(seconds=1)).isoformat()
+        assert queue.get_result(job['id']) is None
+        assert not queue._jobs and not queue._results and not queue._by_hash
+        # Still answered from the jobs table
+        assert (await queue.get_job(job['id']))['status'] == 'completed'
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            func()
+            print(f"✅ {name}")
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""Test script for keyset-paginated, projected report lists"""
+import os
+import re
+import sys
+import json
+import gzip
+import random
+from contextlib import contextmanager
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from utils import report_listing
+from api import population_health
+from api.reports import general
+
+
+class FakeResult:
+    def __init__(self, data):
+        self.data = data
+
+
+class FakeQuery:
+    OR_CURSOR = re.compile(r'created_at\.lt\."(.+?)",and\(created_at\.eq\."(.+?)",id\.lt\."(.+?)"\)')
+
+    def __init__(self, db, table):
+        self.db, self.table = db, table
+        self.columns, self.filters, self.orders, self.limit_to = "*", [], [], None
+
+    def select(self, columns="*"):
+        self.columns = columns
+        return self
+
+    def eq(self, key, value):
+        self.filters.append(lambda row: row.get(key) == value)
+        return self
+
+    def gte(self, key, value):
+        self.filters.append(lambda row: row.get(key) >= value)
+        return self
+
+    def or_(self, expression):
+        created_at, _, report_id = self.OR_CURSOR.fullmatch(expression).groups()
+        self.filters.append(lambda row: (row["created_at"], row["id"]) < (created_at, report_id))
+        return self
+
+    def order(self, key, desc=False):
+        self.orders.append((key, desc))
+        return self
+
+    def limit(self, count):
+        self.limit_to = count
+        return self
+
+    def update(self, values):
+        self.columns = "update"
+        return self
+
+    def execute(self):
+        self.db.queries.append(self.columns)
+        rows = [r for r in self.db.rows if all(match(r) for match in self.filters)]
+        for key, desc in reversed(self.orders):
+            rows.sort(key=lambda r: r[key], reverse=desc)
+        if self.columns != "*":
+            names = [c.strip() for c in self.columns.split(",")]
+            rows = [{name: r.get(name) for name in names} for r in rows]
+        return FakeResult(rows[:self.limit_to])
+
+
+class FakeSupabase:
+    def __init__(self, rows):
+        self.rows, self.queries = rows, []
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+
+def make_reports(count, user_id="u1"):
+    rng = random.Random(7)
+    reports = []
+    for i in range(count):
+        # Batches of reports share a timestamp, so ties must page correctly
+        day = 1 + (i // 3) % 28
+        reports.append({
+            "id": f"{rng.getrandbits(64):016x}",
+            "user_id": user_id,
+            "analysis_id": f"a{i}",
+            "report_type": rng.choice(["comprehensive", "cardiology", "annual_summary"]),
+            "created_at": f"2025-{1 + i // 84:02d}-{day:02d}T10:00:00+00:00",
+            "executive_summary": "Mild intermittent headaches, well controlled. " * 4,
+            "confidence_score": 0.8,
+            "model_used": "deepseek/deepseek-chat",
+            "specialty": "neurology",
+            "doctor_reviewed": False,
+            "report_data": {
+                "executive_summary": {"one_page_summary": "Summary " * 200, "key_findings": ["finding"] * 20},
+                "clinical_timeline": [{"date": "2025-01-01", "event": "Headache episode " * 10}] * 40,
+                "recommendations": ["Hydrate and track sleep " * 5] * 15,
+            },
+        })
+    return reports
+
+
+@contextmanager
+def client_with(fake):
+    originals = report_listing.supabase, general.supabase
+    report_listing.supabase = general.supabase = fake
+    app = FastAPI()
+    app.include_router(population_health.router)
+    app.include_router(general.router)
+    try:
+        yield TestClient(app)
+    finally:
+        report_listing.supabase, general.supabase = originals
+
+
+def test_keyset_pages_cover_every_report_once_in_order():
+    reports = make_reports(500)
+    with client_with(FakeSupabase(reports)) as client:
+        seen, cursor = [], None
+        while True:
+            params = {"limit": 50, "days": 100000, **({"cursor": cursor} if cursor else {})}
+            page = client.get("/api/report/list/u1", params=params).json()
+            seen.extend(report["id"] for report in page["reports"])
+            if not page["has_more"]:
+                break
+            cursor = page["next_cursor"]
+
+    expected = [r["id"] for r in sorted(reports, key=lambda r: (r["created_at"], r["id"]), reverse=True)]
+    assert seen == expected
+
+
+def test_lists_are_projected_and_bodies_are_fetched_lazily():
+    fake = FakeSupabase(make_reports(30))
+    with client_with(fake) as client:
+        listed = client.get("/api/reports", params={"user_id": "u1", "limit": 10})
+        assert len(listed.json()) == 10 and listed.headers["x-next-cursor"]
+        assert all(columns == report_listing.REPORT_LIST_COLUMNS for columns in fake.queries)
+
+        report_id = listed.json()[0]["id"]
+        data = client.get(f"/api/report/{report_id}/data", headers={"Accept-Encoding": "gzip"})
+        assert data.json()["report_data"]["clinical_timeline"]
+        assert fake.queries[-1] == report_listing.REPORT_DATA_COLUMNS
+        # Detail responses keep the full row
+        detail = client.get(f"/api/report/{report_id}").json()["report"]
+        assert detail["specialty"] == "neurology" and detail["doctor_reviewed"] is False
+        assert detail["report_data"]["clinical_timeline"]
+        summary = client.get(f"/api/report/{report_id}", params={"include_data": False}).json()["report"]
+        assert summary.get("report_data") is None and summary["specialty"] == "neurology"
+        # The body is not read from the database at all
+        assert report_listing.REPORT_SUMMARY_COLUMNS in fake.queries
+        assert "report_data" not in report_listing.REPORT_SUMMARY_COLUMNS
+
+
+def test_reports_without_limit_returns_every_report():
+    reports = make_reports(250)
+    with client_with(FakeSupabase(reports)) as client:
+        listed = client.get("/api/reports", params={"user_id": "u1"})
+    assert len(listed.json()) == 250 and "x-next-cursor" not in listed.headers
+    assert [r["id"] for r in listed.json()] == [
+        r["id"] for r in sorted(reports, key=lambda r: (r["created_at"], r["id"]), reverse=True)
+    ]
+
+
+def test_invalid_cursor_is_rejected():
+    with client_with(FakeSupabase(make_reports(3))) as client:
+        assert client.get("/api/report/list/u1", params={"cursor": "not-a-cursor"}).status_code == 400
+        assert client.get("/api/reports", params={"user_id": "u1", "cursor": "%%%"}).status_code == 400
+
+
+def test_benchmark_list_payload_for_500_reports():
+    reports = make_reports(500)
+    old_payload = len(json.dumps({"reports": reports, "count": len(reports), "status": "success"}))
+
+    with client_with(FakeSupabase(reports)) as client:
+        first_page = client.get("/api/report/list/u1", params={"days": 100000})
+    new_payload = len(first_page.content)
+    body = json.dumps({"report_data": reports[0]["report_data"]}).encode()
+    print(f"500 reports: select * list {old_payload / 1024:.0f}KB -> first page {new_payload / 1024:.1f}KB; "
+          f"one report_data {len(body) / 1024:.1f}KB -> gzip {len(gzip.compress(body)) / 1024:.1f}KB")
+    assert new_payload < old_payload / 100
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            func()
+            print(f"✅ {name}")
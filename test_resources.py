@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""Test script for the process-wide connection pools"""
+import os
+import sys
+import asyncio
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from core import resources as resources_module
+from core.resources import ResourceRegistry, resources
+
+
+def test_modules_share_one_supabase_client():
+    import supabase_client
+    from api import export, health_analysis
+    from api.photo.database import get_supabase
+    from services import background_jobs_v2, job_monitoring
+
+    clients = {id(m.supabase) for m in (supabase_client, export, health_analysis, background_jobs_v2, job_monitoring)}
+    assert clients == {id(resources.db)}
+    assert get_supabase() is resources.db
+
+
+def test_http_client_is_shared_and_reopened_after_close():
+    from utils.async_http import close_http_client, get_http_client
+
+    async def scenario():
+        registry = ResourceRegistry()
+        client = registry.http()
+        assert registry.http() is client
+        assert registry.stats()["http"] == {"limit": resources_module.HTTP_MAX_CONNECTIONS, "open": 0, "idle": 0}
+        await registry.close_http()
+        assert client.is_closed and registry.http() is not client
+        await registry.close()
+
+        shared = await get_http_client()
+        assert shared is resources.http()
+        await close_http_client()
+        assert shared.is_closed
+    asyncio.run(scenario())
+
+
+def test_redis_outage_is_not_retried_every_call():
+    async def scenario():
+        original = resources_module.REDIS_URL
+        resources_module.REDIS_URL = "redis://127.0.0.1:1"
+        try:
+            registry = ResourceRegistry()
+            assert await registry.redis() is None
+            retry_at = registry._redis_retry_at
+            assert retry_at > 0 and await registry.redis() is None
+            assert registry._redis_retry_at == retry_at
+            assert registry.stats()["redis"]["connected"] is False
+        finally:
+            resources_module.REDIS_URL = original
+    asyncio.run(scenario())
+
+
+def test_start_and_close_lifecycle():
+    async def scenario():
+        registry = ResourceRegistry()
+        registry._redis_retry_at = float("inf")  # no Redis in this environment
+        await registry.start()
+        assert registry._db is not None and registry._http is not None
+        stats = registry.stats()
+        assert set(stats) == {"db", "http", "redis"}
+        await registry.close()
+        assert registry._db is None and registry._http is None
+    asyncio.run(scenario())
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            func()
+            print(f"✅ {name}")
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Test script for the ephemeral encrypted sensitive photo store"""
+import os
+import sys
+import time
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from api.photo import sensitive_store
+from api.photo.sensitive_store import LocalEncryptedBlobStore
+
+
+def make_store(ttl: int = 60) -> LocalEncryptedBlobStore:
+    return LocalEncryptedBlobStore(tempfile.mkdtemp(), AESGCM.generate_key(bit_length=256), default_ttl=ttl)
+
+
+def test_round_trip_and_encrypted_at_rest():
+    store = make_store()
+    data = os.urandom(1024) + b"JPEG-MARKER"
+    handle = store.put(data)
+
+    assert handle.startswith("local:")
+    assert store.get(handle) == data
+
+    with open(os.path.join(store.root_dir, handle.split(":", 1)[1]), "rb") as f:
+        assert b"JPEG-MARKER" not in f.read()
+
+
+def test_expired_blobs_are_unreadable_and_swept():
+    store = make_store()
+    handle = store.put(b"sensitive", ttl_seconds=-1)
+
+    assert store.get(handle) is None
+    assert store.sweep_expired() == 1
+    assert os.listdir(store.root_dir) == []
+
+
+def test_renamed_blob_fails_authentication():
+    store = make_store()
+    handle = store.put(b"sensitive")
+    name = handle.split(":", 1)[1]
+    forged = f"{int(time.time()) + 10 ** 6}_{name.split('_', 1)[1]}"
+    os.rename(os.path.join(store.root_dir, name), os.path.join(store.root_dir, forged))
+
+    assert store.get(f"local:{forged}") is None
+
+
+def test_blob_under_another_key_is_kept():
+    store = make_store()
+    handle = store.put(b"sensitive")
+    # Same directory, different key: e.g. after a restart with a per-process key
+    other = LocalEncryptedBlobStore(store.root_dir, AESGCM.generate_key(bit_length=256))
+
+    assert other.get(handle) is None
+    assert store.get(handle) == b"sensitive"
+
+
+def test_key_required_outside_development():
+    saved = {name: os.environ.pop(name, None) for name in ("SENSITIVE_PHOTO_KEY", "ENV")}
+    try:
+        try:
+            sensitive_store._load_key()
+            assert False, "missing key should fail"
+        except RuntimeError:
+            pass
+        os.environ["ENV"] = "development"
+        assert len(sensitive_store._load_key()) == 32
+    finally:
+        for name, value in saved.items():
+            os.environ.pop(name, None)
+            if value is not None:
+                os.environ[name] = value
+
+
+def test_rejects_foreign_and_traversal_handles():
+    store = make_store()
+    assert store.get("s3:abc") is None
+    assert store.get("local:../etc/passwd") is None
+    store.delete("local:../etc/passwd")
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            func()
+            print(f"✅ {name}")
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""Test script for the shared specialist report engine"""
+import os
+import sys
+import json
+import asyncio
+import statistics
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from models.requests import SpecialistReportRequest, SpecialtyTriageRequest
+from api.reports import specialist_engine as engine
+from api.reports.specialty_profiles import SPECIALTY_PROFILES
+from api.reports import specialist
+from utils.token_counter import count_tokens
+
+# Response fields the pre-engine handlers returned, per route
+LEGACY_RESPONSES = {
+    "cardiology": ("cardiology", "cardiology"),
+    "primary-care": ("primary_care", "primary-care"),
+    "physical-therapy": ("physical_therapy", "physical_therapy"),
+    "nephrology": ("nephrology", "nephrology"),
+}
+
+
+def sample_data(num_scans=5, num_symptoms=20):
+    return {
+        "medical_profile": {"age": 54, "medications": ["metoprolol"], "allergies": []},
+        "quick_scans": [
+            {"id": f"qs{i}", "created_at": f"2025-03-{i + 1:02d}T10:00:00+00:00", "body_part": "chest",
+             "analysis_result": {"primaryCondition": "Stable angina", "redFlags": ["exertional pain"],
+                                 "reasoning": "Pain with exertion relieved by rest. " * 20},
+             "llm_summary": "Chest tightness climbing stairs. " * 10}
+            for i in range(num_scans)
+        ],
+        "deep_dives": [{"id": "dd1", "status": "active", "created_at": "2025-03-02T10:00:00+00:00",
+                        "questions": [{"q": "When does it happen?", "a": "Stairs"}] * 5}],
+        "photo_analyses": [],
+        "symptom_tracking": [{"id": f"st{i}", "created_at": f"2025-02-{i % 28 + 1:02d}T08:00:00+00:00",
+                              "symptom_name": "chest pain", "severity": i % 10} for i in range(num_symptoms)],
+        "tracking_data": [],
+        "llm_summaries": [],
+        "wearables": {},
+        "general_assessments": [],
+        "general_deep_dives": []
+    }
+
+
+class FakeBackend:
+    """Replaces the engine's database and LLM calls"""
+
+    def __init__(self, data=None, llm_content='{"executive_summary": {"one_page_summary": "ok", "key_findings": ["x"]}}'):
+        self.data = data or sample_data()
+        self.llm_content = llm_content
+        self.gather_calls, self.llm_calls, self.saved = 0, [], []
+
+    async def load_or_create_analysis(self, analysis_id, request, specialty):
+        return {"id": analysis_id, "user_id": request.user_id, "report_config": {}}
+
+    async def gather_selected_data(self, **kwargs):
+        self.gather_calls += 1
+        return self.data
+
+    async def call_llm(self, messages, **kwargs):
+        self.llm_calls.append({"messages": messages, **kwargs})
+        return {"content": self.llm_content}
+
+    async def safe_insert_report(self, record):
+        self.saved.append(record)
+        return True
+
+    def install(self):
+        originals = {name: getattr(engine, name) for name in
+                     ("load_or_create_analysis", "gather_selected_data", "call_llm", "safe_insert_report")}
+        for name in originals:
+            setattr(engine, name, getattr(self, name))
+        return originals
+
+
+def run(profile_key, backend, timings=None):
+    request = SpecialistReportRequest(analysis_id="a1", user_id="u1", quick_scan_ids=["qs0"])
+    originals = backend.install()
+    try:
+        return asyncio.run(engine.run_specialist_report(SPECIALTY_PROFILES[profile_key], request, timings))
+    finally:
+        for name, value in originals.items():
+            setattr(engine, name, value)
+
+
+def test_every_profile_runs_one_gather_and_saves():
+    for key, profile in SPECIALTY_PROFILES.items():
+        backend = FakeBackend()
+        result = run(key, backend)
+        assert result["status"] == "success", (key, result)
+        assert backend.gather_calls == 1
+        call = backend.llm_calls[0]
+        assert call["messages"][0]["content"] == profile.system_prompt
+        assert call["model"] == profile.model and call["max_tokens"] == profile.max_tokens
+        assert backend.saved[0]["report_type"] == profile.report_type
+        assert backend.saved[0]["model_used"] == profile.model
+        if key in LEGACY_RESPONSES:
+            assert (result["report_type"], result["specialty"]) == LEGACY_RESPONSES[key]
+
+
+def test_generic_specialist_report_runs_on_engine():
+    backend = FakeBackend()
+    request = SpecialistReportRequest(analysis_id="a1", user_id="u1", specialty="allergy-immunology",
+                                      quick_scan_ids=["qs0"])
+    originals = backend.install()
+    try:
+        result = asyncio.run(specialist.generate_specialist_report(request))
+    finally:
+        for name, value in originals.items():
+            setattr(engine, name, value)
+
+    assert result["status"] == "success"
+    assert (result["report_type"], result["specialty"]) == ("specialist_focused", "allergy-immunology")
+    assert (backend.saved[0]["report_type"], backend.saved[0]["specialty"]) == ("specialist_focused", "allergy-immunology")
+    assert backend.gather_calls == 1
+    system, user = (m["content"] for m in backend.llm_calls[0]["messages"])
+    assert "referral report for allergy-immunology" in system
+    assert "Primary Concern: general health" in user and "Specialty Focus: allergy-immunology" in user
+    # Compact JSON of everything gathered, not the indented quick scan excerpt
+    assert '"deep_dives":[' in user and "\n  " not in user.split("PATIENT DATA")[1]
+
+
+class FakeTriageTable:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def select(self, columns):
+        return self
+
+    def in_(self, key, values):
+        return self
+
+    def execute(self):
+        return type("Result", (), {"data": self.rows})()
+
+
+def test_triage_context_is_packed_within_budget():
+    scans = [{"id": f"qs{i}", "created_at": f"2025-03-{i % 28 + 1:02d}T10:00:00+00:00", "body_part": "chest",
+              "form_data": {"symptoms": "tight chest"}, "analysis_result": {"reasoning": "Exertional. " * 200}}
+             for i in range(60)]
+    calls = []
+
+    async def fake_structured(messages, schema, **kwargs):
+        calls.append(messages)
+        return {"parsed": schema(primary_specialty="cardiology", confidence=0.8, reasoning="r", urgency="routine")}
+
+    fake_db = type("FakeDB", (), {"table": lambda self, name: FakeTriageTable(scans)})()
+    originals = specialist.supabase, specialist.call_llm_structured, specialist.context_budget
+    specialist.supabase, specialist.call_llm_structured = fake_db, fake_structured
+    specialist.context_budget = lambda model, output_tokens: 3000
+    try:
+        request = SpecialtyTriageRequest(user_id="u1", quick_scan_ids=[s["id"] for s in scans])
+        result = asyncio.run(specialist.triage_specialty(request))
+    finally:
+        specialist.supabase, specialist.call_llm_structured, specialist.context_budget = originals
+
+    assert result["status"] == "success"
+    data_text = calls[0][1]["content"].split("(compact JSON):\n")[1].split("\n\nBased on")[0]
+    payload = json.loads(data_text)
+    assert count_tokens(data_text) <= 3000 * 1.05
+    assert payload["_omitted"]["quick_scans"] > 0
+
+
+def test_compact_context_uses_fewer_tokens():
+    data = sample_data()
+    pretty = count_tokens(json.dumps(data, indent=2))
+    context, compact, omitted = engine.build_report_context(SPECIALTY_PROFILES["neurology"], data)
+    print(f"Context tokens: indent=2 {pretty} -> compact {compact}")
+    assert compact < pretty * 0.85
+    assert not omitted
+    assert "Generate a comprehensive neurology report." in context
+
+
+def test_over_budget_context_drops_oldest_supplementary_first():
+    data = sample_data(num_scans=5, num_symptoms=400)
+    text, tokens, omitted = engine.serialize_report_data(data, max_tokens=3000)
+    payload = json.loads(text)
+
+    assert tokens <= 3000 * 1.05
+    assert omitted.get("symptom_tracking", 0) > 0
+    assert "quick_scans" not in omitted  # primary interactions survive
+    assert payload["_omitted"] == omitted
+    kept = [s["created_at"] for s in payload["symptom_tracking"]]
+    dropped_newest = max(s["created_at"] for s in data["symptom_tracking"] if s not in payload["symptom_tracking"])
+    assert all(created >= dropped_newest for created in kept)
+
+
+def test_invalid_json_error_or_placeholder_per_profile():
+    result = run("cardiology", FakeBackend(llm_content="not json"))
+    assert result["status"] == "error" and result["code"] == "AI_GENERATION_FAILED"
+
+    backend = FakeBackend(llm_content="not json")
+    result = run("neurology", backend)
+    summary = result["report_data"]["executive_summary"]
+    assert summary["one_page_summary"] == "Neurology report generation failed. Please retry."
+    assert summary["urgency_indicators"] == [] and summary["action_items"] == ["Regenerate report"]
+    assert backend.saved
+
+
+def test_post_processors_can_replace_report():
+    profile = SPECIALTY_PROFILES["oncology"]
+    tagged = engine.SpecialtyProfile(**{**profile.__dict__, "post_processors": (
+        lambda report, _: {**report, "reviewed": True},
+    )})
+    original = SPECIALTY_PROFILES["oncology"]
+    SPECIALTY_PROFILES["oncology"] = tagged
+    try:
+        result = run("oncology", FakeBackend())
+    finally:
+        SPECIALTY_PROFILES["oncology"] = original
+    assert result["report_data"]["reviewed"] is True
+
+
+def test_benchmark_engine_overhead_per_specialty():
+    rows = []
+    for key in SPECIALTY_PROFILES:
+        samples = []
+        for _ in range(3):
+            timings = {}
+            run(key, FakeBackend(sample_data(num_scans=20, num_symptoms=200)), timings)
+            samples.append(timings["build_context"])
+        rows.append((key, statistics.median(samples)))
+    for key, ms in rows:
+        print(f"  {key:<18} build_context {ms:.1f}ms")
+    assert all(ms < 250 for _, ms in rows)
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            func()
+            print(f"✅ {name}")
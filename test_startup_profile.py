@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Test script for startup timing and lazy imports"""
+import os
+import sys
+import subprocess
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.startup_profile import StartupProfile, parse_importtime, summarize_importtime
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+SAMPLE_IMPORTTIME = """import time: self [us] | cumulative | imported package
+import time:       900 |        900 |   encodings
+import time:      1500 |       4000 |     reportlab.lib
+import time:       500 |       5000 |   reportlab
+import time:      2000 |       2500 |     utils.pdf_export
+import time:      1000 |      12000 | run_oracle
+"""
+
+
+def test_parse_and_summarize_importtime():
+    rows = parse_importtime(SAMPLE_IMPORTTIME)
+    assert rows[0] == ("encodings", 900, 900)
+    assert len(rows) == 5
+
+    summary = summarize_importtime(rows, top=5)
+    assert summary.startswith("Total import time: 12 ms (5 modules)")
+    first_party, third_party = summary.split("Third-party packages")
+    assert first_party.index("run_oracle") < first_party.index("utils.pdf_export")
+    assert "reportlab" not in first_party
+    # reportlab's self time is summed across its submodules
+    assert "2.0 ms  reportlab" in third_party
+
+
+def test_report_orders_slowest_phases():
+    profile = StartupProfile()
+    with profile.timed("fast"):
+        pass
+    with profile.timed("slow"):
+        sum(range(200000))
+    report = profile.report()
+    assert report["ready_ms"] is None
+    assert [p["phase"] for p in report["phases"]] == ["fast", "slow"]
+    assert report["slowest"][0]["phase"] == "slow"
+    profile.mark_ready()
+    assert profile.report()["ready_ms"] > 0
+
+
+def _import_run_oracle(extra_env=None):
+    env = dict(os.environ, **(extra_env or {}))
+    env.setdefault("SUPABASE_URL", "http://localhost")
+    env.setdefault("SUPABASE_SERVICE_KEY", "eyJhbGciOiJIUzI1NiJ9.eyJyb2xlIjoic2VydmljZSJ9.x")
+    code = (
+        "import sys, run_oracle\n"
+        "print(sorted(m for m in ('reportlab', 'boto3', 'tiktoken') if m in sys.modules))\n"
+        "print('api.export' in sys.modules, len(run_oracle.router_modules))\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, env=env,
+                            capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr[-2000:]
+    return result.stdout.strip().splitlines()[-2:]
+
+
+def test_heavy_dependencies_are_not_imported_at_startup():
+    lazy_loaded, _ = _import_run_oracle()
+    assert lazy_loaded == "[]"
+
+
+def test_disabled_routers_are_not_imported():
+    _, enabled = _import_run_oracle()
+    _, disabled = _import_run_oracle({"DISABLED_ROUTERS": "api.export"})
+    assert enabled.startswith("True")
+    assert disabled.startswith("False")
+    assert int(disabled.split()[1]) == int(enabled.split()[1]) - 1
+
+
+def test_startup_report_requires_admin_key():
+    import asyncio
+    from fastapi import HTTPException
+    from api import internal
+
+    original = os.environ.get("ADMIN_API_KEY")
+    os.environ["ADMIN_API_KEY"] = "secret"
+    try:
+        try:
+            asyncio.run(internal.startup_report(x_admin_key="wrong"))
+            assert False, "expected 403"
+        except HTTPException as e:
+            assert e.status_code == 403
+        report = asyncio.run(internal.startup_report(x_admin_key="secret"))
+        assert {"ready_ms", "phases", "slowest", "lazy_modules_loaded", "pools"} <= set(report)
+    finally:
+        if original is None:
+            os.environ.pop("ADMIN_API_KEY", None)
+        else:
+            os.environ["ADMIN_API_KEY"] = original
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print(f"✅ {name}")
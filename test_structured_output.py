@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""Test script for structured LLM output: response_format, validation and repair retries"""
+import os
+import sys
+import json
+import asyncio
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import business_logic
+from models.llm_outputs import FlashAssessmentOutput
+from utils.json_parser import extract_json_from_response
+from utils.structured_output import StructuredOutputError, StructuredOutputStats, parse_structured_output
+
+VALID = {
+    "response": "Likely tension headache.", "main_concern": "Tension headache", "urgency": "low",
+    "confidence": 75, "next_action": "monitor", "action_reason": "No red flags"
+}
+
+
+class FakeOpenRouter:
+    def __init__(self, replies):
+        self.replies, self.payloads = list(replies), []
+
+    async def chat_completion(self, payload, **kwargs):
+        self.payloads.append(payload)
+        return {"choices": [{"message": {"content": self.replies.pop(0)}, "finish_reason": "stop"}], "usage": {}}
+
+
+def run_with(fake, stats, scenario):
+    originals = business_logic.openrouter, business_logic.structured_output_stats
+    business_logic.openrouter, business_logic.structured_output_stats = fake, stats
+    try:
+        return asyncio.run(scenario())
+    finally:
+        business_logic.openrouter, business_logic.structured_output_stats = originals
+
+
+def test_extractor_handles_fences_prose_and_strings():
+    payload = {"a": "brace } and ``` in a string", "b": [1, {"c": "]"}]}
+    assert extract_json_from_response(f"Here you go:\n```json\n{json.dumps(payload)}\n```\nDone {{") == payload
+    assert extract_json_from_response(f"Result [1]: {json.dumps(payload)} trailing }}") == [1]
+    assert extract_json_from_response(f"Result: {json.dumps(payload)} trailing }}") == payload
+    assert extract_json_from_response('{"truncated": [1, 2') is None
+    assert extract_json_from_response("no json here") is None
+
+
+def test_validation_errors_name_the_field():
+    parsed = parse_structured_output(f"```json\n{json.dumps(VALID)}\n```", FlashAssessmentOutput)
+    assert parsed.urgency == "low" and parsed.confidence == 75
+
+    try:
+        parse_structured_output(json.dumps({**VALID, "urgency": "severe"}), FlashAssessmentOutput)
+        assert False, "urgency should be rejected"
+    except StructuredOutputError as e:
+        assert "urgency" in str(e) and e.raw is not None
+
+
+def test_response_format_only_for_supporting_models():
+    fake = FakeOpenRouter([json.dumps(VALID)] * 2)
+    messages = [{"role": "user", "content": "headache"}]
+
+    async def scenario():
+        await business_logic.call_llm(messages, model="google/gemini-2.5-flash-lite", response_schema=FlashAssessmentOutput)
+        await business_logic.call_llm(messages, model="deepseek/deepseek-chat", response_schema=FlashAssessmentOutput)
+
+    run_with(fake, StructuredOutputStats(), scenario)
+    native, prompted = fake.payloads
+    assert native["response_format"]["type"] == "json_schema"
+    assert native["response_format"]["json_schema"]["schema"]["properties"]["urgency"]["enum"] == [
+        "low", "medium", "high", "emergency"
+    ]
+    assert "response_format" not in prompted
+
+
+def test_invalid_output_is_repaired_once_and_counted():
+    fake, stats = FakeOpenRouter(["Sure! urgency is low", json.dumps(VALID)]), StructuredOutputStats()
+    messages = [{"role": "user", "content": "headache"}]
+
+    result = run_with(fake, stats, lambda: business_logic.call_llm_structured(
+        messages, FlashAssessmentOutput, model="deepseek/deepseek-chat"
+    ))
+    assert result["parsed"].main_concern == "Tension headache"
+    retry_messages = fake.payloads[1]["messages"]
+    assert retry_messages[:1] == messages and retry_messages[1]["content"] == "Sure! urgency is low"
+    assert "not JSON" in retry_messages[2]["content"]
+    assert stats.snapshot()["deepseek/deepseek-chat"] == {
+        "calls": 2, "native_schema": 0, "parse_failures": 1, "retries": 1, "exhausted": 0, "failure_rate": 0.5
+    }
+
+
+def test_exhausted_retries_raise():
+    fake, stats = FakeOpenRouter(["nope", "still nope"]), StructuredOutputStats()
+
+    async def scenario():
+        try:
+            await business_logic.call_llm_structured(
+                [{"role": "user", "content": "x"}], FlashAssessmentOutput, model="openai/gpt-5-mini"
+            )
+            assert False, "should raise"
+        except StructuredOutputError as e:
+            return e
+
+    error = run_with(fake, stats, scenario)
+    assert error.raw == "still nope"
+    counts = stats.snapshot()["openai/gpt-5-mini"]
+    assert counts["calls"] == 2 and counts["native_schema"] == 2 and counts["exhausted"] == 1
+
+
+def test_flash_assessment_falls_back_to_extracted_fields():
+    from api import general_assessment
+
+    class FakeRequest:
+        async def json(self):
+            return {"user_query": "headache for two days"}
+
+    class FakeSupabase:
+        def table(self, name):
+            raise RuntimeError("offline")
+
+    def run_flash(raw):
+        async def invalid(**kwargs):
+            raise StructuredOutputError("response does not match FlashAssessmentOutput", raw)
+
+        originals = general_assessment.call_llm_structured, general_assessment.supabase
+        general_assessment.call_llm_structured, general_assessment.supabase = invalid, FakeSupabase()
+        try:
+            return asyncio.run(general_assessment.flash_assessment(FakeRequest()))
+        finally:
+            general_assessment.call_llm_structured, general_assessment.supabase = originals
+
+    off_schema = run_flash(json.dumps({**VALID, "urgency": "moderate", "confidence": "high"}))
+    assert off_schema["response"] == VALID["response"]
+    assert off_schema["urgency"] == "moderate" and off_schema["confidence"] == 70
+    assert off_schema["next_steps"]["recommended_action"] == "monitor"
+
+    assert run_flash("It sounds like a tension headache.")["response"] == "It sounds like a tension headache."
+    assert run_flash('{"response": ')["response"] == "I understand your concern. Let me help you with that."
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print(f"✅ {name}")
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""Test script for the shared user tier cache"""
+import os
+import sys
+import asyncio
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from core.tier_cache import LocalTTLCache, TierCache
+
+
+class FakeRedisServer:
+    """Keys and pub/sub channels shared by every FakeRedis client"""
+
+    def __init__(self):
+        self.data, self.subscribers, self.down = {}, [], False
+
+
+class FakePubSub:
+    def __init__(self, server):
+        self.server, self.queue = server, asyncio.Queue()
+
+    async def subscribe(self, channel):
+        self.server.subscribers.append((channel, self.queue))
+        await self.queue.put({"type": "subscribe", "data": 1})
+
+    async def listen(self):
+        while True:
+            yield await self.queue.get()
+
+    async def close(self):
+        self.server.subscribers = [s for s in self.server.subscribers if s[1] is not self.queue]
+
+
+class FakeRedis:
+    def __init__(self, server):
+        self.server = server
+
+    def _check(self):
+        if self.server.down:
+            raise ConnectionError("redis down")
+
+    async def ping(self):
+        self._check()
+
+    async def get(self, key):
+        self._check()
+        return self.server.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self._check()
+        self.server.data[key] = value
+
+    async def delete(self, key):
+        self._check()
+        self.server.data.pop(key, None)
+
+    async def publish(self, channel, message):
+        self._check()
+        for subscribed, queue in self.server.subscribers:
+            if subscribed == channel:
+                await queue.put({"type": "message", "data": message})
+
+    def pubsub(self):
+        return FakePubSub(self.server)
+
+    async def close(self):
+        pass
+
+
+class FakeDatabase:
+    def __init__(self, tiers, delay=0.0):
+        self.tiers, self.delay, self.queries, self.fail = tiers, delay, 0, False
+
+    async def __call__(self, user_id):
+        self.queries += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("subscriptions unavailable")
+        return self.tiers.get(user_id, "free")
+
+
+def make_cache(db, server=None):
+    cache = TierCache(db, use_redis=server is not None)
+    if server:
+        cache.redis_client = FakeRedis(server)
+    return cache
+
+
+def test_lru_is_bounded_and_expires():
+    lru = LocalTTLCache(max_entries=3)
+    for i in range(10):
+        lru.set(f"u{i}", "pro", ttl=60)
+    assert len(lru) == 3 and lru.get("u0") is None and lru.get("u9") == "pro"
+    lru.set("old", "pro", ttl=-1)
+    assert lru.get("old") is None
+
+
+def test_concurrent_misses_share_one_query():
+    async def scenario():
+        db = FakeDatabase({"u1": "pro"}, delay=0.05)
+        cache = make_cache(db)
+        tiers = await asyncio.gather(*[cache.get("u1") for _ in range(50)])
+        assert set(tiers) == {"pro"} and db.queries == 1
+        assert cache.stats["coalesced"] == 49
+        assert await cache.get("u1") == "pro" and db.queries == 1
+    asyncio.run(scenario())
+
+
+def test_database_errors_are_negatively_cached():
+    async def scenario():
+        db = FakeDatabase({"u1": "pro"})
+        db.fail = True
+        cache = make_cache(db)
+        for _ in range(20):
+            assert await cache.get("u1") == "free"
+        assert db.queries == 1 and cache.stats["db_errors"] == 1
+
+        # The error entry expires after TIER_CACHE_ERROR_TTL
+        db.fail = False
+        cache.local.set("u1", "free", ttl=-1)
+        assert await cache.get("u1") == "pro"
+    asyncio.run(scenario())
+
+
+def test_redis_is_shared_between_workers():
+    async def scenario():
+        server, db = FakeRedisServer(), FakeDatabase({"u1": "pro_plus"})
+        first, second = make_cache(db, server), make_cache(db, server)
+        assert await first.get("u1") == "pro_plus"
+        assert await second.get("u1") == "pro_plus"
+        assert db.queries == 1 and second.stats["redis_hits"] == 1
+    asyncio.run(scenario())
+
+
+def test_invalidation_fans_out_to_every_replica():
+    async def scenario():
+        server, db = FakeRedisServer(), FakeDatabase({"u1": "basic"})
+        replicas = [make_cache(db, server) for _ in range(3)]
+        for cache in replicas:
+            await cache.start()
+        await asyncio.sleep(0)
+        for cache in replicas:
+            assert await cache.get("u1") == "basic"
+
+        db.tiers["u1"] = "pro"
+        await replicas[0].invalidate("u1")
+        await asyncio.sleep(0.01)
+        for cache in replicas:
+            assert await cache.get("u1") == "pro"
+        assert db.queries == 2
+
+        for cache in replicas:
+            await cache.close()
+    asyncio.run(scenario())
+
+
+def test_redis_outage_falls_back_to_database():
+    async def scenario():
+        server, db = FakeRedisServer(), FakeDatabase({"u1": "pro"})
+        cache = make_cache(db, server)
+        server.down = True
+        assert await cache.get("u1") == "pro"
+        assert cache.redis_client is None and db.queries == 1
+        # Redis is not retried on every call while it is down
+        cache.local.pop("u1")
+        assert await cache.get("u1") == "pro" and cache._redis_retry_at > 0
+    asyncio.run(scenario())
+
+
+def test_cancelled_leader_does_not_cancel_waiters():
+    async def scenario():
+        db = FakeDatabase({"u1": "pro"}, delay=0.05)
+        cache = make_cache(db)
+        leader = asyncio.create_task(cache.get("u1"))
+        await asyncio.sleep(0)
+        waiters = [asyncio.create_task(cache.get("u1")) for _ in range(5)]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        assert await asyncio.gather(*waiters) == ["pro"] * 5
+        assert leader.cancelled() and db.queries == 2 and not cache._inflight
+    asyncio.run(scenario())
+
+
+def test_sync_invalidation_clears_redis_in_background():
+    async def scenario():
+        server, db = FakeRedisServer(), FakeDatabase({"u1": "basic"})
+        cache = make_cache(db, server)
+        assert await cache.get("u1") == "basic"
+        task = cache.invalidate_soon("u1")
+        assert cache.local.get("u1") is None
+        await task
+        assert "tier:u1" not in server.data
+    asyncio.run(scenario())
+    # Outside an event loop only the local entry can be dropped
+    cache = make_cache(FakeDatabase({}))
+    cache.local.set("u1", "pro", ttl=60)
+    assert cache.invalidate_soon("u1") is None and cache.local.get("u1") is None
+
+
+def test_get_user_tier_uses_shared_cache():
+    from core import model_selector
+
+    async def scenario():
+        db = FakeDatabase({"u1": "pro"})
+        original = model_selector.tier_cache
+        model_selector.tier_cache = make_cache(db)
+        try:
+            assert await model_selector.get_user_tier("") == "free"
+            assert await model_selector.get_user_tier("u1") == "pro"
+            db.tiers["u1"] = "max"
+            model_selector.invalidate_tier_cache("u1")
+            assert await model_selector.get_user_tier("u1") == "max"
+        finally:
+            model_selector.tier_cache = original
+    asyncio.run(scenario())
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_") and callable(func):
+            func()
+            print(f"✅ {name}")
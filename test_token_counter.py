@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""Test script for the cached token counting service"""
+import os
+import sys
+import time
+import asyncio
+import threading
+import tiktoken
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils import token_counter
+from utils.token_counter import (
+    TokenCountCache, count_message_tokens, count_tokens, count_tokens_batch,
+    estimate_tokens, exceeds_token_limit, get_encoding, token_cache
+)
+
+# Byte-level vocabulary, so the encode paths run without downloading one
+BYTE_ENCODING = tiktoken.Encoding(
+    name="test_bytes", pat_str=r"\S+|\s+",
+    mergeable_ranks={bytes([i]): i for i in range(256)}, special_tokens={}
+)
+_MISSING = object()
+_previous_encoding = _MISSING
+
+
+def setup_module(module=None):
+    """Install the byte encoding if no real one loads; undone in teardown_module"""
+    global _previous_encoding
+    _previous_encoding = token_counter._encodings.get(token_counter.DEFAULT_MODEL, _MISSING)
+    if get_encoding() is None:
+        token_counter._encodings[token_counter.DEFAULT_MODEL] = BYTE_ENCODING
+
+
+def teardown_module(module=None):
+    if _previous_encoding is _MISSING:
+        token_counter._encodings.pop(token_counter.DEFAULT_MODEL, None)
+    else:
+        token_counter._encodings[token_counter.DEFAULT_MODEL] = _previous_encoding
+    # Counts made with the byte encoding must not leak into other modules
+    token_cache.clear()
+
+SUMMARY = "Patient reports recurring tension headaches in the afternoon, worse with screen time. " * 40
+
+
+def test_counts_are_ints_and_cached():
+    token_cache.clear()
+    first = count_tokens(SUMMARY)
+    again = count_tokens(SUMMARY)
+    assert isinstance(first, int) and first == again > 0
+    assert token_cache.stats() == {"size": 1, "hits": 1, "misses": 1}
+    assert count_tokens("") == 0
+
+
+def test_cache_is_bounded_lru():
+    cache = TokenCountCache(max_size=2)
+    keys = [TokenCountCache.key("enc", text) for text in ("a", "b", "c")]
+    cache.put(keys[0], 1)
+    cache.put(keys[1], 2)
+    assert cache.get(keys[0]) == 1  # a is now most recent
+    cache.put(keys[2], 3)
+    assert cache.get(keys[1]) is None and cache.get(keys[0]) == 1 and cache.get(keys[2]) == 3
+
+
+def test_batch_matches_single_counts():
+    texts = [SUMMARY, "short", "", SUMMARY + " follow-up", SUMMARY]
+    token_cache.clear()
+    assert count_tokens_batch(texts) == [count_tokens(text) for text in texts]
+
+
+def test_message_tokens_include_overhead():
+    messages = [{"role": "user", "content": "I have a headache"}, {"role": "assistant", "content": SUMMARY}]
+    expected = count_tokens("I have a headache") + count_tokens(SUMMARY) + 2 * token_counter.MESSAGE_OVERHEAD_TOKENS
+    assert count_message_tokens(messages) == expected
+
+
+def test_threshold_check_uses_estimate_far_from_limit():
+    calls = []
+    original = token_counter.count_tokens
+    token_counter.count_tokens = lambda text, model=None: calls.append(text) or original(text, model)
+    try:
+        assert exceeds_token_limit(SUMMARY * 10, 100) is True
+        assert exceeds_token_limit("tiny", 25000) is False
+        assert calls == []
+        near = estimate_tokens(SUMMARY)
+        exceeds_token_limit(SUMMARY, near)
+        assert len(calls) == 1
+    finally:
+        token_counter.count_tokens = original
+
+
+def test_per_model_encodings_fall_back():
+    assert get_encoding("openai/gpt-3.5-turbo") is get_encoding("openai/gpt-3.5-turbo")
+    # Unknown (non-OpenAI) models use the default vocabulary, or the estimate offline
+    assert count_tokens(SUMMARY, model="deepseek/deepseek-chat") > 0
+
+
+def test_benchmark_repeated_summary_counts():
+    summaries = [f"{i}: {SUMMARY}" for i in range(50)]
+    token_cache.clear()
+    started = time.perf_counter()
+    count_tokens_batch(summaries)
+    cold = time.perf_counter() - started
+    started = time.perf_counter()
+    for _ in range(20):
+        count_tokens_batch(summaries)
+    warm = (time.perf_counter() - started) / 20
+    print(f"50 summaries: cold {cold * 1000:.2f}ms, cached {warm * 1000:.2f}ms")
+    assert warm < cold
+
+
+
+class FakeRpcClient:
+    def __init__(self):
+        self.calls = []
+
+    def rpc(self, name, params):
+        self.calls.append((name, params, threading.current_thread() is threading.main_thread()))
+        return self
+
+    def execute(self):
+        return None
+
+
+def test_summary_token_backfill_is_one_background_call():
+    from utils import summary_helpers
+
+    rows = [
+        {"id": "s1", "llm_summary": "stored", "token_count": 7},
+        {"id": "s2", "llm_summary": "chest pain on stairs"},
+        {"id": "s3", "llm_summary": "knee swelling after running"},
+    ]
+    fake = FakeRpcClient()
+    original = summary_helpers.supabase
+    summary_helpers.supabase = fake
+
+    async def read():
+        total = summary_helpers.summary_token_total(rows)
+        assert fake.calls == []  # nothing is written on the request path
+        await asyncio.gather(*summary_helpers._backfills)
+        return total
+
+    try:
+        total = asyncio.run(read())
+    finally:
+        summary_helpers.supabase = original
+
+    assert total == 7 + count_tokens(rows[1]["llm_summary"]) + count_tokens(rows[2]["llm_summary"])
+    (name, params, on_main_thread), = fake.calls
+    assert name == "set_llm_context_token_counts" and not on_main_thread
+    assert [c["id"] for c in params["counts"]] == ["s2", "s3"]
+
+if __name__ == "__main__":
+    setup_module()
+    try:
+        for name, func in list(globals().items()):
+            if name.startswith("test_") and callable(func):
+                func()
+                print(f"✅ {name}")
+    finally:
+        teardown_module()
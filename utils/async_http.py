@@ -1,40 +1,20 @@
 """Async HTTP client with connection pooling for optimal performance"""
 import httpx
 import asyncio
-from typing import Dict, Any, Optional
+from typing import Dict, Any
 import logging
 
-logger = logging.getLogger(__name__)
+from core.resources import resources
 
-# Global client instance for connection pooling
-_http_client: Optional[httpx.AsyncClient] = None
+logger = logging.getLogger(__name__)
 
 async def get_http_client() -> httpx.AsyncClient:
-    """Get or create the global HTTP client with connection pooling"""
-    global _http_client
-    if _http_client is None or _http_client.is_closed:
-        _http_client = httpx.AsyncClient(
-            timeout=httpx.Timeout(
-                timeout=240.0,  # Total timeout
-                connect=10.0,   # Connection timeout
-                read=60.0,      # Read timeout
-                write=30.0      # Write timeout
-            ),
-            limits=httpx.Limits(
-                max_keepalive_connections=50,
-                max_connections=100,
-                keepalive_expiry=30
-            ),
-            http2=True  # Enable HTTP/2 for better performance
-        )
-    return _http_client
+    """Get the process-wide HTTP client (pooled in core/resources.py)"""
+    return resources.http()
 
 async def close_http_client():
-    """Close the global HTTP client (call on app shutdown)"""
-    global _http_client
-    if _http_client is not None and not _http_client.is_closed:
-        await _http_client.aclose()
-        _http_client = None
+    """Close the shared HTTP client (call on app shutdown)"""
+    await resources.close_http()
 
 async def make_async_post(url: str, headers: Dict[str, str], json_data: Dict[str, Any], timeout: int = 240) -> Dict[str, Any]:
     """Make an async POST request with connection reuse"""
@@ -3,8 +3,8 @@ from datetime import datetime, timezone, timedelta
 from typing import Optional, List, Dict
 from supabase_client import supabase
 from utils.token_counter import count_tokens
-import requests
-import os
+from utils.openrouter_client import openrouter, OpenRouterError
+from utils.history_digest import get_history_digest, schedule_digest_refresh
 
 # Using string format for order clauses ("created_at.desc")
 
@@ -16,18 +16,27 @@ async def get_enhanced_llm_context(user_id: str, conversation_id: str, current_q
     print(f"User ID type: {type(user_id)}, value: {repr(user_id)}")
     
     try:
-        # 1. Get LLM summaries from previous conversations
-        summaries_response = supabase.table("llm_context")\
-            .select("llm_summary, created_at")\
-            .eq("user_id", str(user_id))\
-            .order("created_at", desc=True)\
-            .limit(5)\
-            .execute()
-        
-        print(f"LLM summaries response: {summaries_response}")
-        print(f"Found {len(summaries_response.data) if summaries_response.data else 0} LLM summaries")
+        # 1. Users with a long history get their stored history digest (one Redis key);
+        #    otherwise the most recent LLM summaries from previous conversations
+        digest = await get_history_digest(str(user_id))
+        if digest is None:
+            # Never built; build it in the background and use the recent summaries now
+            schedule_digest_refresh(str(user_id))
+        history_digest = (digest or {}).get("digest")
+        
+        summaries_response = None
+        if not history_digest:
+            summaries_response = supabase.table("llm_context")\
+                .select("llm_summary, created_at")\
+                .eq("user_id", str(user_id))\
+                .order("created_at", desc=True)\
+                .limit(5)\
+                .execute()
+            
+            print(f"LLM summaries response: {summaries_response}")
+            print(f"Found {len(summaries_response.data) if summaries_response.data else 0} LLM summaries")
         
-        if summaries_response.data:
+        if summaries_response and summaries_response.data:
             context_parts.append("=== Previous Health Discussions ===")
             for summary in summaries_response.data[:3]:  # Use top 3 most recent
                 date = summary['created_at'][:10] if summary.get('created_at') else 'Unknown date'
@@ -104,7 +113,11 @@ async def get_enhanced_llm_context(user_id: str, conversation_id: str, current_q
         total_tokens = count_tokens(full_context)
         if total_tokens > 2000:  # Keep context reasonable
             # Compress by summarizing
-            return await compress_context(full_context, current_query, total_tokens)
+            full_context = await compress_context(full_context, current_query, total_tokens)
+        
+        if history_digest:
+            # Already condensed and capped at HISTORY_DIGEST_MAX_TOKENS, so it is not compressed again
+            full_context = "=== Health History Digest ===\n" + history_digest + ("\n\n" + full_context if full_context else "")
         
         return full_context
         
@@ -129,26 +142,18 @@ Write a concise medical summary focusing on:
 3. Any red flags or serious conditions
 4. Treatment responses and what has/hasn't worked"""
         
-        api_key = os.getenv("OPENROUTER_API_KEY")
-        response = requests.post(
-            "https://openrouter.ai/api/v1/chat/completions",
-            headers={
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json"
-            },
-            json={
-                "model": "deepseek/deepseek-chat",
-                "messages": [{"role": "system", "content": compress_prompt}],
-                "max_tokens": target_tokens,
-                "temperature": 0.3
-            },
-            timeout=30
-        )
-        
-        if response.status_code == 200:
-            result = response.json()
+        try:
+            result = await openrouter.chat_completion(
+                {
+                    "model": "deepseek/deepseek-chat",
+                    "messages": [{"role": "system", "content": compress_prompt}],
+                    "max_tokens": target_tokens,
+                    "temperature": 0.3
+                },
+                timeout=30
+            )
             return result["choices"][0]["message"]["content"]
-        else:
+        except OpenRouterError:
             # Fallback to simple truncation
             return context[:2000] + "\n[Context truncated for length]"
             
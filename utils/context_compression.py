@@ -1,9 +1,8 @@
 """Context compression utilities for managing conversation token limits"""
 import re
 from typing import List, Dict, Any, Optional
-from utils.token_counter import count_tokens
-import os
-from utils.async_http import make_async_post_with_retry
+from utils.token_counter import count_message_tokens
+from utils.openrouter_client import openrouter
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -78,14 +77,26 @@ def extract_medical_flags(messages: List[Dict[str, Any]]) -> List[str]:
     
     return list(flags)
 
-async def generate_medical_summary(messages: List[Dict[str, Any]], max_tokens: int = 500) -> str:
-    """Generate a medical-focused summary of messages"""
+async def summarize_medical_messages(messages: List[Dict[str, Any]], max_tokens: int = 500,
+                                     previous_summary: Optional[str] = None) -> str:
+    """Medical-focused summary of messages; raises if the LLM call fails
+
+    previous_summary (a rolling summary being extended) is included whole;
+    only the new messages are clipped.
+    """
     # Build conversation text
     conversation_text = "\n".join([
         f"{msg['role']}: {msg['content'][:500]}"
         for msg in messages
     ])
     
+    earlier = ""
+    if previous_summary:
+        earlier = f"""
+Summary of the conversation before these messages (keep everything still relevant):
+{previous_summary}
+"""
+    
     prompt = f"""Summarize this medical conversation focusing on:
 1. Initial complaint/symptoms
 2. Key medical information discussed
@@ -94,33 +105,27 @@ async def generate_medical_summary(messages: List[Dict[str, Any]], max_tokens: i
 5. Any urgent concerns
 
 Keep it under {max_tokens} tokens.
-
+{earlier}
 Conversation:
 {conversation_text[:3000]}
 
 Medical Summary:"""
     
+    json_data = {
+        "model": "deepseek/deepseek-chat",
+        "messages": [{"role": "system", "content": prompt}],
+        "max_tokens": max_tokens,
+        "temperature": 0.3
+    }
+    
+    # Shared async OpenRouter client
+    result = await openrouter.chat_completion(json_data, timeout=30)
+    return result["choices"][0]["message"]["content"]
+
+async def generate_medical_summary(messages: List[Dict[str, Any]], max_tokens: int = 500) -> str:
+    """Generate a medical-focused summary of messages"""
     try:
-        api_key = os.getenv("OPENROUTER_API_KEY")
-        headers = {
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json"
-        }
-        json_data = {
-            "model": "deepseek/deepseek-chat",
-            "messages": [{"role": "system", "content": prompt}],
-            "max_tokens": max_tokens,
-            "temperature": 0.3
-        }
-        
-        # Use async HTTP client
-        result = await make_async_post_with_retry(
-            url="https://openrouter.ai/api/v1/chat/completions",
-            headers=headers,
-            json_data=json_data,
-            timeout=30
-        )
-        return result["choices"][0]["message"]["content"]
+        return await summarize_medical_messages(messages, max_tokens)
     except Exception as e:
         print(f"Error generating summary: {e}")
         return f"Unable to generate summary. Conversation has {len(messages)} messages."
@@ -130,53 +135,45 @@ async def compress_medical_context(messages: List[Dict[str, Any]], target_tokens
     if not messages:
         return []
     
-    preserved = []
+    # Work with indices so the result keeps the original order without
+    # searching the list for every message
+    count = len(messages)
+    middle = range(3, count - 10)  # messages[3:-10]
     
     # Always keep first 3 messages (original complaint)
-    preserved.extend(messages[:3] if len(messages) >= 3 else messages)
+    kept = list(range(min(3, count)))
     
-    # Find and keep urgent messages
-    urgent_messages = [msg for msg in messages[3:-10] if has_urgent_keywords(msg)]
-    preserved.extend(urgent_messages)
+    # Keep urgent, medication-related and AI recommendation messages
+    important = [i for i in middle
+                 if has_urgent_keywords(messages[i])
+                 or has_medication_keywords(messages[i])
+                 or is_ai_recommendation(messages[i])]
+    kept.extend(important)
     
-    # Find and keep medication-related messages
-    medication_messages = [msg for msg in messages[3:-10] if has_medication_keywords(msg)]
-    preserved.extend(medication_messages)
+    # Summarize the rest of the middle
+    important_set = set(important)
+    excluded = [messages[i] for i in middle if i not in important_set]
     
-    # Find and keep AI recommendations
-    ai_recommendations = [msg for msg in messages[3:-10] if is_ai_recommendation(msg)]
-    preserved.extend(ai_recommendations)
-    
-    # Generate summary of excluded messages
-    excluded = [msg for msg in messages[3:-10] 
-                if msg not in preserved 
-                and msg not in urgent_messages 
-                and msg not in medication_messages 
-                and msg not in ai_recommendations]
+    # Always keep last 10 messages for recent context
+    if count > 10:
+        kept.extend(range(count - 10, count))
     
+    # Remove duplicates while preserving order
+    seen = set()
+    deduplicated = []
     if excluded:
         summary = await generate_medical_summary(excluded)
-        preserved.append({
+        deduplicated.append({
             "role": "system",
             "content": f"[Previous conversation summary: {summary}]"
         })
-    
-    # Always keep last 10 messages for recent context
-    if len(messages) > 10:
-        preserved.extend(messages[-10:])
-    
-    # Remove duplicates while preserving order
-    seen = set()
-    deduplicated = []
-    for msg in preserved:
+    for i in sorted(set(kept)):
+        msg = messages[i]
         msg_id = f"{msg.get('role')}:{msg.get('content', '')[:100]}"
         if msg_id not in seen:
             seen.add(msg_id)
             deduplicated.append(msg)
     
-    # Sort by original order
-    deduplicated.sort(key=lambda x: messages.index(x) if x in messages else -1)
-    
     return deduplicated
 
 async def free_tier_context(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
@@ -214,11 +211,6 @@ async def generate_medical_title(messages: List[Dict[str, Any]]) -> str:
 Title:"""
     
     try:
-        api_key = os.getenv("OPENROUTER_API_KEY")
-        headers = {
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json"
-        }
         json_data = {
             "model": "deepseek/deepseek-chat",
             "messages": [{"role": "system", "content": prompt}],
@@ -226,13 +218,8 @@ Title:"""
             "temperature": 0.5
         }
         
-        # Use async HTTP client
-        result = await make_async_post_with_retry(
-            url="https://openrouter.ai/api/v1/chat/completions",
-            headers=headers,
-            json_data=json_data,
-            timeout=10
-        )
+        # Shared async OpenRouter client
+        result = await openrouter.chat_completion(json_data, timeout=10)
         title = result["choices"][0]["message"]["content"].strip()
         # Clean up the title
         title = title.replace('"', '').replace("'", '').strip()
@@ -243,8 +230,10 @@ Title:"""
 
 def calculate_context_status(messages: List[Dict[str, Any]], is_premium: bool) -> Dict[str, Any]:
     """Calculate the context status for a conversation"""
-    total_tokens = count_tokens(str(messages))
-    
+    return context_status_for_tokens(count_message_tokens(messages), is_premium)
+
+def context_status_for_tokens(total_tokens: int, is_premium: bool) -> Dict[str, Any]:
+    """Context status for a conversation of total_tokens (e.g. a running count)"""
     if is_premium:
         if total_tokens < PREMIUM_TOKEN_LIMIT:
             return {
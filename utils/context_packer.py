@@ -0,0 +1,243 @@
+"""Token-budgeted packing of prioritized data into LLM prompts
+
+Callers hand over their data as ContextSection entries in priority order.
+Each record is compacted (clinically relevant fields only, no empty values,
+long text shortened) and whole items are added, highest-priority section
+first, until the token budget is used. Nothing is ever cut mid-record, and
+whatever did not fit is reported per section so callers can tell the model
+and the logs that the data is partial.
+"""
+import os
+import json
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+from utils.token_counter import count_tokens
+
+logger = logging.getLogger(__name__)
+
+MAX_FIELD_CHARS = 4000
+
+# Cap on packed data per prompt even when the model's window is larger:
+# bigger contexts cost more per call and dilute the signal
+MAX_CONTEXT_TOKENS = int(os.getenv("MAX_CONTEXT_TOKENS", "60000"))
+
+# Context windows of the models prompts are packed for
+MODEL_CONTEXT_WINDOWS = {
+    "openai/gpt-5": 400000,
+    "openai/gpt-5-mini": 400000,
+    "google/gemini-2.5-flash": 1000000,
+    "google/gemini-2.5-pro": 1000000,
+    "deepseek/deepseek-chat": 64000,
+    "deepseek/deepseek-r1": 64000,
+    "anthropic/claude-3.5-sonnet": 200000,
+}
+DEFAULT_CONTEXT_WINDOW = 32000
+
+# Bookkeeping columns that never help the model
+NOISE_FIELDS = frozenset({
+    "user_id", "updated_at", "model_used", "error_message", "processing_time_ms",
+    "generation_time_ms", "embedding", "raw_response", "is_deleted",
+})
+
+# Fields worth sending per record type, as dotted paths
+CLINICAL_FIELDS = {
+    "quick_scans": (
+        "created_at", "body_part", "form_data.symptoms", "form_data.painLevel", "form_data.duration",
+        "analysis_result.primaryCondition", "analysis_result.likelihood", "analysis_result.confidence",
+        "analysis_result.urgency", "analysis_result.symptoms", "analysis_result.redFlags",
+        "analysis_result.recommendations", "urgency_level", "confidence_score", "llm_summary",
+    ),
+    "deep_dives": (
+        "created_at", "status", "body_part", "final_analysis.primaryCondition", "final_analysis.confidence",
+        "final_analysis.redFlags", "final_analysis.recommendations", "final_confidence", "llm_summary",
+    ),
+    "symptom_tracking": ("created_at", "occurrence_date", "date", "symptom_name", "symptoms", "severity",
+                         "body_part", "notes"),
+    "oracle_chats": ("created_at", "role", "content"),
+    "medications": ("medication_name", "dosage", "frequency", "start_date", "adherence_percentage",
+                    "missed_doses_count", "effectiveness_rating"),
+}
+
+
+def context_budget(model: str, output_tokens: int = 4000, prompt_tokens: int = 2000,
+                   cap: int = MAX_CONTEXT_TOKENS) -> int:
+    """Tokens available for packed data: the model's window minus the reply and the fixed prompt"""
+    window = MODEL_CONTEXT_WINDOWS.get(model, DEFAULT_CONTEXT_WINDOW)
+    return max(0, min(cap, window - output_tokens - prompt_tokens))
+
+
+def compact_json(value: Any) -> str:
+    """JSON without indentation or padding; dates and other objects fall back to str()"""
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def truncate_long_strings(value: Any, max_chars: int = MAX_FIELD_CHARS) -> Any:
+    if isinstance(value, str):
+        return value if len(value) <= max_chars else value[:max_chars] + "…[truncated]"
+    if isinstance(value, list):
+        return [truncate_long_strings(v, max_chars) for v in value]
+    if isinstance(value, dict):
+        return {k: truncate_long_strings(v, max_chars) for k, v in value.items()}
+    return value
+
+
+def _is_empty(value: Any) -> bool:
+    return value is None or value == "" or value == [] or value == {}
+
+
+def _get_path(record: dict, path: str) -> Any:
+    value: Any = record
+    for part in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def compact_record(record: Any, fields: Optional[Sequence[str]] = None) -> Any:
+    """
+    Shrink one record for a prompt.
+
+    With fields, only those dotted paths are kept (nested as in the source);
+    otherwise everything but NOISE_FIELDS is. Empty values are dropped and
+    long strings shortened either way.
+    """
+    if not isinstance(record, dict):
+        return truncate_long_strings(record)
+
+    if fields is None:
+        kept = {k: v for k, v in record.items() if k not in NOISE_FIELDS and not _is_empty(v)}
+        return truncate_long_strings(kept)
+
+    kept: Dict[str, Any] = {}
+    for path in fields:
+        value = _get_path(record, path)
+        if _is_empty(value):
+            continue
+        *parents, leaf = path.split(".")
+        target = kept
+        for part in parents:
+            target = target.setdefault(part, {})
+        target[leaf] = value
+    return truncate_long_strings(kept)
+
+
+@dataclass
+class ContextSection:
+    """
+    One block of prompt data.
+
+    items: a list packed item by item, or any other value packed whole.
+    order_key: items are admitted newest first by this field when the section
+        does not fit; None admits them in list order (for ranked lists).
+    fields: CLINICAL_FIELDS-style paths to keep per record; None keeps all
+        but NOISE_FIELDS.
+    """
+    key: str
+    items: Any
+    title: Optional[str] = None
+    fields: Optional[Sequence[str]] = None
+    order_key: Optional[str] = "created_at"
+    lines: bool = False  # items are text lines rendered one per line instead of JSON
+
+    @classmethod
+    def text(cls, key: str, text: str, title: Optional[str] = None) -> "ContextSection":
+        """Free text packed line by line from the top, so it is never cut mid-line"""
+        return cls(key, [line for line in (text or "").splitlines() if line.strip()],
+                   title=title, order_key=None, lines=True)
+
+
+@dataclass
+class PackedContext:
+    sections: List[ContextSection]
+    kept: Dict[str, Any] = field(default_factory=dict)
+    dropped: Dict[str, int] = field(default_factory=dict)  # items left out per section
+    tokens: int = 0  # estimated tokens of the kept data
+
+    def as_dict(self, with_omitted: bool = True) -> Dict[str, Any]:
+        """Kept data keyed by section, plus "_omitted" counts when anything was dropped"""
+        data = dict(self.kept)
+        if with_omitted and self.dropped:
+            data["_omitted"] = dict(self.dropped)
+        return data
+
+    def render(self, key: str, empty: str = "None") -> str:
+        """One section's kept data as prompt text"""
+        section = next(s for s in self.sections if s.key == key)
+        if key not in self.kept:
+            return empty
+        value = self.kept[key]
+        if section.lines:
+            return "\n".join(value)
+        omitted = f" (+{self.dropped[key]} more omitted)" if self.dropped.get(key) else ""
+        return compact_json(value) + omitted
+
+    def as_text(self) -> str:
+        """Sections with data as "TITLE:\\n<data>" blocks in section order"""
+        return "\n\n".join(f"{section.title or section.key}:\n{self.render(section.key)}"
+                           for section in self.sections if not _is_empty(self.kept.get(section.key)))
+
+    def log(self, label: str):
+        if self.dropped:
+            logger.info(f"[{label}] packed ~{self.tokens} tokens, omitted {self.dropped}")
+
+
+def _admission_order(items: List[Any], order_key: Optional[str]) -> List[int]:
+    indices = list(range(len(items)))
+    if order_key is None:
+        return indices
+    return sorted(indices, key=lambda i: str((items[i] or {}).get(order_key, "")
+                                             if isinstance(items[i], dict) else ""), reverse=True)
+
+
+def pack_context(sections: List[ContextSection], budget: int) -> PackedContext:
+    """
+    Fill a token budget with sections in priority order.
+
+    Within a section, items are admitted in _admission_order until the next
+    one does not fit; the section's kept items keep their original order.
+    Lower-priority sections still get whatever budget is left.
+    """
+    packed = PackedContext(sections=sections)
+    remaining = budget
+
+    for section in sections:
+        header = count_tokens(section.title or section.key) + 2
+
+        if not isinstance(section.items, list):
+            if _is_empty(section.items):
+                continue
+            value = compact_record(section.items, section.fields)
+            cost = header + count_tokens(compact_json(value))
+            if cost <= remaining:
+                packed.kept[section.key] = value
+                remaining -= cost
+            else:
+                packed.dropped[section.key] = 1
+            continue
+
+        items = [compact_record(item, section.fields) for item in section.items]
+        if not items:
+            packed.kept[section.key] = []
+            continue
+
+        available = remaining - header
+        admitted = set()
+        for i in _admission_order(items, section.order_key):
+            text = items[i] if section.lines else compact_json(items[i])
+            cost = count_tokens(text) + 1
+            if cost > available:
+                break
+            admitted.add(i)
+            available -= cost
+
+        if admitted:
+            packed.kept[section.key] = [item for i, item in enumerate(items) if i in admitted]
+            remaining = available
+        if len(admitted) < len(items):
+            packed.dropped[section.key] = len(items) - len(admitted)
+
+    packed.tokens = budget - remaining
+    return packed
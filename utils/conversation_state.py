@@ -0,0 +1,138 @@
+"""Incremental context state for /api/chat conversations
+
+Each conversation has one row in conversation_context_state with a running
+token count of its messages and a summary checkpoint. A chat turn counts only
+the messages created since the last turn, so the limit check never re-reads
+or re-tokenizes the whole conversation.
+
+Once the messages not yet covered by the summary pass
+CONTEXT_SUMMARY_THRESHOLD_TOKENS, everything except the most recent
+CONTEXT_RECENT_MESSAGES is folded into the summary (the previous summary is
+passed along whole) and the checkpoint is stored. Later turns reuse the stored
+summary instead of summarizing again.
+"""
+import os
+import asyncio
+import logging
+from dataclasses import asdict, dataclass, fields
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from supabase_client import supabase
+from utils.token_counter import count_message_tokens
+from utils.context_compression import summarize_medical_messages
+
+logger = logging.getLogger(__name__)
+
+CONTEXT_STATE_TABLE = "conversation_context_state"
+CONTEXT_SUMMARY_THRESHOLD = int(os.getenv("CONTEXT_SUMMARY_THRESHOLD_TOKENS", "30000"))
+CONTEXT_RECENT_MESSAGES = 10
+MESSAGE_COLUMNS = "role, content, created_at"
+
+
+@dataclass
+class ConversationContextState:
+    conversation_id: str
+    user_id: Optional[str] = None
+    token_count: int = 0
+    message_count: int = 0
+    last_message_at: Optional[str] = None
+    summary: Optional[str] = None
+    summarized_count: int = 0  # oldest messages folded into summary
+    summarized_tokens: int = 0
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> "ConversationContextState":
+        names = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in row.items() if k in names and v is not None})
+
+    @property
+    def unsummarized_tokens(self) -> int:
+        return self.token_count - self.summarized_tokens
+
+    def record(self, messages: List[Dict[str, Any]]):
+        """Add messages created since the last update (oldest first)"""
+        if not messages:
+            return
+        self.token_count += count_message_tokens(messages)
+        self.message_count += len(messages)
+        self.last_message_at = messages[-1].get("created_at") or self.last_message_at
+
+    def summary_message(self) -> Optional[Dict[str, str]]:
+        if not self.summary:
+            return None
+        return {"role": "system", "content": f"[Previous conversation summary: {self.summary}]"}
+
+
+async def _fetch_new_messages(conversation_id: str, after: Optional[str]) -> List[Dict[str, Any]]:
+    query = supabase.table("messages").select(MESSAGE_COLUMNS).eq("conversation_id", conversation_id)
+    if after:
+        query = query.gt("created_at", after)
+    response = await asyncio.to_thread(query.order("created_at").execute)
+    return response.data or []
+
+
+async def save_context_state(state: ConversationContextState):
+    try:
+        await asyncio.to_thread(
+            supabase.table(CONTEXT_STATE_TABLE).upsert(
+                {**asdict(state), "updated_at": datetime.now(timezone.utc).isoformat()},
+                on_conflict="conversation_id"
+            ).execute
+        )
+    except Exception as e:
+        logger.warning(f"Could not store context state for {state.conversation_id}: {e}")
+
+
+async def load_context_state(conversation_id: str, user_id: Optional[str] = None) -> ConversationContextState:
+    """The conversation's stored state, brought up to date with messages created since"""
+    state = None
+    try:
+        response = await asyncio.to_thread(
+            supabase.table(CONTEXT_STATE_TABLE).select("*").eq("conversation_id", conversation_id).limit(1).execute
+        )
+        if response.data:
+            state = ConversationContextState.from_row(response.data[0])
+    except Exception as e:
+        logger.warning(f"Could not read context state for {conversation_id}, recounting: {e}")
+    if state is None:
+        state = ConversationContextState(conversation_id=conversation_id, user_id=user_id)
+
+    try:
+        new_messages = await _fetch_new_messages(conversation_id, state.last_message_at)
+    except Exception as e:
+        logger.warning(f"Could not fetch new messages for {conversation_id}: {e}")
+        return state
+    if new_messages:
+        state.record(new_messages)
+        await save_context_state(state)
+    return state
+
+
+async def checkpoint_summary(state: ConversationContextState) -> bool:
+    """Fold older messages into the summary once the unsummarized tail is too large"""
+    fold_until = state.message_count - CONTEXT_RECENT_MESSAGES
+    if state.unsummarized_tokens <= CONTEXT_SUMMARY_THRESHOLD or fold_until <= state.summarized_count:
+        return False
+
+    try:
+        response = await asyncio.to_thread(
+            supabase.table("messages").select(MESSAGE_COLUMNS)
+            .eq("conversation_id", state.conversation_id).order("created_at")
+            .range(state.summarized_count, fold_until - 1).execute
+        )
+        folded = response.data or []
+        if not folded:
+            return False
+        # The previous summary goes in whole; message contents are clipped by the summarizer
+        summary = await summarize_medical_messages(folded, previous_summary=state.summary)
+    except Exception as e:
+        # Keep the old checkpoint; the next turn tries again
+        logger.warning(f"Could not summarize conversation {state.conversation_id}: {e}")
+        return False
+
+    state.summary = summary
+    state.summarized_count += len(folded)
+    state.summarized_tokens += count_message_tokens(folded)
+    await save_context_state(state)
+    return True
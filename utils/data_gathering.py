@@ -2,6 +2,7 @@
 from datetime import datetime, timezone, timedelta
 from typing import Optional, Dict, List, Any
 from supabase_client import supabase
+from utils.fetch_plan import FetchSource, execute_fetch_plan, group_rows, ids_of
 import logging
 
 # Configure logging
@@ -266,105 +267,77 @@ async def load_analysis(analysis_id: str):
     
     return response.data[0]
 
-async def gather_comprehensive_data(user_id: str, config: dict):
+def _in_period(query, time_range: dict, column: str = "created_at"):
+    return query\
+        .gte(column, time_range.get("start", "2020-01-01"))\
+        .lte(column, time_range.get("end", datetime.now(timezone.utc).isoformat()))
+
+
+def _group_tracking_points(points: list, deps: dict) -> list:
+    """One entry per approved configuration that has data, in configuration order"""
+    by_config = group_rows(points, "configuration_id")
+    return [
+        {"metric": config_item["metric_name"], "data_points": by_config[config_item["id"]]}
+        for config_item in deps["tracking_configs"]
+        if by_config.get(config_item["id"])
+    ]
+
+
+async def gather_comprehensive_data(user_id: str, config: dict, timings: Optional[dict] = None):
     """Gather ALL available data for time-based reports"""
     time_range = config.get("time_range", {})
     
     # Convert user_id to string for TEXT columns
     user_id_str = str(user_id)
-    
-    # Quick Scans (user_id is TEXT)
-    scans = supabase.table("quick_scans")\
-        .select("*")\
-        .eq("user_id", user_id_str)\
-        .gte("created_at", time_range.get("start", "2020-01-01"))\
-        .lte("created_at", time_range.get("end", datetime.now(timezone.utc).isoformat()))\
-        .order("created_at")\
-        .execute()
-    
-    # Deep Dives - Include all non-abandoned sessions (active, analysis_ready, completed)
-    # (user_id is TEXT)
-    dives = supabase.table("deep_dive_sessions")\
-        .select("*")\
-        .eq("user_id", user_id_str)\
-        .in_("status", ["active", "analysis_ready", "completed"])\
-        .gte("created_at", time_range.get("start", "2020-01-01"))\
-        .lte("created_at", time_range.get("end", datetime.now(timezone.utc).isoformat()))\
-        .order("created_at")\
-        .execute()
-    
-    # Symptom Tracking (user_id is TEXT)
-    tracking = supabase.table("symptom_tracking")\
-        .select("*")\
-        .eq("user_id", user_id_str)\
-        .gte("created_at", time_range.get("start", "2020-01-01"))\
-        .lte("created_at", time_range.get("end", datetime.now(timezone.utc).isoformat()))\
-        .order("created_at")\
-        .execute()
-    
-    # Long-term tracking data
-    tracking_configs = supabase.table("tracking_configurations")\
-        .select("*")\
-        .eq("user_id", user_id)\
-        .eq("status", "approved")\
-        .execute()
-    
-    tracking_data = []
-    for config_item in (tracking_configs.data or []):
-        points = supabase.table("tracking_data_points")\
-            .select("*")\
-            .eq("configuration_id", config_item["id"])\
-            .gte("recorded_at", time_range.get("start", "2020-01-01"))\
-            .lte("recorded_at", time_range.get("end", datetime.now(timezone.utc).isoformat()))\
-            .order("recorded_at")\
-            .execute()
-        
-        if points.data:
-            tracking_data.append({
-                "metric": config_item["metric_name"],
-                "data_points": points.data
-            })
-    
-    # General Assessments
-    general_assessments = supabase.table("general_assessments")\
-        .select("*")\
-        .eq("user_id", user_id)\
-        .gte("created_at", time_range.get("start", "2020-01-01"))\
-        .lte("created_at", time_range.get("end", datetime.now(timezone.utc).isoformat()))\
-        .order("created_at")\
-        .execute()
-    
-    # General Deep Dives - Include all non-abandoned sessions
-    general_dives = supabase.table("general_deepdive_sessions")\
-        .select("*")\
-        .eq("user_id", user_id)\
-        .in_("status", ["active", "analysis_ready", "completed"])\
-        .gte("created_at", time_range.get("start", "2020-01-01"))\
-        .lte("created_at", time_range.get("end", datetime.now(timezone.utc).isoformat()))\
-        .order("created_at")\
-        .execute()
-    
-    # LLM Chat Summaries (user_id is TEXT)
-    chats = supabase.table("oracle_chats")\
-        .select("*")\
-        .eq("user_id", user_id_str)\
-        .gte("created_at", time_range.get("start", "2020-01-01"))\
-        .lte("created_at", time_range.get("end", datetime.now(timezone.utc).isoformat()))\
-        .order("created_at")\
-        .execute()
-    
-    # Get medical profile
-    medical_profile = await get_user_medical_data(user_id)
-    
+    # Deep Dives - Include all non-abandoned sessions
+    open_statuses = ["active", "analysis_ready", "completed"]
+    
+    def period_rows(table: str, owner: str, **filters):
+        def build(deps):
+            query = supabase.table(table).select("*").eq("user_id", owner)
+            for column, values in filters.items():
+                query = query.in_(column, values)
+            return _in_period(query, time_range).order("created_at")
+        return build
+    
+    plan = [
+        FetchSource("quick_scans", period_rows("quick_scans", user_id_str)),
+        FetchSource("deep_dives", period_rows("deep_dive_sessions", user_id_str, status=open_statuses)),
+        FetchSource("symptom_tracking", period_rows("symptom_tracking", user_id_str)),
+        FetchSource("tracking_configs", lambda deps: supabase.table("tracking_configurations")
+                    .select("*").eq("user_id", user_id).eq("status", "approved")),
+        # Long-term tracking data: one query for every configuration, grouped in memory
+        FetchSource(
+            "tracking_data",
+            lambda deps: _in_period(
+                supabase.table("tracking_data_points").select("*")
+                .in_("configuration_id", ids_of(deps["tracking_configs"])),
+                time_range, "recorded_at"
+            ).order("recorded_at") if deps["tracking_configs"] else None,
+            after=("tracking_configs",),
+            transform=_group_tracking_points
+        ),
+        FetchSource("general_assessments", period_rows("general_assessments", user_id)),
+        FetchSource("general_deep_dives", period_rows("general_deepdive_sessions", user_id, status=open_statuses)),
+        FetchSource("llm_summaries", period_rows("oracle_chats", user_id_str)),
+        FetchSource("medical_profile", fetch=lambda deps: get_user_medical_data(user_id), default=lambda: None),
+    ]
+    
+    result = await execute_fetch_plan(plan)
+    result.log_timings("COMPREHENSIVE DATA")
+    if timings is not None:
+        timings.update(result.timings)
+    
+    data = result.data
     return {
-        "medical_profile": medical_profile,
-        "quick_scans": scans.data or [],
-        "deep_dives": dives.data or [],
-        "general_assessments": general_assessments.data or [],
-        "general_deep_dives": general_dives.data or [],
-        "symptom_tracking": tracking.data or [],
-        "tracking_data": tracking_data,
-        "llm_summaries": chats.data or [],
+        "medical_profile": data["medical_profile"],
+        "quick_scans": data["quick_scans"],
+        "deep_dives": data["deep_dives"],
+        "general_assessments": data["general_assessments"],
+        "general_deep_dives": data["general_deep_dives"],
+        "symptom_tracking": data["symptom_tracking"],
+        "tracking_data": data["tracking_data"],
+        "llm_summaries": data["llm_summaries"],
         "wearables": {}  # Placeholder for wearables integration
     }
 
@@ -381,7 +354,8 @@ async def gather_selected_data(
     deep_dive_ids: Optional[List[str]] = None, 
     photo_session_ids: Optional[List[str]] = None,
     general_assessment_ids: Optional[List[str]] = None,
-    general_deep_dive_ids: Optional[List[str]] = None
+    general_deep_dive_ids: Optional[List[str]] = None,
+    timings: Optional[dict] = None
 ) -> Dict[str, Any]:
     """
     Gather only specific selected interactions for specialist reports
@@ -393,6 +367,7 @@ async def gather_selected_data(
         photo_session_ids: List of specific photo session IDs to fetch
         general_assessment_ids: List of specific general assessment IDs to fetch
         general_deep_dive_ids: List of specific general deep dive session IDs to fetch
+        timings: Optional dict filled with per-table fetch times in ms
         
     Returns:
         Dictionary with selected data matching the structure of gather_comprehensive_data
@@ -418,173 +393,61 @@ async def gather_selected_data(
         "general_deep_dives": []
     }
     
+    if not user_id:
+        logger.warning("No user_id provided, fetching selected interactions without user filter")
+    
+    def selected(table: str, ids: Optional[List[str]], owner: Optional[str]):
+        """Rows of a table by ID, restricted to the user when one is given"""
+        def build(deps):
+            # None (not provided) and [] (explicitly no items) both mean no query
+            if not ids:
+                return None
+            query = supabase.table(table).select("*").in_("id", ids)
+            if owner:
+                query = query.eq("user_id", owner)
+            return query.order("created_at")
+        return build
+    
+    def linked_symptoms(column: str, parent: str):
+        """ONLY symptom tracking directly linked to the fetched sessions"""
+        def build(deps):
+            parent_ids = ids_of(deps[parent])
+            if not parent_ids:
+                return None
+            return supabase.table("symptom_tracking").select("*").in_(column, parent_ids)
+        return build
+    
+    # NOTE: quick_scans and deep_dive_sessions user_id are TEXT, general_* are UUID
+    user_id_str = str(user_id) if user_id else None
+    plan = [
+        FetchSource("medical_profile", fetch=lambda deps: get_user_medical_data(user_id), default=lambda: None),
+        FetchSource("quick_scans", selected("quick_scans", quick_scan_ids, user_id_str)),
+        FetchSource("deep_dives", selected("deep_dive_sessions", deep_dive_ids, user_id_str)),
+        FetchSource("scan_symptoms", linked_symptoms("quick_scan_id", "quick_scans"), after=("quick_scans",)),
+        FetchSource("dive_symptoms", linked_symptoms("deep_dive_id", "deep_dives"), after=("deep_dives",)),
+        FetchSource(
+            "photo_analyses",
+            lambda deps: supabase.table("photo_analyses").select("*")
+            .in_("session_id", photo_session_ids)
+            .order("created_at.desc") if photo_session_ids else None
+        ),
+        FetchSource("general_assessments", selected("general_assessments", general_assessment_ids, user_id)),
+        FetchSource("general_deep_dives", selected("general_deepdive_sessions", general_deep_dive_ids, user_id)),
+    ]
+    
     try:
-        # FIRST: Get medical profile (demographics, medications, allergies, etc.)
-        data["medical_profile"] = await get_user_medical_data(user_id)
+        result = await execute_fetch_plan(plan)
+        result.log_timings("SELECTED DATA")
+        if timings is not None:
+            timings.update(result.timings)
+        fetched = result.data
+        
+        for key in ("medical_profile", "quick_scans", "deep_dives", "photo_analyses",
+                    "general_assessments", "general_deep_dives"):
+            data[key] = fetched[key]
         logger.info(f"Medical profile loaded: {data['medical_profile'] is not None}")
-        
-        # Get specific quick scans
-        # Handle both None (not provided) and empty list [] (explicitly no items)
-        if quick_scan_ids is not None and len(quick_scan_ids) > 0:
-            logger.info(f"Fetching {len(quick_scan_ids)} quick scans...")
-            logger.info(f"Quick scan IDs to fetch: {quick_scan_ids}")
-            logger.info(f"Quick scan IDs type: {type(quick_scan_ids)}")
-            logger.info(f"User ID for filter: {user_id}")
-            
-            # DEBUG: Try fetching without user_id filter first
-            test_result = supabase.table("quick_scans")\
-                .select("id, user_id")\
-                .in_("id", quick_scan_ids)\
-                .execute()
-            logger.info(f"DEBUG - Found {len(test_result.data or [])} quick scans WITHOUT user filter")
-            if test_result.data:
-                logger.info(f"DEBUG - User IDs in results: {[qs.get('user_id') for qs in test_result.data]}")
-            
-            # Now fetch with user_id filter
-            # IMPORTANT: Only filter by user_id if it's provided and not empty
-            # NOTE: quick_scans.user_id is TEXT type, so ensure string comparison
-            if user_id:
-                # Convert user_id to string for proper comparison with TEXT column
-                user_id_str = str(user_id)
-                logger.info(f"Converted user_id to string: {user_id_str}")
-                scans_result = supabase.table("quick_scans")\
-                    .select("*")\
-                    .in_("id", quick_scan_ids)\
-                    .eq("user_id", user_id_str)\
-                    .order("created_at")\
-                    .execute()
-            else:
-                # If no user_id, just fetch by IDs (useful for admin/doctor views)
-                logger.warning("No user_id provided, fetching quick scans without user filter")
-                scans_result = supabase.table("quick_scans")\
-                    .select("*")\
-                    .in_("id", quick_scan_ids)\
-                    .order("created_at")\
-                    .execute()
-            data["quick_scans"] = scans_result.data or []
-            logger.info(f"Found {len(data['quick_scans'])} quick scans WITH user filter: {bool(user_id)}")
-            if data["quick_scans"]:
-                logger.info(f"Quick scan IDs found: {[qs.get('id') for qs in data['quick_scans'] if qs]}")
-                # Safely get summaries with proper null checking
-                summaries = []
-                for qs in data['quick_scans']:
-                    if qs:
-                        summary = qs.get('llm_summary')
-                        if summary and isinstance(summary, str):
-                            summaries.append(summary[:100])
-                        else:
-                            summaries.append('No summary')
-                logger.info(f"Quick scan summaries: {summaries}")
-            
-            # Get ONLY symptom tracking directly linked to these specific scans
-            for scan in data["quick_scans"]:
-                scan_id = scan.get("id")
-                if scan_id:
-                    symptoms_result = supabase.table("symptom_tracking")\
-                        .select("*")\
-                        .eq("quick_scan_id", scan_id)\
-                        .execute()
-                    data["symptom_tracking"].extend(symptoms_result.data or [])
-        elif quick_scan_ids is not None:
-            # Empty array provided - explicitly no quick scans wanted
-            logger.info("Empty quick_scan_ids array provided - not fetching any quick scans")
-        
-        # Get specific deep dives (any status - active, analysis_ready, completed)
-        # Handle both None (not provided) and empty list [] (explicitly no items)
-        if deep_dive_ids is not None and len(deep_dive_ids) > 0:
-            logger.info(f"Fetching {len(deep_dive_ids)} deep dives...")
-            logger.info(f"Deep dive IDs to fetch: {deep_dive_ids}")
-            
-            # DEBUG: Try fetching without user_id filter first
-            test_result = supabase.table("deep_dive_sessions")\
-                .select("id, user_id")\
-                .in_("id", deep_dive_ids)\
-                .execute()
-            logger.info(f"DEBUG - Found {len(test_result.data or [])} deep dives WITHOUT user filter")
-            if test_result.data:
-                logger.info(f"DEBUG - User IDs in results: {[dd.get('user_id') for dd in test_result.data]}")
-            
-            # NOTE: deep_dive_sessions.user_id is TEXT type, so ensure string comparison
-            if user_id:
-                # Convert user_id to string for proper comparison with TEXT column
-                user_id_str = str(user_id)
-                logger.info(f"Converted user_id to string for deep dives: {user_id_str}")
-                dives_result = supabase.table("deep_dive_sessions")\
-                    .select("*")\
-                    .in_("id", deep_dive_ids)\
-                    .eq("user_id", user_id_str)\
-                    .order("created_at")\
-                    .execute()
-            else:
-                logger.warning("No user_id provided, fetching deep dives without user filter")
-                dives_result = supabase.table("deep_dive_sessions")\
-                    .select("*")\
-                    .in_("id", deep_dive_ids)\
-                    .order("created_at")\
-                    .execute()
-            data["deep_dives"] = dives_result.data or []
-            logger.info(f"Found {len(data['deep_dives'])} deep dives WITH user filter: {bool(user_id)}")
-            
-            # Get ONLY symptom tracking directly linked to these specific deep dives
-            for dive in data["deep_dives"]:
-                dive_id = dive.get("id")
-                if dive_id:
-                    symptoms_result = supabase.table("symptom_tracking")\
-                        .select("*")\
-                        .eq("deep_dive_id", dive_id)\
-                        .execute()
-                    data["symptom_tracking"].extend(symptoms_result.data or [])
-        
-        # Get photo analyses for specific sessions
-        if photo_session_ids is not None and len(photo_session_ids) > 0:
-            photo_result = supabase.table("photo_analyses")\
-                .select("*")\
-                .in_("session_id", photo_session_ids)\
-                .order("created_at.desc")\
-                .execute()
-            data["photo_analyses"] = photo_result.data or []
-        
-        # Get specific general assessments
-        if general_assessment_ids is not None and len(general_assessment_ids) > 0:
-            logger.info(f"Fetching {len(general_assessment_ids)} general assessments...")
-            # NOTE: general_assessments.user_id is UUID type, so use as-is
-            if user_id:
-                general_result = supabase.table("general_assessments")\
-                    .select("*")\
-                    .in_("id", general_assessment_ids)\
-                    .eq("user_id", user_id)\
-                    .order("created_at")\
-                    .execute()
-            else:
-                logger.warning("No user_id provided, fetching general assessments without user filter")
-                general_result = supabase.table("general_assessments")\
-                    .select("*")\
-                    .in_("id", general_assessment_ids)\
-                    .order("created_at")\
-                    .execute()
-            data["general_assessments"] = general_result.data or []
-            logger.info(f"Found {len(data['general_assessments'])} general assessments")
-        
-        # Get specific general deep dive sessions (any status)
-        if general_deep_dive_ids is not None and len(general_deep_dive_ids) > 0:
-            logger.info(f"Fetching {len(general_deep_dive_ids)} general deep dives...")
-            # NOTE: general_deepdive_sessions.user_id is UUID type, so use as-is
-            if user_id:
-                general_dives_result = supabase.table("general_deepdive_sessions")\
-                    .select("*")\
-                    .in_("id", general_deep_dive_ids)\
-                    .eq("user_id", user_id)\
-                    .order("created_at")\
-                    .execute()
-            else:
-                logger.warning("No user_id provided, fetching general deep dives without user filter")
-                general_dives_result = supabase.table("general_deepdive_sessions")\
-                    .select("*")\
-                    .in_("id", general_deep_dive_ids)\
-                    .order("created_at")\
-                    .execute()
-            data["general_deep_dives"] = general_dives_result.data or []
-            logger.info(f"Found {len(data['general_deep_dives'])} general deep dives")
+        if data["quick_scans"]:
+            logger.info(f"Quick scan IDs found: {[qs.get('id') for qs in data['quick_scans'] if qs]}")
         
         # REMOVED: No longer fetching unrelated chats from same dates
         # The report should ONLY include data from the specific selected sessions
@@ -593,7 +456,7 @@ async def gather_selected_data(
         # Remove duplicates from symptom_tracking
         seen_symptoms = set()
         unique_symptoms = []
-        for symptom in data["symptom_tracking"]:
+        for symptom in fetched["scan_symptoms"] + fetched["dive_symptoms"]:
             symptom_id = symptom.get("id")
             if symptom_id and symptom_id not in seen_symptoms:
                 seen_symptoms.add(symptom_id)
@@ -0,0 +1,133 @@
+"""Declarative, concurrent multi-table fetches
+
+A fetch plan is a list of FetchSource entries. Each source builds one
+supabase query (optionally from the results of the sources it depends on)
+and the plan runs every query whose dependencies are ready in parallel,
+bounded by a semaphore, since the supabase client is synchronous and each
+execute() occupies a worker thread. Per-source timings are collected so
+slow tables show up in the logs.
+"""
+import os
+import time
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+FETCH_CONCURRENCY = int(os.getenv("REPORT_FETCH_CONCURRENCY", "6"))
+
+
+@dataclass
+class FetchSource:
+    """
+    One table read in a fetch plan.
+
+    query: receives the results of the `after` sources and returns a query
+        builder, or None to skip the source (it then resolves to `default`).
+    fetch: alternative to query for reads that are already async functions.
+    transform: turns the rows (plus the dependency results) into the value
+        stored under `name`; defaults to the rows themselves.
+    """
+    name: str
+    query: Optional[Callable[[Dict[str, Any]], Any]] = None
+    fetch: Optional[Callable[[Dict[str, Any]], Any]] = None
+    after: Tuple[str, ...] = ()
+    transform: Optional[Callable[[List[dict], Dict[str, Any]], Any]] = None
+    default: Callable[[], Any] = list
+
+
+@dataclass
+class FetchResult:
+    data: Dict[str, Any]
+    timings: Dict[str, float] = field(default_factory=dict)  # ms per source, plus "total"
+    errors: Dict[str, str] = field(default_factory=dict)
+
+    def log_timings(self, label: str):
+        breakdown = ", ".join(f"{name}={ms:.0f}ms" for name, ms in self.timings.items() if name != "total")
+        logger.info(f"[{label}] fetched {len(self.data)} sources in {self.timings.get('total', 0):.0f}ms ({breakdown})")
+        for name, error in self.errors.items():
+            logger.warning(f"[{label}] {name} failed: {error}")
+
+
+def group_rows(rows: Iterable[dict], key: str) -> Dict[Any, List[dict]]:
+    """Group rows by a column, keeping row order within each group"""
+    grouped: Dict[Any, List[dict]] = {}
+    for row in rows:
+        grouped.setdefault(row.get(key), []).append(row)
+    return grouped
+
+
+def ids_of(rows: Optional[List[dict]], key: str = "id") -> List[Any]:
+    return [row[key] for row in rows or [] if row.get(key) is not None]
+
+
+def select_sources(sources: List[FetchSource], names: Iterable[str]) -> List[FetchSource]:
+    """The named sources plus everything they depend on, in plan order"""
+    by_name = {source.name: source for source in sources}
+    wanted, pending = set(), list(names)
+    while pending:
+        name = pending.pop()
+        if name not in wanted:
+            wanted.add(name)
+            pending.extend(by_name[name].after)
+    return [source for source in sources if source.name in wanted]
+
+
+def resolved_data(sources: List[FetchSource], result: "FetchResult") -> Dict[str, Any]:
+    """Every source's value, with defaults for sources that were not run"""
+    return {source.name: result.data[source.name] if source.name in result.data else source.default()
+            for source in sources}
+
+
+async def execute_fetch_plan(sources: List[FetchSource], max_concurrency: int = FETCH_CONCURRENCY) -> FetchResult:
+    """
+    Run a fetch plan and return every source's value with timings.
+
+    A failing source is logged and resolves to its default so one missing
+    table does not sink the whole report; sources that depend on it see the
+    default too.
+    """
+    names = {source.name for source in sources}
+    for source in sources:
+        missing = set(source.after) - names
+        if missing:
+            raise ValueError(f"Fetch source {source.name} depends on unknown sources: {missing}")
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+    result = FetchResult(data={})
+    tasks: Dict[str, asyncio.Task] = {}
+
+    async def run(source: FetchSource):
+        deps = {name: await tasks[name] for name in source.after}
+        try:
+            if source.fetch is not None:
+                started = time.perf_counter()
+                value = await source.fetch(deps)
+                result.timings[source.name] = (time.perf_counter() - started) * 1000
+                return value
+
+            query = source.query(deps)
+            if query is None:
+                return source.default()
+
+            async with semaphore:
+                started = time.perf_counter()
+                response = await asyncio.to_thread(query.execute)
+                result.timings[source.name] = (time.perf_counter() - started) * 1000
+
+            rows = response.data or []
+            return source.transform(rows, deps) if source.transform else rows
+        except Exception as e:
+            result.errors[source.name] = str(e)
+            return source.default()
+
+    started = time.perf_counter()
+    for source in sources:
+        tasks[source.name] = asyncio.create_task(run(source))
+    values = await asyncio.gather(*tasks.values())
+    result.timings["total"] = (time.perf_counter() - started) * 1000
+
+    result.data = dict(zip(tasks.keys(), values))
+    return result
@@ -0,0 +1,171 @@
+"""Per-user history digest of llm_context summaries
+
+The Oracle chat used to load every llm_context summary for the user on each
+message and, above HISTORY_DIGEST_MIN_TOKENS, ask an LLM to aggregate them,
+throwing the result away. The aggregate is now kept in llm_context_digests
+(one versioned row per user) and in Redis under history_digest:<user_id>, so
+reading it is a single key lookup. The chat context builder
+(utils/context_builder.get_enhanced_llm_context) puts it in place of the
+recent conversation summaries.
+
+Summary writers call schedule_digest_refresh(user_id) after inserting into
+llm_context; the digest is rebuilt in a background task (one per user at a
+time) and written through to Redis. Users whose summaries are below the
+threshold get a row with digest NULL, which tells readers to use the
+recent summaries instead.
+"""
+import os
+import json
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Set, Tuple
+
+from supabase_client import supabase
+from core.resources import resources
+from utils.openrouter_client import openrouter
+from utils.summary_helpers import summary_token_total
+from utils.token_counter import count_tokens
+
+logger = logging.getLogger(__name__)
+
+DIGEST_TABLE = "llm_context_digests"
+HISTORY_DIGEST_MIN_TOKENS = 25000
+HISTORY_DIGEST_MAX_TOKENS = int(os.getenv("HISTORY_DIGEST_MAX_TOKENS", "4000"))
+HISTORY_DIGEST_REDIS_TTL = int(os.getenv("HISTORY_DIGEST_REDIS_TTL_SECONDS", "86400"))
+HISTORY_DIGEST_MODEL = "openai/gpt-5-mini"
+KEY_PREFIX = "history_digest:"
+DIGEST_INPUT_CHARS = 10000
+
+_refreshing: Dict[str, asyncio.Task] = {}
+_stale: Set[str] = set()  # summaries landed while a refresh was running
+
+
+async def _cache_get(user_id: str) -> Optional[Dict[str, Any]]:
+    client = await resources.redis()
+    if client is None:
+        return None
+    try:
+        cached = await client.get(KEY_PREFIX + user_id)
+        return json.loads(cached) if cached else None
+    except Exception as e:
+        logger.warning(f"History digest Redis read failed: {e}")
+        return None
+
+
+async def _cache_set(row: Dict[str, Any]):
+    client = await resources.redis()
+    if client is None:
+        return
+    try:
+        await client.set(KEY_PREFIX + row["user_id"], json.dumps(row), ex=HISTORY_DIGEST_REDIS_TTL)
+    except Exception as e:
+        logger.warning(f"History digest Redis write failed: {e}")
+
+
+async def get_history_digest(user_id: str) -> Optional[Dict[str, Any]]:
+    """The user's digest row from Redis, else the database; None if never built"""
+    row = await _cache_get(user_id)
+    if row is not None:
+        return row
+    try:
+        response = await asyncio.to_thread(
+            supabase.table(DIGEST_TABLE).select("*").eq("user_id", user_id).limit(1).execute
+        )
+    except Exception as e:
+        logger.warning(f"Could not read history digest for {user_id}: {e}")
+        return None
+    if not response.data:
+        return None
+    row = response.data[0]
+    await _cache_set(row)
+    return row
+
+
+def _digest_prompt(history: str, total_tokens: int) -> Tuple[str, int]:
+    compression_ratio = 1.5 if total_tokens < 50000 else 2.0 if total_tokens < 100000 else 5.0
+    target_tokens = min(int(total_tokens / compression_ratio), HISTORY_DIGEST_MAX_TOKENS)
+    prompt = f"""Summarize this medical history in {target_tokens} tokens, keeping chronic conditions, recurring symptoms, medications, red flags and what treatments did or did not work.
+
+HISTORY: {history[:DIGEST_INPUT_CHARS]}...
+
+Write concise medical summary:"""
+    return prompt, target_tokens
+
+
+async def refresh_history_digest(user_id: str) -> Optional[Dict[str, Any]]:
+    """Rebuild the user's digest from their llm_context summaries and store it"""
+    response = await asyncio.to_thread(
+        supabase.table("llm_context").select("id, llm_summary, token_count, created_at")
+        .eq("user_id", user_id).order("created_at", desc=True).execute
+    )
+    summaries = [s for s in response.data or [] if s.get("llm_summary")]
+    latest = summaries[0].get("created_at") if summaries else None
+
+    current = await get_history_digest(user_id)
+    if current and current.get("source_count") == len(summaries) and current.get("latest_summary_at") == latest:
+        return current  # no new summaries since the last build
+
+    total_tokens = await asyncio.to_thread(summary_token_total, summaries)
+    digest = None
+    if total_tokens > HISTORY_DIGEST_MIN_TOKENS:
+        # Newest first, so truncation drops the oldest history
+        history = "\n\n".join(s["llm_summary"] for s in summaries)
+        prompt, target_tokens = _digest_prompt(history, total_tokens)
+        result = await openrouter.chat_completion(
+            {
+                "model": HISTORY_DIGEST_MODEL,
+                "messages": [{"role": "system", "content": prompt}],
+                "max_tokens": target_tokens,
+                "temperature": 0.3
+            },
+            timeout=120
+        )
+        digest = result["choices"][0]["message"]["content"]
+
+    row = {
+        "user_id": user_id,
+        "version": (current or {}).get("version", 0) + 1,
+        "digest": digest,
+        "token_count": count_tokens(digest) if digest else 0,
+        "source_count": len(summaries),
+        "source_tokens": total_tokens,
+        "latest_summary_at": latest,
+        "updated_at": datetime.now(timezone.utc).isoformat(),
+    }
+    await asyncio.to_thread(supabase.table(DIGEST_TABLE).upsert(row, on_conflict="user_id").execute)
+    await _cache_set(row)
+    logger.info(f"History digest v{row['version']} for {user_id}: {len(summaries)} summaries, {total_tokens} tokens")
+    return row
+
+
+async def _refresh_quietly(user_id: str):
+    try:
+        while True:
+            _stale.discard(user_id)
+            await refresh_history_digest(user_id)
+            if user_id not in _stale:
+                break
+    except Exception as e:
+        # The previous digest stays in place; the next new summary retries
+        logger.warning(f"History digest refresh failed for {user_id}: {e}")
+    finally:
+        _refreshing.pop(user_id, None)
+
+
+def schedule_digest_refresh(user_id: Optional[str]) -> Optional[asyncio.Task]:
+    """Rebuild the digest in the background, at most one refresh per user at a time"""
+    if not user_id:
+        return None
+    user_id = str(user_id)
+    task = _refreshing.get(user_id)
+    if task is not None and not task.done():
+        # It may have read the summaries already; have it go round once more
+        _stale.add(user_id)
+        return task
+    try:
+        task = asyncio.get_running_loop().create_task(_refresh_quietly(user_id))
+    except RuntimeError:
+        return None  # no event loop (sync scripts); the next async writer schedules it
+    _refreshing[user_id] = task
+    return task
@@ -1,131 +1,74 @@
-"""JSON parsing utilities"""
+"""JSON parsing utilities
+
+LLM responses are plain JSON, JSON in a ```json fence, or JSON with prose
+around it. Each candidate start (the whole text, the fence body, the first
+bracket) is decoded once with the C decoder's raw_decode, which stops at the
+end of the value, so trailing text needs no brace matching in Python.
+"""
 import json
-import re
-from typing import Optional
+import logging
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+_decoder = json.JSONDecoder()
+
+
+def _decode_at(content: str, start: int) -> Optional[Any]:
+    try:
+        return _decoder.raw_decode(content, start)[0]
+    except ValueError as e:
+        logger.debug(f"No JSON value at offset {start}: {e}")
+        return None
+
+
+def _fence_start(content: str) -> int:
+    """Offset of the JSON value inside the first closed ``` fence, or -1"""
+    fence = content.find("```")
+    if fence == -1:
+        return -1
+    body = fence + 3
+    if content.startswith("json", body):
+        body += 4
+    if content.find("```", body) == -1:
+        return -1
+    while body < len(content) and content[body].isspace():
+        body += 1
+    return body if content.startswith(("{", "["), body) else -1
+
 
-def extract_json_from_response(content) -> Optional:
-    """Extract JSON from response with multiple fallback strategies"""
-    # Strategy 1: Direct parse if already dict or list
+def _first_bracket(content: str) -> int:
+    starts = [i for i in (content.find("{"), content.find("[")) if i != -1]
+    return min(starts) if starts else -1
+
+
+def extract_json_from_response(content) -> Optional[Any]:
+    """The first JSON object or array in an LLM response, None if there is none"""
     if isinstance(content, (dict, list)):
         return content
-    
-    # Strategy 2: Try direct JSON parse
+    if not isinstance(content, str):
+        try:
+            return json.loads(content)
+        except (TypeError, ValueError):
+            return None
+
     try:
         return json.loads(content)
-    except:
+    except ValueError:
         pass
-    
-    # Strategy 3: Find JSON in code blocks FIRST (most common from LLMs)
-    try:
-        # Look for ```json blocks (handle newlines and whitespace)
-        json_block = re.search(r'```(?:json)?\s*([\s\S]*?)\s*```', content, re.DOTALL)
-        if json_block:
-            # Extract and clean the JSON content
-            json_content = json_block.group(1).strip()
-            if json_content:
-                # Sometimes AI adds extra text after JSON, try to find complete JSON object
-                # by matching balanced braces
-                if json_content.startswith('{'):
-                    # Find the matching closing brace
-                    brace_count = 0
-                    in_string = False
-                    escape = False
-                    end_pos = -1
-                    
-                    for i, char in enumerate(json_content):
-                        if char == '"' and not escape:
-                            in_string = not in_string
-                        elif char == '\\':
-                            escape = not escape
-                        else:
-                            escape = False
-                        
-                        if not in_string:
-                            if char == '{':
-                                brace_count += 1
-                            elif char == '}':
-                                brace_count -= 1
-                                if brace_count == 0:
-                                    end_pos = i + 1
-                                    break
-                    
-                    if end_pos > 0:
-                        json_content = json_content[:end_pos]
-                
-                return json.loads(json_content)
-    except Exception as e:
-        print(f"Error parsing JSON from code block: {e}")
-        print(f"Content that failed: {json_block.group(1)[:500] if json_block else 'No match'}")
-    
-    # Strategy 4: Find JSON in text (handle nested objects and arrays)
-    try:
-        # Find the first { or [ and match to the corresponding } or ]
-        obj_start = content.find('{')
-        arr_start = content.find('[')
-        
-        # Determine which comes first
-        if obj_start == -1 and arr_start == -1:
-            return None
-        elif obj_start == -1:
-            start = arr_start
-            is_array = True
-        elif arr_start == -1:
-            start = obj_start
-            is_array = False
-        else:
-            if obj_start < arr_start:
-                start = obj_start
-                is_array = False
-            else:
-                start = arr_start
-                is_array = True
-        
-        if start != -1:
-            depth = 0
-            in_string = False
-            escape = False
-            
-            for i in range(start, len(content)):
-                char = content[i]
-                
-                # Handle string boundaries
-                if char == '"' and not escape:
-                    in_string = not in_string
-                elif char == '\\':
-                    escape = not escape
-                else:
-                    escape = False
-                
-                # Only count brackets outside of strings
-                if not in_string:
-                    if is_array:
-                        if char == '[':
-                            depth += 1
-                        elif char == ']':
-                            depth -= 1
-                            if depth == 0:
-                                json_str = content[start:i+1]
-                                # Clean up common issues
-                                json_str = json_str.strip()
-                                return json.loads(json_str)
-                    else:
-                        if char == '{':
-                            depth += 1
-                        elif char == '}':
-                            depth -= 1
-                            if depth == 0:
-                                json_str = content[start:i+1]
-                                # Clean up common issues
-                                json_str = json_str.strip()
-                                return json.loads(json_str)
-    except Exception as e:
-        print(f"Error parsing JSON from text: {e}")
+
+    tried = set()
+    for start in (_fence_start(content), _first_bracket(content)):
+        if start == -1 or start in tried:
+            continue
+        tried.add(start)
+        value = _decode_at(content, start)
+        if value is not None:
+            return value
 
     # No automatic fallback - let calling endpoint handle failure appropriately
     # Each endpoint has specific fallback logic for its expected response structure
-    # LLMs should return proper JSON based on explicit prompt instructions
-    # Force Railway redeploy - this comment added to trigger build
     return None
 
 # Alias for consistency
-extract_json_from_text = extract_json_from_response
\ No newline at end of file
+extract_json_from_text = extract_json_from_response
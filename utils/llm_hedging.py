@@ -0,0 +1,158 @@
+"""Hedged requests across an endpoint's fallback models
+
+Instead of waiting for the primary model to time out and exhaust its retries,
+a hedged call starts the next model in parallel once the primary has run
+longer than the endpoint's observed p95 latency. The first valid response
+wins and the other requests are cancelled. A model that fails outright is
+replaced immediately (a failover, which is free).
+
+Hedges cost extra tokens, so each endpoint has a budget: every call earns
+LLM_HEDGE_RATIO of a hedge (up to LLM_HEDGE_BURST saved up), and a hedge is
+only sent when a whole one is available. With the defaults at most ~10% of
+calls pay for a second model.
+"""
+import os
+import time
+import asyncio
+import logging
+import threading
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+HEDGING_ENABLED = os.getenv("LLM_HEDGING_ENABLED", "true").lower() == "true"
+HEDGE_RATIO = float(os.getenv("LLM_HEDGE_RATIO", "0.1"))
+HEDGE_BURST = float(os.getenv("LLM_HEDGE_BURST", "5"))
+HEDGE_MAX_PARALLEL = int(os.getenv("LLM_HEDGE_MAX_PARALLEL", "2"))
+# Deadline before enough latencies are recorded, and bounds on the p95 deadline
+HEDGE_DEFAULT_DELAY = float(os.getenv("LLM_HEDGE_DEFAULT_DELAY_SECONDS", "30"))
+HEDGE_MIN_DELAY = float(os.getenv("LLM_HEDGE_MIN_DELAY_SECONDS", "2"))
+HEDGE_MAX_DELAY = float(os.getenv("LLM_HEDGE_MAX_DELAY_SECONDS", "90"))
+LATENCY_WINDOW = 200
+MIN_LATENCY_SAMPLES = 20
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies per endpoint"""
+
+    def __init__(self, window: int = LATENCY_WINDOW, min_samples: int = MIN_LATENCY_SAMPLES):
+        self.window = window
+        self.min_samples = min_samples
+        self._samples: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint: str, seconds: float):
+        with self._lock:
+            self._samples.setdefault(endpoint, deque(maxlen=self.window)).append(seconds)
+
+    def percentile(self, endpoint: str, pct: float = 0.95) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples.get(endpoint, ()))
+        if len(samples) < self.min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(pct * len(samples)))]
+
+    def hedge_delay(self, endpoint: str) -> float:
+        p95 = self.percentile(endpoint)
+        if p95 is None:
+            return HEDGE_DEFAULT_DELAY
+        return max(HEDGE_MIN_DELAY, min(HEDGE_MAX_DELAY, p95))
+
+
+class HedgeBudget:
+    """Per-endpoint token bucket: each call earns `ratio` hedges, up to `burst`"""
+
+    def __init__(self, ratio: float = HEDGE_RATIO, burst: float = HEDGE_BURST):
+        self.ratio = ratio
+        self.burst = burst
+        self._tokens: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def earn(self, endpoint: str):
+        with self._lock:
+            self._tokens[endpoint] = min(self.burst, self._tokens.get(endpoint, 0.0) + self.ratio)
+
+    def try_spend(self, endpoint: str) -> bool:
+        with self._lock:
+            if self._tokens.get(endpoint, 0.0) >= 1.0:
+                self._tokens[endpoint] -= 1.0
+                return True
+            return False
+
+
+latency_tracker = LatencyTracker()
+hedge_budget = HedgeBudget()
+
+
+async def hedged_call(
+    models: List[str],
+    attempt: Callable[[str], Awaitable[Any]],
+    endpoint: str,
+    is_valid: Callable[[Any], bool],
+    max_parallel: int = HEDGE_MAX_PARALLEL,
+) -> Any:
+    """
+    Run attempt(model) over models with hedging; return the first valid result.
+
+    If every model fails, returns the last invalid result (e.g. a degraded
+    placeholder response) or raises the last error.
+    """
+    hedge_budget.earn(endpoint)
+    delay = latency_tracker.hedge_delay(endpoint)
+    pending: Dict[asyncio.Task, tuple] = {}
+    next_index = 0
+    hedging_allowed = True
+    last_error: Optional[BaseException] = None
+    last_invalid = None
+
+    def launch():
+        nonlocal next_index
+        model = models[next_index]
+        next_index += 1
+        pending[asyncio.create_task(attempt(model))] = (model, time.monotonic())
+
+    launch()
+    try:
+        while pending:
+            can_hedge = hedging_allowed and next_index < len(models) and len(pending) < max_parallel
+            done, _ = await asyncio.wait(
+                pending, timeout=delay if can_hedge else None, return_when=asyncio.FIRST_COMPLETED
+            )
+
+            if not done:
+                # Deadline passed with no response: hedge if the budget allows
+                if hedge_budget.try_spend(endpoint):
+                    logger.info(f"[{endpoint}] no response after {delay:.1f}s, hedging with {models[next_index]}")
+                    launch()
+                else:
+                    logger.info(f"[{endpoint}] hedge budget exhausted, waiting for {len(pending)} request(s)")
+                    hedging_allowed = False
+                continue
+
+            for task in done:
+                model, started = pending.pop(task)
+                try:
+                    result = task.result()
+                except Exception as e:
+                    logger.warning(f"[{endpoint}] {model} failed: {e}")
+                    last_error = e
+                    continue
+                if is_valid(result):
+                    latency_tracker.record(endpoint, time.monotonic() - started)
+                    if pending:
+                        logger.info(f"[{endpoint}] {model} won, cancelling {len(pending)} slower request(s)")
+                    return result
+                logger.warning(f"[{endpoint}] {model} returned an invalid response")
+                last_invalid = result
+
+            # Failover: start the next model right away when nothing is in flight
+            if not pending and next_index < len(models):
+                launch()
+    finally:
+        for task in pending:
+            task.cancel()
+
+    if last_invalid is not None:
+        return last_invalid
+    raise Exception(f"All models failed. Last error: {last_error}")
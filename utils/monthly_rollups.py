@@ -0,0 +1,250 @@
+"""Per-user monthly health rollups for annual reports
+
+A rollup holds one month's interaction counts, symptom and condition
+histograms, severity stats and urgency distribution. Closed months are
+computed once and stored in health_monthly_rollups (on first read after the
+month ends, or by the monthly background job); the current month is always
+computed live. Histograms keep sums rather than averages so months can be
+merged into a year with merge_rollups.
+"""
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from supabase_client import supabase
+from utils.fetch_plan import FetchSource, execute_fetch_plan
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_TABLE = "health_monthly_rollups"
+MAX_HISTOGRAM_ENTRIES = 50  # per month; the long tail never reaches a report
+DEFAULT_PAIN_LEVEL = 5  # quick scans with symptoms but no pain level
+
+# Sources the rollup only counts: count name -> table
+COUNTED_TABLES = {
+    "photo_sessions": "photo_sessions",
+    "general_assessments": "general_assessments",
+    "flash_assessments": "flash_assessments",
+    "health_stories": "health_stories",
+    "population_health_alerts": "population_health_alerts",
+    "medications": "medication_tracking",
+    "llm_summaries": "oracle_chats",
+}
+
+
+def month_key(moment: datetime) -> str:
+    return moment.strftime("%Y-%m")
+
+
+def month_bounds(month: str) -> tuple:
+    """ISO start of the month and of the next month, in UTC"""
+    year, mon = (int(part) for part in month.split("-"))
+    start = datetime(year, mon, 1, tzinfo=timezone.utc)
+    end = datetime(year + mon // 12, mon % 12 + 1, 1, tzinfo=timezone.utc)
+    return start.isoformat(), end.isoformat()
+
+
+def months_between(first: str, last: str) -> List[str]:
+    """Inclusive list of YYYY-MM keys"""
+    year, mon = (int(part) for part in first.split("-"))
+    months = []
+    while f"{year:04d}-{mon:02d}" <= last:
+        months.append(f"{year:04d}-{mon:02d}")
+        year, mon = (year + 1, 1) if mon == 12 else (year, mon + 1)
+    return months
+
+
+def _number(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _bump(histogram: Dict[str, Any], key: Any, severity: Optional[float] = None):
+    if not key:
+        return
+    entry = histogram.setdefault(str(key), {"count": 0, "severity_sum": 0.0})
+    entry["count"] += 1
+    if severity is not None:
+        entry["severity_sum"] += severity
+
+
+def _trim(histogram: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    top = sorted(histogram.items(), key=lambda item: item[1]["count"], reverse=True)
+    return dict(top[:MAX_HISTOGRAM_ENTRIES])
+
+
+def _severity_stats(values: List[float]) -> Dict[str, Any]:
+    if not values:
+        return {"count": 0, "sum": 0.0, "min": None, "max": None}
+    return {"count": len(values), "sum": sum(values), "min": min(values), "max": max(values)}
+
+
+def build_rollup(user_id: str, month: str, rows: Dict[str, List[dict]]) -> Dict[str, Any]:
+    """Aggregate one month of (projected) rows into a rollup"""
+    symptom_frequency: Dict[str, Any] = {}
+    tracked_symptoms: Dict[str, Any] = {}
+    conditions: Dict[str, Any] = {}
+    urgency: Dict[str, int] = {}
+    severities: List[float] = []
+
+    for scan in rows.get("quick_scans", []):
+        pain = _number(scan.get("pain_level"))
+        if scan.get("symptoms"):
+            _bump(symptom_frequency, scan["symptoms"], pain if pain is not None else DEFAULT_PAIN_LEVEL)
+        if pain is not None:
+            severities.append(pain)
+        _bump(conditions, scan.get("condition"))
+        level = scan.get("urgency") or scan.get("urgency_level")
+        if level:
+            urgency[str(level).lower()] = urgency.get(str(level).lower(), 0) + 1
+
+    for dive in rows.get("deep_dives", []):
+        _bump(conditions, dive.get("condition"))
+
+    for entry in rows.get("symptom_tracking", []):
+        severity = _number(entry.get("severity"))
+        _bump(tracked_symptoms, entry.get("symptom_name"), severity)
+        if severity is not None:
+            severities.append(severity)
+
+    counts = {name: len(rows.get(name, [])) for name in ("quick_scans", "deep_dives", "symptom_tracking", *COUNTED_TABLES)}
+    return {
+        "user_id": user_id,
+        "month": month,
+        "counts": counts,
+        "symptom_frequency": _trim(symptom_frequency),
+        "tracked_symptoms": _trim(tracked_symptoms),
+        "conditions": _trim(conditions),
+        "urgency_distribution": urgency,
+        "severity": _severity_stats(severities),
+        "computed_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+async def compute_month_rollup(user_id: str, month: str) -> Dict[str, Any]:
+    """Read one month's rows (only the columns the rollup needs) and aggregate them"""
+    start, end = month_bounds(month)
+    user_id_str = str(user_id)
+
+    def in_month(table: str, columns: str, owner: str, **filters):
+        def build(deps):
+            query = supabase.table(table).select(columns).eq("user_id", owner)
+            for column, value in filters.items():
+                query = query.eq(column, value)
+            return query.gte("created_at", start).lt("created_at", end)
+        return build
+
+    plan = [
+        FetchSource("quick_scans", in_month(
+            "quick_scans",
+            "created_at, urgency_level, symptoms:form_data->>symptoms, pain_level:form_data->>painLevel, "
+            "condition:analysis_result->>primaryCondition, urgency:analysis_result->>urgency",
+            user_id_str)),
+        FetchSource("deep_dives", in_month(
+            "deep_dive_sessions", "created_at, condition:final_analysis->>primaryCondition",
+            user_id_str, status="completed")),
+        FetchSource("symptom_tracking", in_month(
+            "symptom_tracking", "created_at, symptom_name, severity", user_id_str)),
+        *[FetchSource(name, in_month(table, "created_at", user_id_str)) for name, table in COUNTED_TABLES.items()],
+    ]
+    result = await execute_fetch_plan(plan)
+    result.log_timings(f"ROLLUP {month}")
+    return build_rollup(user_id, month, result.data)
+
+
+def _is_final(rollup: Dict[str, Any]) -> bool:
+    """Stored rollups computed before their month ended are incomplete"""
+    _, end = month_bounds(rollup["month"])
+    return str(rollup.get("computed_at") or "") >= end
+
+
+async def close_month(user_id: str, month: str) -> Dict[str, Any]:
+    """Compute and store a finished month's rollup"""
+    rollup = await compute_month_rollup(user_id, month)
+    try:
+        await asyncio.to_thread(
+            supabase.table(ROLLUP_TABLE).upsert(rollup, on_conflict="user_id,month").execute
+        )
+    except Exception as e:
+        logger.warning(f"Failed to store {month} rollup for {user_id}: {e}")
+    return rollup
+
+
+async def get_monthly_rollups(user_id: str, first_month: str, last_month: str,
+                              now: Optional[datetime] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Rollups for every month in [first_month, last_month] up to the current one.
+
+    Stored rollups are used for closed months (missing ones are computed and
+    stored now); the current month is computed live and never stored.
+    """
+    current = month_key(now or datetime.now(timezone.utc))
+    months = [month for month in months_between(first_month, last_month) if month <= current]
+
+    stored: Dict[str, Dict[str, Any]] = {}
+    try:
+        response = await asyncio.to_thread(
+            supabase.table(ROLLUP_TABLE).select("*").eq("user_id", str(user_id))
+            .gte("month", first_month).lte("month", last_month).execute
+        )
+        stored = {row["month"]: row for row in response.data or [] if _is_final(row)}
+    except Exception as e:
+        logger.warning(f"Could not read monthly rollups for {user_id}, computing live: {e}")
+
+    missing = [month for month in months if month not in stored]
+    computed = await asyncio.gather(*[
+        compute_month_rollup(user_id, month) if month == current else close_month(user_id, month)
+        for month in missing
+    ])
+    rollups = {**stored, **{rollup["month"]: rollup for rollup in computed}}
+    return {month: rollups[month] for month in months}
+
+
+def _merge_histograms(histograms: List[Dict[str, Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+    merged: Dict[str, Dict[str, Any]] = {}
+    for histogram in histograms:
+        for key, entry in (histogram or {}).items():
+            target = merged.setdefault(key, {"count": 0, "severity_sum": 0.0})
+            target["count"] += entry.get("count", 0)
+            target["severity_sum"] += entry.get("severity_sum", 0.0)
+    return merged
+
+
+def merge_rollups(rollups: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Combine monthly rollups into one period rollup"""
+    counts: Dict[str, int] = {}
+    urgency: Dict[str, int] = {}
+    severity = {"count": 0, "sum": 0.0, "min": None, "max": None}
+    for rollup in rollups:
+        for name, value in (rollup.get("counts") or {}).items():
+            counts[name] = counts.get(name, 0) + value
+        for level, value in (rollup.get("urgency_distribution") or {}).items():
+            urgency[level] = urgency.get(level, 0) + value
+        month_severity = rollup.get("severity") or {}
+        if month_severity.get("count"):
+            severity["count"] += month_severity["count"]
+            severity["sum"] += month_severity["sum"]
+            severity["min"] = min(v for v in (severity["min"], month_severity["min"]) if v is not None)
+            severity["max"] = max(v for v in (severity["max"], month_severity["max"]) if v is not None)
+
+    return {
+        "counts": counts,
+        "symptom_frequency": _merge_histograms([r.get("symptom_frequency") for r in rollups]),
+        "tracked_symptoms": _merge_histograms([r.get("tracked_symptoms") for r in rollups]),
+        "conditions": _merge_histograms([r.get("conditions") for r in rollups]),
+        "urgency_distribution": urgency,
+        "severity": severity,
+    }
+
+
+def top_entries(histogram: Dict[str, Dict[str, Any]], limit: int = 10) -> List[Dict[str, Any]]:
+    """Most frequent histogram keys with their average severity"""
+    ranked = sorted(histogram.items(), key=lambda item: item[1]["count"], reverse=True)[:limit]
+    return [
+        {"name": key, "frequency": entry["count"],
+         "average_severity": round(entry["severity_sum"] / entry["count"], 1) if entry["count"] else 0.0}
+        for key, entry in ranked
+    ]
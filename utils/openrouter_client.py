@@ -0,0 +1,198 @@
+"""
+Async OpenRouter client used by every LLM call site
+
+Requests go through the shared HTTP pool in core/resources.py, so nothing
+here blocks the event loop. Transient failures (timeouts, connection
+errors, 429 and 5xx) are retried with backoff; when the response carries
+Retry-After that wait is used instead, and a Retry-After longer than
+OPENROUTER_MAX_RETRY_AFTER_SECONDS fails fast so the caller can move on to
+another model rather than hold the request open.
+
+Each model has its own circuit breaker (services/enhanced_retry_system).
+After OPENROUTER_BREAKER_FAILURES failed calls in a row the model is
+skipped with CircuitOpenError until the cooldown passes and a trial call
+succeeds.
+"""
+import os
+import time
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+import httpx
+
+from core.resources import resources
+from services.enhanced_retry_system import (
+    CircuitBreakerConfig,
+    CircuitState,
+    ErrorClassifier,
+    RetryConfig,
+    RetryManager,
+)
+
+logger = logging.getLogger(__name__)
+
+OPENROUTER_URL = "https://openrouter.ai/api/v1/chat/completions"
+OPENROUTER_MAX_RETRIES = int(os.getenv("OPENROUTER_MAX_RETRIES", "3"))
+OPENROUTER_MAX_RETRY_AFTER = float(os.getenv("OPENROUTER_MAX_RETRY_AFTER_SECONDS", "30"))
+OPENROUTER_BREAKER_FAILURES = int(os.getenv("OPENROUTER_BREAKER_FAILURES", "5"))
+OPENROUTER_BREAKER_COOLDOWN = float(os.getenv("OPENROUTER_BREAKER_COOLDOWN_SECONDS", "60"))
+
+
+class OpenRouterError(Exception):
+    """A chat completion that failed after retries (status_code is None for network errors)"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(OpenRouterError):
+    """The model's circuit breaker is open; the call was not attempted"""
+
+    def __init__(self, model: str):
+        super().__init__(f"Circuit open for {model}", status_code=503)
+        self.model = model
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class OpenRouterClient:
+    def __init__(self, max_retries: int = OPENROUTER_MAX_RETRIES):
+        self.max_retries = max_retries
+        # RetryManager supplies the backoff schedule and per-key circuit breakers
+        self.retry = RetryManager(
+            config=RetryConfig(
+                max_attempts=max_retries,
+                initial_delay=1.0,
+                max_delay=OPENROUTER_MAX_RETRY_AFTER,
+                jitter_range=(0.0, 0.25),
+            ),
+            circuit_config=CircuitBreakerConfig(
+                failure_threshold=OPENROUTER_BREAKER_FAILURES,
+                success_threshold=1,
+                timeout=timedelta(seconds=OPENROUTER_BREAKER_COOLDOWN),
+                half_open_requests=1,
+            ),
+        )
+        self.stats = {"calls": 0, "retries": 0, "failures": 0, "circuit_rejections": 0}
+
+    def _headers(self, extra: Optional[Dict[str, str]]) -> Dict[str, str]:
+        headers = {
+            "Authorization": f"Bearer {os.getenv('OPENROUTER_API_KEY')}",
+            "Content-Type": "application/json",
+        }
+        headers.update(extra or {})
+        return headers
+
+    async def chat_completion(
+        self,
+        payload: Dict[str, Any],
+        headers: Optional[Dict[str, str]] = None,
+        timeout: float = 240,
+        max_retries: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """POST payload to /chat/completions and return the decoded response
+
+        Raises CircuitOpenError without calling OpenRouter while the model's
+        breaker is open, and OpenRouterError once retries are exhausted.
+        """
+        model = payload.get("model") or "default"
+        breaker = self.retry.get_circuit_breaker(model)
+        if not breaker.should_attempt():
+            self.stats["circuit_rejections"] += 1
+            raise CircuitOpenError(model)
+
+        self.stats["calls"] += 1
+        attempts = max_retries or self.max_retries
+        request_headers = self._headers(headers)
+        try:
+            for attempt in range(attempts):
+                started = time.monotonic()
+                retry_after = None
+                try:
+                    response = await resources.http().post(
+                        OPENROUTER_URL, headers=request_headers, json=payload, timeout=timeout
+                    )
+                    response.raise_for_status()
+                    data = response.json()
+                    breaker.record_success()
+                    return data
+                except Exception as e:
+                    error = e
+                    if isinstance(e, httpx.HTTPStatusError):
+                        retry_after = parse_retry_after(e.response.headers.get("Retry-After"))
+
+                should_retry, reason = ErrorClassifier.should_retry(error)
+                status_code = error.response.status_code if isinstance(error, httpx.HTTPStatusError) else None
+                if not should_retry:
+                    # A bad request says nothing about the model's health: leave the breaker as it is
+                    _release_trial(breaker)
+                    raise OpenRouterError(f"{model}: {reason}: {_describe(error)}", status_code) from error
+
+                if retry_after is not None:
+                    delay = retry_after
+                else:
+                    delay = self.retry.calculate_delay(attempt, ErrorClassifier.get_retry_strategy(error))
+                if attempt == attempts - 1 or delay > OPENROUTER_MAX_RETRY_AFTER:
+                    breaker.record_failure()
+                    self.stats["failures"] += 1
+                    raise OpenRouterError(
+                        f"{model}: failed after {attempt + 1} attempt(s): {_describe(error)}",
+                        status_code, retry_after
+                    ) from error
+
+                self.stats["retries"] += 1
+                logger.info(
+                    f"OpenRouter {model} attempt {attempt + 1}/{attempts} failed after "
+                    f"{time.monotonic() - started:.1f}s ({reason}); retrying in {delay:.1f}s"
+                )
+                await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            # A cancelled trial call (e.g. a hedged loser) must not use up the half-open slot
+            _release_trial(breaker)
+            raise
+
+    def status(self) -> Dict[str, Any]:
+        """Call counters and the state of every model's circuit breaker"""
+        return {
+            **self.stats,
+            "circuits": {
+                model: {"state": cb.state.value, "failure_count": cb.failure_count}
+                for model, cb in self.retry.circuit_breakers.items()
+            },
+        }
+
+
+def _release_trial(breaker):
+    """Give back a half-open trial slot for a call that says nothing about the model"""
+    if breaker.state == CircuitState.HALF_OPEN:
+        breaker.half_open_attempts = max(0, breaker.half_open_attempts - 1)
+
+
+def _describe(error: Exception) -> str:
+    if isinstance(error, httpx.HTTPStatusError):
+        return f"HTTP {error.response.status_code}: {error.response.text[:200]}"
+    return f"{type(error).__name__}: {error}"
+
+
+openrouter = OpenRouterClient()
@@ -0,0 +1,398 @@
+"""PDF health report rendering
+
+Reports are rendered by ReportLab in a process pool (a large report holds the
+GIL for seconds) straight into files of an on-disk LRU cache. Uploads and
+downloads then stream from that file, so the document is never held as one
+more in-memory copy. The cache key covers the story ids, the export options
+and a digest of the rendered data, so an edited story renders again while a
+repeated export of unchanged stories is served from disk. ReportLab itself is
+only imported by the render workers, never by the API process.
+
+The PDFs are patient data: the cache lives in PDF_CACHE_DIR, by default the
+service user's own cache dir (never the shared system temp dir), and the
+directory is made private (0700).
+"""
+import os
+import json
+import asyncio
+import hashlib
+import logging
+import tempfile
+import threading
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PDF_RENDER_WORKERS = int(os.getenv("PDF_RENDER_WORKERS", "2"))
+PDF_CACHE_MAX_BYTES = int(os.getenv("PDF_CACHE_MAX_MB", "256")) * 1024 * 1024
+PDF_STREAM_CHUNK_BYTES = 64 * 1024
+
+
+def report_cache_key(user_id: str, story_ids: List[str], options: Dict[str, Any],
+                     user_info: Dict[str, Any], stories_data: List[Dict]) -> str:
+    """Hash of (story_ids, options) plus a digest of the data the PDF shows"""
+    digest = hashlib.sha256()
+    digest.update(json.dumps([user_id, sorted(story_ids), options], sort_keys=True).encode())
+    digest.update(json.dumps([user_info.get("name"), stories_data], sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+class PdfFileCache:
+    """On-disk LRU of rendered reports, keyed by report_cache_key.
+
+    Callers render into a path from reserve() and hand it to commit(); the
+    index is rebuilt from file mtimes after a restart. Safe to use from
+    worker threads.
+    """
+
+    def __init__(self, root_dir: str, max_bytes: int = PDF_CACHE_MAX_BYTES):
+        self.root_dir = root_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        os.makedirs(root_dir, mode=0o700, exist_ok=True)
+        # makedirs leaves the mode of an existing directory alone
+        os.chmod(root_dir, 0o700)
+        self._load_index()
+
+    def _load_index(self):
+        files = []
+        for name in os.listdir(self.root_dir):
+            path = os.path.join(self.root_dir, name)
+            if name.startswith(".tmp_"):
+                os.unlink(path)  # an interrupted render
+                continue
+            stat = os.stat(path)
+            files.append((stat.st_mtime, name, stat.st_size))
+        for _, name, size in sorted(files):
+            self._entries[name] = size
+            self._total_bytes += size
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root_dir, f"{key}.pdf")
+
+    def get(self, key: str) -> Optional[Tuple[str, int]]:
+        """Path and size of a cached report"""
+        name = f"{key}.pdf"
+        with self._lock:
+            if name not in self._entries:
+                return None
+            self._entries.move_to_end(name)
+            size = self._entries[name]
+        try:
+            os.utime(self._path(key))
+        except FileNotFoundError:
+            with self._lock:
+                self._total_bytes -= self._entries.pop(name, 0)
+            return None
+        return self._path(key), size
+
+    def reserve(self) -> str:
+        fd, tmp_path = tempfile.mkstemp(dir=self.root_dir, prefix=".tmp_", suffix=".pdf")
+        os.close(fd)
+        return tmp_path
+
+    def commit(self, key: str, tmp_path: str) -> Tuple[str, int]:
+        name, path = f"{key}.pdf", self._path(key)
+        size = os.path.getsize(tmp_path)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._total_bytes -= self._entries.pop(name, 0)
+            self._entries[name] = size
+            self._total_bytes += size
+            evicted = []
+            # The newest entry always stays, even when it alone exceeds the limit
+            while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+                old_name, old_size = self._entries.popitem(last=False)
+                self._total_bytes -= old_size
+                evicted.append(old_name)
+
+        for old_name in evicted:
+            try:
+                os.unlink(os.path.join(self.root_dir, old_name))
+            except FileNotFoundError:
+                pass
+        return path, size
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._total_bytes, "max_bytes": self.max_bytes}
+
+
+_cache: Optional[PdfFileCache] = None
+_render_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def pdf_cache_dir() -> str:
+    """PDF_CACHE_DIR, or oracle/pdf under the user's XDG cache dir"""
+    configured = os.getenv("PDF_CACHE_DIR")
+    if configured:
+        return configured
+    base = os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "oracle", "pdf")
+
+
+def get_pdf_cache() -> PdfFileCache:
+    """Get the process-wide rendered report cache"""
+    global _cache
+    if _cache is None:
+        _cache = PdfFileCache(pdf_cache_dir())
+    return _cache
+
+
+def get_render_pool() -> ProcessPoolExecutor:
+    """Worker processes for ReportLab; spawned, so they never inherit the app's threads"""
+    global _render_pool
+    with _pool_lock:
+        if _render_pool is None:
+            _render_pool = ProcessPoolExecutor(
+                max_workers=PDF_RENDER_WORKERS, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _render_pool
+
+
+def shutdown_render_pool():
+    global _render_pool
+    with _pool_lock:
+        if _render_pool is not None:
+            _render_pool.shutdown(wait=False, cancel_futures=True)
+            _render_pool = None
+
+
+def create_pdf_styles():
+    """Create custom styles for the PDF"""
+    from reportlab.lib import colors
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.enums import TA_CENTER
+
+    styles = getSampleStyleSheet()
+
+    # Custom styles
+    styles.add(ParagraphStyle(
+        name='CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=28,
+        textColor=colors.HexColor('#6B46C1'),
+        spaceAfter=30,
+        alignment=TA_CENTER
+    ))
+
+    styles.add(ParagraphStyle(
+        name='SectionTitle',
+        parent=styles['Heading2'],
+        fontSize=18,
+        textColor=colors.HexColor('#6B46C1'),
+        spaceAfter=20,
+        spaceBefore=30
+    ))
+
+    styles.add(ParagraphStyle(
+        name='InsightPositive',
+        parent=styles['Normal'],
+        fontSize=11,
+        leftIndent=20,
+        textColor=colors.HexColor('#10b981')
+    ))
+
+    styles.add(ParagraphStyle(
+        name='InsightWarning',
+        parent=styles['Normal'],
+        fontSize=11,
+        leftIndent=20,
+        textColor=colors.HexColor('#f59e0b')
+    ))
+
+    styles.add(ParagraphStyle(
+        name='InsightNeutral',
+        parent=styles['Normal'],
+        fontSize=11,
+        leftIndent=20,
+        textColor=colors.HexColor('#6b7280')
+    ))
+
+    return styles
+
+
+def render_health_report_pdf(path: str, user_info: Dict, stories_data: List[Dict],
+                             include_analysis: bool, include_notes: bool, generated_at: datetime) -> int:
+    """Render the health report into path and return its size (runs in a worker process)"""
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import letter
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak
+    from reportlab.lib.styles import ParagraphStyle
+    from reportlab.lib.units import inch
+    from reportlab.lib.enums import TA_CENTER
+
+    doc = SimpleDocTemplate(path, pagesize=letter, topMargin=0.75*inch, bottomMargin=0.75*inch)
+    elements = []
+    styles = create_pdf_styles()
+
+    # Title page
+    elements.append(Paragraph("Health Intelligence Report", styles['CustomTitle']))
+    elements.append(Spacer(1, 0.3*inch))
+
+    # Report metadata
+    elements.append(Paragraph(f"<b>Prepared for:</b> {user_info.get('name', 'User')}", styles['Normal']))
+    elements.append(Paragraph(f"<b>Generated:</b> {generated_at.strftime('%B %d, %Y at %I:%M %p')}", styles['Normal']))
+    elements.append(Paragraph(f"<b>Report Period:</b> {len(stories_data)} health stories included", styles['Normal']))
+    elements.append(Spacer(1, 0.5*inch))
+
+    # Disclaimer
+    disclaimer_style = ParagraphStyle(
+        'Disclaimer',
+        parent=styles['Normal'],
+        fontSize=9,
+        textColor=colors.HexColor('#9ca3af'),
+        borderColor=colors.HexColor('#e5e7eb'),
+        borderWidth=1,
+        borderPadding=10,
+        backColor=colors.HexColor('#f9fafb')
+    )
+
+    elements.append(Paragraph(
+        "<b>Important:</b> This report is for informational purposes only and does not constitute medical advice. "
+        "Always consult with qualified healthcare professionals for medical decisions.",
+        disclaimer_style
+    ))
+
+    elements.append(PageBreak())
+
+    # Process each story
+    for idx, data in enumerate(stories_data):
+        story = data['story']
+
+        # Story header
+        elements.append(Paragraph(f"Health Story #{idx + 1}", styles['SectionTitle']))
+        elements.append(Paragraph(f"Week of {story['created_at'][:10]}", styles['Italic']))
+        elements.append(Spacer(1, 0.2*inch))
+
+        # Story content
+        elements.append(Paragraph(story['story_text'], styles['Normal']))
+
+        # Personal note if included
+        if include_notes and data.get('notes'):
+            elements.append(Spacer(1, 0.3*inch))
+            elements.append(Paragraph("<b>Personal Note:</b>", styles['Heading3']))
+            elements.append(Paragraph(data['notes']['content'], styles['Italic']))
+
+        # Analysis section
+        if include_analysis:
+            elements.append(Spacer(1, 0.3*inch))
+
+            # Insights
+            if data['insights']:
+                elements.append(Paragraph("Key Insights", styles['Heading3']))
+                for insight in data['insights']:
+                    style_name = f"Insight{insight['insight_type'].capitalize()}"
+                    if style_name not in styles:
+                        style_name = 'Normal'
+
+                    elements.append(Paragraph(
+                        f"• <b>{insight['title']}</b> - {insight['description']} "
+                        f"<i>(Confidence: {insight['confidence']}%)</i>",
+                        styles[style_name]
+                    ))
+                elements.append(Spacer(1, 0.2*inch))
+
+            # Predictions
+            if data['predictions']:
+                elements.append(Paragraph("Health Outlook", styles['Heading3']))
+                for pred in data['predictions']:
+                    preventable_text = " (Preventable)" if pred.get('preventable') else ""
+                    elements.append(Paragraph(
+                        f"• {pred['event_description']} - {pred['probability']}% likelihood "
+                        f"{pred['timeframe'].lower()}{preventable_text}",
+                        styles['Normal']
+                    ))
+                    if pred.get('reasoning'):
+                        elements.append(Paragraph(
+                            f"  <i>Reasoning: {pred['reasoning']}</i>",
+                            styles['Italic']
+                        ))
+                elements.append(Spacer(1, 0.2*inch))
+
+        # Add page break between stories (except for last one)
+        if idx < len(stories_data) - 1:
+            elements.append(PageBreak())
+
+    # Summary page
+    if include_analysis and len(stories_data) > 1:
+        elements.append(PageBreak())
+        elements.append(Paragraph("Summary Analysis", styles['SectionTitle']))
+
+        # Aggregate insights
+        total_insights = sum(len(d['insights']) for d in stories_data)
+        total_predictions = sum(len(d['predictions']) for d in stories_data)
+
+        elements.append(Paragraph(
+            f"Across {len(stories_data)} health stories, we identified {total_insights} key insights "
+            f"and {total_predictions} health predictions.",
+            styles['Normal']
+        ))
+
+    # Footer
+    elements.append(Spacer(1, 0.5*inch))
+    elements.append(Paragraph(
+        "Generated by Proxima-1 Health Intelligence • proxima-1.health",
+        ParagraphStyle(
+            'Footer',
+            parent=styles['Normal'],
+            fontSize=9,
+            alignment=TA_CENTER,
+            textColor=colors.HexColor('#9ca3af')
+        )
+    ))
+
+    # Build PDF
+    doc.build(elements)
+    return os.path.getsize(path)
+
+
+async def render_report(cache_key: str, user_info: Dict, stories_data: List[Dict],
+                        include_analysis: bool, include_notes: bool) -> Tuple[str, int, bool]:
+    """
+    Path and size of the rendered report, and whether it came from the cache.
+
+    Renders in the process pool; if the pool is unavailable (e.g. a worker
+    died) the render falls back to a thread.
+    """
+    cache = get_pdf_cache()
+    cached = cache.get(cache_key)
+    if cached:
+        return cached[0], cached[1], True
+
+    tmp_path = cache.reserve()
+    args = (tmp_path, user_info, stories_data, include_analysis, include_notes, datetime.now())
+    try:
+        try:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(get_render_pool(), render_health_report_pdf, *args)
+        except BrokenProcessPool:
+            logger.warning("PDF render pool broken, rendering in a thread")
+            shutdown_render_pool()
+            await asyncio.to_thread(render_health_report_pdf, *args)
+        path, size = await asyncio.to_thread(cache.commit, cache_key, tmp_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return path, size, False
+
+
+def iter_file(handle, chunk_size: int = PDF_STREAM_CHUNK_BYTES) -> Iterator[bytes]:
+    """Stream an open file in chunks and close it at the end"""
+    try:
+        while True:
+            chunk = handle.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        handle.close()
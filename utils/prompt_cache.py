@@ -0,0 +1,108 @@
+"""Provider prompt caching for call_llm
+
+Providers bill cached prompt tokens at a fraction of the normal rate and
+answer faster when a request starts with a prefix they have seen recently.
+Our system prompts are long instructions followed by a short user-specific
+tail, so the instructions are the prefix worth caching.
+
+The cacheable prefix of the leading system message is either
+- the stable prefix of the prompts/ template it was rendered from (found
+  through the prompt registry), or
+- the whole system message, when the caller passes a cache key to say it is
+  the same for every user.
+
+OpenAI, DeepSeek and Grok cache matching prefixes automatically, so their
+requests are sent unchanged. Anthropic and Gemini only cache up to an
+explicit breakpoint, so for those models the system message is split into
+a cached text part carrying cache_control and the uncached tail.
+
+Every call's usage is recorded per endpoint: prompt and cached tokens, hit
+rate and latency with and without a cache hit.
+"""
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from core.prompt_registry import prompt_registry
+
+PROMPT_CACHE_ENABLED = os.getenv("PROMPT_CACHE_ENABLED", "true").lower() == "true"
+# Model prefixes that need a cache_control breakpoint to cache at all
+BREAKPOINT_MODELS = ("anthropic/", "google/gemini")
+
+
+def cacheable_prefix(messages: List[Dict[str, Any]], cache_key: Optional[str] = None) -> Tuple[Optional[str], Optional[str]]:
+    """(prefix, label) for the leading system message, (None, None) if nothing is stable"""
+    if not messages or messages[0].get("role") != "system" or not isinstance(messages[0].get("content"), str):
+        return None, None
+    content = messages[0]["content"]
+    if cache_key:
+        return content, cache_key
+    template = prompt_registry.match_prefix(content)
+    if template is None:
+        return None, None
+    return template.stable_prefix, template.name
+
+
+def apply_prompt_cache(messages: List[Dict[str, Any]], model: str,
+                       cache_key: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Messages with a cache breakpoint after the stable prefix where the model needs one, and its label"""
+    prefix, label = cacheable_prefix(messages, cache_key)
+    if not PROMPT_CACHE_ENABLED or prefix is None or not model.lower().startswith(BREAKPOINT_MODELS):
+        return messages, label
+
+    tail = messages[0]["content"][len(prefix):]
+    parts = [{"type": "text", "text": prefix, "cache_control": {"type": "ephemeral"}}]
+    if tail:
+        parts.append({"type": "text", "text": tail})
+    # A new list: hedged and fallback calls share the caller's messages
+    return [{**messages[0], "content": parts}] + messages[1:], label
+
+
+def cached_tokens(usage: Dict[str, Any]) -> int:
+    """Prompt tokens served from the provider cache, as reported in usage"""
+    details = usage.get("prompt_tokens_details") or {}
+    return details.get("cached_tokens") or usage.get("cache_read_input_tokens") or 0
+
+
+class PromptCacheStats:
+    """Per-endpoint prompt and cached token counts and latency by hit or miss"""
+
+    def __init__(self):
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint: str, usage: Dict[str, Any], seconds: float):
+        cached = cached_tokens(usage)
+        outcome = "hit" if cached else "miss"
+        with self._lock:
+            stats = self._stats.setdefault(endpoint, {
+                "calls": 0, "prompt_tokens": 0, "cached_tokens": 0,
+                "hit": 0, "hit_seconds": 0.0, "miss": 0, "miss_seconds": 0.0,
+            })
+            stats["calls"] += 1
+            stats["prompt_tokens"] += usage.get("prompt_tokens") or 0
+            stats["cached_tokens"] += cached
+            stats[outcome] += 1
+            stats[f"{outcome}_seconds"] += seconds
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            items = [(endpoint, dict(stats)) for endpoint, stats in sorted(self._stats.items())]
+        report = {}
+        for endpoint, s in items:
+            hit_ms = round(1000 * s["hit_seconds"] / s["hit"]) if s["hit"] else None
+            miss_ms = round(1000 * s["miss_seconds"] / s["miss"]) if s["miss"] else None
+            report[endpoint] = {
+                "calls": s["calls"],
+                "hit_rate": round(s["hit"] / s["calls"], 3),
+                "prompt_tokens": s["prompt_tokens"],
+                "cached_tokens": s["cached_tokens"],
+                "cached_token_ratio": round(s["cached_tokens"] / s["prompt_tokens"], 3) if s["prompt_tokens"] else 0.0,
+                "avg_hit_ms": hit_ms,
+                "avg_miss_ms": miss_ms,
+                "latency_saved_ms": miss_ms - hit_ms if hit_ms is not None and miss_ms is not None else None,
+            }
+        return report
+
+
+prompt_cache_stats = PromptCacheStats()
@@ -0,0 +1,166 @@
+"""Paginated, projected reads of medical_reports
+
+Report lists select only the columns a list view shows and page with an
+opaque keyset cursor on (created_at, id), newest first, so a page costs the
+same no matter how deep it is. The heavy report_data JSON is only read by the
+detail endpoint (full row) and the data endpoint (just the body). Detail reads
+without the body project every other column instead of fetching the row and
+dropping report_data.
+"""
+import json
+import gzip
+import base64
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import Request, Response
+
+from supabase_client import supabase
+
+logger = logging.getLogger(__name__)
+
+# Columns every medical_reports row has (see safe_insert_report essentials)
+REPORT_LIST_COLUMNS = "id, report_type, created_at, executive_summary, confidence_score, model_used"
+# Every medical_reports column except report_data (migrations/medical_reports_keyset.sql adds any missing)
+REPORT_SUMMARY_COLUMNS = (
+    "id, user_id, analysis_id, report_type, created_at, executive_summary, confidence_score, model_used, "
+    "data_sources, time_range, specialty, year, metadata, last_accessed, access_count, "
+    "doctor_reviewed, last_modified, report_version, is_draft"
+)
+REPORT_DATA_COLUMNS = "id, report_data, executive_summary"
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+GZIP_MIN_BYTES = 1024
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(row: Dict[str, Any]) -> str:
+    raw = json.dumps([row["created_at"], row["id"]], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    try:
+        created_at, report_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except Exception:
+        raise InvalidCursor("Invalid cursor")
+    if not isinstance(created_at, str) or not isinstance(report_id, str):
+        raise InvalidCursor("Invalid cursor")
+    return created_at, report_id
+
+
+def _quoted(value: str) -> str:
+    """PostgREST filter value; quoting keeps ':' '+' ',' in timestamps literal"""
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+async def list_reports_page(user_id: str, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None,
+                            since: Optional[str] = None) -> Dict[str, Any]:
+    """
+    One page of a user's reports, newest first.
+
+    Returns {"items", "next_cursor", "has_more"}; pass next_cursor back to get
+    the following page. Raises InvalidCursor for a malformed cursor.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    query = supabase.table("medical_reports")\
+        .select(REPORT_LIST_COLUMNS)\
+        .eq("user_id", user_id)
+    if since:
+        query = query.gte("created_at", since)
+    if cursor:
+        created_at, report_id = decode_cursor(cursor)
+        query = query.or_(
+            f"created_at.lt.{_quoted(created_at)},"
+            f"and(created_at.eq.{_quoted(created_at)},id.lt.{_quoted(report_id)})"
+        )
+    query = query.order("created_at", desc=True).order("id", desc=True).limit(limit + 1)
+
+    response = await asyncio.to_thread(query.execute)
+    rows = response.data or []
+    items = rows[:limit]
+    has_more = len(rows) > limit
+    return {
+        "items": items,
+        "next_cursor": encode_cursor(items[-1]) if has_more else None,
+        "has_more": has_more
+    }
+
+
+async def list_all_reports(user_id: str, since: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Every one of a user's reports, newest first, read a page at a time"""
+    items, cursor = [], None
+    while True:
+        page = await list_reports_page(user_id, limit=MAX_PAGE_SIZE, cursor=cursor, since=since)
+        items.extend(page["items"])
+        if not page["has_more"]:
+            return items
+        cursor = page["next_cursor"]
+
+
+async def _fetch_report(report_id: str, columns: str) -> Optional[Dict[str, Any]]:
+    response = await asyncio.to_thread(
+        supabase.table("medical_reports").select(columns).eq("id", report_id).limit(1).execute
+    )
+    return response.data[0] if response.data else None
+
+
+async def get_report(report_id: str, include_data: bool = True) -> Optional[Dict[str, Any]]:
+    """The full report row by id; include_data=False leaves the report_data body in the database"""
+    if include_data:
+        return await _fetch_report(report_id, "*")
+    try:
+        return await _fetch_report(report_id, REPORT_SUMMARY_COLUMNS)
+    except Exception as e:
+        # A database without the medical_reports_keyset migration may lack some columns
+        logger.warning(f"Projected report read failed, reading the full row: {e}")
+        report = await _fetch_report(report_id, "*")
+        if report is not None:
+            report.pop("report_data", None)
+        return report
+
+
+async def get_report_body(report_id: str) -> Optional[Dict[str, Any]]:
+    """id, report_data and executive_summary of a report (what the data endpoint returns)"""
+    return await _fetch_report(report_id, REPORT_DATA_COLUMNS)
+
+
+def with_report_data_defaults(report: Dict[str, Any]) -> Dict[str, Any]:
+    """Make sure report_data has an executive_summary the frontend can render"""
+    if report.get("report_data") and isinstance(report["report_data"], dict):
+        # Ensure all expected fields exist
+        report_data = report["report_data"]
+        if "executive_summary" not in report_data:
+            report_data["executive_summary"] = {
+                "one_page_summary": report.get("executive_summary", "No summary available"),
+                "chief_complaints": [],
+                "key_findings": [],
+                "urgency_indicators": [],
+                "action_items": []
+            }
+    else:
+        # Create minimal structure if report_data is missing
+        report["report_data"] = {
+            "executive_summary": {
+                "one_page_summary": report.get("executive_summary", "Report data unavailable"),
+                "chief_complaints": [],
+                "key_findings": ["Report data needs to be regenerated"],
+                "urgency_indicators": [],
+                "action_items": ["Contact support if this persists"]
+            }
+        }
+    return report
+
+
+def json_response(payload: Any, request: Request) -> Response:
+    """JSON response, gzip-encoded when the client accepts it and it is large"""
+    body = json.dumps(payload, separators=(",", ":"), default=str).encode()
+    headers = {"Vary": "Accept-Encoding"}
+    if len(body) >= GZIP_MIN_BYTES and "gzip" in request.headers.get("accept-encoding", ""):
+        body = gzip.compress(body, compresslevel=6)
+        headers["Content-Encoding"] = "gzip"
+    return Response(content=body, media_type="application/json", headers=headers)
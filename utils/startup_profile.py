@@ -0,0 +1,110 @@
+"""Startup timing for cold starts
+
+run_oracle times each router import and lifespan step with startup_profile;
+GET /internal/startup-report returns the result. For a per-module breakdown
+of import cost, run
+
+    python -m utils.startup_profile [--top N]
+
+which imports run_oracle under `python -X importtime` in a subprocess and
+summarizes the slowest first-party modules and third-party packages.
+"""
+import os
+import sys
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+
+# Heavy dependencies that should only be imported by the feature that needs them
+LAZY_MODULES = ("reportlab", "boto3", "tiktoken")
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class StartupProfile:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.ready_at: Optional[float] = None
+        self.phases: List[Dict[str, Any]] = []
+
+    @contextmanager
+    def timed(self, phase: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append({"phase": phase, "ms": round((time.perf_counter() - started) * 1000, 1)})
+
+    def mark_ready(self):
+        self.ready_at = time.perf_counter()
+
+    def report(self, slowest: int = 10) -> Dict[str, Any]:
+        return {
+            "ready_ms": round((self.ready_at - self.started) * 1000, 1) if self.ready_at else None,
+            "phases": self.phases,
+            "slowest": sorted(self.phases, key=lambda p: p["ms"], reverse=True)[:slowest],
+            "modules_loaded": len(sys.modules),
+            "lazy_modules_loaded": {name: name in sys.modules for name in LAZY_MODULES},
+        }
+
+
+startup_profile = StartupProfile()
+
+
+def parse_importtime(output: str) -> List[Tuple[str, int, int]]:
+    """(module, self_us, cumulative_us) rows from `python -X importtime` stderr"""
+    rows = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # header row
+        rows.append((parts[2].strip(), int(parts[0]), int(parts[1])))
+    return rows
+
+
+def _first_party(module: str) -> bool:
+    top = module.split(".")[0]
+    return os.path.isdir(os.path.join(REPO_ROOT, top)) or os.path.isfile(os.path.join(REPO_ROOT, f"{top}.py"))
+
+
+def summarize_importtime(rows: List[Tuple[str, int, int]], top: int = 20) -> str:
+    """Slowest first-party modules (cumulative) and third-party packages (total self time)"""
+    packages: Dict[str, int] = defaultdict(int)
+    for module, self_us, _ in rows:
+        if not _first_party(module):
+            packages[module.split(".")[0]] += self_us
+    ours = sorted(((cumulative, module) for module, _, cumulative in rows if _first_party(module)), reverse=True)
+    total = max((cumulative for _, _, cumulative in rows), default=0)
+
+    lines = [f"Total import time: {total / 1000:.0f} ms ({len(rows)} modules)", "",
+             f"Slowest first-party modules (cumulative, top {top}):"]
+    lines += [f"  {cumulative / 1000:8.1f} ms  {module}" for cumulative, module in ours[:top]]
+    lines += ["", f"Third-party packages (self time, top {top}):"]
+    lines += [f"  {us / 1000:8.1f} ms  {name}"
+              for name, us in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]]
+    return "\n".join(lines)
+
+
+def main():
+    import argparse
+    import subprocess
+
+    parser = argparse.ArgumentParser(description="Summarize `python -X importtime` for run_oracle")
+    parser.add_argument("--module", default="run_oracle")
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {args.module}"],
+        cwd=REPO_ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        print(result.stderr[-2000:])
+        sys.exit(result.returncode)
+    print(summarize_importtime(parse_importtime(result.stderr), args.top))
+
+
+if __name__ == "__main__":
+    main()
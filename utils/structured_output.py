@@ -0,0 +1,103 @@
+"""Structured LLM output: JSON schemas on the request, validation on the response
+
+Endpoints that want JSON describe it with a Pydantic model (models/llm_outputs).
+call_llm sends the model's JSON schema as response_format to the providers
+that honour it on OpenRouter (STRUCTURED_OUTPUT_MODELS), so the response is
+plain JSON. Other models still get the prompt's own JSON instructions, and
+their text goes through the single-pass extractor in utils/json_parser.
+
+parse_structured_output validates either way. call_llm_structured (in
+business_logic) re-asks the model once with the validation error when it
+fails; each failure and retry is counted per model here.
+"""
+import os
+import logging
+import threading
+from functools import lru_cache
+from typing import Any, Dict, Optional, Type
+
+from pydantic import BaseModel, ValidationError
+
+from utils.json_parser import extract_json_from_response
+
+logger = logging.getLogger(__name__)
+
+# Model prefixes whose providers accept response_format json_schema
+STRUCTURED_OUTPUT_MODELS = tuple(
+    p.strip() for p in os.getenv("STRUCTURED_OUTPUT_MODELS", "openai/,google/gemini").split(",") if p.strip()
+)
+STRUCTURED_OUTPUT_RETRIES = int(os.getenv("STRUCTURED_OUTPUT_RETRIES", "1"))
+RAW_OUTPUT_PREVIEW = 2000
+
+
+class StructuredOutputError(ValueError):
+    def __init__(self, message: str, raw: Any = None):
+        super().__init__(message)
+        self.raw = raw
+
+
+def supports_response_format(model: Optional[str]) -> bool:
+    return bool(model) and model.lower().startswith(STRUCTURED_OUTPUT_MODELS)
+
+
+@lru_cache(maxsize=None)
+def response_format(schema: Type[BaseModel]) -> Dict[str, Any]:
+    """OpenRouter response_format for a Pydantic model, built once per model"""
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": schema.__name__, "strict": False, "schema": schema.model_json_schema()},
+    }
+
+
+def parse_structured_output(content: Any, schema: Type[BaseModel]) -> BaseModel:
+    """Validate an LLM response against schema; StructuredOutputError if it does not fit"""
+    data = extract_json_from_response(content)
+    if data is None:
+        raise StructuredOutputError("response is not JSON", content)
+    try:
+        return schema.model_validate(data)
+    except ValidationError as e:
+        errors = "; ".join(f"{'.'.join(map(str, err['loc'])) or 'root'}: {err['msg']}" for err in e.errors())
+        raise StructuredOutputError(f"response does not match {schema.__name__}: {errors}", content)
+
+
+def repair_messages(raw: Any, error: StructuredOutputError) -> list:
+    """Follow-up turns asking the model to correct an invalid response"""
+    text = raw if isinstance(raw, str) else str(raw)
+    return [
+        {"role": "assistant", "content": text[:RAW_OUTPUT_PREVIEW]},
+        {"role": "user", "content": f"That reply was not valid: {error}. Reply with only the corrected JSON object."},
+    ]
+
+
+class StructuredOutputStats:
+    """Per-model structured calls, parse failures and the retries they caused"""
+
+    def __init__(self):
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def _bump(self, model: Optional[str], **counts: int):
+        with self._lock:
+            stats = self._stats.setdefault(model or "unknown", {
+                "calls": 0, "native_schema": 0, "parse_failures": 0, "retries": 0, "exhausted": 0,
+            })
+            for key, value in counts.items():
+                stats[key] += value
+
+    def record_call(self, model: Optional[str]):
+        self._bump(model, calls=1, native_schema=int(supports_response_format(model)))
+
+    def record_failure(self, model: Optional[str], retrying: bool):
+        self._bump(model, parse_failures=1, retries=int(retrying), exhausted=int(not retrying))
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            items = [(model, dict(stats)) for model, stats in sorted(self._stats.items())]
+        return {
+            model: {**s, "failure_rate": round(s["parse_failures"] / s["calls"], 3) if s["calls"] else 0.0}
+            for model, s in items
+        }
+
+
+structured_output_stats = StructuredOutputStats()
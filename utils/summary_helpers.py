@@ -1,10 +1,63 @@
 """Helper functions for generating summaries"""
 from datetime import datetime, timezone
 import uuid
+import asyncio
 from supabase_client import supabase
 from business_logic import call_llm
 from utils.token_counter import count_tokens
 
+# Running token count backfills (a reference keeps each task alive until it finishes)
+_backfills = set()
+
+
+def stored_token_count(row: dict, text_field: str = "llm_summary") -> int:
+    """A row's persisted token_count, counting the text only when none was stored"""
+    count = row.get("token_count")
+    return count if isinstance(count, int) else count_tokens(row.get(text_field) or "")
+
+
+def summary_token_total(rows: list, text_field: str = "llm_summary") -> int:
+    """Total tokens of stored llm_context summaries; rows saved without a count are backfilled in the background"""
+    total, missing = 0, []
+    for row in rows:
+        if not row.get(text_field):
+            continue
+        if isinstance(row.get("token_count"), int):
+            total += row["token_count"]
+            continue
+        count = count_tokens(row[text_field])
+        total += count
+        if row.get("id"):
+            missing.append({"id": row["id"], "token_count": count})
+    if missing:
+        _schedule_token_backfill(missing)
+    return total
+
+def _store_token_counts(counts: list):
+    """Write backfilled token counts in one call (set_llm_context_token_counts in the migration)"""
+    try:
+        supabase.rpc("set_llm_context_token_counts", {"counts": counts}).execute()
+    except Exception as e:
+        # Counted again on the next read
+        print(f"Could not store token counts for {len(counts)} llm_context rows: {e}")
+
+def _schedule_token_backfill(counts: list):
+    """Store counts off the event loop; called from a worker thread or script, store them directly"""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        _store_token_counts(counts)
+        return
+    task = loop.create_task(asyncio.to_thread(_store_token_counts, counts))
+    _backfills.add(task)
+    task.add_done_callback(_backfills.discard)
+
+def _schedule_digest_refresh(user_id: str):
+    """Rebuild the user's history digest in the background after a new summary"""
+    # Imported here because utils.history_digest imports this module
+    from utils.history_digest import schedule_digest_refresh
+    schedule_digest_refresh(user_id)
+
 async def create_conversational_summary(conversation_id: str, user_id: str) -> str:
     """Generate a summary for a conversation"""
     try:
@@ -31,7 +84,7 @@ async def create_conversational_summary(conversation_id: str, user_id: str) -> s
     for msg in messages:
         role = "User" if msg["role"] == "user" else "Oracle AI"
         conversation_text += f"{role}: {msg['content']}\n\n"
-        total_tokens += count_tokens(msg['content'])
+        total_tokens += stored_token_count(msg, "content")
     
     print(f"Total conversation tokens: {total_tokens}")
     
@@ -82,6 +135,7 @@ CONVERSATION:
     if not insert_response.data:
         print(f"Failed to save summary: {insert_response}")
         raise ValueError("Failed to save summary to database")
+    _schedule_digest_refresh(user_id)
     
     print(f"Summary saved with ID: {summary_data['id']}")
     return summary_content
@@ -169,6 +223,7 @@ Seek Care If: {', '.join(scan_data.get('analysis_result', {}).get('seekCareIf',
     if not insert_response.data:
         print(f"Failed to save summary: {insert_response}")
         raise ValueError("Failed to save summary to database")
+    _schedule_digest_refresh(user_id)
     
     print(f"Quick scan summary saved with ID: {summary_data['id']}")
     return summary_content
\ No newline at end of file
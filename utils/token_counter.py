@@ -1,14 +1,180 @@
-"""Token counting utilities"""
-import tiktoken
+"""Token counting utilities
 
-# Token counter
-try:
-    encoding = tiktoken.encoding_for_model("gpt-3.5-turbo")
-except:
-    encoding = None
+Counts are cached in a bounded LRU keyed on a hash of the text, so the
+summaries and messages that get re-counted on every chat turn are encoded
+once. Use estimate_tokens / exceeds_token_limit for threshold checks that
+do not need an exact count, and count_tokens_batch / count_message_tokens
+to encode many strings in one call.
+"""
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
 
-def count_tokens(text: str) -> int:
+if TYPE_CHECKING:
+    import tiktoken
+
+DEFAULT_MODEL = "gpt-3.5-turbo"
+DEFAULT_ENCODING = "cl100k_base"
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "4096"))
+MIN_CACHED_CHARS = 64  # shorter strings encode faster than they hash
+CHARS_PER_TOKEN = 4
+MESSAGE_OVERHEAD_TOKENS = 4  # role and separators per chat message
+# exceeds_token_limit trusts the estimate when it is this far from the limit
+ESTIMATE_MARGIN = 0.25
+
+# Loaded on first use: importing tiktoken and reading a vocabulary is slow
+_encodings: Dict[str, Optional["tiktoken.Encoding"]] = {}
+_encodings_lock = threading.Lock()
+
+
+def get_encoding(model: Optional[str] = None) -> Optional["tiktoken.Encoding"]:
+    """
+    Encoding for a model, loaded once per model.
+
+    OpenRouter ids ("openai/gpt-4o") are matched on the model name; models
+    tiktoken does not know use cl100k_base. Returns None when no encoding can
+    be loaded (e.g. offline without a cached vocabulary).
+    """
+    model = model or DEFAULT_MODEL
+    if model in _encodings:
+        return _encodings[model]
+
+    with _encodings_lock:
+        if model not in _encodings:
+            name = model.split("/")[-1]
+            try:
+                import tiktoken
+                loaded = tiktoken.encoding_for_model(name)
+            except KeyError:
+                loaded = _load(DEFAULT_ENCODING)
+            except Exception:
+                loaded = None
+            _encodings[model] = loaded
+    return _encodings[model]
+
+
+def _load(encoding_name: str) -> Optional["tiktoken.Encoding"]:
+    try:
+        import tiktoken
+        return tiktoken.get_encoding(encoding_name)
+    except Exception:
+        return None
+
+
+class TokenCountCache:
+    """Thread-safe LRU of token counts keyed on (encoding, text digest)"""
+
+    def __init__(self, max_size: int = TOKEN_CACHE_SIZE):
+        self.max_size = max_size
+        self._counts: "OrderedDict[Tuple[str, bytes], int]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(encoding_name: str, text: str) -> Tuple[str, bytes]:
+        return encoding_name, hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+    def get(self, key: Tuple[str, bytes]) -> Optional[int]:
+        with self._lock:
+            count = self._counts.get(key)
+            if count is None:
+                self.misses += 1
+                return None
+            self._counts.move_to_end(key)
+            self.hits += 1
+            return count
+
+    def put(self, key: Tuple[str, bytes], count: int):
+        with self._lock:
+            self._counts[key] = count
+            self._counts.move_to_end(key)
+            while len(self._counts) > self.max_size:
+                self._counts.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._counts.clear()
+            self.hits = self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {"size": len(self._counts), "hits": self.hits, "misses": self.misses}
+
+
+token_cache = TokenCountCache()
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap approximate count; ~4 chars per token also holds for whitespace-free JSON"""
+    return len(text or "") // CHARS_PER_TOKEN
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
     """Count tokens in text"""
-    if encoding:
-        return len(encoding.encode(text))
-    return len(text.split()) * 1.3  # Rough estimate if tiktoken fails
\ No newline at end of file
+    if not text:
+        return 0
+    enc = get_encoding(model)
+    if enc is None:
+        return estimate_tokens(text)
+    if len(text) < MIN_CACHED_CHARS:
+        return len(enc.encode_ordinary(text))
+
+    key = token_cache.key(enc.name, text)
+    count = token_cache.get(key)
+    if count is None:
+        count = len(enc.encode_ordinary(text))
+        token_cache.put(key, count)
+    return count
+
+
+def count_tokens_batch(texts: Iterable[str], model: Optional[str] = None) -> List[int]:
+    """Token counts for many strings; cache misses are encoded in one batch call"""
+    texts = [text or "" for text in texts]
+    enc = get_encoding(model)
+    if enc is None:
+        return [estimate_tokens(text) for text in texts]
+
+    counts: List[Optional[int]] = [None] * len(texts)
+    pending: Dict[Tuple[str, bytes], List[int]] = {}
+    for i, text in enumerate(texts):
+        if not text:
+            counts[i] = 0
+            continue
+        key = token_cache.key(enc.name, text)
+        cached = token_cache.get(key)
+        if cached is None:
+            pending.setdefault(key, []).append(i)
+        else:
+            counts[i] = cached
+
+    if pending:
+        keys = list(pending)
+        encoded = enc.encode_ordinary_batch([texts[pending[key][0]] for key in keys])
+        for key, tokens in zip(keys, encoded):
+            token_cache.put(key, len(tokens))
+            for i in pending[key]:
+                counts[i] = len(tokens)
+
+    return counts
+
+
+def count_message_tokens(messages: List[dict], model: Optional[str] = None) -> int:
+    """Tokens of a chat transcript: message contents plus per-message overhead"""
+    contents = [m.get("content") if isinstance(m.get("content"), str) else str(m.get("content") or "")
+                for m in messages]
+    return sum(count_tokens_batch(contents, model)) + MESSAGE_OVERHEAD_TOKENS * len(messages)
+
+
+def exceeds_token_limit(text: str, limit: int, model: Optional[str] = None) -> bool:
+    """
+    Whether text is over a token limit, encoding only when the estimate is
+    too close to the limit to trust.
+    """
+    estimate = estimate_tokens(text)
+    if estimate > limit * (1 + ESTIMATE_MARGIN):
+        return True
+    if estimate < limit * (1 - ESTIMATE_MARGIN):
+        return False
+    return count_tokens(text, model) > limit